@@ -0,0 +1,70 @@
+"""基准测试公共工具：路径设置、计时、内存统计、无终端输出。
+
+合成仓库由 core.synthetic_repo 生成。
+"""
+
+import io
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SRC = os.path.join(ROOT, "src")
+CLI = os.path.join(SRC, "cli")
+
+for _path in (SRC, CLI):
+    if _path not in sys.path:
+        sys.path.insert(0, _path)
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+def peak_rss_mb(children: bool = False) -> float:
+    """返回进程峰值 RSS（MB），不支持的平台返回 -1"""
+    if resource is None:
+        return -1.0
+    who = resource.RUSAGE_CHILDREN if children else resource.RUSAGE_SELF
+    peak = resource.getrusage(who).ru_maxrss
+    # Linux 单位是 KB，macOS 是字节
+    if sys.platform == "darwin":
+        return peak / (1024 * 1024)
+    return peak / 1024
+
+
+class Timer:
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.elapsed = time.perf_counter() - self.start
+
+
+class CountingStream(io.StringIO):
+    """只统计写入字节数的终端输出"""
+
+    def __init__(self):
+        super().__init__()
+        self.count = 0
+
+    def write(self, data):
+        self.count += len(data.encode("utf-8"))
+        return len(data)
+
+    def isatty(self):
+        return True
+
+    def fileno(self):
+        raise io.UnsupportedOperation
+
+
+def make_output(stream, rows: int = 40, columns: int = 100):
+    """写到 stream 的 VT100 终端输出（转义序列照常生成）"""
+    from prompt_toolkit.data_structures import Size
+    from prompt_toolkit.output.vt100 import Vt100_Output
+
+    # 计数终端不会回应光标位置查询（CPR），关闭它以免每个 Application 启动时等待超时
+    return Vt100_Output(stream, lambda: Size(rows=rows, columns=columns), term="xterm", enable_cpr=False)
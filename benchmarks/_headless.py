@@ -0,0 +1,159 @@
+"""无终端驱动界面：管道输入 + 计数输出，按脚本发送按键，统计每次按键的延迟和内存分配
+
+    script = parse_script("down*20 up*5 text:hello tab enter")
+    result = Harness().run(lambda: MainMenuNavigation().main_async(), script)
+    print(result.describe())
+
+界面运行在和程序中相同的 ScreenStack 里。每个按键从写入管道计时到下一次渲染
+完成（Application.after_render）；按键没有引起重绘时等待 key_timeout 秒后记为
+超时，不计入延迟分布。trace_alloc=True 时用 tracemalloc 统计每个按键期间的分配
+峰值（tracemalloc 本身会让延迟变大，所以延迟和分配分两遍测）。
+
+脚本由空格分隔的按键组成：
+    down  up  left  right  enter  esc  tab  s-tab  space  backspace
+    pageup  pagedown  home  end  f12
+    name*N      重复 N 次
+    text:abc    逐个字符输入（每个字符算一次按键）
+"""
+
+import asyncio
+import statistics
+import time
+import tracemalloc
+from typing import NamedTuple
+
+from _common import CountingStream, make_output
+
+from prompt_toolkit.application import create_app_session
+from prompt_toolkit.input import create_pipe_input
+
+from screen_stack import ScreenStack
+
+KEYS = {
+    "up": "\x1b[A", "down": "\x1b[B", "right": "\x1b[C", "left": "\x1b[D",
+    "enter": "\r", "esc": "\x1b", "tab": "\t", "s-tab": "\x1b[Z", "space": " ", "backspace": "\x7f",
+    "pageup": "\x1b[5~", "pagedown": "\x1b[6~", "home": "\x1b[H", "end": "\x1b[F", "f12": "\x1b[24~",
+}
+
+
+def parse_script(script: str) -> list:
+    """脚本 -> [(名称, 发送的数据), ...]"""
+    keys = []
+    for token in script.split():
+        if token.startswith("text:"):
+            keys += [(char, char) for char in token[len("text:"):]]
+            continue
+        name, _, count = token.partition("*")
+        if name not in KEYS:
+            raise ValueError(f"未知的按键: {name}")
+        keys += [(name, KEYS[name])] * int(count or 1)
+    return keys
+
+
+class RunResult(NamedTuple):
+    name: str
+    latencies: list     # 每个按键的延迟（毫秒），不含超时
+    timeouts: int       # 没有引起重绘的按键数
+    allocations: list   # 每个按键期间的分配峰值（字节），trace_alloc=False 时为空
+    output_bytes: int   # 写到终端的总字节数
+    keys: int
+
+    def describe(self) -> str:
+        parts = [f"{self.name:<20}"]
+        if self.latencies:
+            ms = sorted(self.latencies)
+            p90 = ms[min(len(ms) - 1, int(len(ms) * 0.9))]
+            p99 = ms[min(len(ms) - 1, int(len(ms) * 0.99))]
+            parts.append(f"median {statistics.median(ms):6.2f}  p90 {p90:6.2f}  p99 {p99:6.2f}  "
+                         f"max {ms[-1]:6.2f} ms")
+        if self.allocations:
+            parts.append(f"alloc {statistics.mean(self.allocations) / 1024:7.1f} KiB/key "
+                         f"(max {max(self.allocations) / 1024:.0f})")
+        if self.keys:
+            parts.append(f"{self.output_bytes / self.keys:6.0f} bytes/key")
+        if self.timeouts:
+            parts.append(f"{self.timeouts} without redraw")
+        return "  ".join(parts)
+
+
+class Harness:
+    def __init__(self, rows: int = 40, columns: int = 100, key_timeout: float = 1.0,
+                 start_timeout: float = 30.0, trace_alloc: bool = False):
+        self.rows = rows
+        self.columns = columns
+        self.key_timeout = key_timeout
+        self.start_timeout = start_timeout
+        self.trace_alloc = trace_alloc
+
+    def run(self, start, keys: list, name: str = "") -> RunResult:
+        """start() 返回显示界面的协程（例如 lambda: File().main_async()），按顺序发送 keys
+
+        脚本发送完后取消 start() 的任务（界面随之出栈），脚本中途界面自己结束也可以。
+        """
+        stream = CountingStream()
+        with create_pipe_input() as inp, create_app_session(
+                input=inp, output=make_output(stream, self.rows, self.columns)):
+            return asyncio.run(self._drive(start, keys, inp, stream, name))
+
+    async def _drive(self, start, keys, inp, stream, name) -> RunResult:
+        stack = ScreenStack()
+        # 单独的 Esc 要等 ttimeoutlen 才能确定不是转义序列的开头，缩短以免每次多等半秒
+        stack.app.ttimeoutlen = 0.01
+        rendered = asyncio.Event()
+        stack.app.after_render += lambda _app: rendered.set()
+        latencies, allocations = [], []
+        timeouts = 0
+
+        async def flow():
+            nonlocal timeouts
+            task = asyncio.ensure_future(start())
+            # 等界面压栈并完成第一次渲染（有的界面先在后台加载数据）
+            deadline = time.perf_counter() + self.start_timeout
+            while not len(stack) and not task.done():
+                if time.perf_counter() > deadline:
+                    raise TimeoutError(f"{name or start}: 界面没有出现")
+                await asyncio.sleep(0.005)
+            rendered.clear()
+            await self._wait(rendered, task, self.start_timeout)
+            stream.count = 0
+
+            for _label, data in keys:
+                if task.done():
+                    break
+                rendered.clear()
+                if self.trace_alloc:
+                    tracemalloc.reset_peak()
+                    base = tracemalloc.get_traced_memory()[0]
+                begin = time.perf_counter()
+                inp.send_text(data)
+                if await self._wait(rendered, task, self.key_timeout):
+                    latencies.append((time.perf_counter() - begin) * 1000)
+                else:
+                    timeouts += 1
+                if self.trace_alloc:
+                    allocations.append(max(tracemalloc.get_traced_memory()[1] - base, 0))
+
+            if not task.done():
+                task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+        if self.trace_alloc:
+            tracemalloc.start()
+        try:
+            await stack.run(flow())
+        finally:
+            if self.trace_alloc:
+                tracemalloc.stop()
+        return RunResult(name, latencies, timeouts, allocations, stream.count, len(keys))
+
+    @staticmethod
+    async def _wait(rendered: asyncio.Event, task, timeout: float) -> bool:
+        """等到下一次渲染完成（或界面自己结束）；超时返回 False"""
+        waiter = asyncio.ensure_future(rendered.wait())
+        done, _pending = await asyncio.wait([waiter, task], timeout=timeout,
+                                            return_when=asyncio.FIRST_COMPLETED)
+        waiter.cancel()
+        return bool(done)
@@ -0,0 +1,85 @@
+"""blame 的响应时间：阻塞的 git blame 与流式 BlameDocument（首批结果、完成、缓存、跳到父版本）
+
+生成一个仓库，其中一个 --lines 行的文件被 --commits 个提交各改几行。
+
+用法: python benchmarks/bench_blame.py [--lines 20000] [--commits 2000]
+"""
+
+import argparse
+import os
+import subprocess
+import tempfile
+import threading
+import time
+
+from _common import Timer
+
+from core import object_cache
+from core.blame_stream import BlameDocument
+from core.git_backend import GitBackend
+from core.synthetic_repo import BIG_FILE, make_synthetic_repo
+
+PATH = BIG_FILE
+
+
+def make_repo(path: str, lines: int, commits: int) -> str:
+    """一条直线历史：只有 BIG_FILE，每个提交改写其中几行，7 个作者轮流提交"""
+    return make_synthetic_repo(path, commits, branches=1, merge_every=0, files=0, files_per_commit=0,
+                               big_file_lines=lines, authors=7)
+
+
+def measure_stream(backend, rev="HEAD", seed=None):
+    """(首批结果 ms, 完成 ms, 文档)"""
+    first = threading.Event()
+    begin = time.perf_counter()
+    times = {}
+
+    def on_update():
+        if not first.is_set():
+            times["first"] = time.perf_counter() - begin
+            first.set()
+
+    doc = BlameDocument.open(backend, PATH, rev, on_update=on_update, seed=seed)
+    doc.wait_for(None)
+    total = time.perf_counter() - begin
+    return times.get("first", total) * 1000, total * 1000, doc
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--lines", type=int, default=20000)
+    parser.add_argument("--commits", type=int, default=2000)
+    args = parser.parse_args()
+
+    repo = make_repo(os.path.join(tempfile.gettempdir(), f"gittui-synthetic-blame-{args.lines}-{args.commits}"),
+                     args.lines, args.commits)
+    backend = GitBackend(repo)
+
+    with Timer() as t:
+        subprocess.run(["git", "blame", "--porcelain", "HEAD", "--", PATH], cwd=repo,
+                       stdout=subprocess.DEVNULL, check=True)
+    print(f"git blame (blocking)         {t.elapsed * 1000:8.0f} ms")
+
+    first, total, doc = measure_stream(backend)
+    print(f"BlameDocument first results  {first:8.0f} ms   complete {total:.0f} ms")
+
+    _first, total, _doc = measure_stream(backend)
+    print(f"reopen (cache)               {total:8.1f} ms")
+
+    # 跳到最近修改的一行所在提交的父版本：沿用行映射 vs 清空缓存后从头 blame
+    line = max(range(len(doc)), key=lambda i: doc.entries[i].commit.author_time)
+    parent_rev = doc.entries[line].previous[0]
+    with Timer() as t:
+        parent = doc.open_parent(line)
+        shown = time.perf_counter() - t.start
+        parent.wait_for(None)
+    print(f"parent jump (reuse)          {shown * 1000:8.0f} ms   {parent.reused}/{len(parent)} lines shown, "
+          f"complete {t.elapsed * 1000:.0f} ms")
+    object_cache.clear()
+    _first, total, _doc = measure_stream(backend, parent_rev)
+    print(f"parent from scratch          {total:8.0f} ms")
+    backend.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""提交搜索：git log --grep / --author / -- 路径 与 core.commit_index 查询的耗时
+
+索引写到临时目录（不影响用户数据目录）；依次测完整建立、没有新提交时的打开、
+加入一批新提交后的增量更新，以及几种查询。路径查询的对照组用
+`--full-history --no-merges`，结果应与索引完全相同。
+
+用法: python benchmarks/bench_commit_index.py [--commits 100000] [--repo /tmp/gittui-bench-100k] [--new 200]
+"""
+
+import argparse
+import os
+import shutil
+import subprocess
+import tempfile
+
+from _common import Timer
+
+from core.commit_index import CommitIndex
+from core.synthetic_repo import RepoSpec, make_synthetic_repo, write_stream
+
+
+def git_log(repo: str, *args) -> set:
+    out = subprocess.run(["git", "log", "--all", "--format=%H", *args], cwd=repo, check=True,
+                         capture_output=True, text=True).stdout
+    return set(out.split())
+
+
+def add_commits(repo: str, count: int):
+    """在 HEAD 之上的新分支 bench-new 上加入 count 个提交（fast-import，不碰工作区）"""
+    head = subprocess.run(["git", "rev-parse", "HEAD"], cwd=repo, check=True, capture_output=True,
+                          text=True).stdout.strip()
+    spec = RepoSpec(commits=count, branches=1, merge_every=0, files=20, dirs=1, prefix="bench",
+                    message="bench update {n}: tune zebra cache", start_time=2_000_000_000)
+    parts = []
+    write_stream(spec, parts.append, main="bench-new", parent=head)
+    subprocess.run(["git", "fast-import", "--quiet", "--done"], cwd=repo, input=b"".join(parts), check=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--commits", type=int, default=100_000)
+    parser.add_argument("--repo", default=None)
+    parser.add_argument("--new", type=int, default=200, help="增量更新时加入的提交数")
+    args = parser.parse_args()
+
+    repo = args.repo or os.path.join(tempfile.gettempdir(), f"gittui-bench-{args.commits}")
+    make_synthetic_repo(repo, args.commits)
+    subprocess.run(["git", "branch", "-D", "bench-new"], cwd=repo, capture_output=True)
+    root = tempfile.mkdtemp(prefix="gittui-index-")
+    try:
+        with Timer() as t:
+            index, added = CommitIndex.update(repo, root)
+        size = os.path.getsize(CommitIndex.path_for(repo, root))
+        print(f"build: {added} commits in {t.elapsed:.2f}s, {size / 1e6:.1f} MB on disk, "
+              f"{len(index.fields['word'][0])} words, {len(index.fields['path'][0])} paths")
+        with Timer() as t:
+            index, added = CommitIndex.update(repo, root)
+        print(f"open, no new commits: {t.elapsed * 1000:.1f} ms")
+
+        add_commits(repo, args.new)
+        with Timer() as t:
+            index, added = CommitIndex.update(repo, root)
+        print(f"incremental: {added} new commits in {t.elapsed * 1000:.1f} ms")
+
+        sample = index.hit(len(index) // 2)
+        word = sample.subject.split()[0]
+        author = sample.author.split(" <")[0]
+        path = subprocess.run(["git", "ls-tree", "-r", "--name-only", "HEAD"], cwd=repo, check=True,
+                              capture_output=True, text=True).stdout.split()[0]
+        directory = path.rpartition("/")[0]
+        cases = [
+            (word, ["-i", f"--grep={word}"]),
+            ("zebra cache", ["-i", "--all-match", "--grep=zebra", "--grep=cache"]),
+            (f"author:\"{author}\"", [f"--author={author}"]),
+            (f"path:{path}", ["--full-history", "--no-merges", "--", path]),
+            (f"path:{directory}", ["--full-history", "--no-merges", "--", directory]),
+            ("zebra path:bench", ["-i", "--grep=zebra", "--full-history", "--no-merges", "--", "bench"]),
+        ]
+        print(f"\n{'query':<32} {'git log':>10} {'index':>10} {'matches':>8}")
+        for query, git_args in cases:
+            with Timer() as git_time:
+                expected = git_log(repo, *git_args)
+            with Timer() as index_time:
+                # 取出全部结果以便与 git log 比较；界面中默认只取最新的 DEFAULT_LIMIT 个
+                result = index.search(query, limit=len(index))
+            same = "" if {hit.sha for hit in result.hits} == expected else f"  (git log: {len(expected)})"
+            print(f"{query[:32]:<32} {git_time.elapsed * 1000:8.0f} ms {index_time.elapsed * 1000:7.2f} ms "
+                  f"{result.total:8d}{same}")
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+        subprocess.run(["git", "branch", "-D", "bench-new"], cwd=repo, capture_output=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""提交存储内存基准：CommitStore 对比朴素的 list-of-dicts 模型
+
+用法: python benchmarks/bench_commit_store.py [--commits 500000]
+"""
+
+import argparse
+import gc
+import hashlib
+import tracemalloc
+
+from _common import Timer
+
+from core.commit_store import CommitStore
+
+AUTHORS = [f"Developer {i}" for i in range(200)]
+
+
+def synthetic_commits(count: int):
+    """生成与真实 git log 形状相近的提交（线性主干 + 周期性合并）"""
+    shas = [hashlib.sha1(str(i).encode()).hexdigest() for i in range(count + 1)]
+    for i in range(count):
+        parents = (shas[i + 1],) if i % 40 else (shas[i + 1], shas[min(i + 7, count)])
+        yield shas[i], parents, AUTHORS[i % len(AUTHORS)], 1_600_000_000 + i, f"Fix issue #{i} in module {i % 97}", i % 6, "| * |"
+
+
+def build_store(count: int) -> CommitStore:
+    store = CommitStore()
+    for sha, parents, author, ts, subject, lane, graph in synthetic_commits(count):
+        store.append(sha, parents, author, ts, subject, lane, graph)
+    return store
+
+
+def build_dicts(count: int) -> list:
+    return [
+        {"sha": sha, "parents": list(parents), "author": author, "timestamp": ts,
+         "subject": subject, "lane": lane, "graph": graph}
+        for sha, parents, author, ts, subject, lane, graph in synthetic_commits(count)
+    ]
+
+
+def measure(label: str, builder, count: int):
+    gc.collect()
+    tracemalloc.start()
+    with Timer() as t:
+        model = builder(count)
+    current, _peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:<14} {count} commits: {current / (1024 * 1024):8.1f} MB retained, "
+          f"{current / count:6.0f} B/commit, built in {t.elapsed:.2f}s")
+    return model
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--commits", type=int, default=500_000)
+    args = parser.parse_args()
+
+    store = measure("CommitStore", build_store, args.commits)
+    print(f"{'':<14} of which array columns: {store.nbytes() / (1024 * 1024):.1f} MB")
+    del store
+    measure("list-of-dicts", build_dicts, args.commits)
+
+
+if __name__ == "__main__":
+    main()
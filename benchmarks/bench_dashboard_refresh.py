@@ -0,0 +1,95 @@
+"""总览刷新基准：刷新全部仓库状态的耗时随仓库数量的变化
+
+先建一个带几百个文件的种子仓库，再本地克隆出 N 个工作区（每个都有上游，
+部分有未提交的修改和领先的提交），然后用不同的并发数调用 refresh_statuses，
+记录第一个结果到达的时间和全部完成的时间。
+
+用法: python benchmarks/bench_dashboard_refresh.py [--max-repos 150]
+"""
+
+import argparse
+import asyncio
+import os
+import subprocess
+import tempfile
+import time
+
+from _common import Timer
+
+from core.repo_status import refresh_statuses
+
+FILES = 300
+
+
+def git(cwd, *args):
+    subprocess.run(["git", *args], cwd=cwd, check=True, capture_output=True)
+
+
+def make_seed(root: str) -> str:
+    seed = os.path.join(root, "seed")
+    os.makedirs(seed)
+    git(seed, "init", "-q", "-b", "main")
+    for i in range(FILES):
+        sub = os.path.join(seed, f"dir{i % 20}")
+        os.makedirs(sub, exist_ok=True)
+        with open(os.path.join(sub, f"file{i}.txt"), "w") as f:
+            f.write(f"line {i}\n" * 20)
+    git(seed, "add", "-A")
+    git(seed, "-c", "user.name=bench", "-c", "user.email=bench@example.com", "commit", "-q", "-m", "seed")
+    return seed
+
+
+def make_repos(root: str, seed: str, count: int, existing: list) -> list:
+    for i in range(len(existing), count):
+        path = os.path.join(root, f"repo{i:04d}")
+        git(root, "clone", "-q", seed, path)
+        if i % 3 == 0:
+            with open(os.path.join(path, "dir0", "file0.txt"), "a") as f:
+                f.write("dirty\n")
+        if i % 5 == 0:
+            git(path, "-c", "user.name=bench", "-c", "user.email=bench@example.com",
+                "commit", "-q", "--allow-empty", "-m", "ahead")
+        existing.append(path)
+    return existing
+
+
+async def measure(paths, concurrency):
+    start = time.perf_counter()
+    first = []
+
+    def on_result(_status):
+        if not first:
+            first.append(time.perf_counter() - start)
+
+    results = await refresh_statuses(paths, on_result, concurrency=concurrency, timeout=30)
+    total = time.perf_counter() - start
+    errors = sum(1 for status in results if status.error)
+    return first[0], total, errors
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--max-repos", type=int, default=150)
+    args = parser.parse_args()
+    counts = [n for n in (10, 50, 100, 150, 300) if n <= args.max_repos] or [args.max_repos]
+
+    with tempfile.TemporaryDirectory() as root:
+        seed = make_seed(root)
+        paths = []
+        with Timer() as t:
+            make_repos(root, seed, max(counts), paths)
+        print(f"created {len(paths)} repositories in {t.elapsed:.1f}s ({os.cpu_count()} CPUs)\n")
+        # 预热文件系统缓存和 git 的 index
+        asyncio.run(measure(paths, 8))
+
+        print(f"{'repos':>6} {'concurrency':>12} {'first result':>13} {'all done':>10} {'per repo':>9}")
+        for count in counts:
+            for concurrency in (1, 8, 32):
+                first, total, errors = asyncio.run(measure(paths[:count], concurrency))
+                note = f"  {errors} errors" if errors else ""
+                print(f"{count:>6} {concurrency:>12} {first * 1000:>10.1f} ms {total:>8.2f} s "
+                      f"{total / count * 1000:>6.1f} ms{note}")
+
+
+if __name__ == "__main__":
+    main()
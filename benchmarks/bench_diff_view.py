@@ -0,0 +1,115 @@
+"""流式 diff 查看基准：巨大 diff 的第一屏时间、内存和滚动开销
+
+生成一份合成的 diff（若干普通大小的 Python 文件 + 一个巨大的文件），对比
+- 整体读取：读完整个输出，切分成行，再交给 VirtualList（原来 CommitView 的做法）
+- DiffDocument：边读边切分，只读到第一屏 + LOOKAHEAD 行；大文件折叠
+第一屏时间和 tracemalloc 峰值都在读到第一屏时统计，之后按住方向键滚动，
+统计每次按键（含语法高亮）的渲染时间。
+
+用法: python benchmarks/bench_diff_view.py [--files 400] [--lines 200] [--huge 200000]
+"""
+
+import argparse
+import io
+import tracemalloc
+
+from _common import Timer
+
+from prompt_toolkit.application import Application
+from prompt_toolkit.application.current import set_app
+from prompt_toolkit.input import DummyInput
+from prompt_toolkit.output import DummyOutput
+from prompt_toolkit.layout import Layout
+
+from core.diff_stream import DiffDocument
+from widgets.diff_view import DiffView
+from widgets.virtual_list import VirtualList
+
+PAGE = 30
+KEYPRESSES = 2000
+
+
+def synthetic_diff(files: int, lines: int, huge: int) -> bytes:
+    out = io.StringIO()
+    write = out.write
+    for f in range(files):
+        write(f"diff --git a/pkg/mod{f}.py b/pkg/mod{f}.py\nindex 1111111..2222222 100644\n")
+        write(f"--- a/pkg/mod{f}.py\n+++ b/pkg/mod{f}.py\n")
+        for start in range(0, lines, 50):
+            write(f"@@ -{start + 1},50 +{start + 1},50 @@ class Mod{f}:\n")
+            for i in range(start, min(start + 50, lines)):
+                sign = "+-  "[i % 4]
+                write(f"{sign}    def method_{i}(self, value):  # {f}\n")
+                write(f"{sign}        return value * {i} + \"text {i}\"\n")
+        if f == files // 2:
+            write("diff --git a/data/huge.csv b/data/huge.csv\nindex 3333333..4444444 100644\n")
+            write("--- a/data/huge.csv\n+++ b/data/huge.csv\n")
+            write(f"@@ -1,{huge} +1,{huge} @@\n")
+            for i in range(huge):
+                write(f"{'+-'[i % 2]}{i},row {i},{i * 7 % 1000}\n")
+    return out.getvalue().encode()
+
+
+def whole(data: bytes):
+    text = data.decode("utf-8", "replace")
+    lines = text.splitlines()
+    return VirtualList(lines, max_height=PAGE)
+
+
+def streaming(data: bytes):
+    document = DiffDocument(io.BytesIO(data))
+    document.wait_for(PAGE, timeout=5)
+    return document
+
+
+def first_screen(data: bytes, build):
+    tracemalloc.start()
+    with Timer() as t:
+        result = build(data)
+    _current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, t.elapsed * 1000, peak / (1 << 20)
+
+
+def scroll(document) -> float:
+    view = DiffView(document, max_height=PAGE)
+    app = Application(layout=Layout(view.window), input=DummyInput(), output=DummyOutput())
+    with set_app(app):
+        with Timer() as t:
+            for n in range(KEYPRESSES):
+                view.view.move_to(view.view.index + (1 if n % 50 else PAGE))
+                view.view._get_fragments()
+    return t.elapsed / KEYPRESSES * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--files", type=int, default=400)
+    parser.add_argument("--lines", type=int, default=200)
+    parser.add_argument("--huge", type=int, default=200_000)
+    args = parser.parse_args()
+
+    data = synthetic_diff(args.files, args.lines, args.huge)
+    lines = data.count(b"\n")
+    print(f"diff: {len(data) / (1 << 20):.1f} MiB, {lines} lines")
+
+    _view, elapsed, peak = first_screen(data, whole)
+    print(f"  read whole output   first screen {elapsed:8.1f} ms  peak {peak:7.1f} MiB")
+    document, elapsed, peak = first_screen(data, streaming)
+    print(f"  DiffDocument        first screen {elapsed:8.1f} ms  peak {peak:7.1f} MiB  ({len(document)} rows parsed)")
+
+    print(f"scroll with highlighting: {scroll(document):7.1f} us/keypress  ({len(document)} rows loaded)")
+
+    document.load_all()
+    document.wait_for(1 << 62, timeout=60)
+    large = [row for row in document.rows if row.kind == "large"]
+    print(f"all loaded: {len(document)} rows, {len(large)} collapsed file(s)")
+    for row in large:
+        with Timer() as t:
+            document.expand(row.file)
+        print(f"  expand {row.file.path}: {t.elapsed * 1000:.1f} ms -> {len(document)} rows")
+    document.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""菜单框渲染基准：每次按键新生成的片段数与耗时
+
+对比重构前每次重绘都用 f-string 重新拼出整个框的 get_text（这里保留一份作为
+对照）与 FrameControl：按下方向键后渲染一帧（create_content 并取出所有行），
+统计与上一帧相比新生成的行和片段，以及每次按键的耗时。
+
+用法: python benchmarks/bench_frame_render.py
+"""
+
+from _common import Timer
+
+from prompt_toolkit.application import Application
+from prompt_toolkit.application.current import set_app
+from prompt_toolkit.input import DummyInput
+from prompt_toolkit.layout import Layout
+from prompt_toolkit.layout.containers import Window
+from prompt_toolkit.layout.controls import FormattedTextControl
+from prompt_toolkit.output import DummyOutput
+
+from widgets.frame import FrameControl
+
+KEYPRESSES = 5000
+WIDTH = 100
+MENUS = {
+    "main menu (6 items)": ("File", ["File", "Edit", "View", "Repository", "Branch", "Help"]),
+    "File (5 items)": ("File", ["New Repository", "Add local Repository", "Clone repository", "Options", "Exit"]),
+    "40 items": ("Menu", [f"Entry number {i}" for i in range(40)]),
+}
+
+
+def legacy_text(title, choices, index):
+    """重构前 File.get_text 的做法"""
+    def get_text():
+        max_choice_len = max(len(c) for c in choices)
+        inner_width = max(len(title), max_choice_len + 2) + 2
+        fragments = [('', f"+{'-' * inner_width}+\n"), ('', f"|{title:^{inner_width}}|\n"),
+                     ('', f"+{'-' * inner_width}+\n")]
+        for i, choice in enumerate(choices):
+            arrow = '►' if i == index[0] else ' '
+            padded_content = f"{f'{arrow} {choice:<{max_choice_len}}':<{inner_width}}"
+            fragments.append(('class:selected' if i == index[0] else '', f"|{padded_content}|\n"))
+        fragments.append(('', f"+{'-' * inner_width}+\n"))
+        return fragments
+    return get_text
+
+
+def render(app, control):
+    """渲染一帧：返回各行片段"""
+    app.render_counter += 1
+    content = control.create_content(WIDTH, 50)
+    return [content.get_line(i) for i in range(content.line_count)]
+
+
+def measure(control, index, count):
+    app = Application(layout=Layout(Window(control)), input=DummyInput(), output=DummyOutput())
+    new_lines = new_fragments = 0
+    with set_app(app):
+        previous = render(app, control)
+        with Timer() as t:
+            for _ in range(KEYPRESSES):
+                index[0] = (index[0] + 1) % count
+                lines = render(app, control)
+                for i, line in enumerate(lines):
+                    if i >= len(previous) or line is not previous[i]:
+                        new_lines += 1
+                        new_fragments += len(line)
+                previous = list(lines)
+    return t.elapsed / KEYPRESSES * 1e6, new_lines / KEYPRESSES, new_fragments / KEYPRESSES
+
+
+def main():
+    print(f"{'':<22}{'us/key':>10}{'lines/key':>11}{'fragments/key':>15}")
+    for name, (title, choices) in MENUS.items():
+        index = [0]
+        legacy = measure(FormattedTextControl(legacy_text(title, choices, index)), index, len(choices))
+        index = [0]
+        frame = measure(FrameControl(title, choices, selected=lambda: index[0], marker='►', padding=2),
+                        index, len(choices))
+        for label, (us, lines, fragments) in (("f-string get_text", legacy), ("FrameControl", frame)):
+            print(f"{name:<22}{us:10.1f}{lines:11.1f}{fragments:15.1f}   {label}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""模糊搜索基准：100 万个候选字符串上每次按键的延迟
+
+逐字输入一个查询再逐字删除，每次按键都更新 VirtualList 的过滤条件并渲染一屏，
+与“每次按键对全部候选重新筛选”的做法对比。VirtualList 对大列表在后台预先建立
+小写键，这里先等它建好再计时（建立耗时单独报告）。
+
+用法: python benchmarks/bench_fuzzy.py [--count 1000000]
+"""
+
+import argparse
+import random
+
+from _common import Timer
+
+from prompt_toolkit.application import Application
+from prompt_toolkit.application.current import set_app
+from prompt_toolkit.input import DummyInput
+from prompt_toolkit.layout import Layout
+from prompt_toolkit.output import DummyOutput
+
+from core.fuzzy import FuzzyIndex, _pattern
+from widgets.virtual_list import VirtualList
+
+WORDS = ["src", "core", "cli", "widgets", "test", "util", "main", "graph", "cache", "store",
+         "view", "history", "module", "lib", "include", "docs", "build", "config", "server", "client"]
+QUERIES = ["cgh55", "histmain", "zz"]
+
+
+def make_paths(count: int) -> list:
+    rng = random.Random(1)
+    return ["/".join(rng.choice(WORDS) for _ in range(rng.randint(2, 5))) + f"/File_{i}.py"
+            for i in range(count)]
+
+
+def keystrokes(query: str) -> list:
+    """逐字输入再逐字删除时每一步的查询"""
+    typed = [query[:n] for n in range(1, len(query) + 1)]
+    return typed + typed[-2::-1] + [""]
+
+
+def bench_virtual_list(paths, query):
+    view = VirtualList(paths, max_height=30, search="type")
+    view._index_thread.join()
+    app = Application(layout=Layout(view.window), input=DummyInput(), output=DummyOutput())
+    samples = []
+    with set_app(app):
+        for step in keystrokes(query):
+            with Timer() as t:
+                view.set_query(step)
+                view._get_fragments()
+                count = len(view.source)
+            samples.append((step, t.elapsed * 1000, count))
+    return samples
+
+
+def bench_rescan(paths, query):
+    lowered = [path.lower() for path in paths]
+    samples = []
+    for step in keystrokes(query)[:len(query)]:
+        with Timer() as t:
+            search = _pattern(step).search
+            matches = [i for i, key in enumerate(lowered) if search(key)]
+        samples.append((step, t.elapsed * 1000, len(matches)))
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--count", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    with Timer() as t:
+        paths = make_paths(args.count)
+    print(f"{args.count} candidates generated in {t.elapsed:.1f}s")
+    with Timer() as t:
+        FuzzyIndex(paths).build()
+    print(f"background key build (FuzzyIndex.build): {t.elapsed * 1000:.0f} ms\n")
+
+    for query in QUERIES:
+        print(f"query {query!r}: incremental index + VirtualList render")
+        worst = 0.0
+        for step, ms, count in bench_virtual_list(paths, query):
+            worst = max(worst, ms)
+            shown = f"{count}" if count else "0"
+            print(f"  {step!r:<12} {ms:8.2f} ms   {shown:>7} matched so far")
+        print(f"  worst keystroke: {worst:.2f} ms")
+        rescan = bench_rescan(paths, query)
+        print("  full rescan per keystroke: " + ", ".join(f"{ms:.0f}" for _, ms, _ in rescan) + " ms\n")
+
+
+if __name__ == "__main__":
+    main()
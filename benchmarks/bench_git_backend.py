@@ -0,0 +1,85 @@
+"""git 后端微基准：常驻 cat-file 进程 vs 每次请求启动一个 git 进程
+
+按 SHA 读取的对象会进入共享缓存，每一组测量前先清空，最后单独测一次缓存命中。
+
+用法: python benchmarks/bench_git_backend.py [--repo .] [--objects 300]
+"""
+
+import argparse
+import statistics
+import subprocess
+import threading
+
+from _common import ROOT, Timer
+
+from core import object_cache
+from core.git_backend import GitBackend
+
+
+def spawn_read(repo: str, sha: str) -> bytes:
+    return subprocess.run(["git", "cat-file", "-p", sha], cwd=repo, capture_output=True, check=True).stdout
+
+
+def report(label: str, samples: list):
+    samples = sorted(samples)
+    p50 = statistics.median(samples) * 1000
+    p99 = samples[min(len(samples) - 1, int(len(samples) * 0.99))] * 1000
+    print(f"{label:<28} p50 {p50:7.3f} ms   p99 {p99:7.3f} ms   total {sum(samples):6.2f} s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repo", default=ROOT)
+    parser.add_argument("--objects", type=int, default=300)
+    args = parser.parse_args()
+
+    backend = GitBackend.for_repo(args.repo)
+    shas = backend.run(["rev-list", "--objects", "--all"]).split()
+    shas = [s for s in shas if len(s) in (40, 64)][:args.objects]
+    print(f"{len(shas)} objects from {args.repo}")
+
+    samples = []
+    for sha in shas:
+        with Timer() as t:
+            spawn_read(args.repo, sha)
+        samples.append(t.elapsed)
+    report("spawn per call", samples)
+
+    backend.read(shas[0])  # 预热：启动常驻进程
+    object_cache.clear()
+    samples = []
+    for sha in shas:
+        with Timer() as t:
+            backend.read(sha)
+        samples.append(t.elapsed)
+    report("persistent cat-file --batch", samples)
+
+    object_cache.clear()
+    with Timer() as t:
+        backend.read_many(shas)
+    print(f"{'pipelined read_many':<28} {t.elapsed / len(shas) * 1000:7.3f} ms/object")
+
+    # 多线程同时请求，共享同一个管道
+    def worker(chunk):
+        for sha in chunk:
+            backend.read(sha)
+    threads = [threading.Thread(target=worker, args=(shas[i::4],)) for i in range(4)]
+    object_cache.clear()
+    with Timer() as t:
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    print(f"{'4 threads, shared pipe':<28} {t.elapsed / len(shas) * 1000:7.3f} ms/object")
+
+    samples = []
+    for sha in shas:
+        with Timer() as t:
+            backend.read(sha)
+        samples.append(t.elapsed)
+    report("object cache hit", samples)
+    GitBackend.close_all()
+
+
+if __name__ == "__main__":
+    main()
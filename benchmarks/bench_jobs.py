@@ -0,0 +1,132 @@
+"""批量作业：N 个仓库上 fetch + gc，逐个执行与 core.jobs 调度（不同并发上限）的耗时
+
+每个仓库都是本地克隆，远程是各自的裸仓库，开始前向裸仓库推入新提交，fetch 有内容可取。
+另外加入两个出错的仓库：
+- broken：远程路径不存在，应直接失败（不重试），后面的 gc 被跳过；
+- flaky：remote.origin.uploadpack 指向一个第一次调用失败的脚本，应重试一次后成功。
+
+用法: python benchmarks/bench_jobs.py [--repos 24] [--limits 1:1,4:2,8:4]
+"""
+
+import argparse
+import asyncio
+import os
+import shutil
+import stat
+import subprocess
+import tempfile
+
+from _common import Timer
+
+from core.jobs import CPU, DONE, NETWORK, JobScheduler
+
+IDENT = ["-c", "user.name=bench", "-c", "user.email=bench@example.com"]
+
+
+def git(cwd, *args):
+    subprocess.run(["git", *args], cwd=cwd, check=True, capture_output=True)
+
+
+def make_repos(root: str, count: int) -> list:
+    seed = os.path.join(root, "seed")
+    os.makedirs(seed)
+    git(seed, "init", "-q", "-b", "main")
+    for i in range(200):
+        with open(os.path.join(seed, f"file{i}.txt"), "w") as f:
+            f.write(f"line {i}\n" * 50)
+    git(seed, "add", "-A")
+    git(seed, *IDENT, "commit", "-q", "-m", "seed")
+    paths = []
+    for i in range(count):
+        remote, path = os.path.join(root, f"remote{i}.git"), os.path.join(root, f"repo{i}")
+        git(root, "clone", "-q", "--bare", seed, remote)
+        git(root, "clone", "-q", remote, path)
+        paths.append(path)
+    return paths
+
+
+def push_updates(root: str, paths: list, round_: int):
+    """让每个远程多出一个提交（在一个临时工作区中提交后推送）"""
+    for i, path in enumerate(paths):
+        work = os.path.join(root, f"work{i}")
+        if not os.path.isdir(work):
+            git(root, "clone", "-q", os.path.join(root, f"remote{i}.git"), work)
+        with open(os.path.join(work, f"update{round_}.txt"), "w") as f:
+            f.write(f"round {round_}\n" * 1000)
+        git(work, "add", "-A")
+        git(work, *IDENT, "commit", "-q", "-m", f"round {round_}")
+        git(work, "push", "-q", "origin", "main")
+
+
+def add_failing_repos(root: str, seed_remote: str) -> list:
+    broken = os.path.join(root, "broken")
+    git(root, "clone", "-q", seed_remote, broken)
+    git(broken, "remote", "set-url", "origin", os.path.join(root, "missing.git"))
+
+    flaky = os.path.join(root, "flaky")
+    git(root, "clone", "-q", seed_remote, flaky)
+    script = os.path.join(root, "flaky-upload-pack")
+    marker = os.path.join(root, "flaky-failed-once")
+    with open(script, "w") as f:
+        f.write(f"#!/bin/sh\nif [ ! -e '{marker}' ]; then touch '{marker}'; "
+                f"echo 'simulated connection reset' >&2; exit 1; fi\nexec git-upload-pack \"$@\"\n")
+    os.chmod(script, os.stat(script).st_mode | stat.S_IEXEC)
+    git(flaky, "config", "remote.origin.uploadpack", script)
+    return [broken, flaky]
+
+
+async def sequential(paths: list):
+    for path in paths:
+        for args in (["fetch", "--all", "--prune"], ["gc"]):
+            proc = await asyncio.create_subprocess_exec("git", *args, cwd=path, stdout=asyncio.subprocess.DEVNULL,
+                                                        stderr=asyncio.subprocess.DEVNULL)
+            await proc.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repos", type=int, default=24)
+    parser.add_argument("--limits", default="1:1,4:2,8:4", help="逗号分隔的 network:cpu 并发上限")
+    args = parser.parse_args()
+
+    root = tempfile.mkdtemp(prefix="gittui-jobs-")
+    try:
+        paths = make_repos(root, args.repos)
+        round_ = 0
+
+        push_updates(root, paths, round_)
+        with Timer() as t:
+            asyncio.run(sequential(paths))
+        print(f"sequential fetch + gc           {t.elapsed:6.2f} s")
+
+        for spec in args.limits.split(","):
+            network, cpu = (int(n) for n in spec.split(":"))
+            round_ += 1
+            push_updates(root, paths, round_)
+            updates = [0]
+
+            def count(_job):
+                updates[0] += 1
+
+            scheduler = JobScheduler({NETWORK: network, CPU: cpu}, on_update=count)
+            report = asyncio.run(scheduler.run(scheduler.plan(paths, ["fetch", "gc"])))
+            done = sum(job.state == DONE for job in report.jobs)
+            print(f"scheduler network={network:<2} cpu={cpu:<2}  {report.elapsed:6.2f} s  "
+                  f"peak {report.peak[NETWORK]}/{report.peak[CPU]}  {done}/{len(report.jobs)} done  "
+                  f"{updates[0]} updates")
+
+        failing = add_failing_repos(root, os.path.join(root, "remote0.git"))
+        scheduler = JobScheduler(retries=2, backoff=0.2)
+        report = asyncio.run(scheduler.run(scheduler.plan(failing + paths[:2], ["fetch", "gc"])))
+        print("\nwith a broken and a flaky remote:")
+        for line in report.format():
+            print(f"  {line}")
+        by_name = {(job.name, job.operation.name): job for job in report.jobs}
+        print(f"  broken fetch attempts {by_name['broken', 'fetch'].attempts}, "
+              f"flaky fetch attempts {by_name['flaky', 'fetch'].attempts} ({by_name['flaky', 'fetch'].state})")
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""菜单与表单的按键延迟基准（无终端，按脚本发送按键，见 _headless）
+
+每个场景跑两遍：第一遍测每个按键到重绘完成的延迟分布，第二遍打开 tracemalloc
+统计每个按键的分配峰值。history 场景在用 git fast-import 生成的合成仓库上运行。
+
+用法: python benchmarks/bench_menus.py [--scenario main-menu file-menu ...] [--commits 20000]
+                                      [--repeat 3] [--keys "down*10 up*10"] [--no-alloc]
+"""
+
+import argparse
+import os
+import tempfile
+
+from _common import ROOT
+from _headless import Harness, parse_script
+
+from command.File.CloneRepository import CloneRepository
+from command.File.File import File
+from command.File.NewRepository import (left_right_choice_async, run_interactive_flow_async,
+                                        select_from_list_async, select_gitignore_async, toggle_readme_async)
+from command.main_menu_navigation import MainMenuNavigation
+from command.View.History import History
+from core.synthetic_repo import make_synthetic_repo
+
+TEMPLATES = ["None", "C", "C++", "Go", "Java", "Node", "Python", "Rust", "Swift", "TeX", "Vim"] * 5
+
+
+def scenarios(repo: str) -> dict:
+    """名称 -> (启动界面的函数, 按键脚本)"""
+    return {
+        "main-menu": (lambda: MainMenuNavigation().main_async(), "down*40 up*40"),
+        "file-menu": (lambda: File().main_async(), "down*40 up*40"),
+        "clone-form": (lambda: CloneRepository().clone_async(),
+                       "text:https://example.com/user/project.git tab text:/tmp/gittui-clone tab text:50 "
+                       "tab space tab space tab left right left"),
+        "select-list": (lambda: select_from_list_async("Select git ignore:", TEMPLATES),
+                        "down*30 up*10 text:pyth backspace*4 pagedown pageup end home"),
+        "gitignore-preview": (lambda: select_gitignore_async("Select git ignore:", TEMPLATES, ROOT),
+                              "down*30 up*10 text:pyth backspace*4 pagedown pageup end home"),
+        "readme-toggle": (lambda: toggle_readme_async("Initialize this repository with a README"), "space*40"),
+        "left-right": (lambda: left_right_choice_async("create repository", "cancel"), "right left " * 20),
+        "new-repository": (run_interactive_flow_async,
+                           "text:demo enter text:a-demo-repository enter text:/tmp/gittui-new-demo enter "
+                           "space enter text:pyth enter down*5 enter right left right"),
+        "history": (lambda: History(repo).main_async(),
+                    "down*100 pagedown*20 pageup*10 end home"),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--scenario", nargs="*", help="只运行这些场景")
+    parser.add_argument("--commits", type=int, default=20000, help="history 场景的合成仓库大小")
+    parser.add_argument("--repeat", type=int, default=3, help="每个场景重复的次数（延迟合并统计）")
+    parser.add_argument("--keys", help="替换场景的按键脚本")
+    parser.add_argument("--no-alloc", action="store_true", help="不统计分配")
+    args = parser.parse_args()
+
+    table = scenarios(os.path.join(tempfile.gettempdir(), f"gittui-bench-{args.commits}"))
+    names = args.scenario or list(table)
+    if "history" in names:
+        make_synthetic_repo(os.path.join(tempfile.gettempdir(), f"gittui-bench-{args.commits}"), args.commits)
+
+    print("latency: keypress -> redraw finished")
+    for name in names:
+        start, script = table[name]
+        keys = parse_script(args.keys or script)
+        runs = [Harness().run(start, keys, name) for _ in range(args.repeat)]
+        merged = runs[0]._replace(
+            latencies=[ms for run in runs for ms in run.latencies],
+            timeouts=sum(run.timeouts for run in runs),
+            output_bytes=sum(run.output_bytes for run in runs),
+            keys=sum(run.keys for run in runs),
+        )
+        if not args.no_alloc:
+            merged = merged._replace(allocations=Harness(trace_alloc=True).run(start, keys, name).allocations)
+        print(merged.describe())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""提交详情预取基准：打开提交详情的等待时间
+
+模拟浏览历史：光标移到下一个提交，停留 dwell 毫秒（阅读标题），然后按回车
+打开详情。对比
+- 不预取：打开时才运行 git show
+- PrefetchScheduler：光标停下后在后台预取附近的提交
+并统计快速滚动（每 10 ms 移动一行）期间启动的 git 进程数。
+
+用法: python benchmarks/bench_prefetch.py [--commits 2000] [--opens 40] [--dwell 300]
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import tempfile
+import time
+
+from _common import Timer
+
+from core.prefetch import PrefetchScheduler
+from core.synthetic_repo import make_synthetic_repo
+
+
+def around(shas, index, radius):
+    order = [index]
+    for distance in range(1, radius + 1):
+        order += [index + distance, index - distance]
+    return [shas[i] for i in order if 0 <= i < len(shas)]
+
+
+def counting(scheduler):
+    """统计 scheduler 启动的 git 进程数"""
+    popen = scheduler.backend.popen
+    started = [0]
+
+    def wrapper(*args, **kwargs):
+        started[0] += 1
+        return popen(*args, **kwargs)
+
+    scheduler.backend.popen = wrapper
+    return started
+
+
+def browse(repo, shas, opens, dwell, prefetch):
+    scheduler = PrefetchScheduler(repo)
+    samples = []
+    try:
+        for index in range(opens):
+            if prefetch:
+                scheduler.focus(around(shas, index, 5))
+            time.sleep(dwell / 1000)
+            with Timer() as t:
+                scheduler.request(shas[index]).result()
+            samples.append(t.elapsed * 1000)
+    finally:
+        scheduler.close()
+    return samples
+
+
+def fast_scroll(repo, shas, rows):
+    scheduler = PrefetchScheduler(repo)
+    started = counting(scheduler)
+    try:
+        for index in range(rows):
+            scheduler.focus(around(shas, index, 5))
+            time.sleep(0.01)
+        during = started[0]
+        time.sleep(1.0)
+        after = started[0]
+    finally:
+        scheduler.close()
+    return during, after
+
+
+def describe(samples) -> str:
+    ordered = sorted(samples)
+    p90 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.9))]
+    return f"median {statistics.median(ordered):7.2f} ms  p90 {p90:7.2f} ms"
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--commits", type=int, default=2000)
+    parser.add_argument("--opens", type=int, default=40)
+    parser.add_argument("--dwell", type=int, default=300)
+    args = parser.parse_args()
+
+    repo = make_synthetic_repo(os.path.join(tempfile.gettempdir(), f"gittui-bench-{args.commits}"), args.commits)
+    shas = subprocess.run(["git", "rev-list", "main"], cwd=repo, capture_output=True, text=True,
+                          check=True).stdout.split()
+
+    print(f"open after {args.dwell} ms dwell, {args.opens} commits:")
+    print(f"  git show on open      {describe(browse(repo, shas, args.opens, args.dwell, prefetch=False))}")
+    print(f"  PrefetchScheduler     {describe(browse(repo, shas, args.opens, args.dwell, prefetch=True))}")
+    during, after = fast_scroll(repo, shas, 100)
+    print(f"fast scroll over 100 rows: {during} git processes while scrolling, {after - during} after stopping")
+
+
+if __name__ == "__main__":
+    main()
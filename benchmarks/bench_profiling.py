@@ -0,0 +1,56 @@
+"""性能记录的开销：关闭时、只统计 p50/p99 时和同时记录 trace 时的每次按键耗时
+
+用 VirtualList 模拟按键重绘（片段生成经过 @timed），并对每次按键额外记录
+key 和 render 两个区间，与界面栈中的记录点相同。
+
+用法: python benchmarks/bench_profiling.py
+"""
+
+import os
+
+from _common import Timer
+
+from prompt_toolkit.application import Application
+from prompt_toolkit.application.current import set_app
+from prompt_toolkit.input import DummyInput
+from prompt_toolkit.output import DummyOutput
+from prompt_toolkit.layout import Layout
+
+from core import profiling
+from widgets.virtual_list import VirtualList
+
+KEYPRESSES = 20_000
+
+
+def measure(label: str):
+    view = VirtualList([f"item {i}" for i in range(10_000)], max_height=30)
+    app = Application(layout=Layout(view.window), input=DummyInput(), output=DummyOutput())
+    with set_app(app):
+        with Timer() as t:
+            for n in range(KEYPRESSES):
+                with profiling.span("key", "keypress"):
+                    view.move_to(n % 5000)
+                with profiling.span("render", "render"):
+                    view._get_fragments()
+    print(f"  {label:<22} {t.elapsed / KEYPRESSES * 1e6:7.1f} us/keypress")
+
+
+def main():
+    print(f"{KEYPRESSES} keypresses:")
+    measure("profiling off")
+    profiler = profiling.enable()
+    measure("p50/p99 only")
+    with Timer() as t:
+        for _ in range(1000):
+            profiler.overlay_text()
+    print(f"  overlay text           {t.elapsed / 1000 * 1e6:7.1f} us/frame")
+    profiling.disable()
+    profiling.enable(trace_path=os.devnull)
+    measure("p50/p99 + trace")
+    with Timer() as t:
+        profiling.disable()
+    print(f"  trace dump             {t.elapsed * 1000:7.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
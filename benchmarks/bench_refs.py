@@ -0,0 +1,69 @@
+"""分支/标签浏览器打开的耗时：一次读出全部引用的元数据 vs RefIndex + 只算可见一页的详情
+
+生成一个有 --tags 个轻量标签（CI 标签）、--branches 个分支的仓库，pack-refs 之后测量。
+
+用法: python benchmarks/bench_refs.py [--tags 28000] [--branches 2000] [--page 30]
+"""
+
+import argparse
+import os
+import subprocess
+import tempfile
+import threading
+
+from _common import Timer
+
+from core.ref_index import RefDetailsLoader, RefIndex
+from core.synthetic_repo import make_synthetic_repo
+
+EAGER_FORMAT = ("--format=%(refname)%00%(objectname)%00%(committerdate:unix)%00%(authorname)%00%(subject)"
+                "%00%(ahead-behind:HEAD)")
+
+
+def make_repo(path: str, tags: int, branches: int) -> str:
+    """main 上 200 个提交，标签和分支均匀指向这些提交，引用打包后测量"""
+    make_synthetic_repo(path, 200, branches=1, merge_every=0, files=1, dirs=1, tags=tags, branch_refs=branches)
+    subprocess.run(["git", "pack-refs", "--all"], cwd=path, check=True)
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tags", type=int, default=28000)
+    parser.add_argument("--branches", type=int, default=2000)
+    parser.add_argument("--page", type=int, default=30)
+    args = parser.parse_args()
+
+    repo = make_repo(os.path.join(tempfile.gettempdir(), f"gittui-synthetic-refs-{args.tags}-{args.branches}"),
+                     args.tags, args.branches)
+
+    fmt = EAGER_FORMAT
+    if subprocess.run(["git", "for-each-ref", "--count=1", fmt], cwd=repo, capture_output=True).returncode:
+        fmt = fmt.rsplit("%00", 1)[0]       # git 2.41 之前没有 ahead-behind
+    with Timer() as t:
+        subprocess.run(["git", "for-each-ref", fmt], cwd=repo, stdout=subprocess.DEVNULL, check=True)
+    print(f"for-each-ref with metadata (all refs)  {t.elapsed * 1000:8.1f} ms")
+
+    with Timer() as t:
+        index = RefIndex.load(repo)
+    print(f"RefIndex.load ({len(index)} refs)          {t.elapsed * 1000:8.1f} ms")
+
+    with Timer() as t:
+        tags = index.view("tag", "name")
+    print(f"tag view                               {t.elapsed * 1000:8.1f} ms")
+    with Timer() as t:
+        index.view("all", "version")
+    print(f"version sort (all refs)                {t.elapsed * 1000:8.1f} ms")
+
+    page = [tags[i].sha for i in range(args.page)]
+    done = threading.Event()
+    loader = RefDetailsLoader(repo, on_result=lambda _sha: len(loader.results) >= len(set(page)) and done.set())
+    with Timer() as t:
+        loader.show(page)
+        done.wait(30)
+    print(f"details for one page ({args.page} rows)         {t.elapsed * 1000:8.1f} ms")
+    loader.close()
+
+
+if __name__ == "__main__":
+    main()
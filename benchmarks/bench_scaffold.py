@@ -0,0 +1,63 @@
+"""新建仓库的耗时：逐个 git 命令（init、写文件、add、commit）与 core.scaffold（一次 fast-import）
+
+用法: python benchmarks/bench_scaffold.py [--repos 50] [--workers 4]
+"""
+
+import argparse
+import os
+import shutil
+import subprocess
+import tempfile
+
+from _common import Timer
+
+from core.git_backend import init_repository
+from core.scaffold import RepoRequest, build_files, create, create_many
+
+
+def quiet(_line):
+    pass
+
+
+def create_step_by_step(request: RepoRequest):
+    """原来的做法：git init 后逐个写文件、git add、git commit"""
+    os.makedirs(request.path)
+    init_repository(request.path)
+    for path, data in build_files(request, "Bench", 2024, quiet).items():
+        with open(os.path.join(request.path, path), "wb") as f:
+            f.write(data)
+        subprocess.run(["git", "add", path], cwd=request.path, check=True)
+    subprocess.run(["git", "commit", "-q", "-m", "Initial commit"], cwd=request.path, check=True)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repos", type=int, default=50)
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+
+    root = tempfile.mkdtemp(prefix="gittui-scaffold-")
+    try:
+        def requests(label):
+            return [RepoRequest(os.path.join(root, label, f"r{i}"), f"r{i}", "bench", readme=True,
+                                gitignore="Python", license="MIT") for i in range(args.repos)]
+
+        with Timer() as t:
+            for request in requests("steps"):
+                create_step_by_step(request)
+        print(f"init + add + commit     {t.elapsed * 1000 / args.repos:7.1f} ms/repo")
+
+        with Timer() as t:
+            for request in requests("scaffold"):
+                create(request, report=quiet)
+        print(f"scaffold.create         {t.elapsed * 1000 / args.repos:7.1f} ms/repo")
+
+        with Timer() as t:
+            create_many(requests("batch"), report=quiet, workers=args.workers)
+        print(f"create_many ({args.workers} workers) {t.elapsed * 1000 / args.repos:7.1f} ms/repo")
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
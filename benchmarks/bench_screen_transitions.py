@@ -0,0 +1,86 @@
+"""界面切换基准：每个菜单新建 Application 与单一 Application + 界面栈的对比
+
+每次切换都从“打开菜单”计时到“菜单第一次渲染完成”，然后关闭菜单。
+输出写到一个只计数的终端（VT100 转义序列照常生成），
+同时统计每次切换写出的字节数。
+
+用法: python benchmarks/bench_screen_transitions.py
+"""
+
+import asyncio
+import statistics
+
+from _common import CountingStream, Timer, make_output
+
+from prompt_toolkit.application import Application, create_app_session
+from prompt_toolkit.input import create_pipe_input
+from prompt_toolkit.layout import Layout
+from prompt_toolkit.styles import Style
+
+from command.File.File import File
+from command.main_menu_navigation import MainMenuNavigation
+from screen_stack import ScreenStack
+
+TRANSITIONS = 300
+
+
+def menu(n: int):
+    return MainMenuNavigation() if n % 2 == 0 else File()
+
+
+async def per_menu_application(inp, stream):
+    """旧做法：每个菜单一个 Application，显示完第一帧后退出"""
+    samples = []
+    for n in range(TRANSITIONS):
+        with Timer() as t:
+            screen = menu(n)
+            container, kb = screen.build()
+            app = Application(layout=Layout(container), key_bindings=kb,
+                              style=Style.from_dict(screen.style_rules),
+                              input=inp, output=make_output(stream), full_screen=False)
+            app.after_render += lambda a: a.future.done() or a.exit()
+            await app.run_async()
+        samples.append(t.elapsed)
+    return samples
+
+
+async def screen_stack(inp, stream):
+    """新做法：一个 Application，菜单压栈显示，渲染后出栈"""
+    stack = ScreenStack()
+    rendered = asyncio.Event()
+    stack.app.after_render += lambda _app: rendered.set()
+    samples = []
+
+    async def transitions():
+        await rendered.wait()
+        for n in range(TRANSITIONS):
+            with Timer() as t:
+                rendered.clear()
+                screen = menu(n)
+                shown = asyncio.ensure_future(stack.push(screen))
+                await rendered.wait()
+                screen.close()
+                await shown
+            samples.append(t.elapsed)
+
+    await stack.run(transitions())
+    return samples
+
+
+def report(name: str, samples, stream):
+    ms = sorted(s * 1000 for s in samples)
+    p99 = ms[min(len(ms) - 1, int(len(ms) * 0.99))]
+    print(f"{name:<24} median {statistics.median(ms):6.2f} ms  p99 {p99:6.2f} ms  "
+          f"{stream.count / len(samples):8.0f} bytes/transition")
+
+
+def main():
+    for name, runner in (("Application per menu", per_menu_application), ("single ScreenStack", screen_stack)):
+        stream = CountingStream()
+        with create_pipe_input() as inp, create_app_session(input=inp, output=make_output(stream)):
+            samples = asyncio.run(runner(inp, stream))
+        report(name, samples, stream)
+
+
+if __name__ == "__main__":
+    main()
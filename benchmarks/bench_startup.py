@@ -0,0 +1,99 @@
+"""冷启动基准：从启动进程到横幅完整显示的时间
+
+- time-to-banner：启动 `python src/cli/main.py`，读取 stdout 直到横幅最后一行出现；
+  分别测 git 版本缓存命中和未命中（删除缓存文件）两种情况。
+- `-X importtime`：横幅显示前导入的模块及累计耗时，列出最慢的几个，
+  并检查 prompt_toolkit / asyncio 没有在按回车之前被导入。
+
+用法: python benchmarks/bench_startup.py [--runs N]
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from _common import CLI
+
+MAIN = os.path.join(CLI, "main.py")
+BANNER_END = b"+---------------------------------------------+"
+TARGET_MS = 50.0
+LAZY_MODULES = ("prompt_toolkit", "asyncio")
+
+
+def time_to_banner(env) -> float:
+    start = time.perf_counter()
+    proc = subprocess.Popen([sys.executable, MAIN], stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                            stderr=subprocess.DEVNULL, env=env)
+    seen = 0
+    for line in proc.stdout:
+        if line.rstrip() == BANNER_END:
+            seen += 1
+            if seen == 2:  # 上边框和下边框
+                break
+    elapsed = time.perf_counter() - start
+    # 输入非空行：不进入界面，直接退出
+    proc.communicate(b"q\n")
+    return elapsed * 1000
+
+
+def time_to_banner_of(cmd) -> float:
+    start = time.perf_counter()
+    subprocess.run(cmd, stdout=subprocess.DEVNULL, check=True)
+    return (time.perf_counter() - start) * 1000
+
+
+def import_profile(env):
+    """返回 [(累计微秒, 模块名)]，只包含顶层导入"""
+    proc = subprocess.run([sys.executable, "-X", "importtime", MAIN], input=b"q\n",
+                          capture_output=True, env=env)
+    rows = []
+    for line in proc.stderr.decode().splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _self, cumulative, name = line[len("import time:"):].split("|")
+        if not name.startswith("  "):  # 顶层（名字前只有一个空格）
+            rows.append((int(cumulative), name.strip()))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=10)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as data:
+        env = dict(os.environ, GITTUI_DATA_DIR=data)
+        cache = os.path.join(data, "git-version.tsv")
+
+        cold = []
+        for _ in range(args.runs):
+            if os.path.exists(cache):
+                os.remove(cache)
+            cold.append(time_to_banner(env))
+        subprocess.run([sys.executable, "-c", "from core.git_version import git_version; git_version()"],
+                       env=dict(env, PYTHONPATH=os.path.dirname(CLI)), check=True)
+        warm = [time_to_banner(env) for _ in range(args.runs)]
+        baseline = [time_to_banner_of([sys.executable, "-c", "print()"]) for _ in range(args.runs)]
+
+        rows = import_profile(env)
+
+    print(f"python -c 'print()'            median {statistics.median(baseline):6.1f} ms")
+    print(f"time-to-banner (cache miss)    median {statistics.median(cold):6.1f} ms")
+    print(f"time-to-banner (cache hit)     median {statistics.median(warm):6.1f} ms")
+    print(f"target                         {TARGET_MS:13.1f} ms  "
+          f"{'OK' if statistics.median(warm) <= TARGET_MS else 'SLOW'}")
+
+    total = sum(us for us, _ in rows)
+    print(f"\nimports before exit: {len(rows)} top-level, {total / 1000:.1f} ms cumulative; slowest:")
+    for us, name in sorted(rows, reverse=True)[:8]:
+        print(f"  {us / 1000:7.2f} ms  {name}")
+    eager = [name for _, name in rows if name.split(".")[0] in LAZY_MODULES]
+    print(f"\neagerly imported UI modules: {', '.join(eager) if eager else 'none'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""增量状态基准：大工作区中修改一个文件后，状态刷新的延迟
+
+用 fast-import 生成一个含 N 个文件的提交并检出，然后比较：
+- 完整的 `git status --porcelain=v2 -z`（每次刷新都全量扫描的做法）
+- StatusEngine：写入一个文件到 on_diff 收到差异的延迟（含监视事件、
+  去抖动和针对该路径的 git status）
+
+用法: python benchmarks/bench_status_engine.py [--files 100000] [--edits 20]
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import tempfile
+import threading
+import time
+
+from _common import Timer
+
+from core.fs_watch import PollingWatcher
+from core.status_engine import StatusEngine
+from core.synthetic_repo import RepoSpec, file_path, generate
+
+
+def tree_spec(files: int) -> RepoSpec:
+    """一个提交，files 个文件，每个目录约 100 个文件"""
+    return RepoSpec(commits=1, branches=1, merge_every=0, files=files, dirs=max(files // 100, 1))
+
+
+def make_tree(path: str, files: int):
+    generate(path, tree_spec(files))
+    subprocess.run(["git", "checkout", "-q", "-f", "main"], cwd=path, check=True)
+    # 刷新索引中的 stat 信息，之后的 git status 不必重新读取文件内容
+    subprocess.run(["git", "status", "-s"], cwd=path, check=True, capture_output=True)
+
+
+def full_status_ms(path: str, runs: int) -> list:
+    samples = []
+    for _ in range(runs):
+        with Timer() as t:
+            subprocess.run(["git", "--no-optional-locks", "status", "--porcelain=v2", "-z"],
+                           cwd=path, check=True, capture_output=True)
+        samples.append(t.elapsed * 1000)
+    return samples
+
+
+def engine_latency_ms(path: str, files: int, edits: int, watcher=None, offset: int = 0) -> tuple:
+    spec = tree_spec(files)
+    received = threading.Event()
+    engine = StatusEngine(path, on_diff=lambda diff: received.set(), watcher=watcher)
+    with Timer() as start:
+        engine.start()
+    samples = []
+    try:
+        for n in range(edits):
+            # 每次改一个还没改过的文件，否则状态不变，不会产生差异
+            i = ((offset + n) * 7919) % files
+            target = os.path.join(path, *file_path(spec, i).split("/"))
+            received.clear()
+            begin = time.perf_counter()
+            with open(target, "a") as f:
+                f.write(f"edit {n}\n")
+            if not received.wait(10):
+                raise RuntimeError("没有收到状态差异")
+            samples.append((time.perf_counter() - begin) * 1000)
+            time.sleep(0.05)
+    finally:
+        watching = engine.watching
+        engine.stop()
+    return start.elapsed * 1000, samples, watching
+
+
+def describe(samples) -> str:
+    ordered = sorted(samples)
+    p90 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.9))]
+    return f"median {statistics.median(ordered):8.1f} ms  p90 {p90:8.1f} ms"
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--files", type=int, default=100_000)
+    parser.add_argument("--edits", type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as root:
+        repo = os.path.join(root, "repo")
+        with Timer() as t:
+            make_tree(repo, args.files)
+        print(f"synthetic tree: {args.files} files, created in {t.elapsed:.1f}s\n")
+
+        print(f"full git status               {describe(full_status_ms(repo, 5))}")
+        startup, samples, watching = engine_latency_ms(repo, args.files, args.edits)
+        print(f"StatusEngine ({watching:<15}) {describe(samples)}  (start {startup:.0f} ms)")
+        startup, samples, watching = engine_latency_ms(repo, args.files, min(args.edits, 5),
+                                                       PollingWatcher(repo, interval=1.0), offset=args.edits)
+        print(f"StatusEngine ({watching:<15}) {describe(samples)}  (start {startup:.0f} ms)")
+
+
+if __name__ == "__main__":
+    main()
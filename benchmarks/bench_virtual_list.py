@@ -0,0 +1,35 @@
+"""VirtualList 基准：每次按键的渲染开销与列表长度无关
+
+用法: python benchmarks/bench_virtual_list.py
+"""
+
+from _common import Timer
+
+from prompt_toolkit.application import Application
+from prompt_toolkit.application.current import set_app
+from prompt_toolkit.input import DummyInput
+from prompt_toolkit.output import DummyOutput
+from prompt_toolkit.layout import Layout
+
+from widgets.virtual_list import VirtualList
+
+KEYPRESSES = 2000
+
+def measure(count: int):
+    items = [f"item {i}" for i in range(count)]
+    view = VirtualList(items, max_height=30)
+    app = Application(layout=Layout(view.window), input=DummyInput(), output=DummyOutput())
+    with set_app(app):
+        with Timer() as t:
+            for n in range(KEYPRESSES):
+                view.move_to(view.index + (1 if n % 50 else 30))
+                view._get_fragments()
+    per_key = t.elapsed / KEYPRESSES * 1e6
+    print(f"{count:>9} items: {per_key:7.1f} us/keypress")
+
+def main():
+    for count in (53, 10_000, 100_000, 1_000_000):
+        measure(count)
+
+if __name__ == "__main__":
+    main()
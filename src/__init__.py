@@ -6,12 +6,18 @@ Minimal package metadata and exported version.
 __version__ = "1.0.0"
 
 # 尽量避免在包初始化时立即导入可能不存在或导致循环导入的子模块。
-# 如果 `core` 不存在或导入失败，只做弱化处理，不阻塞包的其他导入。
-try:
-	from . import core  # re-export for convenience (stubs)
-except Exception:
-	core = None
+# `core` 在第一次访问时才导入（PEP 562）；导入失败时只做弱化处理，返回 None。
+__all__ = ["__version__", "core"]
 
-__all__ = ["__version__"]
-if core is not None:
-	__all__.append("core")
+
+def __getattr__(name):
+	if name != "core":
+		raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+	import importlib
+
+	try:
+		core = importlib.import_module(f"{__name__}.core")  # re-export for convenience (stubs)
+	except Exception:
+		core = None
+	globals()["core"] = core
+	return core
@@ -0,0 +1,194 @@
+import asyncio
+import os
+import time
+
+from prompt_toolkit.key_binding import KeyBindings, merge_key_bindings
+
+from core.ref_index import KINDS, SORTS, RefDetailsLoader, RefIndex
+from screen_stack import Screen
+from widgets.virtual_list import VirtualList
+
+
+class Branch(Screen):
+    """分支和标签
+
+    +----------------------------------------------------------------------+
+    |  Branch: /home/user/project                                           |
+    | ► * main             ↑0 ↓0     2024-05-01  alice   Fix typo            |
+    |     feature/login    ↑3 ↓12    2024-04-28  bob     Add login form      |
+    |     v1.2.0           …                                                 |
+    |  30051 refs  all  按 name  (t 分类，s 排序，/ 搜索，回车 提交，q 退出)     |
+    +----------------------------------------------------------------------+
+
+    引用由 RefIndex 一次读入（不启动 git），分类和排序是预先算好的下标数组。
+    最后一次提交和相对 HEAD 的领先/落后只为当前可见的一页在后台计算
+    （RefDetailsLoader），还没算好的行显示 …。
+    """
+
+    style_rules = {
+        'selected': '#00ff00',
+        'branch': '#5fd75f',
+        'remote': '#ff5f5f',
+        'tag': '#ffd75f',
+        'other': '#888888',
+        'head': 'bold #00ff00',
+        'pending': '#888888',
+        'date': '#888888',
+        'author': '#ffaf00',
+    }
+
+    def __init__(self, repo_path: str = ".", page_size: int = 20, workers: int = 4):
+        super().__init__()
+        self.repo_path = repo_path
+        self.page_size = page_size
+        self.workers = workers
+        self.kind = "all"
+        self.sort = "name"
+        self.index = None
+        self.details = None
+        self.view = None
+        self._loop = None
+
+    # ---- 数据 ----
+
+    def current_view(self):
+        return self.index.view(self.kind, self.sort)
+
+    def apply_view(self):
+        """分类或排序变化后换数据源，保留过滤条件"""
+        query = self.view.query
+        self.view.set_source(self.current_view())
+        if query:
+            self.view.set_query(query)
+
+    def on_select(self, view):
+        """把可见的一页交给后台计算详情"""
+        source = view.source
+        end = min(view.top + view.page_size(), len(source))
+        self.details.show([source[i].sha for i in range(view.top, end)])
+
+    def _on_details(self, _sha):
+        # 工作线程中调用：交给事件循环线程重画
+        self._loop.call_soon_threadsafe(self._redraw)
+
+    def _redraw(self):
+        if self.view is not None:
+            self.view.redraw_rows()
+            if self.stack is not None:
+                self.stack.app.invalidate()
+
+    def _on_dates(self):
+        self._loop.call_soon_threadsafe(self._dates_loaded)
+
+    def _dates_loaded(self):
+        if self.sort == "date" and self.view is not None:
+            self.apply_view()
+            if self.stack is not None:
+                self.stack.app.invalidate()
+
+    def cycle_kind(self):
+        self.kind = KINDS[(KINDS.index(self.kind) + 1) % len(KINDS)]
+        self.apply_view()
+
+    def cycle_sort(self):
+        self.sort = SORTS[(SORTS.index(self.sort) + 1) % len(SORTS)]
+        if self.sort == "date":
+            self.index.load_dates(self._on_dates)
+        self.apply_view()
+
+    async def open_commit(self):
+        ref = self.view.selected
+        if ref is None:
+            return
+        from command.View.CommitView import CommitView
+        details = self.details.get(ref.sha)
+        if details is not None:
+            view = CommitView(self.repo_path, details.commit, details.author, details.subject,
+                              page_size=self.page_size + 10)
+        else:
+            view = CommitView(self.repo_path, f"{ref.target}^{{commit}}", "", ref.short,
+                              page_size=self.page_size + 10)
+        await view.main_async()
+
+    # ---- 界面 ----
+
+    def format_row(self, ref, selected: bool) -> list:
+        arrow = '►' if selected else ' '
+        head = ref.name == self.index.head
+        fragments = [
+            ('class:selected' if selected else '', f"{arrow} "),
+            ('class:head' if head else '', '* ' if head else '  '),
+            ('class:selected' if selected else f'class:{ref.kind}', f"{ref.short[:32]:<32} "),
+        ]
+        details = self.details.get(ref.sha)
+        if details is None:
+            fragments.append(('class:pending', "…"))
+            return fragments
+        counts = f"↑{details.ahead} ↓{details.behind}" if details.ahead is not None else "-"
+        date = time.strftime("%Y-%m-%d", time.localtime(details.time)) if details.time else ""
+        fragments += [
+            ('', f"{counts:<14} "),
+            ('class:date', f"{date:<10}  "),
+            ('class:author', f"{details.author[:12]:<12}  "),
+            ('', details.subject),
+        ]
+        return fragments
+
+    def footer(self):
+        sort = self.sort
+        if sort == "date" and self.index.dates is None:
+            sort = "date（读取中，暂按 name）"
+        return (f" {len(self.view.source)} / {len(self.index)} refs  {self.kind}  按 {sort}"
+                f"  (t 分类，s 排序，/ 搜索，回车 提交，q 退出)")
+
+    def main(self):
+        return asyncio.run(self.main_async())
+
+    async def main_async(self):
+        self._loop = asyncio.get_running_loop()
+        self.index = await asyncio.to_thread(RefIndex.load, self.repo_path)
+        self.index.prepare()
+        self.details = RefDetailsLoader(self.repo_path, on_result=self._on_details, workers=self.workers)
+        try:
+            await self.show()
+        finally:
+            await asyncio.to_thread(self.details.close)
+        selected = self.view.selected if self.view is not None else None
+        return selected.name if selected is not None else None
+
+    def build(self):
+        self.view = VirtualList(self.current_view(), self.format_row, max_height=self.page_size,
+                                title=f" Branch: {os.path.abspath(self.repo_path)}", footer=self.footer,
+                                search="slash", search_key=lambda ref: ref.short, on_select=self.on_select)
+        searching = self.view.searching
+
+        kb = KeyBindings()
+
+        @kb.add('q', filter=~searching)
+        @kb.add('escape', filter=~self.view.filtering)
+        def _(event):
+            self.close()
+
+        @kb.add('enter', filter=~searching)
+        async def _(event):
+            await self.open_commit()
+
+        @kb.add('t', filter=~searching)
+        def _(event):
+            self.cycle_kind()
+            event.app.invalidate()
+
+        @kb.add('s', filter=~searching)
+        def _(event):
+            self.cycle_sort()
+            event.app.invalidate()
+
+        return self.view.window, merge_key_bindings([self.view.key_bindings, kb])
+
+
+# 测试入口
+if __name__ == "__main__":
+    import sys
+
+    name = Branch(sys.argv[1] if len(sys.argv) > 1 else ".").main()
+    print(f"\n您选择了: {name}")
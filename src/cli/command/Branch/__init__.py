@@ -0,0 +1 @@
+__all__ = ["Branch.py"]
\ No newline at end of file
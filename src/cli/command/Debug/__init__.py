@@ -0,0 +1 @@
+__all__ = ["CacheDebug.py"]
\ No newline at end of file
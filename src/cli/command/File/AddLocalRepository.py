@@ -1,10 +1,85 @@
+import asyncio
+import os
+import threading
+
+from prompt_toolkit.application import run_in_terminal
+
+from core.commit_index import CommitIndex
+from core.graph_cache import GraphCache
+from core.refs import is_git_repository
+from core.workspace import Workspace
+from widgets.progress_view import ProgressView
+from widgets.text_prompt import prompt_text
+
+
 class AddLocalRepository:
-    def __init__(self, local_path):
+    def __init__(self, local_path=None):
         self.LocalRepository = local_path
-    
+        self.graph = None
+
     def local_path(self):
-        local_path = input("Local path: ") # 用户输入的是绝对路径
-        
+        return asyncio.run(self.local_path_async())
+
+    async def local_path_async(self):
+        """输入本地仓库路径并打开它
+
+        打开时读取提交图：有缓存且引用未变化时直接从缓存载入，
+        否则只解析新增的提交，读完后写回缓存。读取在后台线程中进行，
+        界面显示进度且可以按 Esc 取消。
+        """
+        local_path = await prompt_text("Local path: ", self.validate_path)  # 用户输入的是绝对路径
+        if local_path is None:
+            return None
+        local_path = local_path.strip()
+
+        self.LocalRepository = local_path
+        view = ProgressView(f"Opening {local_path}")
+        cancel = threading.Event()
+        try:
+            self.graph = await view.run(asyncio.to_thread(self.open_repository, local_path, view.write, cancel))
+        except asyncio.CancelledError:
+            cancel.set()
+            await run_in_terminal(lambda: print("已取消"))
+            return None
+        # 登记到工作区，总览（Repository 菜单）中可以看到
+        Workspace().add(local_path)
+        return local_path
+
+    @staticmethod
+    def validate_path(text: str):
+        """校验输入的路径，返回错误信息；通过时返回 None"""
+        path = text.strip()
+        if not path:
+            return "❌ 错误：本地路径不能为空，请重新输入"
+        if not os.path.isabs(path):
+            return "❌ 错误：必须使用绝对路径"
+        if not is_git_repository(path):
+            return f"❌ 错误：{path} 不是 git 仓库"
+        return None
+
+    @staticmethod
+    def open_repository(path: str, report=print, cancel: threading.Event | None = None):
+        """打开仓库的提交图（走磁盘缓存）并更新提交搜索索引，返回 CommitGraph"""
+        cache = GraphCache()
+        graph = cache.open(path)
+        while not graph.exhausted:
+            if cancel is not None and cancel.is_set():
+                graph.close()
+                return None
+            graph.ensure(len(graph) + 8192)
+            report(f"Reading commits: {len(graph)}")
+        if cache.save(graph):
+            report(f"✅ 已读取 {len(graph)} 个提交并写入缓存")
+        else:
+            report(f"✅ 已从缓存载入 {len(graph)} 个提交")
+        # View -> Search 第一次打开时就不用再等索引
+        index, added = CommitIndex.update(path, report=lambda count: report(f"Indexing commits: {count}"),
+                                          cancel=cancel)
+        if index is not None:
+            report(f"✅ 搜索索引: {len(index)} 个提交（新增 {added}）")
+        return graph
+
+
 if __name__ == "__main__":
     repo = AddLocalRepository()
-    repo.local_path()
\ No newline at end of file
+    repo.local_path()
@@ -1,94 +1,179 @@
+import asyncio
+
 from prompt_toolkit.key_binding import KeyBindings
-from prompt_toolkit.styles import Style
-from prompt_toolkit.application import Application
-from prompt_toolkit.layout import Layout
 from prompt_toolkit.layout.containers import Window
-from prompt_toolkit.layout.controls import FormattedTextControl
+
+from core.clone import CloneOptions, clone_repository
+from core.git_backend import GitError, error_line
+from screen_stack import Screen
+from widgets.frame import FrameControl
+from widgets.progress_view import ProgressView
 
 
-class CloneRepository:
+class CloneRepository(Screen):
     """克隆仓库的交互式界面类"""
+
+    # 样式定义（正确使用class:前缀）
+    style_rules = {
+        'selected': '#00ff00',      # 选中按钮的艳绿色
+        'focus': 'underline',       # 聚焦输入框的下划线
+    }
+
+    # 焦点顺序：四个输入框、两个选项开关、按钮行
+    FIELDS = ["url", "path", "depth", "branch", "filter", "single_branch", "buttons"]
     
     def __init__(self):
         """初始化克隆仓库类，设置默认值"""
+        super().__init__()
         self.repository_url = ""
         self.clone_path = ""
+        self.options = CloneOptions()
+        self.cloned_path = None
+        # 输入内容（使用字典以便在闭包中修改）
+        self._text = {"url": "", "path": "", "depth": "", "branch": ""}
+        self._toggles = {"filter": False, "single_branch": False}
 
     def clone(self) -> str:
+        return asyncio.run(self.clone_async())
+
+    async def clone_async(self) -> str:
         """
-        显示克隆配置对话框，允许用户输入URL和路径
+        显示克隆配置对话框，允许用户输入URL、路径和克隆选项，选择 clone 后执行克隆
         
         +---------------------------------------------+
         |           Clone a Git Repository            |
         +---------------------------------------------+
         | URL: https://github.com/user/repo.git      |
         | path: /home/user/projects/                 |
+        | depth (--depth):                            |
+        | branch (--branch): main                     |
+        | [ ] --filter=blob:none                      |
+        | [x] --single-branch                         |
         |             clone        cancel             |
         +---------------------------------------------+
         
         导航方式：
-        - Tab/Shift+Tab: 在输入框和按钮间切换
+        - Tab/Shift+Tab 或 上/下: 在输入框、选项和按钮间切换
+        - Enter: 输入框中跳到下一项；选项上切换开关；按钮上确认
+        - 空格: 切换选项开关
         - 左/右箭头: 在按钮间切换
-        - Enter: 确认当前按钮（仅按钮区域）
-        - 普通字符: 在当前输入框中输入
+        - 普通字符: 在当前输入框中输入（depth 只接受数字）
         - Backspace: 删除当前输入框最后一个字符
         
+        克隆过程在进度界面中显示对象数、已接收数据量和速度，按 Esc 取消，
+        取消或失败时删除克隆了一半的目录。
+
         Returns:
             "clone" 或 "cancel"
         """
+        result = await self.show()
+        
+        # 将输入的值赋回实例属性
+        self.repository_url = self._text["url"].strip()
+        self.clone_path = self._text["path"].strip()
+        depth = self._text["depth"]
+        self.options = CloneOptions(
+            depth=int(depth) if depth else None,
+            blob_filter=self._toggles["filter"],
+            single_branch=self._toggles["single_branch"],
+            branch=self._text["branch"].strip() or None,
+        )
+
+        if result == "clone" and self.repository_url:
+            self.cloned_path = await self.run_clone()
+        return result
+
+    async def run_clone(self):
+        """在进度界面中执行克隆，返回克隆出的目录；取消或失败时返回 None"""
+        view = ProgressView(f"Cloning {self.repository_url}", max_lines=8, wait=True)
+
+        def on_progress(progress):
+            view.write(progress.format())
+
+        async def job():
+            try:
+                path = await clone_repository(self.repository_url, self.clone_path, self.options,
+                                              on_progress=on_progress, on_line=view.write)
+            except GitError as e:
+                # 只显示 git 最能说明问题的一行（通常是 fatal: ...）
+                view.write(f"❌ {error_line(e.stderr or '') or str(e)}")
+                raise
+            except OSError as e:
+                view.write(f"❌ {e}")
+                raise
+            view.write(f"✅ 已克隆到 {path}")
+            return path
+
+        try:
+            return await view.run(job())
+        except (asyncio.CancelledError, GitError, OSError):
+            return None
+
+    def build(self):
         kb = KeyBindings()
         
-        # 焦点状态: 0=URL输入, 1=Path输入, 2=clone按钮, 3=cancel按钮
+        fields = self.FIELDS
+        text = self._text
+        toggles = self._toggles
         focus_state = [0]
         
-        # 输入内容（使用列表以便在闭包中修改）
-        url_text = [""]
-        path_text = [""]
-        
         # 按钮
         buttons = ["clone", "cancel"]
         selected_button = [0]
 
+        def focused():
+            return fields[focus_state[0]]
+
         @kb.add('tab')
+        @kb.add('down')
         def _(event):
-            """Tab键切换到下一个字段"""
-            focus_state[0] = (focus_state[0] + 1) % 4
+            """切换到下一个字段"""
+            focus_state[0] = (focus_state[0] + 1) % len(fields)
             event.app.invalidate()
 
         @kb.add('s-tab')  # Shift+Tab
+        @kb.add('up')
         def _(event):
-            """Shift+Tab切换到上一个字段"""
-            focus_state[0] = (focus_state[0] - 1) % 4
+            """切换到上一个字段"""
+            focus_state[0] = (focus_state[0] - 1) % len(fields)
             event.app.invalidate()
 
         @kb.add('left')
         def _(event):
             """左箭头仅在按钮区域有效"""
-            if focus_state[0] in [2, 3]:
+            if focused() == "buttons":
                 selected_button[0] = (selected_button[0] - 1) % len(buttons)
                 event.app.invalidate()
 
         @kb.add('right')
         def _(event):
             """右箭头仅在按钮区域有效"""
-            if focus_state[0] in [2, 3]:
+            if focused() == "buttons":
                 selected_button[0] = (selected_button[0] + 1) % len(buttons)
                 event.app.invalidate()
 
         @kb.add('enter')
         def _(event):
-            """回车键仅在按钮区域触发操作"""
-            if focus_state[0] in [2, 3]:
-                event.app.exit(result=buttons[selected_button[0]])
+            """输入框中跳到下一项，选项上切换开关，按钮上触发操作"""
+            field = focused()
+            if field == "buttons":
+                self.close(buttons[selected_button[0]])
+            elif field in toggles:
+                toggles[field] = not toggles[field]
+            else:
+                focus_state[0] += 1
+            event.app.invalidate()
+
+        @kb.add('escape')
+        def _(event):
+            self.close("cancel")
 
         @kb.add('backspace')
         def _(event):
             """退格键删除字符"""
-            if focus_state[0] == 0:
-                url_text[0] = url_text[0][:-1]
-                event.app.invalidate()
-            elif focus_state[0] == 1:
-                path_text[0] = path_text[0][:-1]
+            field = focused()
+            if field in text:
+                text[field] = text[field][:-1]
                 event.app.invalidate()
 
         # 处理普通字符输入
@@ -96,97 +181,49 @@ class CloneRepository:
         def on_any_key(event):
             """处理任意可打印字符"""
             key = event.key_sequence[0].key
+            field = focused()
             
             # 只处理可打印字符（非控制键）
             if len(key) == 1 and key.isprintable():
-                if focus_state[0] == 0:  # URL输入框
-                    url_text[0] += key
-                    event.app.invalidate()
-                elif focus_state[0] == 1:  # Path输入框
-                    path_text[0] += key
-                    event.app.invalidate()
-
-        # 样式定义（正确使用class:前缀）
-        style = Style.from_dict({
-            'selected': '#00ff00',      # 选中按钮的艳绿色
-            'focus': 'underline',       # 聚焦输入框的下划线
-        })
-
-        def get_text():
-            title = "Clone a Git Repository"
-            
-            # 获取当前输入值
-            current_url = url_text[0]
-            current_path = path_text[0]
-            
-            # 计算各行内容长度
-            url_line = f" URL: {current_url}"
-            path_line = f" path: {current_path}"
-            button_line = f" {buttons[0]}    {buttons[1]} "
-            
-            # 确定内部宽度
-            max_content_len = max(len(title), len(url_line), len(path_line), len(button_line))
-            inner_width = max_content_len
-            
-            fragments = []
-            
-            # 上边框
-            fragments.append(('', f"+{'-' * inner_width}+\n"))
-            
-            # 标题
-            fragments.append(('', f"|{title:^{inner_width}}|\n"))
-            
-            # 分隔线
-            fragments.append(('', f"+{'-' * inner_width}+\n"))
-            
-            # URL输入行 (使用class:focus样式)
-            url_style = 'class:focus' if focus_state[0] == 0 else ''
-            fragments.append((url_style, f"|{url_line:<{inner_width}}|\n"))
-            
-            # Path输入行 (使用class:focus样式)
-            path_style = 'class:focus' if focus_state[0] == 1 else ''
-            fragments.append((path_style, f"|{path_line:<{inner_width}}|\n"))
-            
-            # 按钮行
-            fragments.append(('', "| "))
-            
-            # clone按钮
-            clone_style = 'class:selected' if focus_state[0] in [2, 3] and selected_button[0] == 0 else ''
-            fragments.append((clone_style, buttons[0]))
-            
-            # 间隙
-            gap_len = inner_width - len(buttons[0]) - len(buttons[1]) - 4
-            gap_len = max(gap_len, 4)
-            fragments.append(('', f"{' ' * gap_len} "))
-            
-            # cancel按钮
-            cancel_style = 'class:selected' if focus_state[0] in [2, 3] and selected_button[0] == 1 else ''
-            fragments.append((cancel_style, buttons[1]))
-            
-            fragments.append(('', " |\n"))
-            
-            # 下边框
-            fragments.append(('', f"+{'-' * inner_width}+\n"))
-            
-            return fragments
+                if field in toggles and key == ' ':
+                    toggles[field] = not toggles[field]
+                elif field == "depth":
+                    if key.isdigit():
+                        text[field] += key
+                elif field in text:
+                    text[field] += key
+                event.app.invalidate()
 
-        control = FormattedTextControl(get_text)
-        window_height = 7  # 上边框 + 标题 + 分隔线 + URL + Path + 按钮 + 下边框
-        
-        app = Application(
-            layout=Layout(Window(content=control, height=window_height)), 
-            full_screen=False, 
-            key_bindings=kb, 
-            style=style
-        )
-        
-        result = app.run()
+        def mark(name):
+            return "[x]" if toggles[name] else "[ ]"
+
+        def get_rows():
+            on_buttons = focused() == "buttons"
+
+            def button(i):
+                return ('class:selected' if on_buttons and selected_button[0] == i else '', buttons[i])
+
+            return [
+                f" URL: {text['url']}",
+                f" path: {text['path']}",
+                f" depth (--depth): {text['depth']}",
+                f" branch (--branch): {text['branch']}",
+                f" {mark('filter')} --filter=blob:none",
+                f" {mark('single_branch')} --single-branch",
+                # 按钮行：按钮本身的选中样式在片段里，不参与整行的聚焦样式
+                [('', " "), button(0), ('', "    "), button(1), ('', " ")],
+            ]
+
+        def focused_row():
+            # 输入行和选项行使用 class:focus 样式；按钮行不整行高亮
+            return focus_state[0] if focused() != "buttons" else None
+
+        # 每次按键只有光标所在行或正在输入的那一行重新生成
+        control = FrameControl("Clone a Git Repository", get_rows, selected=focused_row,
+                               selected_style='class:focus')
+        window_height = 11  # 上边框 + 标题 + 分隔线 + 4 个输入框 + 2 个选项 + 按钮 + 下边框
         
-        # 将输入的值赋回实例属性
-        self.repository_url = url_text[0]
-        self.clone_path = path_text[0]
-        
-        return result
+        return Window(content=control, height=window_height), kb
 
     def get_repository_info(self) -> tuple[str, str]:
         """
@@ -207,22 +244,7 @@ if __name__ == "__main__":
     print(f"\n您选择了: {action}")
     print(f"仓库URL: {url}")
     print(f"克隆路径: {path}")
+    print(f"克隆选项: {cloner.options}")
     
-    if action == "clone":
-        print(f"开始克隆仓库: {url} 到 {path if path else '当前目录'}")
-        # 添加实际的 git clone 逻辑
-        # import subprocess
-        # target_path = path if path else "."
-        # subprocess.run(["git", "clone", url, target_path])
-
-
-
-
-
-
-
-
-
-
-# 有问题
-# 用户填写URL的时候无法回车转到填Path
+    if cloner.cloned_path:
+        print(f"已克隆到: {cloner.cloned_path}")
@@ -1,13 +1,20 @@
-import json
-import subprocess
+import asyncio
 import os
-from prompt_toolkit import prompt
-from prompt_toolkit.key_binding import KeyBindings
-from prompt_toolkit.styles import Style
-from prompt_toolkit.application import Application
-from prompt_toolkit.layout import Layout
-from prompt_toolkit.layout.containers import Window
+import threading
+from prompt_toolkit.application import run_in_terminal
+from prompt_toolkit.key_binding import KeyBindings, merge_key_bindings
+from prompt_toolkit.layout.containers import HSplit, Window
 from prompt_toolkit.layout.controls import FormattedTextControl
+
+from core import scaffold
+from core.ignore_match import IgnoreMatcher, list_files
+from core.scaffold import LICENSES, RepoRequest, ScaffoldError
+from core.template_archive import TemplateArchiveError, gitignore_templates
+from core.workspace import Workspace
+from screen_stack import SimpleScreen
+from widgets.progress_view import ProgressView
+from widgets.text_prompt import prompt_text
+from widgets.virtual_list import VirtualList
 # from prompt_toolkit.widgets import Label, TextArea, Checkbox, RadioList, Button
 # from prompt_toolkit.layout.containers import HSplit, VSplit
 # from prompt_toolkit.shortcuts import message_dialog
@@ -29,40 +36,144 @@ from prompt_toolkit.layout.controls import FormattedTextControl
 """
 
 def select_from_list(title: str, items: list) -> int:
-    """交互式列表选择器，返回选中项的索引"""
-    kb = KeyBindings()
-    index = {'i': 0}
+    return asyncio.run(select_from_list_async(title, items))
 
-    @kb.add('up')
-    def _(event):
-        index['i'] = (index['i'] - 1) % len(items)
-        event.app.invalidate()
 
-    @kb.add('down')
-    def _(event):
-        index['i'] = (index['i'] + 1) % len(items)
-        event.app.invalidate()
+async def select_from_list_async(title: str, items: list) -> int:
+    """交互式列表选择器，返回选中项的索引
+
+    使用 VirtualList，只渲染视口内的行，长列表同样支持 PageUp/PageDown/Home/End。
+    """
+    view = VirtualList(items, title=title, wrap=True, search="type")
+
+    kb = KeyBindings()
 
     @kb.add('enter')
     def _(event):
-        event.app.exit()
+        # 过滤后没有匹配项时不能确认
+        if view.source_index is not None:
+            screen.close()
+
+    screen = SimpleScreen(view.window, merge_key_bindings([view.key_bindings, kb]), {'selected': '#00ff00'})
+    await screen.show()
+    return view.source_index
+
+
+# 预览区显示的模板行数；目标目录最多扫描的文件数
+PREVIEW_LINES = 12
+PREVIEW_FILE_LIMIT = 1_000_000
+
+
+async def select_gitignore_async(title: str, names: list, target_dir: str) -> str:
+    """.gitignore 模板选择器，返回选中的模板名
+
+    列表下方预览选中的模板：模板内容取自内置归档（见 core.template_archive），
+    以及它会忽略目标目录中的多少个文件。目标目录在后台扫描一次，
+    之后每个模板的计数由编译好的匹配器（core.ignore_match）在线程中完成。
+    归档无法读取时仍然可以选择，只是没有预览。
+    """
+    archive = gitignore_templates()
+    loop = asyncio.get_running_loop()
+    state = {'files': None, 'error': None, 'counts': {}, 'counting': None, 'archive_error': None}
+
+    def template(name):
+        if name is None or state['archive_error'] is not None:
+            return None
+        try:
+            return archive.get(name)
+        except TemplateArchiveError as e:
+            state['archive_error'] = str(e)
+            return None
+
+    def redraw():
+        if screen.stack is not None:
+            screen.stack.app.invalidate()
+
+    async def count(name):
+        state['counting'] = name
+        text = template(name)
+        files = state['files']
+        ignored = await asyncio.to_thread(lambda: IgnoreMatcher.parse(text).count(files))
+        state['counts'][name] = ignored
+        if state['counting'] == name:
+            state['counting'] = None
+        redraw()
+
+    def request_count():
+        name = view.selected
+        if (state['files'] is not None and template(name) is not None and name not in state['counts']
+                and state['counting'] != name):
+            asyncio.ensure_future(count(name))
+
+    async def scan():
+        try:
+            state['files'] = await asyncio.to_thread(list_files, target_dir, PREVIEW_FILE_LIMIT)
+        except Exception as e:
+            state['error'] = str(e)
+        request_count()
+        redraw()
+
+    def summary() -> str:
+        name = view.selected
+        if template(name) is None:
+            if state['archive_error'] is not None:
+                return f"无法读取模板归档，没有预览: {state['archive_error']}"
+            return "不生成 .gitignore"
+        files = state['files']
+        if state['error'] is not None:
+            return f"无法扫描 {target_dir}: {state['error']}"
+        if files is None:
+            return f"正在扫描 {target_dir} …"
+        if not len(files):
+            return f"{target_dir} 中还没有文件"
+        ignored = state['counts'].get(name)
+        if ignored is None:
+            return "正在计算会忽略的文件 …"
+        limit = "（只扫描了前 {:,} 个）".format(PREVIEW_FILE_LIMIT) if len(files) >= PREVIEW_FILE_LIMIT else ""
+        return f"会忽略 {target_dir} 中 {ignored:,} / {len(files):,} 个文件{limit}"
+
+    def preview():
+        name = view.selected
+        fragments = [('class:summary', f" {summary()}\n")]
+        text = template(name)
+        if text:
+            lines = text.splitlines()
+            for line in lines[:PREVIEW_LINES]:
+                fragments.append(('class:comment' if line.startswith('#') else '', f" {line}\n"))
+            if len(lines) > PREVIEW_LINES:
+                fragments.append(('class:comment', f" … 共 {len(lines)} 行"))
+        return fragments
 
-    style = Style.from_dict({'selected': '#00ff00'})
+    view = VirtualList(names, title=title, wrap=True, search="type", on_select=lambda _view: request_count())
 
-    def get_text():
-        fragments = [( '', title + '\n')]
-        for i, it in enumerate(items):
-            fragments.append(('class:selected' if i == index['i'] else '', f"{'►' if i == index['i'] else ' '} {it}\n"))
-        return fragments
+    kb = KeyBindings()
 
-    control = FormattedTextControl(get_text)
-    win = Window(content=control, height=len(items) + 1)
-    app = Application(layout=Layout(win), key_bindings=kb, style=style, full_screen=False)
-    app.run()
-    return index['i']
+    @kb.add('enter')
+    def _(event):
+        if view.source_index is not None:
+            screen.close()
+
+    container = HSplit([
+        view.window,
+        Window(height=1, char='─', style='class:comment'),
+        Window(content=FormattedTextControl(preview), height=PREVIEW_LINES + 2),
+    ])
+    screen = SimpleScreen(container, merge_key_bindings([view.key_bindings, kb]),
+                          {'selected': '#00ff00', 'summary': '#ffd75f', 'comment': '#888888'},
+                          focus=view.window)
+    scanning = loop.create_task(scan())
+    try:
+        await screen.show()
+    finally:
+        scanning.cancel()
+    return view.selected
 
 
 def toggle_readme(title: str) -> bool:
+    return asyncio.run(toggle_readme_async(title))
+
+
+async def toggle_readme_async(title: str) -> bool:
     """交互式复选框，返回是否选中"""
     kb = KeyBindings()
     state = {'selected': False}
@@ -74,9 +185,7 @@ def toggle_readme(title: str) -> bool:
 
     @kb.add('enter')
     def _(event):
-        event.app.exit()
-
-    style = Style.from_dict({'selected': '#00ff00'})
+        screen.close()
 
     def get_text():
         mark = '[X]' if state['selected'] else '[ ]'
@@ -84,12 +193,16 @@ def toggle_readme(title: str) -> bool:
 
     control = FormattedTextControl(get_text)
     win = Window(content=control, height=3)
-    app = Application(layout=Layout(win), key_bindings=kb, style=style, full_screen=False)
-    app.run()
+    screen = SimpleScreen(win, kb, {'selected': '#00ff00'})
+    await screen.show()
     return state['selected']
 
 
 def left_right_choice(left: str, right: str) -> str:
+    return asyncio.run(left_right_choice_async(left, right))
+
+
+async def left_right_choice_async(left: str, right: str) -> str:
     """左右选择对话框，返回选中的字符串"""
     kb = KeyBindings()
     state = {'i': 0}
@@ -106,9 +219,7 @@ def left_right_choice(left: str, right: str) -> str:
 
     @kb.add('enter')
     def _(event):
-        event.app.exit()
-
-    style = Style.from_dict({'selected': '#00ff00'})
+        screen.close()
 
     def get_text():
         left_frag = ('class:selected' if state['i'] == 0 else '', f" {left} ")
@@ -117,167 +228,141 @@ def left_right_choice(left: str, right: str) -> str:
 
     control = FormattedTextControl(get_text)
     win = Window(content=control, height=3)
-    app = Application(layout=Layout(win), key_bindings=kb, style=style, full_screen=False)
-    app.run()
+    screen = SimpleScreen(win, kb, {'selected': '#00ff00'})
+    await screen.show()
     return left if state['i'] == 0 else right
 
 
 def create_repository(name: str, description: str = '', local_path: str = '',
                      initialize_with_readme: bool = False, git_ignore: str | None = None,
                      license: str | None = None) -> bool:
-    """创建仓库的核心功能：创建目录、git init、保存配置"""
-    print('\n[NewRepository] 创建仓库：')
-    print(f'  名称: {name}')
-    print(f'  描述: {description}')
-    print(f'  本地路径: {local_path}')
-    print(f'  初始化 README: {initialize_with_readme}')
-    print(f'  .gitignore 模板: {git_ignore}')
-    print(f'  许可证: {license}')
-
-    # 1. 创建本地目录
+    return asyncio.run(create_repository_async(name, description, local_path,
+                                               initialize_with_readme, git_ignore, license))
+
+
+async def create_repository_async(name: str, description: str = '', local_path: str = '',
+                                  initialize_with_readme: bool = False, git_ignore: str | None = None,
+                                  license: str | None = None, report=print) -> bool:
+    """创建仓库的核心功能：生成初始提交（README、.gitignore、许可证），登记到工作区
+
+    创建过程见 core.scaffold：在临时目录中一次写好再整体移动到目标位置，失败或
+    按 Esc 取消时不留下半成品。创建在线程中进行，进度通过 report 输出
+    （界面中传入 ProgressView.write）。
+    """
+    report('[NewRepository] 创建仓库：')
+    report(f'  名称: {name}')
+    report(f'  描述: {description}')
+    report(f'  本地路径: {local_path}')
+    report(f'  初始化 README: {initialize_with_readme}')
+    report(f'  .gitignore 模板: {git_ignore}')
+    report(f'  许可证: {license}')
+
+    loop = asyncio.get_running_loop()
+    cancelled = threading.Event()
+    request = RepoRequest(local_path, name, description, initialize_with_readme, git_ignore, license)
+
+    def report_from_thread(line):
+        loop.call_soon_threadsafe(report, line)
+
+    job = asyncio.ensure_future(asyncio.to_thread(scaffold.create, request, report_from_thread, cancelled))
     try:
-        os.makedirs(local_path, exist_ok=True)
-        print(f"\n✅ 成功创建目录: {os.path.abspath(local_path)}")
-    except Exception as e:
-        print(f"\n❌ 创建目录失败: {e}")
+        await asyncio.shield(job)
+    except asyncio.CancelledError:
+        # 等创建线程在下一个检查点回滚
+        cancelled.set()
+        try:
+            await job
+        except ScaffoldError:
+            pass
+        raise
+    except ScaffoldError as e:
+        report(f"❌ 创建仓库失败: {e}")
         return False
 
-    # 2. 执行 git init（相当于 cd xxx && git init）
+    # 登记到工作区索引（用户数据目录下的 workspace.json）
     try:
-        result = subprocess.run(
-            ['git', 'init'],
-            cwd=local_path,
-            capture_output=True,
-            text=True,
-            check=True
+        workspace = await asyncio.to_thread(Workspace)
+        await asyncio.to_thread(
+            workspace.add, local_path, name,
+            description=description,
+            initialize_with_readme=initialize_with_readme,
+            git_ignore=git_ignore,
+            license=license,
         )
-        print(f"✅ Git 仓库初始化成功")
-        if result.stdout:
-            print(f"   {result.stdout.strip()}")
-    except subprocess.CalledProcessError as e:
-        print(f"\n❌ Git 初始化失败: {e}")
-        print(f"   错误信息: {e.stderr}")
-        return False
-    except FileNotFoundError:
-        print("\n❌ 错误: 未找到 git 命令，请确保 Git 已安装并添加到系统 PATH")
-        return False
-
-    # 3. 在当前目录创建 NewRepository.json
-    try:
-        repo_info = {
-            "name": name,
-            "description": description,
-            "local_path": os.path.abspath(local_path),
-            "initialize_with_readme": initialize_with_readme,
-            "git_ignore": git_ignore,
-            "license": license,
-            "status": "created",
-            "git_init_success": True
-        }
-        
-        with open('NewRepository.json', 'w', encoding='utf-8') as f:
-            json.dump(repo_info, f, ensure_ascii=False, indent=2)
-        
-        print(f"\n✅ 已创建 NewRepository.json 文件")
-        print(f"   位置: {os.path.abspath('NewRepository.json')}")
+        report("✅ 已登记到工作区")
+        report(f"   索引: {workspace.index_path}")
     except Exception as e:
-        print(f"\n❌ 创建 JSON 文件失败: {e}")
+        report(f"❌ 登记仓库失败: {e}")
         return False
 
     return True
 
 
 def run_interactive_flow() -> bool:
-    """完整的交互式流程，收集信息并创建仓库"""
+    return asyncio.run(run_interactive_flow_async())
+
+
+def _require_name(text: str):
+    if not text.strip():
+        return "❌ 错误：仓库名称不能为空，请重新输入"
+    return None
+
+
+def _require_abs_path(text: str):
+    if not text.strip():
+        return "❌ 错误：路径不能为空，请重新输入"
+    if not os.path.isabs(text):
+        return f"❌ 错误：必须使用绝对路径（例如 {os.path.abspath('/example')}）"
+    return None
+
+
+async def run_interactive_flow_async() -> bool:
+    """完整的交互式流程，收集信息并创建仓库
+
+    所有界面都在同一个事件循环中运行，创建过程显示在进度视图里。
+    """
     # 验证仓库名称不能为空
-    while True:
-        name = prompt('repository name: ')
-        if name.strip():
-            break
-        print("❌ 错误：仓库名称不能为空，请重新输入")
-
-    description = prompt('description: ')
-    
+    name = await prompt_text('repository name: ', _require_name)
+    if name is None:
+        return False
+
+    description = await prompt_text('description: ')
+    if description is None:
+        return False
+
     # 验证本地路径不能为空且必须是绝对路径
-    while True:
-        local_path = prompt('local path: ')
-        if local_path.strip():
-            if os.path.isabs(local_path):
-                break
-            else:
-                print(f"❌ 错误：必须使用绝对路径")
-                print(f"   当前系统支持格式：{os.path.abspath('/example')}")
-        else:
-            print("❌ 错误：本地路径不能为空，请重新输入")
-
-    readme_selected = toggle_readme('Initialize this repository with a README')
-
-    git_ignore_list = [
-        "None",
-        "Actionscript", "Ada", "Agda", "Android", "AppEngine", "AppceleratorTitanium", "ArchLinux",
-        "C", "C++", "CSharp", "Clojure", "CommonLisp",
-        "Dart", "Delphi", "Drupal", "Eclipse",
-        "Elisp", "Emacs", "Erlang", "Express",
-        "Fortran",
-        "Go",
-        "Haskell",
-        "Java", "JavaEE", "Joomla", "Julia",
-        "Kotlin",
-        "Lazarus", "Lua",
-        "Magento", "Matlab",
-        "Node",
-        "Objective-C", "OCaml",
-        "Perl", "PHP", "Python",
-        "R", "Rails", "React", "Ruby", "Rust",
-        "Sass", "Scala", "Swift", "Symfony",
-        "TeX",
-        "Vim", "VisualStudio", "Vue",
-        "WordPress",
-        "Xcode"
-    ]
-
-    gi_index = select_from_list('Select git ignore (回车确认):', git_ignore_list)
-    git_ignore_choice = git_ignore_list[gi_index]
-
-    license_list = ["None",
-        "0BSD",
-        "AGPL-3.0", "Apache-2.0", "Artistic-2.0",
-        "BSD-2-Clause", "BSD-3-Clause", "BSL-1.0",
-        "CC0-1.0", "CDDL-1.0",
-        "EPL-2.0",
-        "GPL-2.0", "GPL-3.0",
-        "ISC",
-        "LGPL-2.1", "LGPL-3.0",
-        "MIT", "MPL-2.0",
-        "OFPL", "OSL-3.0",
-        "PostgreSQL", "Proprietary", "PSF", "Python-2.0",
-        "Ruby",
-        "Unlicense",
-        "WTFPL",
-        "Zlib",
-        "openssl"
-    ]
-
-    lic_index = select_from_list('Select license (回车确认):', license_list)
+    local_path = await prompt_text('local path: ', _require_abs_path)
+    if local_path is None:
+        return False
+
+    readme_selected = await toggle_readme_async('Initialize this repository with a README')
+
+    # 模板名来自内置归档，选择时预览内容和在本地路径中会忽略的文件数
+    try:
+        git_ignore_list = ["None"] + gitignore_templates().names()
+    except TemplateArchiveError:
+        git_ignore_list = ["None"]
+    git_ignore_choice = await select_gitignore_async('Select git ignore (回车确认):', git_ignore_list, local_path)
+
+    license_list = ["None"] + LICENSES
+
+    lic_index = await select_from_list_async('Select license (回车确认):', license_list)
     license_choice = license_list[lic_index]
 
-    final = left_right_choice('create repository', 'cancel')
+    final = await left_right_choice_async('create repository', 'cancel')
     if final == 'create repository':
         # 最终确认的路径也不能为空且必须是绝对路径
-        while True:
-            final_path = prompt('请确认创建路径: ')
-            if final_path.strip():
-                if os.path.isabs(final_path):
-                    break
-                else:
-                    print(f"❌ 错误：必须使用绝对路径")
-                    print(f"   当前系统支持格式：{os.path.abspath('/example')}")
-            else:
-                print("❌ 错误：创建路径不能为空，请重新输入")
-            
-        return create_repository(name, description, final_path, readme_selected, git_ignore_choice, license_choice)
+        final_path = await prompt_text('请确认创建路径: ', _require_abs_path, default=local_path)
+        if final_path is None:
+            # 界面栈的 Application 仍占着屏幕，输出要先让出终端
+            await run_in_terminal(lambda: print('Cancelled by user'))
+            return False
+
+        view = ProgressView('Creating repository', max_lines=12)
+        return await view.run(create_repository_async(name, description, final_path, readme_selected,
+                                                      git_ignore_choice, license_choice, report=view.write))
     else:
-        print('\nCancelled by user')
+        await run_in_terminal(lambda: print('Cancelled by user'))
         return False
 
 
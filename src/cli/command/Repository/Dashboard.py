@@ -0,0 +1,170 @@
+import asyncio
+import os
+
+from prompt_toolkit.application.current import get_app_or_none
+from prompt_toolkit.key_binding import KeyBindings, merge_key_bindings
+
+from core.repo_status import refresh_statuses
+from core.workspace import Workspace
+from screen_stack import Screen
+from widgets.virtual_list import VirtualList
+
+
+class Dashboard(Screen):
+    """已登记仓库的总览
+
+    +----------------------------------------------------------------+
+    |   gittui        main     ↑1 ↓0   +2 ~1 ?3         0.04s        |
+    | ► dotfiles      master   ↑0 ↓4   clean            0.02s        |
+    |   vendor/lib    ...      (刷新中)                               |
+    +----------------------------------------------------------+------+
+
+    所有仓库并行刷新状态（同时运行的 git 进程数有上限，每个仓库单独超时），
+    哪个仓库先完成就先显示，不必等最慢的一个。
+
+    f / p / g 对当前列出的仓库（有搜索条件时只含匹配项）批量 fetch / pull / gc，
+    进度在 Jobs 界面中显示，返回后重新刷新状态。
+    """
+
+    style_rules = {
+        'selected': '#00ff00',
+        'branch': '#5f87ff',
+        'dirty': '#ffaf00',
+        'error': '#ff5f5f',
+        'pending': '#888888',
+    }
+
+    def __init__(self, workspace: Workspace | None = None, concurrency: int = 8, timeout: float = 10.0):
+        super().__init__()
+        self.workspace = workspace or Workspace()
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.entries = list(self.workspace)
+        self.statuses = {}
+        self.view = None
+        self._refresh_task = None
+        self._refreshing = 0
+        self.open_path = None
+        self.run_operation = None
+
+    def format_row(self, entry, selected: bool) -> list:
+        arrow = '►' if selected else ' '
+        name_style = 'class:selected' if selected else ''
+        fragments = [(name_style, f"{arrow} {entry['name'][:24]:<24} ")]
+        status = self.statuses.get(entry['path'])
+        if status is None:
+            fragments.append(('class:pending', "(刷新中)"))
+            return fragments
+        if status.error is not None:
+            fragments.append(('class:error', f"⚠ {status.error}"))
+            return fragments
+        fragments.append(('class:branch', f"{(status.branch or '?')[:20]:<20} "))
+        tracking = f"↑{status.ahead} ↓{status.behind}" if status.upstream else "-"
+        fragments.append(('', f"{tracking:<10} "))
+        if status.dirty:
+            flags = " ".join(f"{mark}{count}" for mark, count in (
+                ('+', status.staged), ('~', status.unstaged), ('?', status.untracked), ('!', status.conflicted))
+                if count)
+            fragments.append(('class:dirty', f"{flags:<16} "))
+        else:
+            fragments.append(('', f"{'clean':<16} "))
+        fragments.append(('class:pending', f"{status.elapsed:.2f}s"))
+        return fragments
+
+    def footer(self):
+        done = sum(1 for entry in self.entries if entry['path'] in self.statuses)
+        state = f"刷新中 {done}/{len(self.entries)}" if self._refreshing else f"{len(self.entries)} 个仓库"
+        return f" {state}  (r 刷新，f/p/g 批量 fetch/pull/gc，/ 搜索，回车查看历史，q 退出)"
+
+    # ---- 刷新 ----
+
+    def _on_result(self, status):
+        self.statuses[status.path] = status
+        self.view.redraw_rows()
+        app = get_app_or_none()
+        if app is not None:
+            app.invalidate()
+
+    async def _refresh(self):
+        self._refreshing += 1
+        try:
+            await refresh_statuses([entry['path'] for entry in self.entries], self._on_result,
+                                   concurrency=self.concurrency, timeout=self.timeout)
+        finally:
+            self._refreshing -= 1
+            self.view.redraw_rows()
+
+    def refresh(self):
+        if self._refresh_task is not None and not self._refresh_task.done():
+            self._refresh_task.cancel()
+        self.statuses.clear()
+        self.view.redraw_rows()
+        self._refresh_task = asyncio.ensure_future(self._refresh())
+
+    # ---- 界面 ----
+
+    def main(self):
+        return asyncio.run(self.main_async())
+
+    async def main_async(self):
+        """显示总览；回车选中仓库时打开它的提交历史，f/p/g 打开批量作业界面"""
+        while True:
+            self.open_path = None
+            self.run_operation = None
+            try:
+                await self.show()
+            finally:
+                if self._refresh_task is not None:
+                    self._refresh_task.cancel()
+            if self.run_operation is not None:
+                from command.Repository.Jobs import Jobs
+                operation, entries = self.run_operation
+                await Jobs([entry['path'] for entry in entries], [operation],
+                           {entry['path']: entry['name'] for entry in entries}).main_async()
+                continue
+            if self.open_path is None:
+                return None
+            from command.View.History import History
+            await History(self.open_path).main_async()
+
+    def build(self):
+        title = f" Workspace: {len(self.entries)} repositories"
+        self.view = VirtualList(self.entries, self.format_row, max_height=20, title=title, footer=self.footer,
+                                search="slash", search_key=lambda entry: f"{entry['name']} {entry['path']}")
+        searching = self.view.searching
+
+        kb = KeyBindings()
+
+        @kb.add('r', filter=~searching)
+        def _(event):
+            self.refresh()
+
+        @kb.add('enter', filter=~searching)
+        def _(event):
+            entry = self.view.selected
+            if entry is not None and os.path.isdir(entry['path']):
+                self.open_path = entry['path']
+                self.close()
+
+        def run_jobs(operation):
+            source = self.view.source
+            entries = [source[i] for i in range(len(source))]
+            if entries:
+                self.run_operation = (operation, entries)
+                self.close()
+
+        for key, operation in (('f', 'fetch'), ('p', 'pull'), ('g', 'gc')):
+            kb.add(key, filter=~searching)(lambda event, operation=operation: run_jobs(operation))
+
+        @kb.add('q', filter=~searching)
+        @kb.add('escape', filter=~self.view.filtering)
+        def _(event):
+            self.close()
+
+        self.refresh()
+        return self.view.window, merge_key_bindings([self.view.key_bindings, kb])
+
+
+# 测试入口
+if __name__ == "__main__":
+    Dashboard().main()
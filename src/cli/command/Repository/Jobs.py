@@ -0,0 +1,181 @@
+import asyncio
+
+from prompt_toolkit.application.current import get_app_or_none
+from prompt_toolkit.key_binding import KeyBindings, merge_key_bindings
+from prompt_toolkit.layout.containers import HSplit, Window
+from prompt_toolkit.layout.controls import FormattedTextControl
+
+from core.jobs import CANCELLED, CPU, DONE, FAILED, NETWORK, RETRYING, RUNNING, SKIPPED, JobScheduler
+from core.workspace import Workspace
+from screen_stack import Screen
+from widgets.virtual_list import VirtualList
+
+DETAIL_LINES = 10
+# 运行中定时重绘（耗时和重试倒计时在没有新输出时也要走）
+TICK = 0.5
+
+
+class Jobs(Screen):
+    """在多个仓库上批量执行 fetch / pull / gc（调度见 core.jobs）
+
+    +----------------------------------------------------------------+
+    |   gittui        fetch  running   Receiving objects:  45% (9/20)|
+    | ► dotfiles      fetch  retrying  2s 后第 2 次尝试：...          |
+    |   vendor/lib    gc     queued                                  |
+    | 运行中 network 4/4 cpu 1/2  完成 12/30                           |
+    |────────────────────────────────────────────────────────────────|
+    | 选中作业的输出；全部结束后显示汇总                                  |
+    +----------------------------------------------------------------+
+
+    Esc 取消（正在运行的 git 会被结束），全部结束后 Esc / q 返回，s 切换输出与汇总。
+    """
+
+    style_rules = {
+        'selected': '#00ff00',
+        'op': '#5f87ff',
+        'running': '#ffd75f',
+        'done': '#5fd75f',
+        'error': '#ff5f5f',
+        'pending': '#888888',
+    }
+
+    _STATE_STYLES = {RUNNING: 'class:running', RETRYING: 'class:running', DONE: 'class:done',
+                     FAILED: 'class:error', SKIPPED: 'class:pending', CANCELLED: 'class:pending'}
+
+    def __init__(self, paths: list, operations: list, names: dict | None = None, limits: dict | None = None,
+                 retries: int = 2):
+        super().__init__()
+        self.scheduler = JobScheduler(limits, retries=retries, on_update=self._on_update)
+        self.jobs = self.scheduler.plan(paths, operations, names)
+        self.report = None
+        self.show_report = False
+        self.view = None
+        self._task = None
+
+    def format_row(self, job, selected: bool) -> list:
+        arrow = '►' if selected else ' '
+        name_style = 'class:selected' if selected else ''
+        state_style = self._STATE_STYLES.get(job.state, 'class:pending')
+        attempts = f"×{job.attempts}" if job.attempts > 1 else ""
+        elapsed = f"{job.elapsed:.1f}s" if job.started is not None else ""
+        return [
+            (name_style, f"{arrow} {job.name[:24]:<24} "),
+            ('class:op', f"{job.operation.name:<6} "),
+            (state_style, f"{job.state:<9} "),
+            ('class:pending', f"{attempts:<3} {elapsed:>7}  "),
+            (state_style if job.state in (FAILED, RETRYING) else '', job.status_text()[:60]),
+        ]
+
+    def footer(self):
+        scheduler = self.scheduler
+        finished = sum(1 for job in self.jobs if job.finished_state)
+        running = "  ".join(f"{kind} {scheduler.running[kind]}/{scheduler.limits[kind]}" for kind in (NETWORK, CPU))
+        if self.running:
+            return f" 运行中 {running}  完成 {finished}/{len(self.jobs)}  (Esc 取消)"
+        state = "已结束" if self.report is not None else "已取消"
+        return f" {state} {finished}/{len(self.jobs)}  (s 切换输出/汇总，Esc 返回)"
+
+    def detail(self):
+        if self.show_report and self.report is not None:
+            return [('', f" {line}\n") for line in self.report.format()]
+        job = self.view.selected if self.view is not None else None
+        if job is None:
+            return []
+        fragments = [('class:op', f" {job.path}  {job.operation.name}\n")]
+        lines = list(job.lines)
+        if job.progress is not None:
+            lines.append(job.progress.format())
+        if job.error:
+            lines.append(job.error)
+        for line in lines[-DETAIL_LINES:]:
+            fragments.append(('class:pending', f" {line}\n"))
+        return fragments
+
+    # ---- 执行 ----
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def _on_update(self, _job):
+        if self.view is not None:
+            self.view.redraw_rows()
+        app = get_app_or_none()
+        if app is not None:
+            app.invalidate()
+
+    async def _tick(self):
+        while True:
+            await asyncio.sleep(TICK)
+            self._on_update(None)
+
+    async def _run(self):
+        ticker = asyncio.ensure_future(self._tick())
+        try:
+            self.report = await self.scheduler.run(self.jobs)
+        finally:
+            ticker.cancel()
+            self.show_report = self.report is not None
+            self._on_update(None)
+
+    # ---- 界面 ----
+
+    def main(self):
+        return asyncio.run(self.main_async())
+
+    async def main_async(self):
+        """执行并显示全部作业，返回 BatchReport（取消时为 None）"""
+        self._task = asyncio.ensure_future(self._run())
+        try:
+            await self.show()
+        finally:
+            if self.running:
+                self._task.cancel()
+                try:
+                    await self._task
+                except asyncio.CancelledError:
+                    pass
+        return self.report
+
+    def focus_target(self):
+        return self.view.window
+
+    def build(self):
+        title = f" Jobs: {len(self.jobs)} ({', '.join(dict.fromkeys(job.operation.name for job in self.jobs))})"
+        self.view = VirtualList(self.jobs, self.format_row, max_height=20, title=title, footer=self.footer,
+                                search="slash", search_key=lambda job: f"{job.name} {job.operation.name} {job.state}")
+        searching = self.view.searching
+
+        kb = KeyBindings()
+
+        @kb.add('s', filter=~searching)
+        def _(event):
+            self.show_report = not self.show_report and self.report is not None
+
+        @kb.add('q', filter=~searching)
+        def _(event):
+            if not self.running:
+                self.close(self.report)
+
+        @kb.add('escape', filter=~self.view.filtering)
+        @kb.add('c-c')
+        def _(event):
+            if self.running:
+                self._task.cancel()
+            else:
+                self.close(self.report)
+
+        return HSplit([
+            self.view.window,
+            Window(height=1, char='─', style='class:pending'),
+            Window(content=FormattedTextControl(self.detail), height=DETAIL_LINES + 1),
+        ]), merge_key_bindings([self.view.key_bindings, kb])
+
+
+# 测试入口
+if __name__ == "__main__":
+    import sys
+
+    operations = sys.argv[1:] or ["fetch"]
+    entries = list(Workspace())
+    Jobs([entry['path'] for entry in entries], operations, {entry['path']: entry['name'] for entry in entries}).main()
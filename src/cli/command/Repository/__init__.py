@@ -0,0 +1 @@
+__all__ = ["Dashboard.py", "Jobs.py"]
\ No newline at end of file
@@ -0,0 +1,226 @@
+import asyncio
+import time
+
+from prompt_toolkit.key_binding import KeyBindings, merge_key_bindings
+
+from core.blame_stream import BlameDocument
+from core.git_backend import GitBackend, GitError
+from screen_stack import Screen, SimpleScreen
+from widgets.virtual_list import VirtualList
+
+
+async def pick_file_async(repo_path: str) -> str | None:
+    """从仓库跟踪的文件中选择一个（直接输入即过滤），Esc 返回 None"""
+    output = await GitBackend.for_repo(repo_path).run_async(["-c", "core.quotePath=false", "ls-files"])
+    files = output.splitlines()
+    view = VirtualList(files, title=" Blame: 选择文件（输入过滤，回车确认，Esc 返回）", max_height=20,
+                       search="type")
+    chosen = {}
+
+    kb = KeyBindings()
+
+    @kb.add('enter')
+    def _(event):
+        if view.source_index is not None:
+            chosen['path'] = files[view.source_index]
+            screen.close()
+
+    @kb.add('escape', filter=~view.filtering)
+    def _(event):
+        screen.close()
+
+    screen = SimpleScreen(view.window, merge_key_bindings([view.key_bindings, kb]), {'selected': '#00ff00'})
+    await screen.show()
+    return chosen.get('path')
+
+
+class Blame(Screen):
+    """文件每一行最后一次被修改的提交
+
+    +-------------------------------------------------------------+
+    |  blame: src/main.py @ 1a2b3c4d                               |
+    | ► 1a2b3c4d alice      2024-05-01     1 │ import os            |
+    |   5e6f7a8b bob        2023-11-20     2 │ import sys           |
+    |   ········                           3 │ def main():          |
+    |  812 行，已标注 640  (回车 提交，p 上一版本，b 返回，q 退出)     |
+    +-------------------------------------------------------------+
+
+    git blame 的结果以流的方式逐块填入（core.blame_stream），文件内容立即显示，
+    还没有结果的行显示为点。p 跳到光标所在行的提交之前的版本（沿用当前版本中
+    没有改动的行的结果），b 回到跳转前的版本；看过的版本在共享缓存中。
+    """
+
+    style_rules = {
+        'selected': '#00ff00',
+        'sha': '#5f87ff',
+        'author': '#ffaf00',
+        'date': '#888888',
+        'lineno': '#888888',
+        'pending': '#444444',
+        'boundary': '#5f5f87',
+    }
+
+    def __init__(self, repo_path: str = ".", path: str | None = None, rev: str = "HEAD", page_size: int = 30):
+        super().__init__()
+        self.repo_path = repo_path
+        self.path = path
+        self.rev = rev
+        self.page_size = page_size
+        self.backend = GitBackend.for_repo(repo_path)
+        self.document = None
+        self.history = []       # 跳转前的 (文档, 光标行)
+        self.message = ""
+        self.view = None
+        self._loop = None
+
+    # ---- 文档 ----
+
+    def _on_update(self):
+        # 读取线程中调用：交给事件循环线程刷新
+        self._loop.call_soon_threadsafe(self._refresh)
+
+    def _refresh(self):
+        if self.view is not None:
+            self.view.invalidate_rows()
+            if self.stack is not None:
+                self.stack.app.invalidate()
+
+    def _show_document(self, document: BlameDocument, index: int = 0):
+        self.document = document
+        if self.view is not None:
+            self.view.set_source(document)
+            self.view.move_to(index)
+            self.view.title = self._title()
+
+    def _title(self) -> str:
+        return f" blame: {self.document.path} @ {self.document.commit[:8]}"
+
+    async def jump_to_parent(self):
+        """打开光标所在行的提交之前的版本，光标停在该行在父版本中的位置附近"""
+        line = self.view.selected
+        if line is None or line.entry is None:
+            self.message = "这一行还没有 blame 结果"
+            return
+        if line.entry.previous is None:
+            self.message = f"这一行在 {line.entry.commit.sha[:8]} 中随文件一起新增，没有更早的版本"
+            return
+        current = self.document
+        try:
+            parent = await asyncio.to_thread(current.open_parent, line.index, self._on_update)
+        except (GitError, FileNotFoundError) as e:
+            self.message = str(e).strip().splitlines()[-1]
+            return
+        self.history.append((current, line.index))
+        # 这一行在来源提交中的行号大致就是它在父版本中的位置
+        self._show_document(parent, min(line.orig_line - 1, len(parent) - 1))
+        self.message = ""
+
+    def go_back(self):
+        if not self.history:
+            return
+        self.document.close()
+        document, index = self.history.pop()
+        self._show_document(document, index)
+        self.message = ""
+
+    def open_commit(self):
+        line = self.view.selected
+        if line is None or line.entry is None:
+            return
+        from command.View.CommitView import CommitView
+        commit = line.entry.commit
+        view = CommitView(self.repo_path, commit.sha, commit.author, commit.summary, page_size=self.page_size + 10)
+        asyncio.ensure_future(view.main_async())
+
+    # ---- 界面 ----
+
+    def format_row(self, line, selected: bool) -> list:
+        arrow = '►' if selected else ' '
+        text_style = 'class:selected' if selected else ''
+        entry = line.entry
+        if entry is None:
+            info = [('class:pending', f"{'·' * 8} {'':<12} {'':<10}")]
+        else:
+            commit = entry.commit
+            date = time.strftime("%Y-%m-%d", time.localtime(commit.author_time)) if commit.author_time else ""
+            info = [
+                ('class:boundary' if commit.boundary else 'class:sha', commit.sha[:8]),
+                ('class:author', f" {commit.author[:12]:<12}"),
+                ('class:date', f" {date:<10}"),
+            ]
+        return [
+            (text_style, f"{arrow} "),
+            *info,
+            ('class:lineno', f" {line.index + 1:>5} │ "),
+            (text_style, line.text),
+        ]
+
+    def footer(self):
+        document = self.document
+        if self.message:
+            status = self.message
+        elif document.error:
+            status = f"blame 失败: {document.error.splitlines()[-1]}"
+        elif not document.done:
+            status = f"已标注 {document.filled}"
+        elif document.cached:
+            status = "缓存"
+        else:
+            reused = f"，沿用 {document.reused} 行" if document.reused else ""
+            status = f"{document.elapsed * 1000:.0f} ms{reused}"
+        back = f"，b 返回({len(self.history)})" if self.history else ""
+        return f" {len(document)} 行  {status}  (回车 提交，p 上一版本{back}，q 退出)"
+
+    def main(self):
+        return asyncio.run(self.main_async())
+
+    async def main_async(self):
+        self._loop = asyncio.get_running_loop()
+        if self.path is None:
+            self.path = await pick_file_async(self.repo_path)
+            if self.path is None:
+                return None
+        self.document = await asyncio.to_thread(BlameDocument.open, self.backend, self.path, self.rev,
+                                                self._on_update)
+        try:
+            # 小文件的 blame 通常很快就完成，稍等一下避免先闪一帧点
+            await asyncio.to_thread(self.document.wait_for, 0.05)
+            await self.show()
+        finally:
+            documents = [self.document, *(document for document, _index in self.history)]
+            await asyncio.to_thread(lambda: [document.close() for document in documents])
+        return self.document.commit
+
+    def build(self):
+        self.view = VirtualList(self.document, self.format_row, max_height=self.page_size,
+                                title=self._title(), footer=self.footer)
+
+        kb = KeyBindings()
+
+        @kb.add('q')
+        @kb.add('escape')
+        def _(event):
+            self.close()
+
+        @kb.add('enter')
+        def _(event):
+            self.open_commit()
+
+        @kb.add('p')
+        def _(event):
+            asyncio.ensure_future(self.jump_to_parent()).add_done_callback(lambda _f: event.app.invalidate())
+
+        @kb.add('b')
+        def _(event):
+            self.go_back()
+            event.app.invalidate()
+
+        return self.view.window, merge_key_bindings([self.view.key_bindings, kb])
+
+
+# 测试入口
+if __name__ == "__main__":
+    import sys
+
+    repo = sys.argv[1] if len(sys.argv) > 1 else "."
+    Blame(repo, sys.argv[2] if len(sys.argv) > 2 else None).main()
@@ -0,0 +1,145 @@
+import asyncio
+import bisect
+import os
+
+from prompt_toolkit.application.current import get_app_or_none
+from prompt_toolkit.key_binding import KeyBindings, merge_key_bindings
+
+from core.status_engine import StatusEngine
+from screen_stack import Screen
+from widgets.virtual_list import VirtualList
+
+
+class Changes(Screen):
+    """工作区改动视图（实时更新）
+
+    +-------------------------------------------------------------+
+    |  Changes: /home/user/project                                 |
+    | ► .M  src/main.py                                            |
+    |   A.  docs/new.md                                            |
+    |   ??  notes.txt                                              |
+    |  3 changes  inotify  上次更新 4 ms                            |
+    +-------------------------------------------------------------+
+
+    状态由 StatusEngine 维护：打开时全量扫描一次，之后只对文件系统报告变化的
+    路径重新计算，差异从后台线程推送到界面，按路径有序地插入/更新/删除行。
+    回车打开选中文件相对 HEAD 的 diff（DiffScreen）。
+    """
+
+    style_rules = {
+        'selected': '#00ff00',
+        'staged': '#00d75f',
+        'unstaged': '#ff5f5f',
+        'untracked': '#888888',
+        'conflict': 'bold #ff0000',
+    }
+
+    def __init__(self, repo_path: str = ".", page_size: int = 20):
+        super().__init__()
+        self.repo_path = repo_path
+        self.page_size = page_size
+        self.paths = []      # 有序路径列表，VirtualList 的数据源
+        self.entries = {}    # path -> StatusEntry
+        self.last_elapsed = None
+        self.engine = None
+        self.view = None
+
+    @staticmethod
+    def _xy_style(entry) -> str:
+        if entry.kind == "u":
+            return 'class:conflict'
+        if entry.kind == "?":
+            return 'class:untracked'
+        return 'class:staged' if entry.xy[1] == "." else 'class:unstaged'
+
+    def format_row(self, path, selected: bool) -> list:
+        entry = self.entries[path]
+        arrow = '►' if selected else ' '
+        return [
+            ('class:selected' if selected else '', f"{arrow} "),
+            (self._xy_style(entry), f"{entry.xy}  "),
+            ('class:selected' if selected else '', path),
+        ]
+
+    def footer(self):
+        watching = "inotify" if self.engine and self.engine.watching == "InotifyWatcher" else "polling"
+        elapsed = f"  上次更新 {self.last_elapsed * 1000:.0f} ms" if self.last_elapsed is not None else ""
+        return f" {len(self.paths)} changes  {watching}{elapsed}  (回车 查看 diff，/ 搜索，q 退出)"
+
+    # ---- 差异 ----
+
+    def apply_diff(self, diff):
+        for path in diff.removed:
+            if self.entries.pop(path, None) is not None:
+                i = bisect.bisect_left(self.paths, path)
+                if i < len(self.paths) and self.paths[i] == path:
+                    del self.paths[i]
+        for entry in diff.added:
+            if entry.path not in self.entries:
+                bisect.insort(self.paths, entry.path)
+            self.entries[entry.path] = entry
+        for entry in diff.changed:
+            self.entries[entry.path] = entry
+        self.last_elapsed = diff.elapsed
+        if self.view is not None:
+            self.view.index = min(self.view.index, max(len(self.paths) - 1, 0))
+            self.view.invalidate_rows()
+        app = get_app_or_none()
+        if app is not None:
+            app.invalidate()
+
+    # ---- 界面 ----
+
+    def open_diff(self):
+        path = self.view.selected if self.view is not None else None
+        if path is None:
+            return
+        from command.View.DiffScreen import DiffScreen
+        if self.entries[path].kind == "?":
+            # 未跟踪的文件和空文件比较
+            args = ["diff", "--no-color", "--no-index", "--", os.devnull, path]
+        else:
+            args = ["diff", "--no-color", "HEAD", "--", path]
+        screen = DiffScreen(self.repo_path, args=args, title=f" diff: {path}", page_size=self.page_size + 10)
+        asyncio.ensure_future(screen.main_async())
+
+    def main(self):
+        return asyncio.run(self.main_async())
+
+    async def main_async(self):
+        loop = asyncio.get_running_loop()
+        # 差异在引擎线程中产生，交给事件循环线程应用
+        self.engine = StatusEngine(self.repo_path, on_diff=lambda diff: loop.call_soon_threadsafe(self.apply_diff, diff))
+        await asyncio.to_thread(self.engine.start)
+        try:
+            await self.show()
+        finally:
+            await asyncio.to_thread(self.engine.stop)
+        return self.view.selected if self.view is not None else None
+
+    def build(self):
+        self.view = VirtualList(self.paths, self.format_row, max_height=self.page_size,
+                                title=f" Changes: {os.path.abspath(self.repo_path)}", footer=self.footer,
+                                search="slash")
+        searching = self.view.searching
+
+        kb = KeyBindings()
+
+        @kb.add('q', filter=~searching)
+        @kb.add('escape', filter=~self.view.filtering)
+        def _(event):
+            self.close()
+
+        @kb.add('enter', filter=~searching)
+        def _(event):
+            self.open_diff()
+
+        return self.view.window, merge_key_bindings([self.view.key_bindings, kb])
+
+
+# 测试入口
+if __name__ == "__main__":
+    import sys
+
+    path = Changes(sys.argv[1] if len(sys.argv) > 1 else ".").main()
+    print(f"\n您选择了: {path}")
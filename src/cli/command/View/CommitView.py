@@ -0,0 +1,35 @@
+from command.View.DiffScreen import DiffScreen
+from core.prefetch import SHOW_ARGS
+
+
+class CommitView(DiffScreen):
+    """单个提交的详情：stat 和补丁
+
+    +-------------------------------------------------------------+
+    |  commit 1a2b3c4d  alice  Fix typo                            |
+    |  README.md | 2 +-                                            |
+    | ━━ README.md                                                 |
+    | @@ -1,3 +1,3 @@                                              |
+    +-------------------------------------------------------------+
+
+    details 是预取好的 CommitDetails（core.prefetch）时直接显示；没有预取到
+    （光标刚移过来，或者提交太大没有预取）时以流的方式读取 git show 的输出。
+    """
+
+    def __init__(self, repo_path: str, sha: str, author: str, subject: str, details=None, page_size: int = 30):
+        text = f"{details.stat}\n\n{details.patch}" if details is not None else None
+        super().__init__(repo_path, args=[*SHOW_ARGS, sha, "--"], text=text,
+                         title=f" commit {sha[:12]}  {author}  {subject}", page_size=page_size)
+        self.sha = sha
+
+
+# 测试入口
+if __name__ == "__main__":
+    import sys
+
+    from core.git_backend import GitBackend
+
+    repo_path = sys.argv[1] if len(sys.argv) > 1 else "."
+    rev = sys.argv[2] if len(sys.argv) > 2 else "HEAD"
+    sha, author, subject = GitBackend(repo_path).run(["log", "-1", "--format=%H%x00%an%x00%s", rev]).strip().split("\0")
+    CommitView(repo_path, sha, author, subject).main()
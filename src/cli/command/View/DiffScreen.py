@@ -0,0 +1,85 @@
+import asyncio
+
+from prompt_toolkit.key_binding import KeyBindings, merge_key_bindings
+
+from core.diff_stream import DiffDocument
+from core.git_backend import GitBackend
+from screen_stack import Screen
+from widgets.diff_view import DiffView
+
+
+class DiffScreen(Screen):
+    """显示一段 diff：`git diff` / `git show` 的输出边读边显示，或已经取到的文本
+
+    +-------------------------------------------------------------+
+    |  diff HEAD -- src/main.py                                    |
+    | ━━ src/main.py                                               |
+    | @@ -1,3 +1,3 @@                                              |
+    | -print("hello")                                              |
+    | +print("world")                                              |
+    |  812 行  (回车 展开大文件，n/p 下/上一个文件，q 返回)           |
+    +-------------------------------------------------------------+
+
+    args 和 text 二选一：args 是 git 参数（在 repo_path 中运行），text 是完整的 diff。
+    """
+
+    style_rules = DiffView.STYLE
+
+    def __init__(self, repo_path: str = ".", args: list | None = None, text: str | None = None,
+                 title: str | None = None, page_size: int = 30):
+        super().__init__()
+        self.repo_path = repo_path
+        self.args = args
+        self.text = text
+        self.title = title if title is not None else f" {' '.join(args or [])}"
+        self.page_size = page_size
+        self.document = None
+        self.diff_view = None
+
+    def open_document(self) -> DiffDocument:
+        loop = asyncio.get_running_loop()
+
+        def on_update():
+            # 读取线程中调用：交给事件循环线程刷新
+            loop.call_soon_threadsafe(self._refresh)
+
+        if self.text is not None:
+            return DiffDocument.from_text(self.text, on_update=on_update)
+        return DiffDocument.from_git(GitBackend.for_repo(self.repo_path), self.args, on_update=on_update)
+
+    def _refresh(self):
+        if self.diff_view is not None:
+            self.diff_view.refresh()
+            if self.stack is not None:
+                self.stack.app.invalidate()
+
+    def main(self):
+        return asyncio.run(self.main_async())
+
+    async def main_async(self):
+        self.document = self.open_document()
+        try:
+            # 第一屏通常在几毫秒内就绪，稍等一下避免先闪一帧空白
+            await asyncio.to_thread(self.document.wait_for, self.page_size, 0.05)
+            await self.show()
+        finally:
+            await asyncio.to_thread(self.document.close)
+
+    def build(self):
+        self.diff_view = DiffView(self.document, max_height=self.page_size, title=self.title)
+
+        kb = KeyBindings()
+
+        @kb.add('q')
+        @kb.add('escape')
+        def _(event):
+            self.close()
+
+        return self.diff_view.window, merge_key_bindings([self.diff_view.key_bindings, kb])
+
+
+# 测试入口
+if __name__ == "__main__":
+    import sys
+
+    DiffScreen(".", args=sys.argv[1:] or ["diff", "HEAD"]).main()
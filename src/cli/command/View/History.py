@@ -0,0 +1,150 @@
+import asyncio
+import os
+
+from prompt_toolkit.key_binding import KeyBindings, merge_key_bindings
+
+from core.graph_cache import GraphCache
+from core.prefetch import PrefetchScheduler
+from screen_stack import Screen
+from widgets.virtual_list import VirtualList
+
+
+class History(Screen):
+    """ASCII 提交历史视图
+
+    +-------------------------------------------------------------+
+    | * 1a2b3c4d  Merge branch 'dev'                               |
+    | * \\ 5e6f7a8b  Fix typo                                       |
+    | | * 9c0d1e2f  Add feature                                    |
+    +-------------------------------------------------------------+
+
+    只读取当前屏幕需要的提交，向下滚动时才继续从 git 读取。
+    提交图通过 GraphCache 打开，完整读取过的历史在退出时写回缓存。
+    光标停下时在后台预取附近 prefetch_radius 个提交的 stat 和补丁，
+    回车打开提交详情时通常已经在缓存中。
+    select 给出 SHA 时打开后光标直接停在该提交（例如从 Search 跳转过来）。
+    """
+
+    style_rules = {
+        'selected': '#00ff00',
+        'graph': '#ffaf00',
+        'sha': '#5f87ff',
+    }
+
+    def __init__(self, repo_path: str = ".", page_size: int = 20, prefetch_radius: int = 5,
+                 select: str | None = None):
+        super().__init__()
+        self.repo_path = repo_path
+        self.page_size = page_size
+        self.prefetch_radius = prefetch_radius
+        self.select = select
+        self.graph = None
+        self.view = None
+        self.prefetch = None
+        self._select_index = None
+
+    @staticmethod
+    def format_row(row, selected: bool) -> list:
+        arrow = '►' if selected else ' '
+        text_style = 'class:selected' if selected else ''
+        return [
+            (text_style, f"{arrow} "),
+            ('class:graph', f"{row.graph:<10} "),
+            ('class:sha', row.sha[:8]),
+            (text_style, f"  {row.subject}"),
+        ]
+
+    @staticmethod
+    def search_key(row) -> str:
+        return f"{row.sha} {row.author} {row.subject}"
+
+    def on_select(self, view):
+        """光标附近的提交按距离排序交给预取（光标所在的提交最先）"""
+        source = view.source
+        loaded = len(source)
+        order = [view.index]
+        for distance in range(1, self.prefetch_radius + 1):
+            order += [view.index + distance, view.index - distance]
+        self.prefetch.focus([source[i].sha for i in order if 0 <= i < loaded])
+
+    def locate(self, sha: str) -> int | None:
+        """提交在图中的行号；还没读到时继续向后读取，不在图中时返回 None"""
+        graph = self.graph
+        rows = graph.rows
+        searched = 0
+        while True:
+            commit_id = rows.id_of(sha)
+            if commit_id >= 0:
+                try:
+                    return rows.row_ids.index(commit_id, searched)
+                except ValueError:
+                    pass
+            if graph.exhausted:
+                return None
+            searched = len(rows)
+            graph.ensure(searched + 4096)
+
+    async def open_commit(self):
+        row = self.view.selected
+        if row is not None:
+            from command.View.CommitView import CommitView
+            # 已预取时直接显示，否则 CommitView 自己以流的方式读取
+            details = self.prefetch.get(row.sha)
+            view = CommitView(self.repo_path, row.sha, row.author, row.subject, details,
+                              page_size=self.page_size + 10)
+            await view.main_async()
+
+    def main(self):
+        return asyncio.run(self.main_async())
+
+    async def main_async(self):
+        cache = GraphCache()
+        self.graph = cache.open(self.repo_path)
+        self.prefetch = PrefetchScheduler(self.repo_path)
+        if self.select is not None:
+            self._select_index = await asyncio.to_thread(self.locate, self.select)
+        try:
+            await self.show()
+        finally:
+            self.prefetch.close()
+            cache.save(self.graph)
+            self.graph.close()
+
+        selected = self.view.selected if self.view is not None else None
+        return selected.sha if selected is not None else None
+
+    def build(self):
+        graph = self.graph
+
+        def footer():
+            more = '' if graph.exhausted else '+'
+            return f" {len(graph)}{more} commits  (上下/PageUp/PageDown/Home/End 移动，回车 详情，/ 搜索，q 退出)"
+
+        self.view = VirtualList(graph, self.format_row, max_height=self.page_size,
+                                title=f" History: {os.path.abspath(self.repo_path)}", footer=footer,
+                                search="slash", search_key=self.search_key, on_select=self.on_select)
+        if self._select_index is not None:
+            self.view.move_to(self._select_index)
+        searching = self.view.searching
+
+        kb = KeyBindings()
+
+        @kb.add('q', filter=~searching)
+        @kb.add('escape', filter=~self.view.filtering)
+        def _(event):
+            self.close()
+
+        @kb.add('enter', filter=~searching)
+        async def _(event):
+            # 协程按键处理由 Application 作为后台任务持有，详情界面的异常经事件循环报告
+            await self.open_commit()
+
+        return self.view.window, merge_key_bindings([self.view.key_bindings, kb])
+
+
+# 测试入口
+if __name__ == "__main__":
+    import sys
+
+    sha = History(sys.argv[1] if len(sys.argv) > 1 else ".").main()
+    print(f"\n您选择了: {sha}")
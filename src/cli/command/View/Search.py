@@ -0,0 +1,167 @@
+import asyncio
+import os
+import threading
+import time
+
+from prompt_toolkit.buffer import Buffer
+from prompt_toolkit.key_binding import KeyBindings, merge_key_bindings
+from prompt_toolkit.layout.containers import HSplit, VSplit, Window
+from prompt_toolkit.layout.controls import BufferControl, FormattedTextControl
+
+from core.commit_index import CommitIndex
+from screen_stack import Screen
+from widgets.virtual_list import VirtualList
+
+
+class Search(Screen):
+    """按提交说明、作者、路径搜索历史（索引见 core.commit_index）
+
+    +-------------------------------------------------------------+
+    | Search: crash author:alice path:src/core                     |
+    |   2024-05-01  1a2b3c4d  alice     Fix crash in graph cache   |
+    | ► 2024-04-28  5e6f7a8b  alice     Guard against crash on ... |
+    | 12 个匹配 (0.21 ms)                                           |
+    +-------------------------------------------------------------+
+
+    打开时在后台把新提交加入索引（第一次打开时完整建立），之后每次输入立即查询。
+    回车在 History 中打开选中的提交，返回后回到搜索结果。
+    """
+
+    style_rules = {
+        'selected': '#00ff00',
+        'label': 'bold',
+        'sha': '#5f87ff',
+        'author': '#ffaf00',
+        'pending': '#888888',
+    }
+
+    def __init__(self, repo_path: str = ".", page_size: int = 20, query: str = ''):
+        super().__init__()
+        self.repo_path = repo_path
+        self.page_size = page_size
+        self.index = None
+        self.status = "正在读取索引…"
+        self.result = None
+        self.open_sha = None
+        self.buffer = Buffer(multiline=False, on_text_changed=lambda _buffer: self.run_query())
+        self.buffer.text = query
+        self._control = BufferControl(buffer=self.buffer)
+        self.view = None
+        self._return_index = 0
+
+    @staticmethod
+    def format_row(hit, selected: bool) -> list:
+        arrow = '►' if selected else ' '
+        text_style = 'class:selected' if selected else ''
+        date = time.strftime('%Y-%m-%d', time.localtime(hit.timestamp))
+        return [
+            (text_style, f"{arrow} {date}  "),
+            ('class:sha', hit.sha[:8]),
+            ('class:author', f"  {hit.author.split(' <')[0][:16]:<16}"),
+            (text_style, f"  {hit.subject}"),
+        ]
+
+    def footer(self):
+        if self.index is None:
+            return f" {self.status}"
+        if self.result is None:
+            help_text = "输入词、author:名字、path:路径"
+            return f" {self.status}  ({help_text}，上下移动，回车 在 History 中打开，Esc 返回)"
+        shown = len(self.result.hits)
+        more = f"，显示最新的 {shown} 个" if shown < self.result.total else ""
+        return f" {self.result.total} 个匹配{more} ({self.result.elapsed * 1000:.2f} ms)  (回车 在 History 中打开，Esc 返回)"
+
+    def run_query(self):
+        if self.index is None or self.view is None:
+            return
+        query = self.buffer.text
+        self.result = self.index.search(query) if query.strip() else None
+        self._return_index = 0
+        self.view.set_source(self.result.hits if self.result is not None else [])
+
+    # ---- 索引 ----
+
+    async def _load(self, cancel: threading.Event):
+        loop = asyncio.get_running_loop()
+
+        def report(count):
+            self.status = f"正在建立索引: {count} 个提交"
+            loop.call_soon_threadsafe(self._invalidate)
+
+        start = time.perf_counter()
+        try:
+            index, added = await asyncio.to_thread(CommitIndex.update, self.repo_path, report=report, cancel=cancel)
+        except OSError as e:
+            self.status = f"⚠ 无法建立索引: {e}"
+        else:
+            if index is not None:
+                self.index = index
+                new = f"，新增 {added}" if added else ""
+                self.status = f"{len(index)} 个提交已索引{new} ({time.perf_counter() - start:.2f}s)"
+                self.run_query()
+        self._invalidate()
+
+    def _invalidate(self):
+        if self.stack is not None:
+            self.stack.app.invalidate()
+
+    # ---- 界面 ----
+
+    def main(self):
+        return asyncio.run(self.main_async())
+
+    async def main_async(self):
+        """显示搜索界面；回车时在 History 中打开选中的提交，返回后继续搜索"""
+        cancel = threading.Event()
+        loading = asyncio.ensure_future(self._load(cancel))
+        try:
+            while True:
+                self.open_sha = None
+                await self.show()
+                if self.open_sha is None:
+                    return None
+                from command.View.History import History
+                await History(self.repo_path, page_size=self.page_size, select=self.open_sha).main_async()
+        finally:
+            cancel.set()
+            loading.cancel()
+
+    def focus_target(self):
+        return self._control
+
+    def build(self):
+        self.view = VirtualList(self.result.hits if self.result is not None else [], self.format_row,
+                                max_height=self.page_size, title=f" {os.path.abspath(self.repo_path)}",
+                                footer=self.footer)
+        # 从 History 返回时光标回到原来的结果上
+        self.view.move_to(self._return_index)
+
+        kb = KeyBindings()
+
+        @kb.add('enter')
+        def _(event):
+            hit = self.view.selected
+            if hit is not None:
+                self.open_sha = hit.sha
+                self._return_index = self.view.index
+                self.close()
+
+        @kb.add('escape')
+        def _(event):
+            self.close()
+
+        container = HSplit([
+            VSplit([
+                Window(FormattedTextControl([('class:label', " Search: ")]), dont_extend_width=True),
+                Window(self._control, height=1),
+            ]),
+            self.view.window,
+        ])
+        return container, merge_key_bindings([self.view.key_bindings, kb])
+
+
+# 测试入口
+if __name__ == "__main__":
+    import sys
+
+    Search(sys.argv[1] if len(sys.argv) > 1 else ".").main()
@@ -0,0 +1,66 @@
+import asyncio
+
+from prompt_toolkit.key_binding import KeyBindings
+from prompt_toolkit.layout.containers import Window
+
+from screen_stack import Screen
+from widgets.frame import FrameControl
+
+
+class View(Screen):
+    # 样式：仅设置选中文字的前景色为艳绿色
+    style_rules = {
+        'selected': '#00ff00',
+    }
+
+    def __init__(self):
+        super().__init__()
+        self.choices = [
+            "History",
+            "Changes",
+            "Blame",
+            "Search",
+            "Back",
+        ]
+        self.index = {'i': 0}
+
+    def main(self):
+        return asyncio.run(self.main_async())
+
+    async def main_async(self):
+        await self.show()
+        return self.choices[self.index['i']]
+
+    def build(self):
+        choices = self.choices
+        kb = KeyBindings()
+        index = self.index
+
+        @kb.add('up')
+        def _(event):
+            index['i'] = (index['i'] - 1) % len(choices)
+            event.app.invalidate()
+
+        @kb.add('down')
+        def _(event):
+            index['i'] = (index['i'] + 1) % len(choices)
+            event.app.invalidate()
+
+        @kb.add('enter')
+        def _(event):
+            self.close()
+
+        # 边框、标题和各行由 FrameControl 缓存，移动光标只重画变化的两行
+        control = FrameControl("View", choices, selected=lambda: index['i'],
+                               marker='►', padding=2, focusable=True)
+        # 窗口高度 = 菜单项数 + 4(上边框、标题、分隔线、下边框)
+        window_height = len(choices) + 4
+        win = Window(content=control, height=window_height)
+        return win, kb
+
+
+# 测试入口
+if __name__ == "__main__":
+    view_menu = View()
+    result = view_menu.main()
+    print(f"\n您选择了: {result}")
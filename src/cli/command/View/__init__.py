@@ -0,0 +1 @@
+__all__ = ["View.py", "History.py", "CommitView.py", "DiffScreen.py", "Changes.py", "Blame.py", "Search.py"]
\ No newline at end of file
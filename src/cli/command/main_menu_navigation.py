@@ -1,31 +1,49 @@
+import asyncio
 import importlib
 import sys
 import os
 from typing import Optional, List
 
 from prompt_toolkit.key_binding import KeyBindings
-from prompt_toolkit.styles import Style
-from prompt_toolkit.application import Application
-from prompt_toolkit.layout import Layout
 from prompt_toolkit.layout.containers import Window
-from prompt_toolkit.layout.controls import FormattedTextControl
 
+from screen_stack import Screen
+from widgets.frame import FrameControl
+
+
+class MainMenuNavigation(Screen):
+    style_rules = {
+        # 样式：只设置前景色（艳绿色），无背景色
+        'selected': '#00ff00',
+    }
 
-class MainMenuNavigation:
     def __init__(self):
+        super().__init__()
         self.kb = KeyBindings()
         self.choice_index = 0
-
-    def main(self):
-        choices = [
+        self.choices = [
             "File",
             "Edit",
             "View",
             "Repository",
             "Branch",
             "Help",
+            "Debug",
         ]
 
+    def main(self):
+        return asyncio.run(self.main_async())
+
+    async def main_async(self):
+        """在界面栈中显示菜单，返回选中的菜单项"""
+        await self.show()
+        choices = self.choices
+        return choices[self.choice_index] if self.choice_index < len(choices) else "Invalid choice"
+
+    def build(self):
+        choices = self.choices
+        self.kb = KeyBindings()
+
         @self.kb.add('up')
         def _(event):
             self.choice_index = (self.choice_index - 1) % len(choices)
@@ -38,66 +56,16 @@ class MainMenuNavigation:
 
         @self.kb.add('enter')
         def _(event):
-            event.app.exit()
+            self.close()
 
-        # 样式：只设置前景色（艳绿色），无背景色
-        style = Style.from_dict({
-            'selected': '#00ff00',
-        })
-
-        def get_choice_text():
-            title = "File"
-            # 计算内容区域最大宽度
-            max_choice_len = max(len(c) for c in choices)
-            # 菜单项内容宽度 = 前缀("► "或"  ") + 最长选项文本
-            menu_content_width = max_choice_len + 2
-            
-            # 内部宽度 = 标题或菜单项内容的最大值
-            inner_width = max(len(title), menu_content_width) + 2  # +2 为内边距
-            
-            # 构建边框和内容的各个片段
-            fragments = []
-            
-            # 上边框
-            fragments.append(('', f"+{'-' * inner_width}+\n"))
-            
-            # 标题行（居中）
-            fragments.append(('', f"|{title:^{inner_width}}|\n"))
-            
-            # 分隔线
-            fragments.append(('', f"+{'-' * inner_width}+\n"))
-            
-            # 菜单项
-            for i, choice in enumerate(choices):
-                arrow = '►' if i == self.choice_index else ' '
-                # 格式化菜单行内容：前缀 + 选项文本 + 填充
-                line_content = f"{arrow} {choice:<{max_choice_len}}"
-                # 填充至内部宽度
-                padded_content = f"{line_content:<{inner_width}}"
-                full_line = f"|{padded_content}|\n"
-                
-                # 为选中行应用艳绿色样式
-                if i == self.choice_index:
-                    fragments.append(('class:selected', full_line))
-                else:
-                    fragments.append(('', full_line))
-            
-            # 下边框
-            fragments.append(('', f"+{'-' * inner_width}+\n"))
-            
-            return fragments
-
-        choice_control = FormattedTextControl(get_choice_text)
+        # 边框、标题和各行由 FrameControl 缓存，移动光标只重画变化的两行
+        choice_control = FrameControl("File", choices, selected=lambda: self.choice_index,
+                                      marker='►', padding=2)
         # 窗口高度 = 菜单项数 + 4(上边框、标题、分隔线、下边框)
         window_height = len(choices) + 4
         
         choice_window = Window(content=choice_control, height=window_height)
-        layout = Layout(container=choice_window)
-        
-        app = Application(layout=layout, full_screen=False, key_bindings=self.kb, style=style)
-        app.run()
-        
-        return choices[self.choice_index] if self.choice_index < len(choices) else "Invalid choice"
+        return choice_window, self.kb
 
 
 def setup_project_path():
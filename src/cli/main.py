@@ -1,43 +1,177 @@
-import subprocess
+"""程序入口
 
+冷启动时只导入标准库里的轻量模块，先显示横幅；git 版本优先读缓存，
+缓存未命中时在后台线程探测，探测完成后原地刷新横幅中的版本行。
+prompt_toolkit、asyncio 和各个界面模块在用户按下回车后才导入。
+
+性能记录（core.profiling）默认关闭，用 --profile / --trace 文件 / --cprofile 文件
+或环境变量 GITTUI_PROFILE 打开。
+"""
+
+import os
+import sys
+
+# src/ 目录加入搜索路径，使 core 包可以被导入；cli/ 目录使 command、widgets 可以被导入
+CLI_DIR = os.path.dirname(os.path.abspath(__file__))
+SRC_DIR = os.path.dirname(CLI_DIR)
+for _path in (CLI_DIR, SRC_DIR):
+    if _path not in sys.path:
+        sys.path.insert(0, _path)
+
+from core.git_version import cached_git_version, probe_in_background
+
+# 版本行距离横幅下方输入行的行数（版本行之后还有两行）
+VERSION_LINE_OFFSET = 3
+
+
+def version_line(version: str) -> str:
+    return f"| Git Version: {version:<31}|"
+
+
+def print_banner(version: str):
+    print("+---------------------------------------------+")
+    print("|             Git-DIT Terminal UI             |")
+    print("| A simple and powerful ASCII-based Git client|")
+    print("| for your terminal environment.              |")
+    print(version_line(version))
+    print("| Press [ENTER] to begin...                   |")
+    print("+---------------------------------------------+", flush=True)
+
+
+def update_version_line(version: str):
+    """后台探测完成后，原地改写横幅里的版本行（仅在终端上）"""
+    if not sys.stdout.isatty():
+        return
+    # 保存光标 -> 上移到版本行 -> 改写 -> 恢复光标
+    sys.stdout.write(f"\x1b7\x1b[{VERSION_LINE_OFFSET}A\r{version_line(version)}\x1b8")
+    sys.stdout.flush()
+
+
+async def run_file_action(action: str):
+    """执行 File 菜单中的选项"""
+    if action == "New Repository":
+        from command.File.NewRepository import run_interactive_flow_async
+        await run_interactive_flow_async()
+    elif action == "Add local Repository":
+        from command.File.AddLocalRepository import AddLocalRepository
+        await AddLocalRepository().local_path_async()
+    elif action == "Clone repository":
+        from command.File.CloneRepository import CloneRepository
+        await CloneRepository().clone_async()
+
+
+async def run_view_action():
+    """View 菜单：查看当前目录所在仓库"""
+    from command.View.View import View
+
+    action = await View().main_async()
+    if action == "History":
+        from command.View.History import History
+        await History(os.getcwd()).main_async()
+    elif action == "Changes":
+        from command.View.Changes import Changes
+        await Changes(os.getcwd()).main_async()
+    elif action == "Blame":
+        from command.View.Blame import Blame
+        await Blame(os.getcwd()).main_async()
+    elif action == "Search":
+        from command.View.Search import Search
+        await Search(os.getcwd()).main_async()
+
+
+async def run_navigation():
+    """主菜单循环：所有界面都运行在同一个 asyncio 事件循环和同一个 Application 中"""
+    from command.main_menu_navigation import MainMenuNavigation
+    from command.File.File import File
+
+    while True:
+        choice = await MainMenuNavigation().main_async()
+        if choice == "File":
+            action = await File().main_async()
+            if action == "Exit":
+                break
+            await run_file_action(action)
+        elif choice == "View":
+            await run_view_action()
+        elif choice == "Repository":
+            from command.Repository.Dashboard import Dashboard
+            await Dashboard().main_async()
+        elif choice == "Branch":
+            from command.Branch.Branch import Branch
+            await Branch(os.getcwd()).main_async()
+        elif choice == "Debug":
+            from command.Debug.CacheDebug import CacheDebug
+            await CacheDebug().main_async()
+
+
+def parse_args(argv: list):
+    """解析命令行参数；没有参数时不导入 argparse"""
+    if not argv:
+        return None
+    import argparse
+
+    parser = argparse.ArgumentParser(prog="gittui", description="Git-DIT Terminal UI")
+    parser.add_argument("--profile", action="store_true", help="在界面底部显示按键、渲染和 git 耗时的 p50/p99")
+    parser.add_argument("--trace", metavar="FILE", help="退出时写出 Chrome trace-event JSON（同时打开 --profile）")
+    parser.add_argument("--cprofile", metavar="FILE", help="退出时写出 cProfile 统计（同时打开 --profile）")
+    return parser.parse_args(argv)
+
+
+def enable_profiling(args):
+    """按命令行参数或 GITTUI_PROFILE 打开性能记录，返回 Profiler 或 None"""
+    requested = args is not None and (args.profile or args.trace or args.cprofile)
+    if not requested and not os.environ.get("GITTUI_PROFILE"):
+        return None     # 默认情况下连 core.profiling 都不在这里导入
+    from core import profiling
+
+    if requested:
+        return profiling.enable(trace_path=args.trace, cprofile_path=args.cprofile)
+    return profiling.enable_from_env()
+
+
+def main():
+    args = parse_args(sys.argv[1:])
+    profiler = enable_profiling(args)
+
+    version = cached_git_version()
+    print_banner(version or "detecting...")
+    banner_visible = [True]
+    if version is None:
+        probe = probe_in_background(lambda v: banner_visible[0] and update_version_line(v))
+    else:
+        probe = None
 
-def get_git_version():
-    try:
-        result = subprocess.run(
-            ["git", "version"], 
-            capture_output=True, 
-            text=True, 
-            check=True
-        )
-        version_output = result.stdout.strip()
-        version = version_output.replace("git version ", "")
-        version_parts = version.split('.')
-        if len(version_parts) >= 3:
-            return '.'.join(version_parts[:3])
-        return version
-    except Exception:
-        return "unknown"
-
-version = get_git_version()
-
-print("+---------------------------------------------+")
-print("|             Git-DIT Terminal UI             |")
-print("| A simple and powerful ASCII-based Git client|")
-print("| for your terminal environment.              |")
-print(f"| Git Version: {version}                         |")
-print("| Press [ENTER] to begin...                   |")
-print("+---------------------------------------------+")
-
-users_input = input()  # 等待用户按下回车键
-
-if users_input == "":
-    print("Starting Git-DIT...")
-    print("Try to return Navigation Interface...")
     try:
-        # 正确导入并调用
-        from command.main_menu_navigation import MainMenuNavigation
-        menu = MainMenuNavigation()
-        menu.main()
-    except Exception as e:
-        print(f"Error: {e}")
-        print("Exiting...")
+        users_input = input()  # 等待用户按下回车键
+    except (KeyboardInterrupt, EOFError):
+        return
+    finally:
+        banner_visible[0] = False
+
+    if users_input == "":
+        print("Starting Git-DIT...")
+        print("Try to return Navigation Interface...")
+        try:
+            import asyncio
+            from screen_stack import ScreenStack
+            if profiler is not None:
+                profiler.start()
+            asyncio.run(ScreenStack().run(run_navigation()))
+        except (KeyboardInterrupt, EOFError):
+            pass
+        except Exception as e:
+            print(f"Error: {e}")
+            print("Exiting...")
+        finally:
+            if profiler is not None:
+                from core import profiling
+                for path in profiling.disable():
+                    print(f"Profile written to {path}")
+
+    if probe is not None:
+        # 让后台探测把结果写入缓存，下次启动直接命中
+        probe.join(timeout=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,249 @@
+"""界面栈：一个 Application 独占终端，各个界面压栈/出栈切换
+
+以前每个菜单都会新建并销毁自己的 Application、按键绑定和样式，
+每次切换都要重新初始化并从头重绘终端。现在只有一个 Application，
+它的布局、按键绑定和样式都是动态的，始终取栈顶界面的内容：
+
+    result = await stack.push(SomeScreen())   # 显示界面，等待它关闭
+    screen.close(result)                      # 界面关闭自己，结果返回给 push 的调用方
+
+没有正在运行的栈时，`Screen.show()` 会临时创建一个，
+因此各个界面仍然可以单独运行（各文件的测试入口）。
+"""
+
+import asyncio
+import time
+
+from prompt_toolkit.application import Application
+from prompt_toolkit.filters import Condition
+from prompt_toolkit.key_binding import KeyBindings, DynamicKeyBindings, merge_key_bindings
+from prompt_toolkit.layout import Layout
+from prompt_toolkit.layout.containers import ConditionalContainer, DynamicContainer, HSplit, Window
+from prompt_toolkit.layout.controls import FormattedTextControl
+from prompt_toolkit.styles import DynamicStyle, Style
+
+from core import profiling
+
+
+class Screen:
+    """界面基类
+
+    子类实现 `build()`，返回 (容器, 按键绑定)；按键处理中调用
+    `self.close(result)` 结束界面。`style_rules` 是该界面的样式表。
+    """
+
+    style_rules: dict = {}
+
+    def __init__(self):
+        self.stack = None
+        self._early_close = None
+
+    def build(self):
+        raise NotImplementedError
+
+    def focus_target(self):
+        """需要获得焦点的控件（例如输入框），默认不需要"""
+        return None
+
+    def close(self, result=None):
+        if self.stack is not None:
+            self.stack.pop(self, result)
+        else:
+            # 还没显示就被关闭（例如后台任务瞬间完成），显示时立即返回
+            self._early_close = (result,)
+
+    async def show(self):
+        """在当前界面栈上显示，返回 close() 传入的结果"""
+        return await ScreenStack.show(self)
+
+
+class SimpleScreen(Screen):
+    """由现成的容器和按键绑定组成的界面，适合函数式的小对话框"""
+
+    def __init__(self, container, key_bindings, style_rules: dict | None = None, focus=None):
+        super().__init__()
+        self.container = container
+        self.key_bindings = key_bindings
+        self.style_rules = style_rules or {}
+        self.focus = focus
+
+    def focus_target(self):
+        return self.focus
+
+    def build(self):
+        return self.container, self.key_bindings
+
+
+class _Entry:
+    __slots__ = ("screen", "container", "key_bindings", "style", "future")
+
+    def __init__(self, screen, container, key_bindings, style, future):
+        self.screen = screen
+        self.container = container
+        self.key_bindings = key_bindings
+        self.style = style
+        self.future = future
+
+
+class ScreenStack:
+    # 当前正在运行的界面栈（同一时间只有一个 Application 占用终端）
+    active = None
+
+    def __init__(self):
+        self._entries = []
+        self._empty = Window(height=0)
+        self._styles = {}
+
+        global_kb = KeyBindings()
+
+        @global_kb.add('c-c')
+        def _(event):
+            event.app.exit(exception=KeyboardInterrupt())
+
+        root = DynamicContainer(self._container)
+        profiler = profiling.active()
+        if profiler is not None:
+            root = self._profile_overlay(root, profiler, global_kb)
+
+        self.app = Application(
+            layout=Layout(root),
+            key_bindings=merge_key_bindings([global_kb, DynamicKeyBindings(self._key_bindings)]),
+            style=DynamicStyle(self._style),
+            full_screen=False,
+            mouse_support=False,
+        )
+        if profiler is not None:
+            self._profile_events(profiler)
+
+    # ---- 性能记录（core.profiling，打开时才安装） ----
+
+    @staticmethod
+    def _profile_overlay(root, profiler, kb):
+        """在所有界面下方加一行滚动的 p50/p99，F12 显示/隐藏"""
+        @kb.add('f12')
+        def _(event):
+            profiler.overlay = not profiler.overlay
+
+        overlay = Window(FormattedTextControl(lambda: [('reverse', profiler.overlay_text())]), height=1)
+        return HSplit([root, ConditionalContainer(overlay, filter=Condition(lambda: profiler.overlay))])
+
+    def _profile_events(self, profiler):
+        started = {}
+
+        def begin(name):
+            def handler(_sender):
+                started[name] = time.perf_counter()
+            return handler
+
+        def end(category, name):
+            def handler(_sender):
+                start = started.pop(name, None)
+                if start is not None:
+                    profiler.record(category, name, start, time.perf_counter())
+            return handler
+
+        processor = self.app.key_processor
+        processor.before_key_press += begin("keypress")
+        processor.after_key_press += end("key", "keypress")
+        self.app.before_render += begin("render")
+        self.app.after_render += end("render", "render")
+
+    # ---- 动态布局 ----
+
+    def _container(self):
+        return self._entries[-1].container if self._entries else self._empty
+
+    def _key_bindings(self):
+        return self._entries[-1].key_bindings if self._entries else None
+
+    def _style(self):
+        return self._entries[-1].style if self._entries else None
+
+    @property
+    def top(self):
+        return self._entries[-1].screen if self._entries else None
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _refresh(self):
+        if self._entries:
+            target = self._entries[-1].screen.focus_target()
+            if target is not None:
+                try:
+                    self.app.layout.focus(target)
+                except ValueError:
+                    pass
+        self.app.invalidate()
+
+    # ---- 压栈/出栈 ----
+
+    async def push(self, screen: Screen):
+        container, key_bindings = screen.build()
+        key = tuple(sorted(screen.style_rules.items()))
+        style = self._styles.get(key)
+        if style is None:
+            style = self._styles[key] = Style.from_dict(screen.style_rules)
+        future = asyncio.get_running_loop().create_future()
+        screen.stack = self
+        entry = _Entry(screen, container, key_bindings, style, future)
+        self._entries.append(entry)
+        if screen._early_close is not None:
+            (result,), screen._early_close = screen._early_close, None
+            self.pop(screen, result)
+        self._refresh()
+        try:
+            return await future
+        finally:
+            # 被取消时也要把界面移出栈
+            if entry in self._entries:
+                self._entries.remove(entry)
+                self._refresh()
+            screen.stack = None
+
+    def pop(self, screen: Screen, result=None):
+        for entry in reversed(self._entries):
+            if entry.screen is screen:
+                self._entries.remove(entry)
+                if not entry.future.done():
+                    entry.future.set_result(result)
+                self._refresh()
+                return
+
+    # ---- 运行 ----
+
+    async def run(self, coro):
+        """在这个栈的 Application 中运行 coro（通常是整个导航流程）"""
+        previous, ScreenStack.active = ScreenStack.active, self
+        started = asyncio.Event()
+        main_task = asyncio.ensure_future(coro)
+        app_task = asyncio.ensure_future(self.app.run_async(pre_run=started.set))
+        # Application 因 Ctrl-C 等原因退出时，结束导航流程
+        app_task.add_done_callback(lambda _t: main_task.done() or main_task.cancel())
+        try:
+            return await main_task
+        except asyncio.CancelledError:
+            if app_task.done() and not app_task.cancelled() and app_task.exception() is not None:
+                raise app_task.exception()
+            raise
+        finally:
+            ScreenStack.active = previous
+            if not app_task.done():
+                # 等 Application 真正启动后再退出，否则 exit() 无效
+                waiter = asyncio.ensure_future(started.wait())
+                await asyncio.wait([waiter, app_task], return_when=asyncio.FIRST_COMPLETED)
+                waiter.cancel()
+                if self.app.future is not None and not self.app.future.done():
+                    self.app.exit()
+            try:
+                await app_task
+            except (Exception, KeyboardInterrupt, asyncio.CancelledError):
+                pass
+
+    @classmethod
+    async def show(cls, screen: Screen):
+        stack = cls.active
+        if stack is None:
+            stack = cls()
+            return await stack.run(stack.push(screen))
+        return await stack.push(screen)
@@ -0,0 +1,9 @@
+"""可复用的界面组件"""
+
+from .frame import FrameControl
+from .virtual_list import VirtualList
+from .diff_view import DiffView
+from .progress_view import ProgressView
+from .text_prompt import TextPrompt, prompt_text
+
+__all__ = ["FrameControl", "VirtualList", "DiffView", "ProgressView", "TextPrompt", "prompt_text"]
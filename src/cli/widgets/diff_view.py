@@ -0,0 +1,152 @@
+import os
+
+from prompt_toolkit.key_binding import KeyBindings, merge_key_bindings
+from prompt_toolkit.styles.pygments import pygments_token_to_classname
+
+from .virtual_list import VirtualList
+
+# 每次对一个 hunk 中这么多行一起做语法分析（连续几行的上下文让多行字符串等更准确）
+HIGHLIGHT_BLOCK = 64
+
+_lexers = {}
+
+
+def lexer_for(path: str):
+    """按扩展名缓存的 pygments 词法分析器；没有安装 pygments 或不认识的文件返回 None"""
+    ext = os.path.splitext(path)[1] or os.path.basename(path)
+    if ext in _lexers:
+        return _lexers[ext]
+    try:
+        from pygments.lexers import get_lexer_for_filename
+        from pygments.util import ClassNotFound
+    except ImportError:
+        lexer = None
+    else:
+        try:
+            lexer = get_lexer_for_filename(path, stripnl=False, ensurenl=False)
+        except ClassNotFound:
+            lexer = None
+    _lexers[ext] = lexer
+    return lexer
+
+
+def highlight(row):
+    """row 所在代码行的 [(class, 文本), ...]（不含 +/- 前缀），不能高亮时返回 None
+
+    结果缓存在 hunk.highlighted 中，以 HIGHLIGHT_BLOCK 行为单位，只分析被显示到的块。
+    """
+    hunk = row.hunk
+    lexer = lexer_for(hunk.file.path)
+    if lexer is None:
+        return None
+    block, offset = divmod(row.line, HIGHLIGHT_BLOCK)
+    lines = hunk.highlighted.get(block)
+    if lines is None:
+        prefix = hunk.prefix
+        rows = hunk.rows[block * HIGHLIGHT_BLOCK:(block + 1) * HIGHLIGHT_BLOCK]
+        code = "\n".join(r.text[prefix:] for r in rows) + "\n"
+        lines = [[]]
+        for token, value in lexer.get_tokens(code):
+            style = "class:" + pygments_token_to_classname(token)
+            parts = value.split("\n")
+            for i, part in enumerate(parts):
+                if i:
+                    lines.append([])
+                if part:
+                    lines[-1].append((style, part))
+        hunk.highlighted[block] = lines
+    return lines[offset] if offset < len(lines) else None
+
+
+class DiffView:
+    """流式 diff 查看控件（数据源是 core.diff_stream.DiffDocument）
+
+    基于 VirtualList：只格式化视口内的行，只对这些行做语法高亮（见 highlight）。
+    折叠的大文件显示为一行占位，光标移到上面按回车展开；n/p 跳到下/上一个文件。
+    使用它的界面要把 STYLE 合并进自己的 style_rules。
+    """
+
+    STYLE = {
+        'diff.file': 'bold #ffaf00',
+        'diff.meta': '#888888',
+        'diff.hunk': '#5fd7ff',
+        'diff.add': 'bg:#103810',
+        'diff.del': 'bg:#401414',
+        'diff.large': 'italic #ffd75f',
+        'diff.cursor': 'reverse',
+        'pygments.keyword': '#d787ff',
+        'pygments.name.function': '#87afff',
+        'pygments.name.class': 'bold #87afff',
+        'pygments.name.builtin': '#5fd7d7',
+        'pygments.name.decorator': '#ffd75f',
+        'pygments.literal.string': '#d7af5f',
+        'pygments.literal.number': '#ff875f',
+        'pygments.comment': 'italic #808080',
+        'pygments.operator': '#d7d7d7',
+    }
+
+    def __init__(self, document, max_height: int = 30, title: str | None = None):
+        self.document = document
+        self.view = VirtualList(document, self.format_row, max_height=max_height, title=title,
+                                footer=self.footer)
+        self.key_bindings = merge_key_bindings([self.view.key_bindings, self._build_key_bindings()])
+        self.window = self.view.window
+
+    @staticmethod
+    def format_row(row, selected: bool) -> list:
+        kind = row.kind
+        if kind in ("add", "del", "ctx"):
+            base = f"class:diff.{kind}"
+            code = highlight(row)
+            if code is None:
+                fragments = [(base, row.text)]
+            else:
+                fragments = [(base, row.text[:row.hunk.prefix])]
+                fragments += [(f"{base} {style}", text) for style, text in code]
+        elif kind == "file":
+            fragments = [('class:diff.file', f"━━ {row.text}")]
+        else:
+            fragments = [(f"class:diff.{kind}", row.text)]
+        if selected:
+            fragments = [(f"{style} class:diff.cursor", text) for style, text in fragments if text]
+            return fragments or [('class:diff.cursor', " ")]
+        return fragments
+
+    def footer(self):
+        document = self.document
+        if document.exhausted and not len(document):
+            return " (没有差异)"
+        more = "" if document.exhausted else "+"
+        return f" {len(document)}{more} 行  (回车 展开大文件，n/p 下/上一个文件，q 返回)"
+
+    def refresh(self):
+        """文档有新内容时调用（在事件循环线程中）"""
+        self.view.invalidate_rows()
+
+    def _jump_file(self, step: int):
+        rows = self.document
+        i = self.view.index + step
+        while 0 <= i < len(rows):
+            if rows[i].kind == "file":
+                self.view.move_to(i)
+                return
+            i += step
+
+    def _build_key_bindings(self) -> KeyBindings:
+        kb = KeyBindings()
+
+        @kb.add('enter')
+        def _(event):
+            row = self.view.selected
+            if row is not None and row.kind == "large" and self.document.expand(row.file):
+                self.view.invalidate_rows()
+
+        @kb.add('n')
+        def _(event):
+            self._jump_file(1)
+
+        @kb.add('p')
+        def _(event):
+            self._jump_file(-1)
+
+        return kb
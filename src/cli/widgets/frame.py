@@ -0,0 +1,159 @@
+from prompt_toolkit.layout.controls import UIContent, UIControl
+
+from core.profiling import timed
+
+
+class FrameControl(UIControl):
+    """带边框和标题的菜单/表单框，各菜单界面共用
+
+        +----------------+
+        |      File      |
+        +----------------+
+        | ► New Repo     |
+        |   Exit         |
+        +----------------+
+
+    title、rows、selected 可以是值或无参函数（每次渲染时取值）。
+    rows 的每一项是一行文本，或 [(样式, 文本), ...] 片段列表（例如按钮行）。
+    marker 不为空时每行前加选中标记（"► " 或两个空格）；padding 是右侧额外留白。
+
+    边框、标题和各行的片段按 (title, rows, 宽度) 缓存：光标移动时只重新生成
+    选中状态变化的两行，其余行直接复用；某一行内容变化时只重做这一行（总宽度
+    随之变化时才整体重建）。宽度由 create_content 传入，终端尺寸变化时自动重建。
+    """
+
+    def __init__(self, title, rows, selected=None, selected_style: str = 'class:selected',
+                 marker: str | None = None, padding: int = 0, key_bindings=None, focusable: bool = False):
+        self.title = title
+        self.rows = rows
+        self.selected = selected
+        self.selected_style = selected_style
+        self.marker = marker
+        self.padding = padding
+        self.key_bindings = key_bindings
+        self.focusable = focusable
+        self._frame_key = None    # (title, 内部宽度)
+        self._rows = ()
+        self._plain = []          # 每行未选中时的片段
+        self._styled = {}         # 行号 -> 选中时的片段（按需生成）
+        self._lines = []          # 当前帧：边框、标题、各行、下边框
+        self._selected = None
+
+    # ---- 取值 ----
+
+    @staticmethod
+    def _value(value):
+        return value() if callable(value) else value
+
+    def _row_width(self, row) -> int:
+        width = len(row) if isinstance(row, str) else sum(len(text) for _style, text, *_ in row)
+        return width + (2 if self.marker is not None else 0)
+
+    def _inner_width(self, title: str, rows, width: int | None) -> int:
+        natural = max(len(title), *(self._row_width(row) for row in rows), 0) + self.padding
+        # 终端比框窄时截断，保证边框不折行
+        return natural if width is None else max(min(natural, width - 2), 0)
+
+    # ---- 生成片段 ----
+
+    def _border(self, inner: int) -> list:
+        return [('', f"+{'-' * inner}+")]
+
+    def _render_row(self, row, inner: int, selected: bool) -> list:
+        style = self.selected_style if selected else ''
+        if self.marker is not None:
+            prefix = f"{self.marker if selected else ' '} "
+        else:
+            prefix = ""
+        if isinstance(row, str):
+            # 整行（含两侧边框）一个片段，与选中样式一起整体替换
+            return [(style, f"|{f'{prefix}{row}'[:inner]:<{inner}}|")]
+        # 片段行：选中样式叠加在每个片段的样式之前
+        fragments = [('', "|")]
+        used = 0
+        if prefix:
+            fragments.append((style, prefix))
+            used = len(prefix)
+        for frag_style, text, *_ in row:
+            text = text[:max(inner - used, 0)]
+            used += len(text)
+            fragments.append((f"{style} {frag_style}".strip(), text))
+        fragments.append((style, " " * (inner - used)))
+        fragments.append(('', "|"))
+        return fragments
+
+    def _layout(self, title: str, rows: tuple, width: int | None):
+        inner = self._inner_width(title, rows, width)
+        frame_key = (title, inner)
+        if frame_key != self._frame_key:
+            # 总宽度或标题变化：整体重建
+            self._frame_key = frame_key
+            self._rows = ()
+            self._plain = []
+            self._styled = {}
+            border = self._border(inner)
+            self._lines = [border, [('', f"|{title[:inner]:^{inner}}|")], border, border]
+            self._selected = None
+        old_rows = self._rows
+        if rows != old_rows:
+            plain = self._plain[:len(rows)]
+            for i, row in enumerate(rows):
+                if i < len(old_rows) and old_rows[i] == row:
+                    continue
+                fragments = self._render_row(row, inner, False)
+                if i < len(plain):
+                    plain[i] = fragments
+                else:
+                    plain.append(fragments)
+                self._styled.pop(i, None)
+            for i in range(len(rows), len(old_rows)):
+                self._styled.pop(i, None)
+            border = self._lines[0]
+            self._lines = [*self._lines[:3], *plain, border]
+            self._rows = rows
+            self._plain = plain
+            self._selected = None
+
+    def _select(self, selected):
+        """只替换选中状态变化的行"""
+        previous = self._selected
+        if selected == previous:
+            return
+        if previous is not None and previous < len(self._plain):
+            self._lines[3 + previous] = self._plain[previous]
+        if selected is not None and 0 <= selected < len(self._rows):
+            styled = self._styled.get(selected)
+            if styled is None:
+                styled = self._render_row(self._rows[selected], self._frame_key[1], True)
+                self._styled[selected] = styled
+            self._lines[3 + selected] = styled
+        else:
+            selected = None
+        self._selected = selected
+
+    def lines(self, width: int | None = None) -> list:
+        """当前帧的各行片段（同一行未变化时返回同一个列表对象）"""
+        title = str(self._value(self.title))
+        rows = tuple(row if isinstance(row, str) else tuple(row) for row in self._value(self.rows))
+        self._layout(title, rows, width)
+        self._select(self._value(self.selected))
+        return self._lines
+
+    # ---- UIControl ----
+
+    def preferred_width(self, max_available_width: int) -> int:
+        return len(self.lines(max_available_width)[0][0][1])
+
+    def preferred_height(self, width, max_available_height, wrap_lines, get_line_prefix):
+        return len(self._value(self.rows)) + 4
+
+    @timed("fragments", "FrameControl")
+    def create_content(self, width: int, height: int) -> UIContent:
+        lines = self.lines(width)
+        return UIContent(get_line=lines.__getitem__, line_count=len(lines), show_cursor=False)
+
+    def is_focusable(self) -> bool:
+        return self.focusable
+
+    def get_key_bindings(self):
+        return self.key_bindings
@@ -0,0 +1,107 @@
+import asyncio
+import collections
+
+from prompt_toolkit.application.current import get_app_or_none
+from prompt_toolkit.key_binding import KeyBindings
+from prompt_toolkit.layout.containers import Window
+from prompt_toolkit.layout.controls import FormattedTextControl
+
+from screen_stack import Screen
+
+
+class ProgressView(Screen):
+    """在界面中运行一个耗时任务并实时显示进度
+
+    +------------------------------------------+
+    | Cloning into 'repo'...                   |
+    | Receiving objects:  45% (450/1000)       |
+    | (Esc 取消)                                |
+    +------------------------------------------+
+
+    任务是一个协程，通过 `write(line)` 追加进度行；以 `\\r` 原地刷新的
+    git 进度行（同一前缀）会覆盖上一行而不是不断追加。
+    任务在事件循环中运行，按键处理不会被阻塞；Esc / Ctrl-C 取消任务。
+    wait=True 时任务结束后停留在结果界面，按回车返回。
+    """
+
+    style_rules = {'title': 'bold', 'hint': '#888888'}
+
+    def __init__(self, title: str, max_lines: int = 8, wait: bool = False):
+        super().__init__()
+        self.title = title
+        self.lines = collections.deque(maxlen=max_lines)
+        self.max_lines = max_lines
+        self.wait = wait
+        self.status = "running"
+        self._task = None
+
+    def write(self, line: str):
+        line = line.rstrip()
+        if not line:
+            return
+        # "Receiving objects:  45% ..." 这样的进度行按冒号前的前缀原地更新
+        prefix = line.split(":", 1)[0] if ":" in line else None
+        if prefix and self.lines and self.lines[-1].split(":", 1)[0] == prefix:
+            self.lines[-1] = line
+        else:
+            self.lines.append(line)
+        app = get_app_or_none()
+        if app is not None:
+            app.invalidate()
+
+    def _get_text(self):
+        fragments = [('class:title', f"{self.title}\n")]
+        for line in self.lines:
+            fragments.append(('', f"  {line}\n"))
+        if self.status == "running":
+            hint = "(Esc 取消)"
+        else:
+            hint = f"[{self.status}] (回车继续)" if self.wait else f"[{self.status}]"
+        fragments.append(('class:hint', hint))
+        return fragments
+
+    def build(self):
+        kb = KeyBindings()
+
+        @kb.add('escape')
+        @kb.add('c-c', eager=True)
+        def _(event):
+            if self._task is not None and not self._task.done():
+                self._task.cancel()
+            else:
+                self.close()
+
+        @kb.add('enter')
+        def _(event):
+            if self._task is not None and self._task.done():
+                self.close()
+
+        control = FormattedTextControl(self._get_text)
+        # 窗口高度 = 标题 + 进度行 + 提示行
+        return Window(content=control, height=self.max_lines + 2), kb
+
+    async def run(self, coro):
+        """运行协程并返回其结果；取消时抛出 asyncio.CancelledError"""
+        self._task = asyncio.ensure_future(coro)
+
+        def on_done(task):
+            self.status = "cancelled" if task.cancelled() else ("failed" if task.exception() else "done")
+            if not self.wait:
+                self.close()
+            else:
+                app = get_app_or_none()
+                if app is not None:
+                    app.invalidate()
+
+        self._task.add_done_callback(on_done)
+        shown = asyncio.ensure_future(self.show())
+        try:
+            await asyncio.wait([self._task, shown], return_when=asyncio.FIRST_COMPLETED)
+            if not self._task.done():
+                # 界面被意外关闭（例如整个应用退出），任务一并取消
+                self._task.cancel()
+            await shown
+        finally:
+            if not self._task.done():
+                self._task.cancel()
+        return await self._task
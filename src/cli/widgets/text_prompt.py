@@ -0,0 +1,58 @@
+from prompt_toolkit.buffer import Buffer
+from prompt_toolkit.key_binding import KeyBindings
+from prompt_toolkit.layout.containers import HSplit, VSplit, Window
+from prompt_toolkit.layout.controls import BufferControl, FormattedTextControl
+
+from screen_stack import Screen
+
+
+class TextPrompt(Screen):
+    """单行文本输入界面（替代 input()/prompt()，在界面栈中运行）
+
+    validate(text) 返回错误信息字符串时显示在输入框下方并要求重新输入，
+    返回 None 表示通过。回车确认，Esc 取消（结果为 None）。
+    """
+
+    style_rules = {'error': '#ff5f5f', 'label': 'bold'}
+
+    def __init__(self, label: str, validate=None, default: str = ''):
+        super().__init__()
+        self.label = label
+        self.validate = validate
+        self.error = ''
+        self.buffer = Buffer(multiline=False)
+        self.buffer.text = default
+        self._control = BufferControl(buffer=self.buffer)
+
+    def focus_target(self):
+        return self._control
+
+    def build(self):
+        kb = KeyBindings()
+
+        @kb.add('enter')
+        def _(event):
+            text = self.buffer.text
+            error = self.validate(text) if self.validate else None
+            if error:
+                self.error = error
+                event.app.invalidate()
+            else:
+                self.close(text)
+
+        @kb.add('escape')
+        def _(event):
+            self.close(None)
+
+        container = HSplit([
+            VSplit([
+                Window(FormattedTextControl([('class:label', self.label)]), dont_extend_width=True),
+                Window(self._control, height=1),
+            ]),
+            Window(FormattedTextControl(lambda: [('class:error', self.error)]), height=1),
+        ])
+        return container, kb
+
+
+async def prompt_text(label: str, validate=None, default: str = ''):
+    return await TextPrompt(label, validate, default).show()
@@ -0,0 +1,298 @@
+import threading
+
+from prompt_toolkit.application.current import get_app
+from prompt_toolkit.filters import Condition
+from prompt_toolkit.key_binding import KeyBindings
+from prompt_toolkit.layout.containers import Window
+from prompt_toolkit.layout.controls import FormattedTextControl
+
+from core.profiling import timed
+
+
+def default_format_row(item, selected: bool) -> list:
+    """默认行格式：选中行带箭头并使用 class:selected 样式"""
+    return [('class:selected' if selected else '', f"{'►' if selected else ' '} {item}")]
+
+
+class VirtualList:
+    """视口虚拟化的列表控件
+
+    只格式化终端视口内可见的行，格式化结果按 (行号, 是否选中) 缓存，
+    因此每次按键的开销只与视口高度有关，与列表长度无关。
+
+    source 只需支持 len() 和下标访问；如果还提供 ensure(count)
+    （例如 CommitGraph），会在滚动到末尾时按需加载更多行。
+
+    按键：上/下、PageUp/PageDown、Home/End。回车等确认键由调用方绑定。
+    wrap=True 时上/下在首尾循环（仅适用于长度已知的数据源）。
+
+    search 打开输入过滤（模糊匹配，见 core.fuzzy），search_key 把数据项转成匹配文本：
+        "type"   直接输入即过滤（适合本身没有字母快捷键的选择列表）
+        "slash"  按 / 开始输入，回车确认、Esc 取消（适合 q、r 等字母已有用途的界面；
+                 这些界面的按键绑定应加上 filter=~view.searching）
+    过滤后 selected 返回原始数据项，source_index 返回它在原数据源中的下标。
+
+    on_select(view) 在选中项变化后的下一次渲染时调用（连续按键只对最终显示的
+    选中项调用一次），适合触发预取等后台工作。
+    """
+
+    # 缓存行数超过视口高度的这个倍数时整体清空
+    CACHE_PAGES = 8
+    # 超过这么多项的静态列表在后台线程中预先建立搜索索引
+    PREBUILD_THRESHOLD = 16384
+
+    def __init__(self, source, format_row=default_format_row, max_height: int = 20,
+                 title: str | None = None, footer=None, wrap: bool = False,
+                 search: str | None = None, search_key=str, on_select=None):
+        self.source = source
+        self.base_source = source
+        self.wrap = wrap
+        self.search = search
+        self.search_key = search_key
+        self.query = ""
+        self._searching = search == "type"
+        self._fuzzy = None
+        # 正在输入查询 / 正在输入或已有过滤条件（调用方的按键绑定据此避让）
+        self.searching = Condition(lambda: self._searching)
+        self.filtering = Condition(lambda: self._searching or bool(self.query))
+        self.format_row = format_row
+        self.max_height = max_height
+        self.title = title
+        self.footer = footer
+        self.index = 0
+        self.top = 0
+        self._cache = {}
+        self.on_select = on_select
+        self._notified = None
+        self._index_thread = None
+        if search is not None:
+            self._make_index(source)
+
+        self.key_bindings = self._build_key_bindings()
+        self.control = FormattedTextControl(self._get_fragments, focusable=True,
+                                            key_bindings=self.key_bindings)
+        self.window = Window(content=self.control, height=self._window_height)
+
+    # ---- 数据 ----
+
+    def _ensure(self, count: int) -> int:
+        ensure = getattr(self.source, 'ensure', None)
+        if ensure is not None:
+            return ensure(count)
+        return len(self.source)
+
+    def set_source(self, source):
+        """替换数据源，清空缓存和过滤条件并回到第一行"""
+        self.base_source = source
+        self.query = ""
+        if self.search is not None:
+            self._make_index(source)
+        self._show(source)
+
+    def _make_index(self, source):
+        from core.fuzzy import FuzzyIndex
+
+        self._fuzzy = FuzzyIndex(source, self.search_key)
+        # 长度已知的大列表：在后台计算全部小写键，第一次按键不必等待；
+        # 增长型数据源（带 ensure）不是线程安全的，按需计算
+        if getattr(source, 'ensure', None) is None and len(source) > self.PREBUILD_THRESHOLD:
+            self._index_thread = threading.Thread(target=self._fuzzy.build, name="fuzzy-index", daemon=True)
+            self._index_thread.start()
+
+    def _show(self, source):
+        self.source = source
+        self.index = 0
+        self.top = 0
+        self._cache.clear()
+
+    def redraw_rows(self):
+        """数据不变、只是行的显示内容变化时调用（例如后台算好了附加信息）"""
+        self._cache.clear()
+
+    def invalidate_rows(self):
+        """数据源内容原地变化时调用"""
+        self._cache.clear()
+        if self._fuzzy is not None:
+            # 下标可能已经变化，重建过滤结果
+            self._fuzzy.clear()
+            if self.query:
+                selected = self.index
+                self.source = self._fuzzy.search(self.query)
+                self.index = min(selected, max(self._ensure(selected + 1) - 1, 0))
+
+    def set_query(self, query: str):
+        """按查询过滤（空查询显示全部）"""
+        self.query = query
+        if not query:
+            self._show(self.base_source)
+            return
+        self._show(self._fuzzy.search(query))
+
+    @property
+    def selected(self):
+        return self.source[self.index] if self._ensure(self.index + 1) > self.index else None
+
+    @property
+    def source_index(self):
+        """选中项在原数据源中的下标"""
+        if self._ensure(self.index + 1) <= self.index:
+            return None
+        mapping = getattr(self.source, 'source_index', None)
+        return mapping(self.index) if mapping is not None else self.index
+
+    # ---- 布局 ----
+
+    def _chrome_lines(self) -> int:
+        return (1 if self._title_line() is not None else 0) + (1 if self.footer is not None else 0)
+
+    def _title_line(self):
+        if not (self._searching or self.query):
+            return self.title
+        marker = '/' if self.search == "slash" else '›'
+        return f"{self.title or ''}  {marker} {self.query}{'▏' if self._searching else ''}"
+
+    def page_size(self) -> int:
+        """视口内可显示的行数，不超过终端高度"""
+        rows = self.max_height
+        try:
+            rows = min(rows, get_app().output.get_size().rows - self._chrome_lines() - 1)
+        except Exception:
+            pass
+        return max(rows, 1)
+
+    def _window_height(self) -> int:
+        visible = min(self.page_size(), max(self._ensure(self.page_size()), 1))
+        return visible + self._chrome_lines()
+
+    # ---- 导航 ----
+
+    def move_to(self, index: int):
+        available = self._ensure(index + 1)
+        if available == 0:
+            return
+        self.index = max(0, min(index, available - 1))
+        page = self.page_size()
+        if self.index < self.top:
+            self.top = self.index
+        elif self.index >= self.top + page:
+            self.top = self.index - page + 1
+
+    def move_to_end(self):
+        load_all = getattr(self.source, 'load_all', None)
+        if load_all is not None:
+            load_all()
+        self.move_to(len(self.source) - 1)
+
+    def _build_key_bindings(self) -> KeyBindings:
+        kb = KeyBindings()
+
+        @kb.add('up')
+        def _(event):
+            if self.wrap and self.index == 0:
+                self.move_to_end()
+            else:
+                self.move_to(self.index - 1)
+            event.app.invalidate()
+
+        @kb.add('down')
+        def _(event):
+            if self.wrap and self.index == len(self.source) - 1:
+                self.move_to(0)
+            else:
+                self.move_to(self.index + 1)
+            event.app.invalidate()
+
+        @kb.add('pageup')
+        def _(event):
+            self.move_to(self.index - self.page_size())
+            event.app.invalidate()
+
+        @kb.add('pagedown')
+        def _(event):
+            self.move_to(self.index + self.page_size())
+            event.app.invalidate()
+
+        @kb.add('home')
+        def _(event):
+            self.move_to(0)
+            event.app.invalidate()
+
+        @kb.add('end')
+        def _(event):
+            self.move_to_end()
+            event.app.invalidate()
+
+        if self.search is not None:
+            self._add_search_bindings(kb)
+        return kb
+
+    def _add_search_bindings(self, kb: KeyBindings):
+        searching = self.searching
+        slash = self.search == "slash"
+        # type 模式下 Esc 只在有查询时用来清空，否则留给调用方（例如关闭界面）
+        clear_filter = self.filtering if slash else Condition(lambda: bool(self.query))
+
+        if slash:
+            @kb.add('/', filter=~searching)
+            def _(event):
+                self._searching = True
+                event.app.invalidate()
+
+            @kb.add('enter', filter=searching)
+            def _(event):
+                self._searching = False
+                event.app.invalidate()
+
+        @kb.add('<any>', filter=searching)
+        def _(event):
+            char = event.data
+            if len(char) == 1 and char.isprintable():
+                self.set_query(self.query + char)
+                event.app.invalidate()
+
+        @kb.add('backspace', filter=searching)
+        def _(event):
+            if self.query:
+                self.set_query(self.query[:-1])
+            elif slash:
+                self._searching = False
+            event.app.invalidate()
+
+        @kb.add('escape', filter=clear_filter, eager=True)
+        def _(event):
+            self.set_query("")
+            if slash:
+                self._searching = False
+            event.app.invalidate()
+
+    # ---- 渲染 ----
+
+    def _row_fragments(self, index: int, selected: bool) -> list:
+        key = (index, selected)
+        fragments = self._cache.get(key)
+        if fragments is None:
+            fragments = self.format_row(self.source[index], selected) + [('', '\n')]
+            if len(self._cache) > self.CACHE_PAGES * self.page_size():
+                self._cache.clear()
+            self._cache[key] = fragments
+        return fragments
+
+    @timed("fragments", "VirtualList")
+    def _get_fragments(self) -> list:
+        page = self.page_size()
+        end = min(self.top + page, self._ensure(self.top + page))
+        fragments = []
+        title = self._title_line()
+        if title is not None:
+            fragments.append(('', title + '\n'))
+        for i in range(self.top, end):
+            fragments.extend(self._row_fragments(i, i == self.index))
+        if self.footer is not None:
+            fragments.append(('', self.footer() if callable(self.footer) else self.footer))
+        if self.on_select is not None:
+            # 按数据源对象本身比较（过滤条件变化时换成另一个结果对象）
+            notified = (id(self.source), self.index)
+            if notified != self._notified:
+                self._notified = notified
+                self.on_select(self)
+        return fragments
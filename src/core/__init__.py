@@ -0,0 +1,31 @@
+"""核心层：与界面无关的 git 数据处理。
+
+导出的名字按需导入（PEP 562），导入 `core.git_version`、`core.paths` 这类轻量
+子模块时不会连带加载提交图、git 后端等重模块，以免拖慢启动。
+"""
+
+import importlib
+
+_EXPORTS = {
+    "CommitGraph": ".commit_graph",
+    "LaneLayout": ".commit_graph",
+    "LogEntry": ".commit_graph",
+    "iter_commits": ".commit_graph",
+    "CommitStore": ".commit_store",
+    "CommitRow": ".commit_store",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,344 @@
+"""流式 blame：读取 `git blame --incremental --porcelain`，各行的来源随 git 的输出逐块填入
+
+    doc = BlameDocument.open(backend, "src/main.py", "HEAD", on_update=refresh)
+    len(doc), doc[i]                  # 文件的每一行（BlameLine），来源未知时 entry 为 None
+    doc.wait_for(0.05)                # 最多等一会儿（第一屏）
+    parent = doc.open_parent(i)       # 第 i 行所在提交的父版本（复用已知的行映射）
+    doc.close()
+
+文件内容直接从 blob 读出（object 缓存），行数一开始就确定，界面可以立即显示
+全部行；git 按它找到来源的顺序（不是行号顺序）输出结果，每到一块就通知界面。
+
+完整的结果以 (路径, 提交 SHA) 为键放进共享缓存 "blame"，再次打开同一个版本
+不再运行 git。
+
+跳到父版本 P 时不从头 blame：用 `git diff -U0 P:旧路径 R:路径` 把 P 的行映射到
+当前版本 R 的行，没有改动、并且来源提交是 P 的祖先的行沿用原来的结果，只对
+其余的行用 -L 范围运行 blame。来源提交是不是 P 的祖先由
+`git rev-list R ^P -- 路径` 判断（这个范围之外的提交都是 P 的祖先）。
+"""
+
+import array
+import re
+import subprocess
+import sys
+import threading
+import time
+from typing import NamedTuple, Optional
+
+from .object_cache import cache as shared_cache
+
+# 至少间隔这么久通知一次界面（git 一次输出很多小块时合并刷新）
+UPDATE_INTERVAL = 0.03
+# 需要重新 blame 的范围超过这么多段时改为整个文件重新 blame（先显示沿用的结果）
+MAX_RANGES = 64
+TAB_SIZE = 4
+# 缓存计量：每行的引用和原始行号，每个来源条目的大致开销
+_LINE_BYTES = 12
+_ENTRY_BYTES = 400
+
+_HUNK = re.compile(rb"^@@ -(\d+)(?:,(\d+))? \+(\d+)(?:,(\d+))? @@")
+
+
+class BlameCommit:
+    __slots__ = ("sha", "author", "author_time", "summary", "boundary")
+
+    def __init__(self, sha: str):
+        self.sha = sha
+        self.author = ""
+        self.author_time = 0
+        self.summary = ""
+        self.boundary = False
+
+
+class BlameEntry(NamedTuple):
+    """一组行的来源：提交、提交中的文件名，以及该提交的父版本（根提交为 None）"""
+    commit: BlameCommit
+    filename: str
+    previous: Optional[tuple]       # (父提交 SHA, 父版本中的文件名)
+
+
+class BlameLine(NamedTuple):
+    index: int                      # 从 0 开始的行号
+    text: str
+    entry: Optional[BlameEntry]     # 还没有结果时为 None
+    orig_line: int                  # 在来源提交中的行号（从 1 开始）
+
+
+class BlameResult:
+    """缓存的完整结果（不含文件内容，内容在 object 缓存中）"""
+
+    __slots__ = ("entries", "orig_lines")
+
+    def __init__(self, entries: list, orig_lines: array.array):
+        self.entries = entries
+        self.orig_lines = orig_lines
+
+    @property
+    def nbytes(self) -> int:
+        return len(self.entries) * _LINE_BYTES + len({id(e) for e in self.entries}) * _ENTRY_BYTES
+
+
+def _decode_lines(data: bytes) -> list:
+    text = data.decode("utf-8", "replace")
+    lines = text.split("\n")
+    if lines and lines[-1] == "":
+        lines.pop()
+    return [line.rstrip("\r").expandtabs(TAB_SIZE) for line in lines]
+
+
+def line_mapping(diff: bytes, old_count: int) -> array.array:
+    """由 `git diff -U0 旧 新` 的输出得到旧版本每一行在新版本中的行号（0 起），改动的行为 -1"""
+    mapping = array.array("i", [-1]) * old_count
+    old_next = new_next = 0         # 下一段未改动的行的起点（0 起）
+    for raw in diff.splitlines():
+        match = _HUNK.match(raw)
+        if match is None:
+            continue
+        old_start, old_len, new_start, new_len = (
+            int(value) if value is not None else 1 for value in match.groups())
+        # -U0 中长度为 0 的一侧，起点是它之前的那一行
+        old_begin = old_start - 1 if old_len else old_start
+        new_begin = new_start - 1 if new_len else new_start
+        for i in range(old_next, old_begin):
+            mapping[i] = new_next + (i - old_next)
+        old_next = old_begin + old_len
+        new_next = new_begin + new_len
+    for i in range(old_next, old_count):
+        mapping[i] = new_next + (i - old_next)
+    return mapping
+
+
+def _ranges(missing: list) -> list:
+    """[行号, ...]（0 起，有序） -> [(起, 止), ...]（1 起，闭区间）"""
+    ranges = []
+    for i in missing:
+        if ranges and ranges[-1][1] == i:
+            ranges[-1][1] = i + 1
+        else:
+            ranges.append([i + 1, i + 1])
+    return [tuple(r) for r in ranges]
+
+
+class BlameDocument:
+    def __init__(self, backend, path: str, commit: str, lines: list, on_update=None):
+        self.backend = backend
+        self.path = path
+        self.commit = commit
+        self.lines = lines
+        self.blob = None
+        self.on_update = on_update
+        self.entries = [None] * len(lines)
+        self.orig_lines = array.array("I", bytes(4 * len(lines)))
+        self.filled = 0
+        self.reused = 0
+        self.cached = False
+        self.error = None
+        self.elapsed = None
+        self.proc = None
+        self._commits = {}
+        self._interned = {}
+        self._cond = threading.Condition()
+        self._done = False
+        self._closed = False
+        self._last_update = 0.0
+        self._thread = None
+
+    # ---- 打开 ----
+
+    @classmethod
+    def open(cls, backend, path: str, rev: str = "HEAD", on_update=None, seed: "BlameDocument | None" = None):
+        """打开 rev 版本的 path（阻塞：解析版本、读取文件内容，在线程中调用）
+
+        seed 是 rev 的某个后代版本已经完成的 blame，用来沿用没有改动的行。
+        文件不存在时抛出 GitError / FileNotFoundError。
+        """
+        commit = backend.run(["rev-parse", "--verify", f"{rev}^{{commit}}"]).strip()
+        info = backend.info(f"{commit}:{path}")
+        if info is None or info.type != "blob":
+            raise FileNotFoundError(f"{path} 在 {commit[:12]} 中不存在")
+        blob = backend.read(info.sha)
+        doc = cls(backend, path, commit, _decode_lines(blob.data), on_update)
+        doc.blob = info.sha
+        doc._start(seed)
+        return doc
+
+    def _start(self, seed):
+        begin = time.perf_counter()
+        cached = shared_cache("blame").get((self.path, self.commit))
+        if cached is not None and len(cached.entries) == len(self.lines):
+            self.entries = list(cached.entries)
+            self.orig_lines = array.array("I", cached.orig_lines)
+            self.filled = len(self.lines)
+            self.cached = True
+            self._finish(begin, store=False)
+            return
+        args = None
+        if seed is not None and seed.complete:
+            args = self._reuse(seed)
+        if args is None:
+            args = []
+        if self.filled == len(self.lines):
+            self._finish(begin)
+            return
+        cmd = ["-c", "core.quotePath=false", "blame", "--incremental", "--porcelain", *args,
+               self.commit, "--", self.path]
+        self.proc = self.backend.popen(cmd, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE,
+                                       stderr=subprocess.PIPE)
+        self._thread = threading.Thread(target=self._read, args=(begin,), name="blame-reader", daemon=True)
+        self._thread.start()
+
+    def _reuse(self, seed: "BlameDocument") -> Optional[list]:
+        """从后代版本 seed 沿用结果，返回其余的行对应的 -L 参数"""
+        diff = self.backend.popen(["diff", "--no-color", "--no-ext-diff", "-U0", self.blob, seed.blob],
+                                  stdin=subprocess.DEVNULL, stdout=subprocess.PIPE,
+                                  stderr=subprocess.DEVNULL).communicate()[0]
+        mapping = line_mapping(diff, len(self.lines))
+        filenames = sorted({entry.filename for entry in seed.entries})
+        newer = set(self.backend.run(["rev-list", "--full-history", seed.commit, f"^{self.commit}",
+                                      "--", *filenames]).split())
+        missing = []
+        for i, j in enumerate(mapping):
+            entry = seed.entries[j] if j >= 0 else None
+            if entry is None or entry.commit.sha in newer:
+                missing.append(i)
+                continue
+            self.entries[i] = self._intern_entry(entry)
+            self.orig_lines[i] = seed.orig_lines[j]
+        self.filled = self.reused = len(self.lines) - len(missing)
+        ranges = _ranges(missing)
+        if len(ranges) > MAX_RANGES:
+            return []
+        return [arg for start, end in ranges for arg in ("-L", f"{start},{end}")]
+
+    def _intern_entry(self, entry: BlameEntry) -> BlameEntry:
+        commit = self._commits.setdefault(entry.commit.sha, entry.commit)
+        key = (commit.sha, entry.filename, entry.previous)
+        return self._interned.setdefault(key, BlameEntry(commit, entry.filename, entry.previous))
+
+    # ---- 读取线程 ----
+
+    def _read(self, begin: float):
+        pending = None      # (提交, 原始行号, 最终行号, 行数)
+        fields = {}
+        try:
+            for raw in self.proc.stdout:
+                if self._closed:
+                    return
+                line = raw.decode("utf-8", "replace").rstrip("\n")
+                if pending is None:
+                    sha, orig, final, count = line.split(" ")
+                    commit = self._commits.get(sha)
+                    if commit is None:
+                        commit = self._commits[sha] = BlameCommit(sha)
+                    pending = (commit, int(orig), int(final), int(count))
+                    fields = {}
+                    continue
+                key, _, value = line.partition(" ")
+                if key != "filename":
+                    fields[key] = value
+                    continue
+                self._apply(pending, value, fields)
+                pending = None
+            stderr = self.proc.stderr.read().decode("utf-8", "replace").strip()
+            if self.proc.wait() != 0 and not self._closed:
+                self.error = stderr or f"git blame 退出码 {self.proc.returncode}"
+        except (OSError, ValueError) as e:
+            if not self._closed:
+                self.error = str(e)
+        finally:
+            self._finish(begin, store=self.error is None and not self._closed)
+
+    def _apply(self, pending, filename: str, fields: dict):
+        commit, orig, final, count = pending
+        if "author" in fields:
+            commit.author = fields["author"]
+            commit.author_time = int(fields.get("author-time", 0))
+            commit.summary = fields.get("summary", "")
+        if "boundary" in fields:
+            commit.boundary = True
+        previous = None
+        if "previous" in fields:
+            sha, _, name = fields["previous"].partition(" ")
+            previous = (sha, name)
+        key = (commit.sha, filename, previous)
+        entry = self._interned.get(key)
+        if entry is None:
+            entry = self._interned[key] = BlameEntry(commit, filename, previous)
+        with self._cond:
+            for i in range(count):
+                line = final - 1 + i
+                if self.entries[line] is None:
+                    self.filled += 1
+                self.entries[line] = entry
+                self.orig_lines[line] = orig + i
+            self._cond.notify_all()
+        now = time.perf_counter()
+        if self.on_update is not None and now - self._last_update >= UPDATE_INTERVAL:
+            self._last_update = now
+            self.on_update()
+
+    def _finish(self, begin: float, store: bool = True):
+        if store:
+            result = BlameResult(list(self.entries), array.array("I", self.orig_lines))
+            shared_cache("blame").put((self.path, self.commit), result)
+        with self._cond:
+            self.elapsed = time.perf_counter() - begin
+            self._done = True
+            self._cond.notify_all()
+        if self.on_update is not None and not self._closed:
+            self.on_update()
+
+    # ---- 界面接口（VirtualList 数据源） ----
+
+    def __len__(self):
+        return len(self.lines)
+
+    def __getitem__(self, i) -> BlameLine:
+        return BlameLine(i, self.lines[i], self.entries[i], self.orig_lines[i])
+
+    @property
+    def done(self) -> bool:
+        return self._done
+
+    @property
+    def complete(self) -> bool:
+        """所有行都有结果（可以缓存，也可以作为父版本的 seed）"""
+        return self._done and self.error is None and self.filled == len(self.lines)
+
+    def wait_for(self, timeout: float) -> bool:
+        """最多等待 timeout 秒直到结束，返回是否已经结束"""
+        with self._cond:
+            return self._cond.wait_for(lambda: self._done, timeout)
+
+    def open_parent(self, index: int, on_update=None) -> Optional["BlameDocument"]:
+        """第 index 行来源提交的父版本（阻塞，在线程中调用）；没有父版本或该行还没有结果时返回 None"""
+        entry = self.entries[index]
+        if entry is None or entry.previous is None:
+            return None
+        sha, filename = entry.previous
+        return BlameDocument.open(self.backend, filename, sha, on_update,
+                                  seed=self if self.complete else None)
+
+    def close(self):
+        self._closed = True
+        if self.proc is not None and self.proc.poll() is None:
+            self.proc.kill()
+            self.proc.wait()
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+        if self.proc is not None:
+            self.proc.stdout.close()
+            self.proc.stderr.close()
+
+
+# 测试入口
+if __name__ == "__main__":
+    from .git_backend import GitBackend
+
+    doc = BlameDocument.open(GitBackend("."), sys.argv[1], sys.argv[2] if len(sys.argv) > 2 else "HEAD")
+    doc.wait_for(None)
+    print(f"{len(doc)} 行，{doc.elapsed * 1000:.0f} ms，{doc.error or ''}")
+    for line in list(doc)[:20]:
+        entry = line.entry
+        print(f"{entry.commit.sha[:8] if entry else '--------'} {line.index + 1:>5} {line.text}")
@@ -0,0 +1,162 @@
+"""git clone：进度解析、部分/浅克隆选项和可取消的异步克隆
+
+`git clone --progress` 把进度写到 stderr，每个阶段一行，并用 \\r 原地刷新：
+
+    remote: Enumerating objects: 1200, done.
+    remote: Counting objects: 100% (1200/1200), done.
+    Receiving objects:  45% (540/1200), 1.20 MiB | 2.00 MiB/s
+    Resolving deltas: 100% (300/300), done.
+
+`parse_progress` 把这样的行解析成 CloneProgress，界面据此显示对象数、
+已接收字节数和速度。克隆以 asyncio 子进程运行（GitBackend.stream_async），
+任务被取消时结束 git 并删除克隆了一半的目录。
+"""
+
+import os
+import re
+import shutil
+from typing import NamedTuple, Optional
+
+from .git_backend import GitBackend
+
+
+class CloneOptions(NamedTuple):
+    depth: Optional[int] = None        # --depth N：浅克隆，只取最近 N 个提交
+    blob_filter: bool = False          # --filter=blob:none：部分克隆，文件内容按需下载
+    single_branch: bool = False        # --single-branch：只取一个分支
+    branch: Optional[str] = None       # --branch：指定分支（配合 single_branch）
+
+
+class CloneProgress(NamedTuple):
+    phase: str                  # "Receiving objects"、"Resolving deltas" ...
+    current: int
+    total: Optional[int]        # 只有计数没有百分比的阶段为 None
+    percent: Optional[int]
+    transferred: Optional[int]  # 已接收字节数
+    rate: Optional[int]         # 每秒字节数
+    done: bool
+    remote: bool                # 服务端（remote:）的阶段
+
+    def format(self) -> str:
+        text = f"{self.phase}: "
+        if self.percent is not None:
+            text += f"{self.percent:3d}% ({self.current}/{self.total})"
+        else:
+            text += str(self.current)
+        if self.transferred is not None:
+            text += f", {format_size(self.transferred)}"
+        if self.rate is not None:
+            text += f" | {format_size(self.rate)}/s"
+        if self.done:
+            text += ", done"
+        return text
+
+
+_PROGRESS = re.compile(
+    r"^(?P<remote>remote:\s*)?(?P<phase>[A-Za-z][A-Za-z ]*?):\s+"
+    r"(?:(?P<percent>\d+)%\s+\((?P<current>\d+)/(?P<total>\d+)\)|(?P<count>\d+))"
+    r"(?:,\s*(?P<size>[\d.]+\s*[KMGT]?i?B)(?:\s*\|\s*(?P<rate>[\d.]+\s*[KMGT]?i?B)/s)?)?"
+    r"(?P<done>,\s*done)?"
+)
+
+_UNITS = {"B": 1, "KiB": 1 << 10, "MiB": 1 << 20, "GiB": 1 << 30, "TiB": 1 << 40,
+          "KB": 10 ** 3, "MB": 10 ** 6, "GB": 10 ** 9, "TB": 10 ** 12}
+
+
+def parse_size(text: str) -> int:
+    """"1.20 MiB" -> 1258291"""
+    number, unit = re.match(r"([\d.]+)\s*(\w+)", text).groups()
+    return int(float(number) * _UNITS.get(unit, 1))
+
+
+def format_size(size: int) -> str:
+    for unit in ("B", "KiB", "MiB", "GiB"):
+        if size < 1024 or unit == "GiB":
+            return f"{size} {unit}" if unit == "B" else f"{size:.2f} {unit}"
+        size /= 1024
+
+
+def parse_progress(line: str) -> Optional[CloneProgress]:
+    """解析一行进度输出，不是进度行（例如 "Cloning into 'x'..."）时返回 None"""
+    match = _PROGRESS.match(line.strip())
+    if match is None:
+        return None
+    if match["count"] is not None:
+        current, total, percent = int(match["count"]), None, None
+    else:
+        current, total, percent = int(match["current"]), int(match["total"]), int(match["percent"])
+    return CloneProgress(
+        phase=match["phase"],
+        current=current,
+        total=total,
+        percent=percent,
+        transferred=parse_size(match["size"]) if match["size"] else None,
+        rate=parse_size(match["rate"]) if match["rate"] else None,
+        done=match["done"] is not None,
+        remote=match["remote"] is not None,
+    )
+
+
+def default_clone_path(url: str) -> str:
+    """与 git 相同的默认目录名：最后一段路径去掉 .git"""
+    name = re.split(r"[/:\\]", url.rstrip("/\\"))[-1]
+    if name.endswith(".git"):
+        name = name[:-4]
+    return name or "repository"
+
+
+def clone_args(url: str, path: str, options: CloneOptions = CloneOptions()) -> list:
+    args = ["clone", "--progress"]
+    if options.depth:
+        args += ["--depth", str(options.depth)]
+    if options.blob_filter:
+        args.append("--filter=blob:none")
+    if options.single_branch:
+        args.append("--single-branch")
+    if options.branch:
+        args += ["--branch", options.branch]
+    return [*args, "--", url, path]
+
+
+async def clone_repository(url: str, path: str = "", options: CloneOptions = CloneOptions(),
+                           on_progress=None, on_line=None) -> str:
+    """克隆 url 到 path（为空时按 URL 取目录名），返回克隆出的目录的绝对路径
+
+    on_progress(CloneProgress) 接收解析后的进度，on_line(str) 接收其他输出行。
+    取消或失败时删除本次创建的目录（已存在的空目录保留，只清空内容）。
+    """
+    target = os.path.abspath(path or default_clone_path(url))
+    existed = os.path.exists(target)
+    if existed and os.listdir(target):
+        raise FileExistsError(f"{target} 已存在且不是空目录")
+    parent = os.path.dirname(target)
+    os.makedirs(parent, exist_ok=True)
+
+    def handle(line: str):
+        progress = parse_progress(line)
+        if progress is not None:
+            if on_progress is not None:
+                on_progress(progress)
+        elif on_line is not None:
+            on_line(line)
+
+    try:
+        await GitBackend(parent).stream_async(clone_args(url, target, options), on_line=handle)
+    except BaseException:  # 包括 asyncio.CancelledError
+        _remove_partial(target, existed)
+        raise
+    return target
+
+
+def _remove_partial(target: str, existed: bool):
+    if not os.path.exists(target):
+        return
+    if existed:
+        for name in os.listdir(target):
+            full = os.path.join(target, name)
+            if os.path.isdir(full) and not os.path.islink(full):
+                shutil.rmtree(full, ignore_errors=True)
+            else:
+                os.remove(full)
+    else:
+        shutil.rmtree(target, ignore_errors=True)
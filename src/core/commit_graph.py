@@ -0,0 +1,218 @@
+"""提交图引擎：流式读取 git log 并逐条分配泳道（lane）。
+
+整个历史不会一次性读入内存：`iter_commits` 是一个生成器，
+`LaneLayout` 每次只处理一个提交，`CommitGraph` 按需向后读取，
+因此第一屏可以在 git 还在输出剩余历史时就绘制出来。
+"""
+
+import subprocess
+from typing import Iterator, NamedTuple, Optional
+
+from .commit_store import CommitStore
+from .git_backend import GitBackend
+
+# 字段之间用 \x1f 分隔；%s 只取首行，所以一行就是一条记录
+FIELD_SEP = "\x1f"
+LOG_FORMAT = "%H%x1f%P%x1f%an%x1f%at%x1f%s"
+
+
+class LogEntry(NamedTuple):
+    sha: str
+    parents: tuple
+    author: str
+    timestamp: int
+    subject: str
+
+
+def parse_log_line(line: str) -> LogEntry:
+    """解析一行 LOG_FORMAT 输出"""
+    sha, parents, author, timestamp, subject = line.rstrip("\n").split(FIELD_SEP, 4)
+    return LogEntry(
+        sha,
+        tuple(parents.split()) if parents else (),
+        author,
+        int(timestamp or 0),
+        subject,
+    )
+
+
+def iter_commits(repo_path: str, revs: tuple = ("--all",), extra_args: tuple = (),
+                 stdin_revs: tuple = ()) -> Iterator[LogEntry]:
+    """以生成器形式流式读取 `git log --topo-order`
+
+    stdin_revs 通过 `--stdin` 传入（排除的提交写成 "^sha"），用于引用很多、
+    命令行放不下的情况。
+    生成器被关闭（或提前丢弃）时会结束 git 子进程。
+    注意：只有仓库存在 commit-graph 文件（带代数号）时，git 才能
+    边遍历边输出拓扑序；否则 git 会先走完整个历史再输出第一行。
+    """
+    args = ["log", "--topo-order", f"--format={LOG_FORMAT}", *extra_args, *revs]
+    if stdin_revs:
+        args.append("--stdin")
+    proc = GitBackend.for_repo(repo_path).popen(
+        args,
+        stdin=subprocess.PIPE if stdin_revs else subprocess.DEVNULL,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+        encoding="utf-8",
+        errors="replace",
+        bufsize=1 << 16,
+    )
+    try:
+        if stdin_revs:
+            proc.stdin.write("\n".join(stdin_revs) + "\n")
+            proc.stdin.close()
+        for line in proc.stdout:
+            if line.strip():
+                yield parse_log_line(line)
+    finally:
+        if proc.poll() is None:
+            proc.terminate()
+        proc.stdout.close()
+        proc.wait()
+
+
+class LaneLayout:
+    """增量泳道分配
+
+    `lanes[i]` 保存第 i 条泳道上期待出现的下一个提交 SHA（空闲为 None）。
+    每处理一个提交只需要 O(泳道数) 的工作量，与历史长度无关。
+
+    图形字符：
+        *  当前提交
+        |  穿过本行的泳道
+        /  在本行汇入当前提交的泳道
+        \\  从当前提交分出的新泳道（合并提交的其他父提交）
+    """
+
+    def __init__(self):
+        self.lanes: list = []
+        self.max_width = 0
+
+    def _free_slot(self) -> int:
+        for i, sha in enumerate(self.lanes):
+            if sha is None:
+                return i
+        self.lanes.append(None)
+        return len(self.lanes) - 1
+
+    def place(self, sha: str, parents: tuple) -> tuple[int, str]:
+        """为一个提交分配泳道，返回 (列号, 图形字符串)"""
+        lanes = self.lanes
+        column = -1
+        merged_in = []
+        for i, expected in enumerate(lanes):
+            if expected == sha:
+                if column < 0:
+                    column = i
+                else:
+                    merged_in.append(i)
+        if column < 0:
+            column = self._free_slot()
+
+        for i in merged_in:
+            lanes[i] = None
+
+        opened = []
+        if parents:
+            lanes[column] = parents[0]
+            for parent in parents[1:]:
+                if parent in lanes:
+                    continue
+                slot = self._free_slot()
+                lanes[slot] = parent
+                opened.append(slot)
+        else:
+            lanes[column] = None
+
+        width = max(len(lanes), column + 1, *(i + 1 for i in merged_in))
+        cells = []
+        for i in range(width):
+            if i == column:
+                cells.append("*")
+            elif i in merged_in:
+                cells.append("/")
+            elif i in opened:
+                cells.append("\\")
+            elif i < len(lanes) and lanes[i] is not None:
+                cells.append("|")
+            else:
+                cells.append(" ")
+
+        if width > self.max_width:
+            self.max_width = width
+        while lanes and lanes[-1] is None:
+            lanes.pop()
+
+        return column, " ".join(cells).rstrip()
+
+
+class CommitGraph:
+    """按需增长的提交图
+
+    只在调用 `ensure(n)` 时才继续从 git 读取，直到至少有 n 行可用
+    或历史读完为止。行数据保存在列式的 `CommitStore` 中，
+    `rows[i]` 返回 `CommitRow` 视图。
+    """
+
+    def __init__(self, repo_path: str, revs: tuple = ("--all",), entries: Optional[Iterator[LogEntry]] = None):
+        self.repo_path = repo_path
+        self._entries = entries if entries is not None else iter_commits(repo_path, revs)
+        self.layout = LaneLayout()
+        self.rows = CommitStore()
+        self.exhausted = False
+        # 由 GraphCache 设置：打开时的引用快照，以及是否原样来自缓存
+        self.tips: dict | None = None
+        self.from_cache = False
+
+    @classmethod
+    def from_store(cls, repo_path: str, store: CommitStore) -> "CommitGraph":
+        """用已经完整布局好的存储（例如磁盘缓存）构造提交图"""
+        graph = cls(repo_path, entries=iter(()))
+        graph.rows = store
+        graph.exhausted = True
+        return graph
+
+    def ensure(self, count: int) -> int:
+        """保证至少读取 count 行，返回当前已有的行数"""
+        rows = self.rows
+        layout = self.layout
+        while len(rows) < count and not self.exhausted:
+            try:
+                entry = next(self._entries)
+            except StopIteration:
+                self.exhausted = True
+                break
+            column, graph = layout.place(entry.sha, entry.parents)
+            rows.append(entry.sha, entry.parents, entry.author, entry.timestamp,
+                        entry.subject, column, graph)
+        return len(rows)
+
+    def load_all(self) -> int:
+        while not self.exhausted:
+            self.ensure(len(self.rows) + 4096)
+        return len(self.rows)
+
+    def close(self):
+        """提前结束读取（例如用户退出历史视图）"""
+        close = getattr(self._entries, "close", None)
+        if close is not None:
+            close()
+        self.exhausted = True
+
+    def __len__(self):
+        return len(self.rows)
+
+    def __getitem__(self, index: int):
+        return self.rows[index]
+
+
+# 测试入口
+if __name__ == "__main__":
+    import sys
+
+    graph = CommitGraph(sys.argv[1] if len(sys.argv) > 1 else ".")
+    graph.ensure(30)
+    for row in graph.rows:
+        print(f"{row.graph:<12} {row.sha[:8]} {row.subject}")
+    graph.close()
@@ -0,0 +1,494 @@
+"""提交搜索索引：提交说明中的词、作者、改动过的路径 -> 提交
+
+    index, added = CommitIndex.update(repo_path)     # 第一次完整建立，以后只加入新提交
+    result = index.search("crash author:alice path:src/core")
+    for hit in result.hits:                         # 按提交时间从新到旧
+        print(hit.sha, hit.subject)
+    python -m core.commit_index <仓库> [查询]
+
+`git log --grep` / `-- path` 每次查询都要遍历整个历史；这里把历史读一遍，
+建成倒排表存到磁盘（用户数据目录的 commit-index/ 下，每个仓库一个文件），
+查询只是在排好序的词表中二分查找、再求文档号集合的交集。
+
+查询由空格分隔的条件组成，条件之间是"并且"：
+    词            提交说明（标题和正文）中的词，不分大小写；最后一个词按前缀匹配
+    author:名字    作者名或邮箱包含该文本（含空格时加引号：author:"Ada Lovelace"）
+    path:路径      改动过该文件，或改动过该目录下的文件；没有这个路径时按前缀匹配
+中日韩文字按单字切分，"修复崩溃" 等于四个字各自出现。路径条件不简化历史、不算合并提交，
+结果与 `git log --all --full-history --no-merges -- 路径` 相同。
+
+是否有新提交用与 GraphCache 相同的引用快照判断（见 graph_cache.tip_delta）：
+引用没变时直接使用；有新提交时只让 git 输出新提交，追加到索引末尾；
+引用被回退或删除时重新建立。
+"""
+
+import hashlib
+import heapq
+import json
+import mmap
+import os
+import re
+import shlex
+import struct
+import subprocess
+import sys
+import time
+from array import array
+from bisect import bisect_left
+from typing import NamedTuple, Optional
+
+from .git_backend import GitBackend
+from .graph_cache import new_commit_revs, tip_delta
+from .paths import data_dir
+from .refs import read_ref_tips
+
+MAGIC = b"GTUICI1\n"
+FORMAT_VERSION = 1
+
+# 每条记录以 \x1e 开头，字段以 \x1f 分隔，完整说明以 \x1d 结束，后面是 --name-only 的路径
+LOG_FORMAT = "%x1e%H%x1f%ct%x1f%an <%ae>%x1f%B%x1d"
+FIELDS = ("word", "path", "author")
+MAX_TOKEN = 64
+# 默认最多返回的结果数（总数照常统计）
+DEFAULT_LIMIT = 500
+
+_CJK = "\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uac00-\ud7af"
+_TOKEN = re.compile(f"[{_CJK}]|[^\\W{_CJK}]+")
+
+
+def tokenize(text: str) -> list:
+    """小写的词（字母数字下划线连续段），中日韩文字每字一个词"""
+    return [token for token in _TOKEN.findall(text.lower()) if len(token) <= MAX_TOKEN]
+
+
+def path_terms(paths) -> set:
+    """路径本身加上它所在的各级目录"""
+    terms = set()
+    for path in paths:
+        terms.add(path)
+        while "/" in path:
+            path = path.rpartition("/")[0]
+            if path in terms:
+                break
+            terms.add(path)
+    return terms
+
+
+class Hit(NamedTuple):
+    sha: str
+    author: str
+    timestamp: int          # 提交时间
+    subject: str
+
+
+class SearchResult(NamedTuple):
+    total: int              # 匹配的提交数
+    hits: list              # 最多 limit 个 Hit，按提交时间从新到旧
+    elapsed: float
+
+
+def _empty_field() -> tuple:
+    return [], array("Q", [0]), array("I")
+
+
+def _postings(field: tuple, i: int) -> array:
+    _terms, start, docs = field
+    return docs[start[i]:start[i + 1]]
+
+
+def _merge_sorted(old: tuple, new: dict) -> tuple:
+    """old 是 (按序的词表, 起点, 文档号)，new 是 {词: 文档号}；new 中的文档号都比 old 中的大"""
+    old_terms, old_start, old_docs = old
+    terms, start, docs = [], array("Q", [0]), array("I")
+    i = 0
+
+    def copy_old(j):
+        # 两个新词之间的旧词整段复制
+        nonlocal i
+        if j > i:
+            terms.extend(old_terms[i:j])
+            shift = len(docs) - old_start[i]
+            docs.extend(old_docs[old_start[i]:old_start[j]])
+            start.extend([offset + shift for offset in old_start[i + 1:j + 1]])
+            i = j
+
+    for term in sorted(new):
+        copy_old(bisect_left(old_terms, term, i))
+        if i < len(old_terms) and old_terms[i] == term:
+            docs.extend(old_docs[old_start[i]:old_start[i + 1]])
+            i += 1
+        terms.append(term)
+        docs.extend(new[term])
+        start.append(len(docs))
+    copy_old(len(old_terms))
+    return terms, start, docs
+
+
+def _merge_authors(old: tuple, new: dict, authors: list) -> tuple:
+    """作者的"词"就是作者表下标，不排序，新作者接在后面"""
+    _old_terms, old_start, old_docs = old
+    known = len(old_start) - 1
+    start, docs = array("Q", [0]), array("I")
+    for author_id in range(len(authors)):
+        if author_id < known:
+            docs.extend(old_docs[old_start[author_id]:old_start[author_id + 1]])
+        docs.extend(new.get(author_id, ()))
+        start.append(len(docs))
+    return authors, start, docs
+
+
+def _intersect(result: set, postings) -> set:
+    """postings 是有序数组（单个词）或集合（前缀、作者等多个词的并集）"""
+    if isinstance(postings, array) and len(result) * 16 < len(postings):
+        # 结果已经很少时逐个二分查找，不为长倒排表建集合
+        size = len(postings)
+        return {doc for doc in result if (i := bisect_left(postings, doc)) < size and postings[i] == doc}
+    result.intersection_update(postings)
+    return result
+
+
+class CommitIndex:
+    """一个仓库的提交索引；用 load / update 得到，search 查询"""
+
+    def __init__(self, repo_path: str, tips: dict, hash_size: int = 20):
+        self.repo_path = repo_path
+        self.tips = tips
+        self.hash_size = hash_size
+        # 按文档号（加入索引的顺序）的列
+        self.shas = bytearray()
+        self.timestamps = array("q")
+        self.author_ids = array("I")
+        self.subject_start = array("Q", [0])
+        self.subjects = bytearray()
+        self.authors: list = []
+        # 字段 -> (词表, 每个词在 docs 中的起点（多一个结尾）, 按词拼接的有序文档号)
+        self.fields = {name: _empty_field() for name in FIELDS}
+
+    def __len__(self):
+        return len(self.timestamps)
+
+    def sha_of(self, doc: int) -> str:
+        size = self.hash_size
+        return self.shas[doc * size:(doc + 1) * size].hex()
+
+    def hit(self, doc: int) -> Hit:
+        start = self.subject_start[doc]
+        subject = self.subjects[start:self.subject_start[doc + 1]].decode("utf-8", "replace")
+        return Hit(self.sha_of(doc), self.authors[self.author_ids[doc]], self.timestamps[doc], subject)
+
+    # ---- 查询 ----
+
+    def _word(self, word: str, prefix: bool):
+        terms = self.fields["word"][0]
+        i = bisect_left(terms, word)
+        if not prefix:
+            return _postings(self.fields["word"], i) if i < len(terms) and terms[i] == word else array("I")
+        docs = set()
+        while i < len(terms) and terms[i].startswith(word):
+            docs.update(_postings(self.fields["word"], i))
+            i += 1
+        return docs
+
+    def _path(self, path: str):
+        path = path.strip().removeprefix("./").strip("/")
+        terms = self.fields["path"][0]
+        i = bisect_left(terms, path)
+        if i < len(terms) and terms[i] == path:
+            return _postings(self.fields["path"], i)
+        docs = set()
+        while i < len(terms) and terms[i].startswith(path):
+            docs.update(_postings(self.fields["path"], i))
+            i += 1
+        return docs
+
+    def _author(self, text: str) -> set:
+        text = text.lower()
+        docs = set()
+        for author_id, author in enumerate(self.authors):
+            if text in author.lower():
+                docs.update(_postings(self.fields["author"], author_id))
+        return docs
+
+    def criteria(self, query: str) -> list:
+        """查询拆成各个条件的文档号集合（或有序数组）"""
+        words, criteria = [], []
+        try:
+            parts = shlex.split(query)
+        except ValueError:
+            # 引号还没输入完，或者是 don't 这样的撇号
+            parts = query.split()
+        for part in parts:
+            field, sep, value = part.partition(":")
+            if sep and value and field.lower() == "author":
+                criteria.append(self._author(value))
+            elif sep and value and field.lower() == "path":
+                criteria.append(self._path(value))
+            else:
+                words.append(part)
+        tokens = tokenize(" ".join(words))
+        if tokens:
+            # 只有最后一个词可能还没输入完，按前缀匹配
+            for token in dict.fromkeys(tokens[:-1]):
+                criteria.append(self._word(token, prefix=False))
+            last = tokens[-1]
+            criteria.append(self._word(last, prefix=query[-1:].strip() != ""))
+        return criteria
+
+    def search(self, query: str, limit: int = DEFAULT_LIMIT) -> SearchResult:
+        start = time.perf_counter()
+        criteria = sorted(self.criteria(query), key=len)
+        if not criteria:
+            return SearchResult(0, [], time.perf_counter() - start)
+        docs = set(criteria[0])
+        for postings in criteria[1:]:
+            if not docs:
+                break
+            docs = _intersect(docs, postings)
+        newest = heapq.nlargest(limit, docs, key=self.timestamps.__getitem__)
+        return SearchResult(len(docs), [self.hit(doc) for doc in newest], time.perf_counter() - start)
+
+    # ---- 读写 ----
+
+    @staticmethod
+    def path_for(repo_path: str, root: Optional[str] = None) -> str:
+        key = os.path.normcase(os.path.abspath(repo_path))
+        return os.path.join(root or data_dir("commit-index"), hashlib.sha1(key.encode("utf-8")).hexdigest() + ".bin")
+
+    def _columns(self) -> dict:
+        columns = {
+            "shas": self.shas,
+            "timestamps": self.timestamps,
+            "author_ids": self.author_ids,
+            "subject_start": self.subject_start,
+            "subjects": self.subjects,
+        }
+        for name, (terms, start, docs) in self.fields.items():
+            if name != "author":
+                columns[f"{name}_terms"] = "\n".join(terms).encode("utf-8")
+            columns[f"{name}_start"] = start
+            columns[f"{name}_docs"] = docs
+        return {name: memoryview(value).cast("B") for name, value in columns.items()}
+
+    def save(self, root: Optional[str] = None):
+        """写临时文件后原子替换"""
+        columns = self._columns()
+        layout, offset = [], 0
+        for name, view in columns.items():
+            layout.append([name, offset, view.nbytes])
+            offset += view.nbytes
+        header = json.dumps({
+            "version": FORMAT_VERSION,
+            "repo": os.path.abspath(self.repo_path),
+            "tips": self.tips,
+            "hash_size": self.hash_size,
+            "byteorder": sys.byteorder,
+            "authors": self.authors,
+            "columns": layout,
+        }).encode("utf-8")
+        path = self.path_for(self.repo_path, root)
+        tmp = path + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(MAGIC)
+            f.write(struct.pack("<I", len(header)))
+            f.write(header)
+            for view in columns.values():
+                f.write(view)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, repo_path: str, root: Optional[str] = None) -> Optional["CommitIndex"]:
+        """读取磁盘上的索引（不检查是否过期），没有有效索引时返回 None"""
+        try:
+            f = open(cls.path_for(repo_path, root), "rb")
+        except FileNotFoundError:
+            return None
+        try:
+            with f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                if mm[:len(MAGIC)] != MAGIC:
+                    return None
+                (header_len,) = struct.unpack_from("<I", mm, len(MAGIC))
+                body = len(MAGIC) + 4 + header_len
+                header = json.loads(mm[len(MAGIC) + 4:body])
+                if (header.get("version") != FORMAT_VERSION
+                        or header.get("byteorder") != sys.byteorder
+                        or header.get("repo") != os.path.abspath(repo_path)):
+                    return None
+                raw = {name: mm[body + start:body + start + size] for name, start, size in header["columns"]}
+        except (ValueError, KeyError, struct.error, OSError):
+            return None
+
+        index = cls(repo_path, header["tips"], header["hash_size"])
+        index.authors = header["authors"]
+        index.shas += raw["shas"]
+        index.subjects += raw["subjects"]
+        for name in ("timestamps", "author_ids"):
+            getattr(index, name).frombytes(raw[name])
+        index.subject_start = array("Q")
+        index.subject_start.frombytes(raw["subject_start"])
+        for name in FIELDS:
+            start, docs = array("Q"), array("I")
+            start.frombytes(raw[f"{name}_start"])
+            docs.frombytes(raw[f"{name}_docs"])
+            if name == "author":
+                terms = index.authors
+            else:
+                blob = raw[f"{name}_terms"]
+                terms = blob.decode("utf-8").split("\n") if blob else []
+            index.fields[name] = (terms, start, docs)
+        return index
+
+    # ---- 建立 / 更新 ----
+
+    @classmethod
+    def update(cls, repo_path: str, root: Optional[str] = None, report=None, cancel=None) -> tuple:
+        """打开索引并加入新提交，返回 (CommitIndex, 新加入的提交数)
+
+        report(count) 在读取过程中定期调用；cancel（threading.Event）被设置时
+        停止读取，不写盘，返回 (None, 0)。
+        """
+        tips = read_ref_tips(repo_path)
+        index = cls.load(repo_path, root)
+        revs, stdin_revs = ("--all",), ()
+        if index is not None:
+            delta = tip_delta(repo_path, index.tips, tips)
+            if delta is None:
+                index = None
+            elif not delta[0]:
+                # 可达的提交没变（引用可能改名、删除或前移到已有提交）
+                if index.tips != tips:
+                    index.tips = tips
+                    index.save(root)
+                return index, 0
+            else:
+                revs, stdin_revs = (), new_commit_revs(*delta)
+        if index is None:
+            index = cls(repo_path, tips)
+
+        builder = _Builder(index)
+        for count, commit in enumerate(iter_log(repo_path, revs, stdin_revs), 1):
+            if cancel is not None and cancel.is_set():
+                return None, 0
+            builder.add(*commit)
+            if report is not None and count % 5000 == 0:
+                report(count)
+        builder.finish()
+        index.tips = tips
+        index.save(root)
+        return index, builder.added
+
+
+class _Builder:
+    """把新提交追加到 index 的各列，倒排表先收集在字典中，finish 时与旧表合并"""
+
+    def __init__(self, index: CommitIndex):
+        self.index = index
+        self.author_lookup = {name: i for i, name in enumerate(index.authors)}
+        self.postings = {name: {} for name in FIELDS}
+        self.added = 0
+
+    def _post(self, field: str, terms, doc: int):
+        postings = self.postings[field]
+        for term in terms:
+            docs = postings.get(term)
+            if docs is None:
+                docs = postings[term] = array("I")
+            docs.append(doc)
+
+    def add(self, sha: str, timestamp: int, author: str, message: str, paths: list):
+        index = self.index
+        doc = len(index.timestamps)
+        key = bytes.fromhex(sha)
+        if not index.shas:
+            index.hash_size = len(key)
+        index.shas += key
+        index.timestamps.append(timestamp)
+        author_id = self.author_lookup.get(author)
+        if author_id is None:
+            author_id = self.author_lookup[author] = len(index.authors)
+            index.authors.append(author)
+        index.author_ids.append(author_id)
+        index.subjects += message.split("\n", 1)[0].encode("utf-8")
+        index.subject_start.append(len(index.subjects))
+
+        self._post("word", set(tokenize(message)), doc)
+        self._post("path", path_terms(paths), doc)
+        self._post("author", (author_id,), doc)
+        self.added += 1
+
+    def finish(self):
+        index = self.index
+        fields = index.fields
+        fields["word"] = _merge_sorted(fields["word"], self.postings["word"])
+        fields["path"] = _merge_sorted(fields["path"], self.postings["path"])
+        fields["author"] = _merge_authors(fields["author"], self.postings["author"], index.authors)
+
+
+def iter_log(repo_path: str, revs: tuple = ("--all",), stdin_revs: tuple = ()):
+    """流式读取提交：(sha, 提交时间, "作者 <邮箱>", 完整说明, 改动的路径列表)
+
+    合并提交没有路径（与 git log --name-only 相同）。生成器被关闭时结束 git。
+    """
+    args = ["-c", "core.quotePath=false", "log", "--no-renames", "--name-only", f"--format={LOG_FORMAT}", *revs]
+    if stdin_revs:
+        args.append("--stdin")
+    proc = GitBackend.for_repo(repo_path).popen(
+        args,
+        stdin=subprocess.PIPE if stdin_revs else subprocess.DEVNULL,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+        encoding="utf-8",
+        errors="replace",
+        bufsize=1 << 16,
+    )
+    try:
+        if stdin_revs:
+            proc.stdin.write("\n".join(stdin_revs) + "\n")
+            proc.stdin.close()
+        record, paths, in_message = None, [], False
+        for line in proc.stdout:
+            if line.startswith("\x1e"):
+                if record is not None:
+                    yield _parse_record(record, paths)
+                record, paths = [line[1:]], []
+                in_message = "\x1d" not in line
+            elif in_message:
+                record.append(line)
+                in_message = "\x1d" not in line
+            elif record is not None and line.strip():
+                paths.append(line.rstrip("\n"))
+        if record is not None:
+            yield _parse_record(record, paths)
+    finally:
+        if proc.poll() is None:
+            proc.terminate()
+        proc.stdout.close()
+        proc.wait()
+
+
+def _parse_record(lines: list, paths: list) -> tuple:
+    text = "".join(lines).split("\x1d", 1)[0]
+    sha, timestamp, author, message = text.split("\x1f", 3)
+    return sha, int(timestamp or 0), author, message.strip(), paths
+
+
+def main(argv=None) -> int:
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv:
+        print("用法: python -m core.commit_index <仓库> [查询]", file=sys.stderr)
+        return 2
+    repo, query = argv[0], " ".join(argv[1:])
+    start = time.perf_counter()
+    index, added = CommitIndex.update(repo, report=lambda count: print(f"Indexing commits: {count}"))
+    print(f"{len(index)} 个提交已索引（新增 {added}），用时 {time.perf_counter() - start:.2f}s")
+    if query:
+        result = index.search(query)
+        for hit in result.hits[:50]:
+            print(f"{hit.sha[:10]}  {time.strftime('%Y-%m-%d', time.localtime(hit.timestamp))}  "
+                  f"{hit.author.split(' <')[0][:16]:<16}  {hit.subject}")
+        print(f"{result.total} 个匹配，用时 {result.elapsed * 1000:.2f} ms")
+    return 0
+
+
+# 测试入口
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,223 @@
+"""紧凑的列式提交存储
+
+每个提交不再是一个带 __dict__ 的 Python 对象，而是若干 `array` 列中的
+一个下标：
+
+    SHA         bytearray，每个提交固定 20 字节（SHA-256 仓库为 32 字节）
+    父提交       parent_start/parent_count + 扁平的 parents 数组（均为整数 id）
+    作者         作者表下标（同一作者只保存一次字符串）
+    时间戳       array('q')
+    泳道         array('H')
+    标题/图形    拼接在 bytearray 中，按偏移量按需解码
+
+SHA 在第一次出现时（不论作为提交本身还是作为父提交）被分配一个整数 id。
+界面只拿到 `CommitRow` 这种 __slots__ 轻量视图，字符串只在真正显示时才生成。
+"""
+
+from array import array
+from typing import Iterator
+
+
+class CommitRow:
+    """某一显示行的只读视图，不复制任何数据"""
+
+    __slots__ = ("store", "index", "id")
+
+    def __init__(self, store: "CommitStore", index: int, commit_id: int):
+        self.store = store
+        self.index = index
+        self.id = commit_id
+
+    @property
+    def sha(self) -> str:
+        return self.store.sha_of(self.id)
+
+    @property
+    def parents(self) -> tuple:
+        return tuple(self.store.sha_of(p) for p in self.store.parent_ids(self.id))
+
+    @property
+    def author(self) -> str:
+        return self.store.authors[self.store.author[self.id]]
+
+    @property
+    def timestamp(self) -> int:
+        return self.store.timestamp[self.id]
+
+    @property
+    def column(self) -> int:
+        return self.store.lane[self.id]
+
+    @property
+    def subject(self) -> str:
+        return self.store.subject_of(self.id)
+
+    @property
+    def graph(self) -> str:
+        return self.store.graph_of(self.index)
+
+    def __repr__(self):
+        return f"CommitRow({self.index}, {self.sha[:8]})"
+
+
+class CommitStore:
+    """按显示顺序追加提交的列式存储"""
+
+    def __init__(self, hash_size: int = 20):
+        self.hash_size = hash_size
+        self._ids: dict = {}              # 原始 SHA 字节 -> id
+        self._shas = bytearray()          # id -> SHA 字节
+
+        # 按 id 索引的列；只被引用过、尚未出现的父提交对应的行为占位值
+        self.parent_start = array("I")
+        self.parent_count = array("B")
+        self.author = array("I")
+        self.timestamp = array("q")
+        self.lane = array("H")
+        self._subject_start = array("Q")
+        self._subject_len = array("I")
+        self.parents = array("I")
+        self._subjects = bytearray()
+
+        self.authors: list = []
+        self._author_ids: dict = {}
+
+        # 按显示行索引的列
+        self.row_ids = array("I")
+        self._graph_start = array("Q")
+        self._graphs = bytearray()
+
+    # ---- 驻留 ----
+
+    def intern(self, sha: str) -> int:
+        """返回 SHA 对应的整数 id，第一次出现时分配"""
+        key = bytes.fromhex(sha)
+        commit_id = self._ids.get(key)
+        if commit_id is None:
+            if len(key) != self.hash_size:
+                if not self._ids:
+                    self.hash_size = len(key)
+                else:
+                    raise ValueError(f"SHA 长度不一致: {sha}")
+            commit_id = len(self._ids)
+            self._ids[key] = commit_id
+            self._shas += key
+            self.parent_start.append(0)
+            self.parent_count.append(0)
+            self.author.append(0)
+            self.timestamp.append(0)
+            self.lane.append(0)
+            self._subject_start.append(0)
+            self._subject_len.append(0)
+        return commit_id
+
+    def _intern_author(self, name: str) -> int:
+        author_id = self._author_ids.get(name)
+        if author_id is None:
+            author_id = len(self.authors)
+            self.authors.append(name)
+            self._author_ids[name] = author_id
+        return author_id
+
+    def id_of(self, sha: str) -> int:
+        """查找已驻留的 SHA，不存在时返回 -1"""
+        return self._ids.get(bytes.fromhex(sha), -1)
+
+    def sha_of(self, commit_id: int) -> str:
+        size = self.hash_size
+        start = commit_id * size
+        return self._shas[start:start + size].hex()
+
+    # ---- 写入 ----
+
+    def append(self, sha: str, parents: tuple, author: str, timestamp: int,
+               subject: str, lane: int = 0, graph: str = "") -> int:
+        """追加一个显示行，返回行号"""
+        commit_id = self.intern(sha)
+        parent_ids = [self.intern(p) for p in parents]
+        self.parent_start[commit_id] = len(self.parents)
+        self.parent_count[commit_id] = min(len(parent_ids), 255)
+        self.parents.extend(parent_ids[:255])
+        self.author[commit_id] = self._intern_author(author)
+        self.timestamp[commit_id] = timestamp
+        self.lane[commit_id] = min(lane, 0xFFFF)
+
+        encoded = subject.encode("utf-8")
+        self._subject_start[commit_id] = len(self._subjects)
+        self._subject_len[commit_id] = len(encoded)
+        self._subjects += encoded
+
+        self.row_ids.append(commit_id)
+        self._graph_start.append(len(self._graphs))
+        self._graphs += graph.encode("ascii")
+        return len(self.row_ids) - 1
+
+    # ---- 读取 ----
+
+    def parent_ids(self, commit_id: int) -> array:
+        start = self.parent_start[commit_id]
+        return self.parents[start:start + self.parent_count[commit_id]]
+
+    def subject_of(self, commit_id: int) -> str:
+        start = self._subject_start[commit_id]
+        return self._subjects[start:start + self._subject_len[commit_id]].decode("utf-8", "replace")
+
+    def graph_of(self, index: int) -> str:
+        start = self._graph_start[index]
+        end = self._graph_start[index + 1] if index + 1 < len(self._graph_start) else len(self._graphs)
+        return self._graphs[start:end].decode("ascii")
+
+    def column(self, name: str) -> memoryview:
+        """以 memoryview 暴露某一列，供缓存等模块零拷贝读写"""
+        return memoryview(getattr(self, name))
+
+    def nbytes(self) -> int:
+        """各列占用的字节数（不含 SHA 索引字典和作者表）"""
+        columns = (self.parent_start, self.parent_count, self.author, self.timestamp, self.lane,
+                   self._subject_start, self._subject_len, self.parents, self.row_ids, self._graph_start)
+        return (sum(c.itemsize * len(c) for c in columns)
+                + len(self._shas) + len(self._subjects) + len(self._graphs))
+
+    # ---- 序列化 ----
+
+    # 参与持久化的列，顺序即文件中的顺序
+    COLUMNS = ("_shas", "parent_start", "parent_count", "author", "timestamp", "lane",
+               "_subject_start", "_subject_len", "parents", "_subjects",
+               "row_ids", "_graph_start", "_graphs")
+
+    def to_columns(self) -> dict:
+        """返回 {列名: memoryview}，供缓存直接写盘"""
+        return {name: memoryview(getattr(self, name)).cast("B") for name in self.COLUMNS}
+
+    @classmethod
+    def from_columns(cls, hash_size: int, columns: dict, authors: list) -> "CommitStore":
+        """从 `to_columns` 的输出（任意 bytes-like）重建存储"""
+        store = cls(hash_size)
+        for name in cls.COLUMNS:
+            target = getattr(store, name)
+            if isinstance(target, bytearray):
+                target += columns[name]
+            else:
+                target.frombytes(columns[name])
+        shas = store._shas
+        store._ids = {bytes(shas[i:i + hash_size]): n for n, i in enumerate(range(0, len(shas), hash_size))}
+        store.authors = list(authors)
+        store._author_ids = {name: i for i, name in enumerate(store.authors)}
+        return store
+
+    def iter_entries(self) -> Iterator:
+        """按显示顺序重新产生 (sha, parents, author, timestamp, subject)"""
+        for row in self:
+            yield row.sha, row.parents, row.author, row.timestamp, row.subject
+
+    def __len__(self):
+        return len(self.row_ids)
+
+    def __getitem__(self, index: int) -> CommitRow:
+        if index < 0:
+            index += len(self.row_ids)
+        return CommitRow(self, index, self.row_ids[index])
+
+    def __iter__(self) -> Iterator[CommitRow]:
+        for index, commit_id in enumerate(self.row_ids):
+            yield CommitRow(self, index, commit_id)
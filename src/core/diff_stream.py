@@ -0,0 +1,299 @@
+"""流式 diff：边读 `git diff` / `git show` 的输出边切分成文件和 hunk
+
+    doc = DiffDocument.from_git(backend, ["show", "--format=", "--patch-with-stat", sha])
+    doc.wait_for(30, timeout=0.05)    # 第一屏
+    len(doc), doc[i]                  # 已解析的行（DiffRow）
+    doc.ensure(count)                 # 请求更多行（不阻塞），到达后调用 on_update
+    doc.expand(row.file)              # 展开被折叠的大文件
+    doc.close()
+
+输出由后台线程逐行读取，只读到比界面请求的行数多 LOOKAHEAD 行为止，之后
+git 阻塞在管道上，直到界面滚动到附近；巨大的 diff 不会整个读进一个字符串。
+
+单个文件的 diff 超过 large_bytes 时折叠成一行“large diff”占位：原始字节留在
+内存中（最多 MAX_RAW_BYTES），按回车展开时才解码、切分成行。文件第一次出现
+时先缓冲它的行，确定没有超过阈值（文件结束）后才变成可见的行。
+
+DiffRow.kind：
+    "note"   第一个文件之前的内容（例如 git show 的 stat）
+    "file"   文件标题（diff --git ...）
+    "meta"   index、---、+++、mode、rename、Binary files 等
+    "hunk"   @@ ... @@
+    "add" / "del" / "ctx"    hunk 中的行（合并提交的 combined diff 有多列前缀）
+    "large"  折叠的大文件
+"""
+
+import io
+import subprocess
+import threading
+from typing import Optional
+
+LARGE_FILE_BYTES = 256 << 10
+MAX_RAW_BYTES = 32 << 20
+LOOKAHEAD = 500
+TAB_SIZE = 4
+
+_FILE_START = (b"diff --git ", b"diff --cc ", b"diff --combined ")
+_META = ("index ", "--- ", "+++ ", "old mode", "new mode", "deleted file", "new file", "similarity",
+         "dissimilarity", "rename ", "copy ", "Binary files")
+
+
+class Hunk:
+    """一个 hunk；highlighted 供界面缓存本 hunk 已高亮的行"""
+
+    __slots__ = ("file", "index", "prefix", "rows", "highlighted")
+
+    def __init__(self, file: "DiffFile", index: int, prefix: int):
+        self.file = file
+        self.index = index
+        self.prefix = prefix        # 行首的 +/-/空格 列数（普通 diff 为 1）
+        self.rows = []
+        self.highlighted = {}
+
+
+class DiffRow:
+    __slots__ = ("kind", "text", "file", "hunk", "line")
+
+    def __init__(self, kind: str, text: str, file: Optional["DiffFile"] = None,
+                 hunk: Optional[Hunk] = None, line: int = 0):
+        self.kind = kind
+        self.text = text
+        self.file = file
+        self.hunk = hunk
+        self.line = line            # 在 hunk.rows 中的位置
+
+    def __repr__(self):
+        return f"DiffRow({self.kind!r}, {self.text[:40]!r})"
+
+
+class DiffFile:
+    __slots__ = ("index", "header", "path", "nbytes", "nlines", "pending", "raw", "truncated",
+                 "placeholder", "complete", "hunks")
+
+    def __init__(self, index: int, header: bytes):
+        self.index = index
+        self.header = header
+        self.path = _header_path(header.decode("utf-8", "replace").rstrip("\n"))
+        self.nbytes = 0
+        self.nlines = 0
+        self.pending = []           # 尚未确定是否折叠的行
+        self.raw = None             # 折叠时保存的原始行
+        self.truncated = 0          # 超过 MAX_RAW_BYTES 后丢弃的字节数
+        self.placeholder = None     # 折叠时的占位行
+        self.complete = False
+        self.hunks = []
+
+    @property
+    def collapsed(self) -> bool:
+        return self.raw is not None
+
+
+def _header_path(header: str) -> str:
+    """diff --git a/x b/x -> x；diff --cc x -> x"""
+    if header.startswith("diff --git "):
+        rest = header[len("diff --git "):]
+        middle = rest.find(" b/")
+        return rest[middle + 3:] if middle >= 0 else rest
+    return header.split(" ", 2)[-1]
+
+
+def _decode(raw: bytes) -> str:
+    return raw.decode("utf-8", "replace").rstrip("\r\n").expandtabs(TAB_SIZE)
+
+
+class DiffDocument:
+    def __init__(self, stream, proc: subprocess.Popen | None = None, on_update=None,
+                 large_bytes: int = LARGE_FILE_BYTES):
+        self.stream = stream
+        self.proc = proc
+        self.on_update = on_update
+        self.large_bytes = large_bytes
+        self.rows = []
+        self.files = []
+        self.error = None
+        self._cond = threading.Condition()
+        self._wanted = LOOKAHEAD
+        self._done = False
+        self._closed = False
+        self._file = None
+        self._thread = threading.Thread(target=self._read, name="diff-reader", daemon=True)
+        self._thread.start()
+
+    @classmethod
+    def from_git(cls, backend, args: list, **kwargs) -> "DiffDocument":
+        proc = backend.popen(["-c", "core.quotePath=false", *args], stdin=subprocess.DEVNULL,
+                             stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+        return cls(proc.stdout, proc=proc, **kwargs)
+
+    @classmethod
+    def from_text(cls, text: str | bytes, **kwargs) -> "DiffDocument":
+        data = text.encode("utf-8") if isinstance(text, str) else text
+        return cls(io.BytesIO(data), **kwargs)
+
+    # ---- 读取线程 ----
+
+    def _read(self):
+        try:
+            for raw in self.stream:
+                with self._cond:
+                    # 折叠的大文件不产生可见行，一直读到它结束，占位行才能显示最终大小
+                    while len(self.rows) >= self._wanted and not self._closed and not self._collapsing():
+                        self._notify()
+                        self._cond.wait()
+                    if self._closed:
+                        return
+                    self._feed(raw)
+        except (OSError, ValueError) as e:
+            self.error = e
+        finally:
+            with self._cond:
+                self._finish_file()
+                self._done = True
+                self._cond.notify_all()
+            if self.on_update is not None and not self._closed:
+                self.on_update()
+
+    def _collapsing(self) -> bool:
+        return self._file is not None and self._file.raw is not None
+
+    def _notify(self):
+        """在锁内调用：读取暂停前通知界面"""
+        self._cond.notify_all()
+        if self.on_update is not None:
+            self.on_update()
+
+    def _feed(self, raw: bytes):
+        if raw.startswith(_FILE_START):
+            self._finish_file()
+            self._file = DiffFile(len(self.files), raw)
+            self.files.append(self._file)
+        file = self._file
+        if file is None:
+            self.rows.append(DiffRow("note", _decode(raw)))
+            return
+        file.nbytes += len(raw)
+        file.nlines += 1
+        if file.raw is not None:
+            if file.nbytes <= MAX_RAW_BYTES:
+                file.raw.append(raw)
+            else:
+                file.truncated += len(raw)
+            return
+        file.pending.append(raw)
+        if file.nbytes > self.large_bytes:
+            # 超过阈值：折叠成占位行，之后的行只保存原始字节
+            file.raw, file.pending = file.pending, []
+            file.placeholder = DiffRow("large", "", file)
+            self.rows.append(DiffRow("file", file.path, file))
+            self.rows.append(file.placeholder)
+            self._update_placeholder(file)
+
+    def _finish_file(self):
+        file = self._file
+        if file is None:
+            return
+        self._file = None
+        file.complete = True
+        if file.raw is not None:
+            self._update_placeholder(file)
+        else:
+            self.rows.extend(self._parse(file, file.pending))
+            file.pending = []
+        self._cond.notify_all()
+
+    @staticmethod
+    def _update_placeholder(file: DiffFile):
+        size = f"{file.nbytes / 1024:.0f} KiB, {file.nlines} 行"
+        if file.complete:
+            file.placeholder.text = f"▸ large diff ({size})，回车展开"
+        else:
+            file.placeholder.text = f"▸ large diff ({size} 以上，读取中…)"
+
+    @staticmethod
+    def _parse(file: DiffFile, lines) -> list:
+        """把一个文件的原始行切分成 DiffRow"""
+        rows = []
+        hunk = None
+        for raw in lines:
+            text = _decode(raw)
+            if hunk is not None and not text.startswith("@@"):
+                # hunk 开始后直到下一个 @@ 都是 hunk 的内容
+                head = text[:hunk.prefix]
+                if head.startswith("\\"):
+                    kind = "meta"           # \ No newline at end of file
+                elif "+" in head:
+                    kind = "add"
+                elif "-" in head:
+                    kind = "del"
+                else:
+                    kind = "ctx"
+                row = DiffRow(kind, text, file, hunk, len(hunk.rows))
+                hunk.rows.append(row)
+                rows.append(row)
+            elif text.startswith("@@"):
+                # @@ 普通 diff；@@@ 合并提交（每多一个父提交多一个 @ 和一列前缀）
+                prefix = len(text) - len(text.lstrip("@")) - 1
+                hunk = Hunk(file, len(file.hunks), max(prefix, 1))
+                file.hunks.append(hunk)
+                rows.append(DiffRow("hunk", text, file, hunk))
+            elif text.startswith(("diff --git ", "diff --cc ", "diff --combined ")):
+                rows.append(DiffRow("file", file.path, file))
+            else:
+                rows.append(DiffRow("meta" if text.startswith(_META) else "note", text, file))
+        return rows
+
+    # ---- 界面接口（VirtualList 数据源协议） ----
+
+    def __len__(self):
+        return len(self.rows)
+
+    def __getitem__(self, i):
+        return self.rows[i]
+
+    @property
+    def exhausted(self) -> bool:
+        return self._done
+
+    def ensure(self, count: int) -> int:
+        """请求至少 count 行；不阻塞，行到达后调用 on_update"""
+        if not self._done and count + LOOKAHEAD > self._wanted:
+            with self._cond:
+                self._wanted = count + LOOKAHEAD
+                self._cond.notify_all()
+        return len(self.rows)
+
+    def load_all(self):
+        """读到末尾（在后台进行，不阻塞）"""
+        self.ensure(1 << 62)
+
+    def wait_for(self, count: int, timeout: float) -> int:
+        """最多等待 timeout 秒直到有 count 行（用于第一屏）"""
+        self.ensure(count)
+        with self._cond:
+            self._cond.wait_for(lambda: len(self.rows) >= count or self._done, timeout)
+            return len(self.rows)
+
+    def expand(self, file: DiffFile) -> bool:
+        """展开折叠的大文件；文件还没读完时返回 False"""
+        with self._cond:
+            if file.raw is None or not file.complete:
+                return False
+            position = self.rows.index(file.placeholder)
+            rows = self._parse(file, file.raw[1:])
+            if file.truncated:
+                rows.append(DiffRow("note", f"… 已截断，另有 {file.truncated / 1024:.0f} KiB 未显示", file))
+            self.rows[position:position + 1] = rows
+            file.raw = None
+            file.placeholder = None
+            return True
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        if self.proc is not None and self.proc.poll() is None:
+            self.proc.kill()
+            self.proc.wait()
+        self._thread.join(timeout=2)
+        if self.proc is not None:
+            self.proc.stdout.close()
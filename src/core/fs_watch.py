@@ -0,0 +1,265 @@
+"""工作区文件变化监视：Linux 上用 inotify（ctypes 调用 libc），其他情况轮询
+
+两种监视器接口相同：
+
+    watcher = open_watcher(repo_path)
+    changes = watcher.read(timeout)   # 变化的相对路径集合；空集合表示超时
+                                      # None 表示事件丢失（队列溢出），需要全量重新扫描
+    watcher.close()
+
+.git 目录内部不监视，只关心 .git/index 和 .git/HEAD（外部的 git add、
+commit、checkout 会改动它们），以 GIT_STATE 这个特殊路径报告。
+"""
+
+import ctypes
+import ctypes.util
+import errno
+import os
+import select
+import struct
+import sys
+import time
+
+GIT_STATE = ".git"
+_GIT_STATE_FILES = ("index", "HEAD")
+
+# <sys/inotify.h>
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+WATCH_MASK = (IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO
+              | IN_CREATE | IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF | IN_ONLYDIR)
+GIT_DIR_MASK = IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_ONLYDIR
+
+_EVENT = struct.Struct("iIII")
+
+
+def _load_libc():
+    if not sys.platform.startswith("linux"):
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        libc.inotify_init1.argtypes = [ctypes.c_int]
+        libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        libc.inotify_rm_watch.argtypes = [ctypes.c_int, ctypes.c_int]
+        return libc
+    except (OSError, AttributeError):
+        return None
+
+
+_libc = None
+
+
+class WatchLimitError(OSError):
+    """inotify 监视数量达到上限（/proc/sys/fs/inotify/max_user_watches）"""
+
+
+class InotifyWatcher:
+    """递归监视工作区的所有目录（inotify 本身不递归，新建的目录随时补上监视）"""
+
+    def __init__(self, root: str, git_dir: str | None = None):
+        global _libc
+        if _libc is None:
+            _libc = _load_libc()
+        if _libc is None:
+            raise OSError(errno.ENOSYS, "inotify 不可用")
+        self.root = os.path.abspath(root)
+        self.git_dir = os.path.abspath(git_dir or os.path.join(self.root, ".git"))
+        self.fd = _libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err))
+        self._dirs = {}       # wd -> 相对目录（根目录为 ""）
+        self._git_wd = None
+        try:
+            self._watch_tree("")
+            self._git_wd = self._add_watch(self.git_dir, GIT_DIR_MASK)
+        except OSError:
+            self.close()
+            raise
+
+    @property
+    def watch_count(self) -> int:
+        return len(self._dirs)
+
+    def _add_watch(self, path: str, mask: int) -> int:
+        wd = _libc.inotify_add_watch(self.fd, os.fsencode(path), mask)
+        if wd < 0:
+            err = ctypes.get_errno()
+            if err == errno.ENOSPC:
+                raise WatchLimitError(err, "inotify 监视数量达到上限")
+            raise OSError(err, os.strerror(err), path)
+        return wd
+
+    def _watch_tree(self, rel: str):
+        """监视 rel 及其下所有目录（跳过 .git）"""
+        stack = [rel]
+        while stack:
+            rel_dir = stack.pop()
+            full = os.path.join(self.root, rel_dir) if rel_dir else self.root
+            try:
+                wd = self._add_watch(full, WATCH_MASK)
+            except WatchLimitError:
+                raise
+            except OSError:
+                continue  # 目录刚被删除
+            self._dirs[wd] = rel_dir
+            try:
+                with os.scandir(full) as it:
+                    for entry in it:
+                        if entry.is_dir(follow_symlinks=False) and not (rel_dir == "" and entry.name == ".git"):
+                            stack.append(f"{rel_dir}/{entry.name}" if rel_dir else entry.name)
+            except OSError:
+                continue
+
+    def fileno(self) -> int:
+        return self.fd
+
+    def read(self, timeout: float | None = None):
+        """等待变化，返回相对路径集合；超时返回空集合，事件溢出返回 None"""
+        if self.fd < 0:
+            return set()
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return set()
+        changes = set()
+        overflow = False
+        while True:
+            try:
+                data = os.read(self.fd, 1 << 16)
+            except BlockingIOError:
+                break
+            except OSError:
+                break
+            offset = 0
+            while offset < len(data):
+                wd, mask, _cookie, length = _EVENT.unpack_from(data, offset)
+                offset += _EVENT.size
+                name = os.fsdecode(data[offset:offset + length].rstrip(b"\0"))
+                offset += length
+                if mask & IN_Q_OVERFLOW:
+                    overflow = True
+                    continue
+                if wd == self._git_wd:
+                    if name in _GIT_STATE_FILES:
+                        changes.add(GIT_STATE)
+                    continue
+                rel_dir = self._dirs.get(wd)
+                if rel_dir is None:
+                    continue
+                if mask & IN_IGNORED:
+                    self._dirs.pop(wd, None)
+                    continue
+                if mask & (IN_DELETE_SELF | IN_MOVE_SELF):
+                    if rel_dir:
+                        changes.add(rel_dir)
+                    continue
+                path = f"{rel_dir}/{name}" if rel_dir else name
+                changes.add(path)
+                if mask & IN_ISDIR and mask & (IN_CREATE | IN_MOVED_TO):
+                    # 新目录：补上监视；监视建立之前写入的文件由目录路径本身覆盖
+                    try:
+                        self._watch_tree(path)
+                    except WatchLimitError:
+                        overflow = True
+            if len(data) < (1 << 16):
+                break
+        return None if overflow else changes
+
+    def close(self):
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+
+
+class PollingWatcher:
+    """没有 inotify 时的退路：每隔 interval 秒比较一次所有文件的 (mtime, size)"""
+
+    def __init__(self, root: str, git_dir: str | None = None, interval: float = 1.0):
+        self.root = os.path.abspath(root)
+        self.git_dir = os.path.abspath(git_dir or os.path.join(self.root, ".git"))
+        self.interval = interval
+        self._snapshot = self._scan()
+        self._next = time.monotonic() + interval
+        self._closed = False
+
+    def _scan(self) -> dict:
+        snapshot = {}
+        stack = [""]
+        while stack:
+            rel_dir = stack.pop()
+            full = os.path.join(self.root, rel_dir) if rel_dir else self.root
+            try:
+                it = os.scandir(full)
+            except OSError:
+                continue
+            with it:
+                for entry in it:
+                    if rel_dir == "" and entry.name == ".git":
+                        continue
+                    rel = f"{rel_dir}/{entry.name}" if rel_dir else entry.name
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            snapshot[rel] = None
+                            stack.append(rel)
+                        else:
+                            st = entry.stat(follow_symlinks=False)
+                            snapshot[rel] = (st.st_mtime_ns, st.st_size, st.st_mode)
+                    except OSError:
+                        continue
+        for name in _GIT_STATE_FILES:
+            try:
+                st = os.stat(os.path.join(self.git_dir, name))
+                snapshot[f"\0{name}"] = (st.st_mtime_ns, st.st_size, st.st_mode)
+            except OSError:
+                pass
+        return snapshot
+
+    def fileno(self):
+        return None
+
+    def read(self, timeout: float | None = None):
+        wait = self._next - time.monotonic()
+        if timeout is not None and wait > timeout:
+            time.sleep(max(timeout, 0))
+            return set()
+        if wait > 0:
+            time.sleep(wait)
+        self._next = time.monotonic() + self.interval
+        if self._closed:
+            return set()
+        old, new = self._snapshot, self._scan()
+        self._snapshot = new
+        changes = set()
+        for path, value in new.items():
+            if old.get(path, 0) != value:
+                changes.add(path)
+        changes.update(path for path in old.keys() - new.keys())
+        if any(path.startswith("\0") for path in changes):
+            changes = {path for path in changes if not path.startswith("\0")}
+            changes.add(GIT_STATE)
+        return changes
+
+    def close(self):
+        self._closed = True
+
+
+def open_watcher(root: str, git_dir: str | None = None, poll_interval: float = 1.0):
+    """优先使用 inotify；不可用或监视数量超限时退回轮询"""
+    try:
+        return InotifyWatcher(root, git_dir)
+    except OSError:
+        return PollingWatcher(root, git_dir, poll_interval)
@@ -0,0 +1,263 @@
+"""模糊搜索索引
+
+    index = FuzzyIndex(items, key=str)
+    result = index.search("cgh")     # 惰性结果序列：len()/下标访问/ensure()/load_all()
+
+匹配规则：查询的每个字符按顺序出现在候选项中（不区分大小写），例如 "cgh" 匹配
+"src/core/graph_cache.py"。候选项的小写键按块（BLOCK 项一块）计算并缓存：每块是用
+换行连接起来的一整段文本，扫描原始列表时正则表达式直接在整块文本上查找，
+没有匹配的行完全在 C 代码里跳过。
+
+每次按键的开销与候选总数无关：
+- 逐字追加查询时，新结果只在上一次的结果里继续筛选（查询变长，匹配集合只会变小），
+  上一次尚未扫描到的部分才回到原始列表继续扫描；退格直接取回之前的结果。
+- 结果是惰性的，只扫描到填满当前视口所需的位置（与 VirtualList 的 ensure 协议一致），
+  因此在 100 万个候选里输入第一个字符也只需检查开头的几十项。
+- 候选数不超过 RANK_LIMIT 时一次算完并按得分排序（连续匹配、单词边界、
+  文件名部分匹配得分高）；更多时保持原始顺序（提交按时间、路径按字典序）。
+
+数据源可以是普通序列，也可以是支持 ensure(count) 的增长型数据源（例如 CommitGraph）。
+"""
+
+import re
+
+RANK_LIMIT = 20_000
+BLOCK = 4096
+CHUNK = 2048
+HISTORY = 64
+
+_BOUNDARY = "/\\_-. :"
+
+
+def _pattern(query: str):
+    """"abc" -> a[^b\\n]*b[^c\\n]*c：不回溯、不跨行的子序列匹配"""
+    if not query:
+        return re.compile("")
+    parts = [re.escape(query[0])]
+    for ch in query[1:]:
+        escaped = re.escape(ch)
+        parts.append(f"[^{escaped}\\n]*{escaped}")
+    return re.compile("".join(parts))
+
+
+def score(key: str, query: str) -> int:
+    """匹配得分，越高越相关；key 和 query 都应是小写"""
+    position = key.find(query)
+    if position >= 0:
+        # 连续子串：越靠前、越靠近文件名开头越好
+        result = 100 + 10 * len(query) - min(position, 50)
+        if position == 0 or key[position - 1] in _BOUNDARY:
+            result += 30
+        if position >= key.rfind("/") + 1:
+            result += 20
+        return result
+    result = 0
+    last = -2
+    start = 0
+    basename = key.rfind("/") + 1
+    for ch in query:
+        position = key.find(ch, start)
+        if position < 0:
+            return -1
+        if position == last + 1:
+            result += 15
+        else:
+            result -= min(position - start, 10)
+        if position == 0 or key[position - 1] in _BOUNDARY:
+            result += 10
+        if position >= basename:
+            result += 3
+        last = position
+        start = position + 1
+    return result
+
+
+def match_positions(key: str, query: str) -> list:
+    """匹配到的字符位置（用于高亮），不匹配时返回空列表"""
+    key = key.lower()
+    query = query.lower()
+    position = key.find(query)
+    if position >= 0:
+        return list(range(position, position + len(query)))
+    positions = []
+    start = 0
+    for ch in query:
+        position = key.find(ch, start)
+        if position < 0:
+            return []
+        positions.append(position)
+        start = position + 1
+    return positions
+
+
+class FuzzyIndex:
+    def __init__(self, source, key=str):
+        self.source = source
+        self.key = key
+        self._blocks = {}         # 块号 -> (小写文本, 各行)，只缓存完整的块
+        self._results = {}        # 查询 -> FuzzyResult（最近 HISTORY 个）
+
+    # ---- 数据源 ----
+
+    def available(self, count: int) -> int:
+        """确保前 count 项可用（增长型数据源会继续加载），返回实际可用数量"""
+        ensure = getattr(self.source, "ensure", None)
+        return ensure(count) if ensure is not None else len(self.source)
+
+    @property
+    def source_exhausted(self) -> bool:
+        return getattr(self.source, "exhausted", True)
+
+    def block(self, number: int):
+        """第 number 块的 (小写文本, 各行)；数据源不足一块时返回已有的部分"""
+        cached = self._blocks.get(number)
+        if cached is not None:
+            return cached
+        start = number * BLOCK
+        stop = min(self.available(start + BLOCK), start + BLOCK)
+        source = self.source
+        items = source[start:stop] if isinstance(source, (list, tuple)) else [source[i] for i in range(start, stop)]
+        keys = list(map(self.key, items))
+        text = "\n".join(keys).lower()
+        lines = text.split("\n")
+        if len(lines) != len(keys):
+            # 键本身含有换行：换成空格，保证一行对应一项
+            text = "\n".join(key.replace("\n", " ") for key in keys).lower()
+            lines = text.split("\n")
+        if not keys:
+            lines = []
+        if len(lines) == BLOCK:
+            self._blocks[number] = (text, lines)
+        return text, lines
+
+    def key_of(self, i: int) -> str:
+        return self.block(i // BLOCK)[1][i % BLOCK]
+
+    def build(self):
+        """预先计算全部小写键（可以放到后台线程中做）"""
+        count = self.available(1 << 62)
+        for number in range((count + BLOCK - 1) // BLOCK):
+            self.block(number)
+
+    # ---- 搜索 ----
+
+    def search(self, query: str) -> "FuzzyResult":
+        query = query.lower()
+        cached = self._results.get(query)
+        if cached is not None:
+            return cached
+        parent = None
+        for length in range(len(query) - 1, 0, -1):
+            parent = self._results.get(query[:length])
+            if parent is not None:
+                break
+        result = FuzzyResult(self, query, parent)
+        if len(self._results) >= HISTORY:
+            self._results.pop(next(iter(self._results)))
+        self._results[query] = result
+        return result
+
+    def clear(self):
+        """数据源内容变化（不只是追加）时调用"""
+        self._blocks.clear()
+        self._results.clear()
+
+
+class FuzzyResult:
+    """一次查询的惰性结果；下标访问返回原始项，indices 为它们在数据源中的下标"""
+
+    def __init__(self, index: FuzzyIndex, query: str, parent: "FuzzyResult | None" = None):
+        self.index = index
+        self.query = query
+        self.pattern = _pattern(query)
+        self.indices = []
+        if parent is not None:
+            # 父查询已经扫描过的区域：只需在它的结果（以及它还没筛选完的候选）里筛选
+            self._pending = parent.indices + parent._pending[parent._pending_pos:]
+            self._cursor = parent._cursor
+        else:
+            self._pending = []
+            self._cursor = 0
+        self._pending_pos = 0
+        self.ranked = False
+        small = (parent is not None and parent.exhausted and len(parent) <= RANK_LIMIT) or (
+            index.source_exhausted and index.available(RANK_LIMIT + 1) <= RANK_LIMIT)
+        if small:
+            self.load_all()
+            self._rank()
+
+    # ---- 扫描 ----
+
+    @property
+    def exhausted(self) -> bool:
+        return (self._pending_pos >= len(self._pending) and self.index.source_exhausted
+                and self._cursor >= self.index.available(self._cursor + 1))
+
+    def _step(self) -> bool:
+        """扫描一块，没有更多可扫描的内容时返回 False"""
+        search = self.pattern.search
+        if self._pending_pos < len(self._pending):
+            start = self._pending_pos
+            self._pending_pos = start + CHUNK
+            key_of = self.index.key_of
+            self.indices.extend(i for i in self._pending[start:start + CHUNK] if search(key_of(i)))
+            if self._pending_pos >= len(self._pending):
+                self._pending = []
+                self._pending_pos = 0
+            return True
+        # 在原始列表的下一块（整段文本）中查找，每行最多记录一次
+        number, skip = divmod(self._cursor, BLOCK)
+        text, lines = self.index.block(number)
+        if skip >= len(lines):
+            return False
+        base = number * BLOCK
+        found = self.indices
+        count = text.count
+        find = text.find
+        line = 0
+        pos = 0
+        if skip:
+            pos = len("\n".join(lines[:skip])) + 1
+            line = skip
+        last = pos
+        while True:
+            match = search(text, pos)
+            if match is None:
+                break
+            begin = match.start()
+            line += count("\n", last, begin)
+            found.append(base + line)
+            end = find("\n", match.end())
+            if end < 0:
+                break
+            pos = last = end + 1
+            line += 1
+        self._cursor = base + len(lines)
+        return True
+
+    def ensure(self, count: int) -> int:
+        while len(self.indices) < count and self._step():
+            pass
+        return len(self.indices)
+
+    def load_all(self):
+        while self._step():
+            pass
+
+    def _rank(self):
+        key_of = self.index.key_of
+        query = self.query
+        scored = sorted(self.indices, key=lambda i: -score(key_of(i), query))
+        self.indices = scored
+        self.ranked = True
+
+    # ---- 序列协议 ----
+
+    def __len__(self):
+        return len(self.indices)
+
+    def __getitem__(self, i):
+        return self.index.source[self.indices[i]]
+
+    def source_index(self, i: int) -> int:
+        return self.indices[i]
@@ -0,0 +1,360 @@
+"""git 后端：所有 git 调用的统一入口
+
+一次性命令（init、version、rev-list 等）仍然各自启动进程（界面中用
+`run_async`/`stream_async`，以 asyncio 子进程运行，不阻塞按键处理），但读取对象
+这种高频请求通过每个仓库常驻的 `git cat-file --batch` 和
+`git cat-file --batch-check` 进程完成：请求写入管道，响应按顺序读回，
+多个线程可以同时提交请求而不必各自等待一次完整的往返。
+按完整 SHA 读取的对象放进共享的 "object" 缓存（core.object_cache），
+再次读取不必经过 cat-file。
+"""
+
+import asyncio
+import collections
+import os
+import re
+import subprocess
+import threading
+from concurrent.futures import Future
+from typing import NamedTuple, Optional
+
+from . import profiling
+from .object_cache import cache as shared_cache, is_sha
+
+
+class GitError(subprocess.CalledProcessError):
+    """git 命令失败；兼容原来捕获 CalledProcessError 的代码"""
+
+    def __str__(self):
+        detail = (self.stderr or "").strip()
+        return f"{' '.join(self.cmd)} 失败 (退出码 {self.returncode}){': ' + detail if detail else ''}"
+
+
+def error_line(stderr: str) -> str:
+    """stderr 中最能说明问题的一行：优先 fatal:/error:，否则最后一行"""
+    lines = [line.strip() for line in stderr.splitlines() if line.strip()]
+    for line in lines:
+        if line.startswith(("fatal:", "error:")):
+            return line
+    return lines[-1] if lines else ""
+
+
+class ObjectInfo(NamedTuple):
+    sha: str
+    type: str
+    size: int
+
+
+class GitObject(NamedTuple):
+    sha: str
+    type: str
+    size: int
+    data: bytes
+
+    def text(self, encoding: str = "utf-8") -> str:
+        return self.data.decode(encoding, "replace")
+
+
+# 每个缓存条目除数据外的大致开销（元组、SHA 字符串等）
+_ENTRY_OVERHEAD = 200
+# read_many 同时在途的请求数上限（已读回但未取走的对象都在内存中）
+READ_WINDOW = 256
+
+
+class CatFileProcess:
+    """一个常驻的 `git cat-file --batch[-check]` 进程
+
+    写请求在写锁内完成，并把对应的 Future 放入队列；读线程按顺序读取
+    响应并完成 Future。git 按请求顺序输出，所以不需要请求编号。
+    队列有自己的锁，从不在管道读写期间持有：git 的 stdout 写满时写请求会
+    阻塞在 stdin 上，读线程必须仍能取出 Future 并继续读取。
+    """
+
+    def __init__(self, repo_path: str, with_data: bool):
+        self.repo_path = repo_path
+        self.with_data = with_data
+        self._write_lock = threading.Lock()
+        self._pending_lock = threading.Lock()
+        self._pending = None
+        self._proc = None
+        self._reader = None
+
+    def _start(self):
+        mode = "--batch" if self.with_data else "--batch-check"
+        self._proc = subprocess.Popen(
+            ["git", "cat-file", mode],
+            cwd=self.repo_path,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+        )
+        # 每个进程一条独立的等待队列，重启后旧读线程不会误伤新请求
+        self._pending = collections.deque()
+        self._reader = threading.Thread(target=self._read_loop, args=(self._proc, self._pending), daemon=True)
+        self._reader.start()
+
+    def _read_loop(self, proc, pending):
+        stdout = proc.stdout
+        while True:
+            header = stdout.readline()
+            if not header:
+                break
+            with self._pending_lock:
+                future = pending.popleft() if pending else None
+            line = header.rstrip(b"\n")
+            try:
+                # "<rev> missing" 中的 rev 可能是含空格的 rev:path，不能按空格数判断
+                if line.endswith((b" missing", b" ambiguous")):
+                    result = None
+                else:
+                    sha, obj_type, size = line.decode("utf-8", "replace").split()
+                    size = int(size)
+                    if self.with_data:
+                        data = stdout.read(size)
+                        stdout.read(1)  # 结尾换行
+                        result = GitObject(sha, obj_type, size, data)
+                    else:
+                        result = ObjectInfo(sha, obj_type, size)
+            except (IndexError, ValueError) as e:
+                result = e
+            if future is not None:
+                if isinstance(result, Exception):
+                    future.set_exception(result)
+                else:
+                    future.set_result(result)
+        # 进程退出：未完成的请求全部失败
+        proc.wait()
+        with self._pending_lock:
+            failed = list(pending)
+            pending.clear()
+        for future in failed:
+            future.set_exception(GitError(proc.returncode or -1, ["git", "cat-file"], stderr="cat-file 进程已退出"))
+
+    def submit(self, rev: str) -> Future:
+        if "\n" in rev:
+            raise ValueError("rev 不能包含换行")
+        future = Future()
+        with self._write_lock:
+            if self._proc is None or self._proc.poll() is not None:
+                self._start()
+            pending = self._pending
+            # 先入队再写：队列顺序与写入顺序一致
+            with self._pending_lock:
+                pending.append(future)
+            try:
+                self._proc.stdin.write(rev.encode("utf-8") + b"\n")
+                self._proc.stdin.flush()
+            except OSError as e:
+                with self._pending_lock:
+                    try:
+                        pending.remove(future)
+                    except ValueError:
+                        pass        # 读线程已在进程退出时让它失败
+                if not future.done():
+                    future.set_exception(e)
+        return future
+
+    def close(self):
+        with self._write_lock:
+            proc, self._proc = self._proc, None
+        if proc is not None:
+            try:
+                proc.stdin.close()
+            except OSError:
+                pass
+            proc.wait()
+
+
+class GitBackend:
+    """每个仓库一个实例，通过 `GitBackend.for_repo(path)` 获取"""
+
+    _instances: dict = {}
+    _instances_lock = threading.Lock()
+
+    def __init__(self, repo_path: str = "."):
+        self.repo_path = repo_path
+        self._batch = CatFileProcess(repo_path, with_data=True)
+        self._batch_check = CatFileProcess(repo_path, with_data=False)
+
+    @classmethod
+    def for_repo(cls, repo_path: str) -> "GitBackend":
+        key = os.path.abspath(repo_path)
+        with cls._instances_lock:
+            backend = cls._instances.get(key)
+            if backend is None:
+                backend = cls._instances[key] = cls(key)
+            return backend
+
+    @classmethod
+    def close_all(cls):
+        with cls._instances_lock:
+            backends, cls._instances = list(cls._instances.values()), {}
+        for backend in backends:
+            backend.close()
+
+    # ---- 一次性命令 ----
+
+    def run(self, args: list, input: Optional[str | bytes] = None, check: bool = True) -> str:
+        """运行 `git <args>` 并返回 stdout；失败时抛出 GitError
+
+        input 为 bytes 时原样写入（例如 fast-import 流：其中的长度按字节计，
+        不能经过文本模式的编码和换行转换）。
+        """
+        cmd = ["git", *args]
+        binary = isinstance(input, bytes)
+        text = {} if binary else {"text": True, "encoding": "utf-8", "errors": "replace"}
+        with profiling.span("git", _label(args)):
+            result = subprocess.run(cmd, cwd=self.repo_path, input=input, capture_output=True, **text)
+        stdout, stderr = result.stdout, result.stderr
+        if binary:
+            stdout, stderr = stdout.decode("utf-8", "replace"), stderr.decode("utf-8", "replace")
+        if check and result.returncode != 0:
+            raise GitError(result.returncode, cmd, output=stdout, stderr=stderr)
+        return stdout
+
+    def popen(self, args: list, **kwargs) -> subprocess.Popen:
+        """启动流式读取输出的 git 进程（例如 log）"""
+        kwargs.setdefault("cwd", self.repo_path)
+        proc = subprocess.Popen(["git", *args], **kwargs)
+        profiling.watch_process(proc, _label(args))
+        return proc
+
+    # ---- 异步命令（界面事件循环中使用） ----
+
+    async def run_async(self, args: list, input: Optional[str] = None, check: bool = True) -> str:
+        """`run` 的 asyncio 版本；任务被取消时结束 git 进程"""
+        return await self.stream_async(args, on_line=None, input=input, check=check)
+
+    async def stream_async(self, args: list, on_line, input: Optional[str] = None, check: bool = True) -> str:
+        """运行 git，把 stderr 的每一行（进度信息以 \r 分隔）交给 on_line
+
+        返回 stdout；失败时抛出 GitError。
+        """
+        cmd = ["git", *args]
+        with profiling.span("git", _label(args)):
+            stdout, stderr_lines, returncode = await self._communicate_async(cmd, on_line, input)
+        output = stdout.decode("utf-8", "replace")
+        if check and returncode != 0:
+            raise GitError(returncode, cmd, output=output, stderr="\n".join(stderr_lines[-20:]))
+        return output
+
+    async def _communicate_async(self, cmd: list, on_line, input: Optional[str]):
+        proc = await asyncio.create_subprocess_exec(
+            *cmd, cwd=self.repo_path,
+            stdin=asyncio.subprocess.PIPE if input is not None else asyncio.subprocess.DEVNULL,
+            stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE,
+        )
+        stderr_lines = []
+
+        def collect(line):
+            stderr_lines.append(line)
+            if on_line is not None:
+                on_line(line)
+
+        try:
+            if input is not None:
+                proc.stdin.write(input.encode("utf-8"))
+                await proc.stdin.drain()
+                proc.stdin.close()
+            stdout, _ = await asyncio.gather(proc.stdout.read(), _read_lines(proc.stderr, collect))
+            returncode = await proc.wait()
+        except asyncio.CancelledError:
+            if proc.returncode is None:
+                proc.kill()
+                await proc.wait()
+            raise
+        return stdout, stderr_lines, returncode
+
+    # ---- 对象读取（常驻进程） ----
+
+    def info(self, rev: str) -> Optional[ObjectInfo]:
+        """对象类型和大小，对象不存在时返回 None"""
+        if is_sha(rev):
+            objects = shared_cache("object")
+            # 已经读过完整对象时直接从中取类型和大小
+            key = rev if objects.peek(rev) is not None else ("info", rev)
+            cached = objects.get(key)
+            if cached is not None:
+                return ObjectInfo(cached.sha, cached.type, cached.size)
+            with profiling.span("git", "cat-file --batch-check"):
+                info = self._batch_check.submit(rev).result()
+            if info is not None:
+                objects.put(("info", rev), info, _ENTRY_OVERHEAD)
+            return info
+        with profiling.span("git", "cat-file --batch-check"):
+            return self._batch_check.submit(rev).result()
+
+    def read(self, rev: str) -> Optional[GitObject]:
+        """读取对象内容，对象不存在时返回 None"""
+        return self.read_many([rev])[0]
+
+    def read_many(self, revs: list) -> list:
+        """流水线方式读取多个对象：每次写入 READ_WINDOW 个请求，再依次取回；已缓存的对象不再读取"""
+        objects = shared_cache("object")
+        results = [objects.get(rev) if is_sha(rev) else None for rev in revs]
+        todo = [i for i, result in enumerate(results) if result is None]
+        if not todo:
+            return results
+        with profiling.span("git", "cat-file --batch"):
+            for start in range(0, len(todo), READ_WINDOW):
+                window = todo[start:start + READ_WINDOW]
+                futures = [self._batch.submit(revs[i]) for i in window]
+                for i, future in zip(window, futures):
+                    obj = results[i] = future.result()
+                    if obj is not None and is_sha(revs[i]):
+                        objects.put(revs[i], obj, len(obj.data) + _ENTRY_OVERHEAD)
+        return results
+
+    def read_text(self, rev: str) -> Optional[str]:
+        obj = self.read(rev)
+        return obj.text() if obj is not None else None
+
+    def close(self):
+        self._batch.close()
+        self._batch_check.close()
+
+
+_LINE_SPLIT = re.compile(rb"[\r\n]")
+
+
+def _label(args: list) -> str:
+    """性能记录中 git 命令的名称：跳过 -c 配置，取子命令"""
+    i = 0
+    while i < len(args) and args[i] == "-c":
+        i += 2
+    return f"git {args[i]}" if i < len(args) else "git"
+
+
+async def _read_lines(stream, on_line):
+    """按 \r 或 \n 切分流，git 的进度行用 \r 原地刷新"""
+    buffer = b""
+    while True:
+        chunk = await stream.read(4096)
+        if not chunk:
+            break
+        parts = _LINE_SPLIT.split(buffer + chunk)
+        buffer = parts.pop()
+        for part in parts:
+            if part:
+                on_line(part.decode("utf-8", "replace"))
+    if buffer:
+        on_line(buffer.decode("utf-8", "replace"))
+
+
+def git_version() -> str:
+    """返回 git 版本号（主.次.修订），git 不可用时返回 "unknown"
+
+    结果按 git 可执行文件的路径和 mtime 缓存，见 core.git_version。
+    """
+    from .git_version import git_version as cached
+
+    return cached()
+
+
+def init_repository(path: str) -> str:
+    """在 path 执行 git init，返回 git 的输出"""
+    return GitBackend(path).run(["init"])
+
+
+async def init_repository_async(path: str) -> str:
+    return await GitBackend(path).run_async(["init"])
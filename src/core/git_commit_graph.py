@@ -0,0 +1,138 @@
+"""读取 git 自带的 commit-graph 文件（.git/objects/info/commit-graph）
+
+文件格式见 git 文档 gitformat-commit-graph(5)。这里只实现单文件格式，
+通过 mmap 按需读取，用于在不启动 git 的情况下查询父提交和代数号，
+判断缓存中的旧引用是否仍然可达。commit-graph 链（split graph）不支持，
+此时 `open_commit_graph` 返回 None，由调用方回退到 git 命令。
+"""
+
+import mmap
+import os
+import struct
+
+from .refs import common_dir, git_dir
+
+SIGNATURE = b"CGPH"
+PARENT_NONE = 0x70000000
+EXTRA_EDGES = 0x80000000
+LAST_EDGE = 0x80000000
+
+
+class CommitGraphFile:
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        mm = self._mm
+        if mm[:4] != SIGNATURE:
+            raise ValueError("不是 commit-graph 文件")
+        version, hash_version, num_chunks = mm[4], mm[5], mm[6]
+        if version != 1:
+            raise ValueError(f"不支持的 commit-graph 版本: {version}")
+        self.hash_size = 20 if hash_version == 1 else 32
+
+        chunks = {}
+        for i in range(num_chunks + 1):
+            chunk_id, offset = struct.unpack_from(">4sQ", mm, 8 + i * 12)
+            chunks[chunk_id] = offset
+        self._fanout = chunks[b"OIDF"]
+        self._oids = chunks[b"OIDL"]
+        self._data = chunks[b"CDAT"]
+        self._edges = chunks.get(b"EDGE")
+        self.count = struct.unpack_from(">I", mm, self._fanout + 255 * 4)[0]
+
+    def close(self):
+        self._mm.close()
+
+    def oid(self, pos: int) -> bytes:
+        start = self._oids + pos * self.hash_size
+        return self._mm[start:start + self.hash_size]
+
+    def lookup(self, sha: str) -> int:
+        """返回提交在文件中的位置，不存在返回 -1（按 fanout 表二分查找）"""
+        key = bytes.fromhex(sha)
+        mm = self._mm
+        first = key[0]
+        lo = struct.unpack_from(">I", mm, self._fanout + (first - 1) * 4)[0] if first else 0
+        hi = struct.unpack_from(">I", mm, self._fanout + first * 4)[0]
+        while lo < hi:
+            mid = (lo + hi) // 2
+            value = self.oid(mid)
+            if value < key:
+                lo = mid + 1
+            elif value > key:
+                hi = mid
+            else:
+                return mid
+        return -1
+
+    def _record(self, pos: int) -> tuple:
+        return struct.unpack_from(">IIII", self._mm, self._data + pos * (self.hash_size + 16) + self.hash_size)
+
+    def parents(self, pos: int) -> list:
+        p1, p2, _gen_hi, _time_lo = self._record(pos)
+        result = []
+        if p1 != PARENT_NONE:
+            result.append(p1)
+        if p2 == PARENT_NONE:
+            return result
+        if not p2 & EXTRA_EDGES:
+            result.append(p2)
+            return result
+        index = p2 & ~EXTRA_EDGES
+        while True:
+            edge = struct.unpack_from(">I", self._mm, self._edges + index * 4)[0]
+            result.append(edge & ~LAST_EDGE)
+            if edge & LAST_EDGE:
+                return result
+            index += 1
+
+    def generation(self, pos: int) -> int:
+        """拓扑层级（祖先的代数号一定更小）"""
+        return self._record(pos)[2] >> 2
+
+    def commit_time(self, pos: int) -> int:
+        _p1, _p2, gen_hi, time_lo = self._record(pos)
+        return ((gen_hi & 0x3) << 32) | time_lo
+
+    def is_reachable(self, target: str, tips: list):
+        """判断 target 是否可从 tips 到达
+
+        返回 True/False；有提交不在文件中（图比引用旧）时返回 None。
+        利用代数号剪枝：代数号不大于目标的提交不可能以目标为祖先。
+        """
+        goal = self.lookup(target)
+        if goal < 0:
+            return None
+        goal_gen = self.generation(goal)
+        stack = []
+        for tip in tips:
+            pos = self.lookup(tip)
+            if pos < 0:
+                return None
+            stack.append(pos)
+        seen = set()
+        while stack:
+            pos = stack.pop()
+            if pos == goal:
+                return True
+            if pos in seen or self.generation(pos) <= goal_gen:
+                continue
+            seen.add(pos)
+            stack.extend(self.parents(pos))
+        return False
+
+
+def commit_graph_path(repo_path: str) -> str:
+    return os.path.join(common_dir(git_dir(repo_path)), "objects", "info", "commit-graph")
+
+
+def open_commit_graph(repo_path: str):
+    """打开仓库的 commit-graph 文件，不存在或格式不支持时返回 None"""
+    try:
+        path = commit_graph_path(repo_path)
+        if not os.path.isfile(path):
+            return None
+        return CommitGraphFile(path)
+    except (OSError, ValueError, KeyError, struct.error):
+        return None
@@ -0,0 +1,106 @@
+"""git 版本探测（带缓存，可在后台进行）
+
+启动 `git version` 进程要几十毫秒，而 git 本身很少变化。结果按 git 可执行文件的
+路径和修改时间缓存在用户数据目录中；git 升级后 mtime 改变，缓存自然失效。
+
+这个模块在显示启动横幅之前导入，因此刻意避开 json、shutil、re 等导入较慢的
+标准库模块：缓存是一行以制表符分隔的文本，subprocess、threading 用到时才导入。
+"""
+
+import os
+import sys
+
+from .paths import data_dir
+
+CACHE_FILE = "git-version.tsv"
+UNKNOWN = "unknown"
+
+
+def _which_git() -> str | None:
+    """在 PATH 中查找 git（shutil.which 的精简版）"""
+    names = ["git.exe", "git.cmd"] if sys.platform == "win32" else ["git"]
+    for directory in os.environ.get("PATH", os.defpath).split(os.pathsep):
+        for name in names:
+            candidate = os.path.join(directory, name)
+            if os.path.isfile(candidate) and os.access(candidate, os.X_OK):
+                return candidate
+    return None
+
+
+def _git_key(git_path: str | None = None):
+    """返回 (git 路径, mtime_ns, 大小)；找不到 git 时返回 None"""
+    path = git_path or _which_git()
+    if not path:
+        return None
+    path = os.path.realpath(path)
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return path, st.st_mtime_ns, st.st_size
+
+
+def _cache_path() -> str:
+    return os.path.join(data_dir(), CACHE_FILE)
+
+
+def _short(version: str) -> str:
+    version = version.strip().replace("git version ", "")
+    parts = version.split(".")
+    return ".".join(parts[:3]) if len(parts) >= 3 else version
+
+
+def cached_git_version(git_path: str | None = None) -> str | None:
+    """只查缓存：命中返回版本号，未命中（或 git 已变化）返回 None"""
+    key = _git_key(git_path)
+    if key is None:
+        return UNKNOWN
+    try:
+        with open(_cache_path(), encoding="utf-8") as f:
+            fields = f.readline().rstrip("\n").split("\t")
+    except OSError:
+        return None
+    if len(fields) != 4 or fields[:3] != [str(part) for part in key]:
+        return None
+    return fields[3]
+
+
+def probe_git_version(git_path: str | None = None) -> str:
+    """运行 `git version` 并写入缓存，git 不可用时返回 "unknown" """
+    import subprocess
+
+    key = _git_key(git_path)
+    if key is None:
+        return UNKNOWN
+    try:
+        out = subprocess.run([key[0], "version"], capture_output=True, text=True, check=True).stdout
+    except (OSError, subprocess.CalledProcessError):
+        return UNKNOWN
+    version = _short(out)
+    path = _cache_path()
+    tmp = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write("\t".join([*(str(part) for part in key), version]) + "\n")
+        os.replace(tmp, path)
+    except OSError:
+        pass
+    return version
+
+
+def git_version(git_path: str | None = None) -> str:
+    """返回 git 版本号，优先使用缓存"""
+    return cached_git_version(git_path) or probe_git_version(git_path)
+
+
+def probe_in_background(on_ready, git_path: str | None = None):
+    """在守护线程中探测 git 版本（结果写入缓存），完成后调用 on_ready(version)
+
+    返回线程对象，可以 join() 等待结果写入缓存。
+    """
+    import threading
+
+    thread = threading.Thread(target=lambda: on_ready(probe_git_version(git_path)),
+                              name="git-version", daemon=True)
+    thread.start()
+    return thread
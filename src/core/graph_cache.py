@@ -0,0 +1,185 @@
+"""提交图的持久化磁盘缓存
+
+缓存文件位于用户数据目录的 graph-cache/ 下，每个仓库一个文件，
+以仓库绝对路径的哈希命名；文件中记录写入时的引用快照（HEAD、
+packed-refs 和松散引用的 SHA）。
+
+再次打开仓库时：
+    没有新提交      通过 mmap 读入各列，直接得到完整布局好的提交图
+    引用有新提交    只让 git 遍历新引用可达、旧引用不可达的提交，
+                    新提交排在前面，缓存中的旧提交接在后面重新布局
+    引用被回退/删除  旧提交可能已不可达，放弃缓存重新遍历
+
+如果仓库带有 git 自己的 commit-graph 文件，旧引用是否仍可达直接
+通过它判断，不需要启动 git。
+"""
+
+import hashlib
+import json
+import mmap
+import os
+import struct
+import sys
+
+from .commit_graph import CommitGraph, LogEntry, iter_commits
+from .commit_store import CommitStore
+from .git_backend import GitBackend, GitError
+from .git_commit_graph import open_commit_graph
+from .paths import data_dir
+from .refs import read_ref_tips
+
+MAGIC = b"GTUIGC1\n"
+FORMAT_VERSION = 1
+
+
+class GraphCache:
+    def __init__(self, root: str | None = None):
+        self.root = root or data_dir("graph-cache")
+
+    def path_for(self, repo_path: str) -> str:
+        key = os.path.normcase(os.path.abspath(repo_path))
+        return os.path.join(self.root, hashlib.sha1(key.encode("utf-8")).hexdigest() + ".bin")
+
+    # ---- 读写 ----
+
+    def save(self, graph: CommitGraph) -> bool:
+        """把完整读取的提交图写入缓存（写临时文件后原子替换）"""
+        if not graph.exhausted or graph.tips is None or graph.from_cache:
+            return False
+        store = graph.rows
+        columns = store.to_columns()
+        layout = []
+        offset = 0
+        for name, view in columns.items():
+            layout.append([name, offset, view.nbytes])
+            offset += view.nbytes
+        header = json.dumps({
+            "version": FORMAT_VERSION,
+            "repo": os.path.abspath(graph.repo_path),
+            "tips": graph.tips,
+            "hash_size": store.hash_size,
+            "byteorder": sys.byteorder,
+            "authors": store.authors,
+            "columns": layout,
+        }).encode("utf-8")
+
+        path = self.path_for(graph.repo_path)
+        tmp = path + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(MAGIC)
+            f.write(struct.pack("<I", len(header)))
+            f.write(header)
+            for view in columns.values():
+                f.write(view)
+        os.replace(tmp, path)
+        return True
+
+    def load(self, repo_path: str):
+        """通过 mmap 读取缓存，返回 (CommitStore, tips)，无有效缓存时返回 None"""
+        path = self.path_for(repo_path)
+        try:
+            f = open(path, "rb")
+        except FileNotFoundError:
+            return None
+        try:
+            with f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                if mm[:len(MAGIC)] != MAGIC:
+                    return None
+                (header_len,) = struct.unpack_from("<I", mm, len(MAGIC))
+                body = len(MAGIC) + 4 + header_len
+                header = json.loads(mm[len(MAGIC) + 4:body])
+                if (header.get("version") != FORMAT_VERSION
+                        or header.get("byteorder") != sys.byteorder
+                        or header.get("repo") != os.path.abspath(repo_path)):
+                    return None
+                view = memoryview(mm)
+                columns = {}
+                try:
+                    columns = {name: view[body + start:body + start + size]
+                               for name, start, size in header["columns"]}
+                    store = CommitStore.from_columns(header["hash_size"], columns, header["authors"])
+                finally:
+                    for column in columns.values():
+                        column.release()
+                    view.release()
+                return store, header["tips"]
+        except (ValueError, KeyError, struct.error, OSError):
+            return None
+
+    # ---- 打开仓库 ----
+
+    def open(self, repo_path: str) -> CommitGraph:
+        """打开仓库的提交图：尽量复用缓存，只解析新增的提交"""
+        tips = read_ref_tips(repo_path)
+        cached = self.load(repo_path)
+        graph = None
+        if cached is not None:
+            store, old_tips = cached
+            delta = tip_delta(repo_path, old_tips, tips)
+            if delta is not None:
+                fresh, old_shas = delta
+                if not fresh:
+                    # 引用可能改名、删除或前移到已有提交，但可达的提交集合没变
+                    graph = CommitGraph.from_store(repo_path, store)
+                    graph.from_cache = old_tips == tips
+                else:
+                    new_entries = iter_commits(repo_path, revs=(), stdin_revs=new_commit_revs(fresh, old_shas))
+                    graph = CommitGraph(repo_path, entries=_chain(new_entries, store))
+        if graph is None:
+            graph = CommitGraph(repo_path)
+        graph.tips = tips
+        return graph
+
+
+def tip_delta(repo_path: str, old_tips: dict, tips: dict):
+    """比较两次引用快照（read_ref_tips 的结果）
+
+    返回 (新增的引用 SHA, 旧快照的全部 SHA)，两者都已排序；新提交就是前者可达、
+    后者不可达的提交（见 new_commit_revs）。旧引用指向的提交已不可达
+    （强制推送、删除分支等）时返回 None，调用方应放弃缓存重新读取。
+    """
+    new_shas = set(tips.values())
+    old_shas = set(old_tips.values())
+    if not still_reachable(repo_path, old_shas - new_shas, sorted(new_shas)):
+        return None
+    return sorted(new_shas - old_shas), sorted(old_shas)
+
+
+def new_commit_revs(fresh: list, old_shas: list) -> tuple:
+    """tip_delta 的结果转成 `git log --stdin` 的输入：只遍历新提交"""
+    return (*fresh, *("^" + sha for sha in old_shas))
+
+
+def still_reachable(repo_path: str, targets: set, tips: list) -> bool:
+    """判断旧引用指向的提交是否都还能从当前引用到达"""
+    if not targets:
+        return True
+    undecided = []
+    commit_graph = open_commit_graph(repo_path)
+    try:
+        for target in targets:
+            reachable = commit_graph.is_reachable(target, tips) if commit_graph else None
+            if reachable is False:
+                return False
+            if reachable is None:
+                undecided.append(target)
+    finally:
+        if commit_graph is not None:
+            commit_graph.close()
+    if not undecided:
+        return True
+    try:
+        count = GitBackend.for_repo(repo_path).run(
+            ["rev-list", "--count", "--stdin"],
+            input="\n".join([*undecided, *("^" + sha for sha in tips)]) + "\n",
+        )
+    except (OSError, GitError):
+        return False
+    return count.strip() == "0"
+
+
+def _chain(new_entries, store: CommitStore):
+    """新提交在前，缓存中的旧提交在后（旧提交不可能是新提交的后代）"""
+    yield from new_entries
+    for entry in store.iter_entries():
+        yield LogEntry(*entry)
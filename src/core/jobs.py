@@ -0,0 +1,301 @@
+"""批量 git 操作：在登记的多个仓库上并行执行 fetch / pull / gc
+
+    scheduler = JobScheduler(limits={"network": 4, "cpu": 2}, retries=2, on_update=refresh)
+    jobs = scheduler.plan(paths, ["fetch", "gc"])     # 每个仓库按顺序执行各个操作
+    report = await scheduler.run(jobs)
+    print("\\n".join(report.format()))
+    python -m core.jobs fetch gc                      # 对工作区中全部仓库执行
+
+- 操作分两类：fetch / pull 主要在等网络（network），gc 主要占 CPU 和磁盘（cpu）。
+  两类各有并发上限、互不占用名额，一批仓库 gc 的同时其他仓库可以继续 fetch；
+- 同一仓库的操作按顺序执行（git 会为 gc、pull 加锁），前一个失败时后面的跳过；
+- 失败时按错误信息判断是否重试：网络中断、超时、锁冲突这类暂时性错误按指数退避
+  （带随机抖动）重试，认证失败、远程仓库不存在、无法快进等直接失败；
+  等待重试期间不占并发名额；
+- git 的 stderr 逐行（包括以 \\r 刷新的进度）记进 Job，进度行解析成 CloneProgress，
+  每次变化调用 on_update(job)（在事件循环线程中）；
+- 结束后得到 BatchReport：各操作各状态的数量、失败原因、重试次数和总耗时。
+"""
+
+import asyncio
+import collections
+import os
+import random
+import sys
+import time
+from typing import NamedTuple, Optional
+
+from .clone import parse_progress
+from .git_backend import GitBackend, GitError, error_line
+
+NETWORK = "network"
+CPU = "cpu"
+DEFAULT_LIMITS = {NETWORK: 4, CPU: 2}
+
+# 每个作业保留的输出行数
+OUTPUT_LINES = 50
+
+QUEUED = "queued"
+RUNNING = "running"
+RETRYING = "retrying"
+DONE = "done"
+FAILED = "failed"
+SKIPPED = "skipped"
+CANCELLED = "cancelled"
+FINISHED = (DONE, FAILED, SKIPPED, CANCELLED)
+
+
+class Operation(NamedTuple):
+    name: str
+    args: tuple
+    kind: str               # NETWORK 或 CPU，决定占用哪一类并发名额
+    timeout: float          # 单次尝试的超时（秒）
+
+
+OPERATIONS = {
+    "fetch": Operation("fetch", ("fetch", "--all", "--prune", "--progress"), NETWORK, 600.0),
+    "pull": Operation("pull", ("pull", "--ff-only", "--progress"), NETWORK, 600.0),
+    "gc": Operation("gc", ("gc",), CPU, 1800.0),
+}
+
+# 重试也不会成功的错误（优先判断）
+_PERMANENT = (
+    "authentication failed", "permission denied", "repository not found",
+    "does not appear to be a git repository", "not a git repository", "couldn't find remote ref",
+    "not possible to fast-forward", "would be overwritten", "no tracking information",
+    "no remote repository specified", "you are not currently on a branch",
+)
+# CPU 类操作只在这些情况下重试（另一个 git 进程持有锁）
+_LOCKED = ("index.lock", ".lock': file exists", "another git process", "cannot lock ref",
+           "gc is already running")
+
+
+def is_transient(kind: str, stderr: str) -> bool:
+    """失败是否值得重试：网络操作除明确的永久错误外都重试，CPU 操作只重试锁冲突"""
+    text = stderr.lower()
+    if any(pattern in text for pattern in _PERMANENT):
+        return False
+    if any(pattern in text for pattern in _LOCKED):
+        return True
+    return kind == NETWORK
+
+
+class Job:
+    """一个仓库上的一个操作"""
+
+    def __init__(self, path: str, operation: Operation, name: Optional[str] = None):
+        self.path = path
+        self.name = name or os.path.basename(path.rstrip(os.sep)) or path
+        self.operation = operation
+        self.state = QUEUED
+        self.attempts = 0
+        self.progress = None        # 最近一行进度（CloneProgress）
+        self.lines = collections.deque(maxlen=OUTPUT_LINES)
+        self.error = None
+        self.retry_at = None        # 下次重试的时间（time.time()）
+        self.started = None
+        self.finished = None
+
+    @property
+    def finished_state(self) -> bool:
+        return self.state in FINISHED
+
+    @property
+    def elapsed(self) -> float:
+        if self.started is None:
+            return 0.0
+        return (self.finished or time.perf_counter()) - self.started
+
+    def status_text(self) -> str:
+        """界面中一行的状态说明"""
+        if self.state == RUNNING and self.progress is not None:
+            return self.progress.format()
+        if self.state == RUNNING:
+            return self.lines[-1] if self.lines else "…"
+        if self.state == RETRYING:
+            wait = max(0.0, (self.retry_at or 0) - time.time())
+            return f"{wait:.0f}s 后第 {self.attempts + 1} 次尝试：{self.error}"
+        if self.state in (FAILED, SKIPPED):
+            return self.error or ""
+        return ""
+
+
+class BatchReport(NamedTuple):
+    jobs: list
+    elapsed: float
+    peak: dict              # 各类操作实际达到的最大并发数
+
+    def counts(self) -> dict:
+        """{操作名: {状态: 数量}}"""
+        counts = {}
+        for job in self.jobs:
+            by_state = counts.setdefault(job.operation.name, collections.Counter())
+            by_state[job.state] += 1
+        return counts
+
+    @property
+    def failures(self) -> list:
+        return [job for job in self.jobs if job.state == FAILED]
+
+    @property
+    def retries(self) -> int:
+        return sum(max(job.attempts - 1, 0) for job in self.jobs)
+
+    @property
+    def ok(self) -> bool:
+        return all(job.state == DONE for job in self.jobs)
+
+    def format(self) -> list:
+        lines = []
+        for name, by_state in self.counts().items():
+            parts = ", ".join(f"{by_state[state]} {state}" for state in (DONE, *FINISHED[1:], QUEUED, RUNNING)
+                              if by_state[state])
+            lines.append(f"{name:<6} {parts}")
+        peak = " / ".join(f"{self.peak.get(kind, 0)} {kind}" for kind in (NETWORK, CPU))
+        lines.append(f"{len(self.jobs)} 个作业，用时 {self.elapsed:.1f}s，重试 {self.retries} 次，最大并发 {peak}")
+        for job in self.failures:
+            lines.append(f"✗ {job.name} {job.operation.name}（{job.attempts} 次）：{job.error}")
+        return lines
+
+
+class JobScheduler:
+    def __init__(self, limits: Optional[dict] = None, retries: int = 2, backoff: float = 1.0,
+                 max_backoff: float = 30.0, jitter: float = 0.2, on_update=None):
+        self.limits = {**DEFAULT_LIMITS, **(limits or {})}
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.jitter = jitter
+        self.on_update = on_update
+        self.running = {kind: 0 for kind in self.limits}
+        self.peak = {kind: 0 for kind in self.limits}
+        self._semaphores = None
+
+    @staticmethod
+    def plan(paths, operations, names: Optional[dict] = None) -> list:
+        """每个仓库依次执行 operations（名称或 Operation），返回作业列表（按仓库分组）"""
+        operations = [OPERATIONS[op] if isinstance(op, str) else op for op in operations]
+        names = names or {}
+        return [Job(path, op, names.get(path)) for path in paths for op in operations]
+
+    def backoff_delay(self, attempt: int) -> float:
+        """第 attempt 次失败后等待的秒数：指数增长、有上限、带随机抖动"""
+        delay = min(self.max_backoff, self.backoff * 2 ** (attempt - 1))
+        return delay * (1 + random.uniform(-self.jitter, self.jitter))
+
+    def _notify(self, job: Job):
+        if self.on_update is not None:
+            self.on_update(job)
+
+    async def run(self, jobs: list) -> BatchReport:
+        """执行全部作业；被取消时结束正在运行的 git，未完成的作业记为 cancelled"""
+        self._semaphores = {kind: asyncio.Semaphore(max(1, limit)) for kind, limit in self.limits.items()}
+        chains = {}
+        for job in jobs:
+            chains.setdefault(job.path, []).append(job)
+        start = time.perf_counter()
+        try:
+            await asyncio.gather(*(self._run_chain(chain) for chain in chains.values()))
+        finally:
+            for job in jobs:
+                if not job.finished_state:
+                    job.state = CANCELLED
+                    job.finished = time.perf_counter()
+                    self._notify(job)
+        return BatchReport(jobs, time.perf_counter() - start, dict(self.peak))
+
+    async def _run_chain(self, chain: list):
+        for i, job in enumerate(chain):
+            if not await self._run_job(job):
+                for rest in chain[i + 1:]:
+                    rest.state = SKIPPED
+                    rest.error = f"{job.operation.name} 失败，已跳过"
+                    self._notify(rest)
+                return
+
+    async def _run_job(self, job: Job) -> bool:
+        op = job.operation
+        if not os.path.isdir(job.path):
+            return self._finish(job, FAILED, "目录不存在")
+        while True:
+            async with self._semaphores[op.kind]:
+                self.running[op.kind] += 1
+                self.peak[op.kind] = max(self.peak[op.kind], self.running[op.kind])
+                job.state = RUNNING
+                job.attempts += 1
+                job.progress = None
+                if job.started is None:
+                    job.started = time.perf_counter()
+                self._notify(job)
+                try:
+                    await asyncio.wait_for(
+                        GitBackend(job.path).stream_async(list(op.args), on_line=lambda line: self._on_line(job, line)),
+                        op.timeout)
+                    return self._finish(job, DONE)
+                except asyncio.TimeoutError:
+                    error, transient = f"超时（>{op.timeout:g}s）", True
+                except GitError as e:
+                    error, transient = error_line(e.stderr or "") or str(e), is_transient(op.kind, e.stderr or "")
+                except OSError as e:
+                    error, transient = str(e), False
+                finally:
+                    self.running[op.kind] -= 1
+            if not transient or job.attempts > self.retries:
+                return self._finish(job, FAILED, error)
+            delay = self.backoff_delay(job.attempts)
+            job.state = RETRYING
+            job.error = error
+            job.retry_at = time.time() + delay
+            self._notify(job)
+            await asyncio.sleep(delay)
+
+    def _on_line(self, job: Job, line: str):
+        progress = parse_progress(line)
+        if progress is not None:
+            job.progress = progress
+        else:
+            job.lines.append(line)
+        self._notify(job)
+
+    def _finish(self, job: Job, state: str, error: Optional[str] = None) -> bool:
+        job.state = state
+        job.error = error
+        job.finished = time.perf_counter()
+        self._notify(job)
+        return state == DONE
+
+
+def main(argv=None):
+    import argparse
+
+    from .workspace import Workspace
+
+    parser = argparse.ArgumentParser(prog="python -m core.jobs", description="在多个仓库上批量执行 git 操作")
+    parser.add_argument("operations", nargs="+", choices=sorted(OPERATIONS))
+    parser.add_argument("--repo", action="append", default=[], help="仓库路径（可重复；默认工作区中的全部仓库）")
+    parser.add_argument("--network", type=int, default=DEFAULT_LIMITS[NETWORK], help="fetch/pull 的并发数")
+    parser.add_argument("--cpu", type=int, default=DEFAULT_LIMITS[CPU], help="gc 的并发数")
+    parser.add_argument("--retries", type=int, default=2)
+    args = parser.parse_args(argv)
+
+    if args.repo:
+        paths, names = [os.path.abspath(path) for path in args.repo], {}
+    else:
+        entries = list(Workspace())
+        paths, names = [entry["path"] for entry in entries], {entry["path"]: entry["name"] for entry in entries}
+
+    def on_update(job):
+        if job.finished_state:
+            mark = "✓" if job.state == DONE else "✗"
+            detail = f"  {job.error}" if job.error else ""
+            print(f"{mark} {job.name:<24} {job.operation.name:<6} {job.state:<9} {job.elapsed:6.1f}s{detail}")
+
+    scheduler = JobScheduler({NETWORK: args.network, CPU: args.cpu}, retries=args.retries, on_update=on_update)
+    report = asyncio.run(scheduler.run(scheduler.plan(paths, args.operations, names)))
+    print("\n".join(report.format()))
+    return 0 if report.ok else 1
+
+
+# 测试入口
+if __name__ == "__main__":
+    sys.exit(main())
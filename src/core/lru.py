@@ -0,0 +1,109 @@
+"""按字节数限制大小的 LRU 缓存
+
+    cache = ByteLRU(64 << 20, sizeof=len)
+    cache.put(sha, data)
+    cache.get(sha)          # 命中时移到最近使用的一端
+
+条目数量不限，淘汰按占用字节数：插入后总量超过 max_bytes 时从最久未使用的
+一端逐个淘汰。单个值超过整个预算时不缓存。可以被多个线程同时使用。
+命中、未命中、淘汰和拒绝（值太大）的次数记录在计数器中，stats() 返回快照。
+"""
+
+import collections
+import threading
+from typing import NamedTuple
+
+
+class CacheStats(NamedTuple):
+    name: str
+    entries: int
+    bytes: int
+    max_bytes: int
+    hits: int
+    misses: int
+    evictions: int
+    rejected: int
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+class ByteLRU:
+    def __init__(self, max_bytes: int, sizeof=len, name: str = ""):
+        self.name = name
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof
+        self.bytes = 0
+        self._entries = collections.OrderedDict()   # key -> (value, size)
+        self._lock = threading.Lock()
+        self.reset_stats()
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return entry[0]
+
+    def peek(self, key, default=None):
+        """查看但不计入命中统计、不改变淘汰顺序"""
+        entry = self._entries.get(key)
+        return default if entry is None else entry[0]
+
+    def put(self, key, value, size: int | None = None) -> bool:
+        """加入缓存，返回是否真的缓存了（值太大时不缓存）"""
+        size = self.sizeof(value) if size is None else size
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.bytes -= old[1]
+            if size > self.max_bytes:
+                self.rejected += 1
+                return False
+            self._entries[key] = (value, size)
+            self.bytes += size
+            self._evict()
+            return True
+
+    def _evict(self):
+        """在锁内调用：淘汰到不超过预算"""
+        while self.bytes > self.max_bytes:
+            _key, (_value, evicted) = self._entries.popitem(last=False)
+            self.bytes -= evicted
+            self.evictions += 1
+
+    def resize(self, max_bytes: int):
+        """调整预算，缩小时立即淘汰"""
+        with self._lock:
+            self.max_bytes = max_bytes
+            self._evict()
+
+    def discard(self, key):
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.bytes -= old[1]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+
+    def reset_stats(self):
+        self.hits = self.misses = self.evictions = self.rejected = 0
+
+    def stats(self) -> CacheStats:
+        with self._lock:
+            return CacheStats(self.name, len(self._entries), self.bytes, self.max_bytes,
+                              self.hits, self.misses, self.evictions, self.rejected)
+
+    def __contains__(self, key) -> bool:
+        return key in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
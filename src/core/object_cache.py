@@ -0,0 +1,97 @@
+"""进程内共享的 git 数据缓存
+
+    from core.object_cache import cache, is_sha
+    objects = cache("object")       # GitBackend.read/info 读到的 blob、tree、提交对象
+    diffs = cache("diff")           # 提交的 stat + 补丁（core.prefetch）
+    blames = cache("blame")         # (路径, 提交) 的 blame 结果（core.blame_stream）
+
+所有界面共用同一组缓存，总内存预算默认 128 MB，可以用环境变量
+GITTUI_CACHE_MB 或 set_budget() 调整，按 SHARES 的比例分给各个缓存。
+淘汰按占用字节数（core.lru.ByteLRU），键都是不可变的对象 SHA（blame 是
+(路径, 提交 SHA)）：同一个 SHA 的内容永远相同，所以缓存不需要失效。"HEAD:README" 这类会变化的 rev 不缓存，
+见 is_sha()。
+
+命中、未命中和淘汰次数通过 stats() 汇总，显示在调试界面（主菜单 Debug）上。
+"""
+
+import os
+import re
+import threading
+
+from .lru import ByteLRU, CacheStats
+
+BUDGET_ENV = "GITTUI_CACHE_MB"
+DEFAULT_BUDGET_MB = 128
+
+# 各缓存占总预算的比例
+SHARES = {
+    "object": 0.35,
+    "diff": 0.5,
+    "blame": 0.15,
+}
+
+_SHA = re.compile(r"[0-9a-f]{40}(?:[0-9a-f]{24})?")
+
+_caches = {}
+_lock = threading.Lock()
+_budget = None
+
+
+def is_sha(rev: str) -> bool:
+    """完整的 SHA-1 / SHA-256 对象名（只有这种 rev 的内容不会变化）"""
+    return _SHA.fullmatch(rev) is not None
+
+
+def _nbytes(value) -> int:
+    return value.nbytes
+
+
+def budget() -> int:
+    """总预算（字节）"""
+    global _budget
+    if _budget is None:
+        try:
+            megabytes = float(os.environ.get(BUDGET_ENV) or DEFAULT_BUDGET_MB)
+        except ValueError:
+            megabytes = DEFAULT_BUDGET_MB
+        _budget = int(megabytes * (1 << 20))
+    return _budget
+
+
+def set_budget(nbytes: int):
+    """调整总预算，各缓存按比例缩放（缩小时立即淘汰）"""
+    global _budget
+    with _lock:
+        _budget = max(int(nbytes), 0)
+        for name, lru in _caches.items():
+            lru.resize(int(_budget * SHARES.get(name, 0.0)))
+
+
+def cache(name: str) -> ByteLRU:
+    """名为 name 的共享缓存（第一次使用时创建）"""
+    lru = _caches.get(name)
+    if lru is None:
+        with _lock:
+            lru = _caches.get(name)
+            if lru is None:
+                if name not in SHARES:
+                    raise KeyError(f"未知的缓存: {name}")
+                lru = _caches[name] = ByteLRU(int(budget() * SHARES[name]), sizeof=_nbytes, name=name)
+    return lru
+
+
+def stats() -> list:
+    """各缓存的统计，最后一项是合计"""
+    rows = [cache(name).stats() for name in SHARES]
+    total = CacheStats("total", *(sum(row[i] for row in rows) for i in range(1, len(CacheStats._fields))))
+    return [*rows, total]
+
+
+def reset_stats():
+    for name in SHARES:
+        cache(name).reset_stats()
+
+
+def clear():
+    for name in SHARES:
+        cache(name).clear()
@@ -0,0 +1,27 @@
+"""用户数据目录"""
+
+import os
+import sys
+
+APP_NAME = "gittui"
+
+
+def data_dir(*parts: str) -> str:
+    """返回（并创建）用户数据目录下的子目录
+
+    Linux: $XDG_DATA_HOME/gittui 或 ~/.local/share/gittui
+    macOS: ~/Library/Application Support/gittui
+    Windows: %LOCALAPPDATA%\\gittui
+    可以用环境变量 GITTUI_DATA_DIR 覆盖。
+    """
+    base = os.environ.get("GITTUI_DATA_DIR")
+    if not base:
+        if sys.platform == "win32":
+            base = os.path.join(os.environ.get("LOCALAPPDATA") or os.path.expanduser("~"), APP_NAME)
+        elif sys.platform == "darwin":
+            base = os.path.join(os.path.expanduser("~/Library/Application Support"), APP_NAME)
+        else:
+            base = os.path.join(os.environ.get("XDG_DATA_HOME") or os.path.expanduser("~/.local/share"), APP_NAME)
+    path = os.path.join(base, *parts)
+    os.makedirs(path, exist_ok=True)
+    return path
@@ -0,0 +1,249 @@
+"""提交详情（stat + patch）的后台预取
+
+浏览历史时，界面把光标附近的提交按优先级交给 PrefetchScheduler：
+
+    prefetch = PrefetchScheduler(repo_path)
+    prefetch.focus([sha0, sha1, sha_1, sha2, ...])   # 光标所在提交在最前
+    future = prefetch.request(sha)                   # 真正打开时：立即获取，结果是 CommitDetails
+    prefetch.close()
+
+- 工作线程池按优先级（列表中的位置）取任务，光标所在的提交最先获取。
+- 光标停下 idle_delay 秒后才开始预取，按住方向键滚动时不会为每一行启动 git。
+- 光标移走后，不再需要的排队任务直接丢弃，正在运行的 git 进程被结束。
+- request() 的任务优先级最高、不等待空闲，也不会因光标移动而取消。
+- 输出超过 max_commit_bytes 的提交不预取也不缓存（结果为 None），打开时由
+  界面以流的方式读取（core.diff_stream）。
+- 结果默认放进共享的 "diff" 缓存（core.object_cache，按字节计量的 LRU），
+  提交的 SHA 不可变，缓存永远不会过期。
+"""
+
+import heapq
+import re
+import subprocess
+import threading
+import time
+from concurrent.futures import Future
+from typing import NamedTuple
+
+from .git_backend import GitBackend, GitError
+from .lru import ByteLRU
+from .object_cache import cache as shared_cache
+
+SHOW_ARGS = ["show", "--no-color", "--no-ext-diff", "--format=", "--patch-with-stat", "-M"]
+
+_DIFF_START = re.compile(r"^diff --(?:git|cc|combined) ", re.MULTILINE)
+
+# 超过这个大小的提交不整个读进内存
+MAX_COMMIT_BYTES = 1 << 20
+
+# 用户明确请求的任务的优先级（预取任务从 0 开始）
+REQUESTED = -1
+
+
+class CommitDetails(NamedTuple):
+    sha: str
+    stat: str       # --stat 部分
+    patch: str      # diff --git ... 开始的补丁
+    nbytes: int     # git 输出的字节数，用于缓存计量
+
+
+def parse_show(sha: str, data: bytes) -> CommitDetails:
+    """把 `git show --format= --patch-with-stat` 的输出分成 stat 和 patch 两部分
+
+    合并提交的补丁是 combined diff（diff --cc）。
+    """
+    text = data.decode("utf-8", "replace")
+    match = _DIFF_START.search(text)
+    if match is None:
+        # 没有补丁（空提交，或合并时没有冲突解决的改动）
+        return CommitDetails(sha, text.strip("\n"), "", len(data))
+    start = match.start()
+    return CommitDetails(sha, text[:start].strip("\n"), text[start:], len(data))
+
+
+class PrefetchScheduler:
+    def __init__(self, repo_path: str, workers: int = 2, idle_delay: float = 0.15,
+                 cache: ByteLRU | None = None, max_commit_bytes: int = MAX_COMMIT_BYTES):
+        self.backend = GitBackend.for_repo(repo_path)
+        self.cache = cache if cache is not None else shared_cache("diff")
+        self.idle_delay = idle_delay
+        self.max_commit_bytes = max_commit_bytes
+        self.workers = workers
+        self._cond = threading.Condition()
+        self._queue = []          # (优先级, 序号, sha) 最小堆；已不需要的项在取出时跳过
+        self._wanted = {}         # sha -> 当前优先级（光标附近的提交和用户请求）
+        self._futures = {}        # sha -> 尚未完成的 Future
+        self._running = {}        # sha -> 正在运行的 git 进程（启动前为 None）
+        self._too_large = set()   # 超过 max_commit_bytes 的提交
+        self._seq = 0
+        self._last_focus = 0.0
+        self._threads = []
+        self._closed = False
+
+    # ---- 调度 ----
+
+    def _start_workers(self):
+        while len(self._threads) < self.workers:
+            thread = threading.Thread(target=self._work, name=f"prefetch-{len(self._threads)}", daemon=True)
+            self._threads.append(thread)
+            thread.start()
+
+    def _enqueue(self, sha: str, priority: int) -> Future:
+        """在锁内调用"""
+        future = self._futures.get(sha)
+        if future is None:
+            future = self._futures[sha] = Future()
+        old = self._wanted.get(sha)
+        if old is None or priority < old:
+            self._wanted[sha] = priority
+            if sha not in self._running:
+                self._seq += 1
+                heapq.heappush(self._queue, (priority, self._seq, sha))
+        return future
+
+    def request(self, sha: str) -> Future:
+        """立即获取 sha 的详情（已缓存时返回已完成的 Future；提交太大时结果为 None）"""
+        cached = self.cache.get(sha)
+        if cached is not None or sha in self._too_large:
+            future = Future()
+            future.set_result(cached)
+            return future
+        with self._cond:
+            future = self._enqueue(sha, REQUESTED)
+            self._start_workers()
+            self._cond.notify_all()
+        return future
+
+    def focus(self, shas):
+        """光标附近的提交，按优先级排列；不在其中的预取任务被取消"""
+        with self._cond:
+            self._last_focus = time.monotonic()
+            stale = [sha for sha, priority in self._wanted.items() if priority != REQUESTED]
+            for sha in stale:
+                del self._wanted[sha]
+            for priority, sha in enumerate(shas):
+                if sha not in self.cache and sha not in self._too_large:
+                    self._enqueue(sha, priority)
+            for sha in stale:
+                if sha not in self._wanted:
+                    self._cancel(sha)
+            self._start_workers()
+            self._cond.notify_all()
+
+    def _cancel(self, sha: str):
+        """在锁内调用：结束正在运行的 git，取消等待的 Future"""
+        proc = self._running.get(sha)
+        if proc is not None:
+            proc.kill()
+        elif sha not in self._running:
+            future = self._futures.pop(sha, None)
+            if future is not None:
+                future.cancel()
+
+    def get(self, sha: str):
+        """已缓存的详情，没有时返回 None"""
+        return self.cache.get(sha)
+
+    # ---- 工作线程 ----
+
+    def _next(self):
+        """在锁内调用：取出下一个要获取的 sha；需要等待时返回等待秒数"""
+        queue = self._queue
+        while queue:
+            priority, _seq, sha = queue[0]
+            if self._wanted.get(sha) != priority or sha in self._running:
+                heapq.heappop(queue)
+                continue
+            if priority != REQUESTED:
+                remaining = self._last_focus + self.idle_delay - time.monotonic()
+                if remaining > 0:
+                    return remaining
+            heapq.heappop(queue)
+            return sha
+        return None
+
+    def _work(self):
+        while True:
+            with self._cond:
+                while True:
+                    if self._closed:
+                        return
+                    item = self._next()
+                    if isinstance(item, str):
+                        break
+                    self._cond.wait(item)
+                sha = item
+                self._running[sha] = None
+            try:
+                self._fetch(sha)
+            finally:
+                with self._cond:
+                    self._running.pop(sha, None)
+
+    def _fetch(self, sha: str):
+        cached = self.cache.peek(sha)
+        if cached is None:
+            proc = self.backend.popen([*SHOW_ARGS, sha, "--"], stdin=subprocess.DEVNULL,
+                                      stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+            with self._cond:
+                self._running[sha] = proc
+                if sha not in self._wanted:
+                    proc.kill()
+            stdout = proc.stdout.read(self.max_commit_bytes + 1)
+            too_large = len(stdout) > self.max_commit_bytes
+            if too_large:
+                proc.kill()
+            stderr = proc.communicate()[1]
+            if too_large:
+                # 放弃，打开时以流的方式读取；记下来，光标再经过时不再预取
+                with self._cond:
+                    self._too_large.add(sha)
+                    self._wanted.pop(sha, None)
+                    future = self._futures.pop(sha, None)
+                if future is not None and not future.done():
+                    future.set_result(None)
+                return
+        if cached is None and proc.returncode < 0:
+            # 光标移走后被结束；如果之后又移了回来，重新排队
+            with self._cond:
+                priority = self._wanted.get(sha)
+                if priority is not None:
+                    self._running.pop(sha, None)
+                    self._seq += 1
+                    heapq.heappush(self._queue, (priority, self._seq, sha))
+                    self._cond.notify()
+                    return
+                future = self._futures.pop(sha, None)
+            if future is not None:
+                future.cancel()
+            return
+        with self._cond:
+            self._wanted.pop(sha, None)
+            future = self._futures.pop(sha, None)
+        if cached is not None:
+            result = cached
+        elif proc.returncode != 0:
+            if future is not None:
+                future.set_exception(GitError(proc.returncode, proc.args,
+                                              output=stdout.decode("utf-8", "replace"),
+                                              stderr=stderr.decode("utf-8", "replace")))
+            return
+        else:
+            result = parse_show(sha, stdout)
+            self.cache.put(sha, result)
+        if future is not None and not future.done():
+            future.set_result(result)
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            for sha in list(self._wanted):
+                self._cancel(sha)
+            self._wanted.clear()
+            self._queue.clear()
+            for future in self._futures.values():
+                future.cancel()
+            self._cond.notify_all()
+        for thread in self._threads:
+            thread.join(timeout=2)
+        self._threads = []
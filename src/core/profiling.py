@@ -0,0 +1,214 @@
+"""可选的性能记录：按键处理、片段生成、渲染和 git 子进程的耗时
+
+默认关闭，所有记录点只多一次全局变量检查。启动时加参数或设置环境变量打开：
+
+    python src/cli/main.py --profile                        # 界面底部显示 p50/p99
+    python src/cli/main.py --trace /tmp/gittui.json         # 退出时写 Chrome trace
+    python src/cli/main.py --cprofile /tmp/gittui.prof      # 退出时写 cProfile 统计
+    GITTUI_PROFILE=1 python src/cli/main.py
+    GITTUI_PROFILE=trace=/tmp/gittui.json,cprofile=/tmp/gittui.prof python src/cli/main.py
+
+记录的类别（CATEGORIES）：
+    key         一次按键从分发到处理函数返回（KeyProcessor 的 before/after_key_press）
+    fragments   控件生成显示片段（VirtualList、FrameControl）
+    render      一次重绘（Application 的 before/after_render，包含 fragments）
+    git         git 命令、cat-file 请求和流式读取的 git 进程（从启动到退出）
+
+每个类别保留最近 WINDOW 个样本，overlay_text() 给出滚动的 p50/p99。trace 文件
+是 Chrome trace-event 格式，用 chrome://tracing 或 https://ui.perfetto.dev 打开，
+后台线程（预取、diff 读取等）各占一行。cProfile 只统计主线程（事件循环）。
+"""
+
+import collections
+import functools
+import os
+import threading
+import time
+
+PROFILE_ENV = "GITTUI_PROFILE"
+CATEGORIES = ("key", "fragments", "render", "git")
+WINDOW = 500
+MAX_TRACE_EVENTS = 1_000_000
+
+_profiler = None
+
+
+class Profiler:
+    def __init__(self, trace_path: str | None = None, cprofile_path: str | None = None, overlay: bool = True):
+        self.trace_path = trace_path
+        self.cprofile_path = cprofile_path
+        self.overlay = overlay
+        self.samples = {category: collections.deque(maxlen=WINDOW) for category in CATEGORIES}
+        self.events = [] if trace_path else None
+        self.dropped = 0
+        self._threads = {}
+        self._origin = time.perf_counter()
+        self._cprofile = None
+
+    # ---- 记录 ----
+
+    def record(self, category: str, name: str, start: float, end: float):
+        """记录一个区间（time.perf_counter() 的秒数），可以在任意线程中调用"""
+        self.samples[category].append((end - start) * 1000)
+        events = self.events
+        if events is None:
+            return
+        if len(events) >= MAX_TRACE_EVENTS:
+            self.dropped += 1
+            return
+        tid = threading.get_ident()
+        if tid not in self._threads:
+            self._threads[tid] = threading.current_thread().name
+        events.append({
+            "name": name, "cat": category, "ph": "X", "pid": os.getpid(), "tid": tid,
+            "ts": round((start - self._origin) * 1e6, 1), "dur": round((end - start) * 1e6, 1),
+        })
+
+    def percentiles(self, category: str):
+        """(样本数, p50, p99)，单位毫秒；没有样本时返回 None"""
+        samples = sorted(self.samples[category].copy())   # copy() 不会与其他线程的 append 冲突
+        if not samples:
+            return None
+        last = len(samples) - 1
+        return len(samples), samples[last // 2], samples[round(last * 0.99)]
+
+    def overlay_text(self) -> str:
+        parts = []
+        for category in CATEGORIES:
+            result = self.percentiles(category)
+            if result is None:
+                parts.append(f"{category} -")
+            else:
+                _count, p50, p99 = result
+                parts.append(f"{category} {p50:.1f}/{p99:.1f}")
+        return " p50/p99 ms  " + "  ".join(parts) + "  (F12 隐藏)"
+
+    # ---- 开始/结束 ----
+
+    def start(self):
+        if self.cprofile_path and self._cprofile is None:
+            import cProfile
+
+            self._cprofile = cProfile.Profile()
+            self._cprofile.enable()
+
+    def finish(self) -> list:
+        """停止记录并写出文件，返回写出的文件路径"""
+        written = []
+        if self._cprofile is not None:
+            self._cprofile.disable()
+            self._cprofile.dump_stats(self.cprofile_path)
+            self._cprofile = None
+            written.append(self.cprofile_path)
+        if self.events is not None:
+            import json
+
+            pid = os.getpid()
+            metadata = [{"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": name}}
+                        for tid, name in list(self._threads.items())]
+            with open(self.trace_path, "w", encoding="utf-8") as f:
+                json.dump({"traceEvents": metadata + self.events, "displayTimeUnit": "ms",
+                           "otherData": {"dropped": self.dropped}}, f)
+            written.append(self.trace_path)
+        return written
+
+
+def active() -> Profiler | None:
+    """正在记录的 Profiler，没有打开时返回 None"""
+    return _profiler
+
+
+def enable(trace_path: str | None = None, cprofile_path: str | None = None, overlay: bool = True) -> Profiler:
+    global _profiler
+    _profiler = Profiler(trace_path, cprofile_path, overlay)
+    return _profiler
+
+
+def disable() -> list:
+    """结束记录，返回写出的文件路径"""
+    global _profiler
+    profiler, _profiler = _profiler, None
+    return profiler.finish() if profiler is not None else []
+
+
+def enable_from_env() -> Profiler | None:
+    """按 GITTUI_PROFILE 打开记录：1 只显示统计；trace=路径、cprofile=路径 以逗号分隔"""
+    value = os.environ.get(PROFILE_ENV, "").strip()
+    if not value or value == "0":
+        return None
+    options = {}
+    for item in value.split(","):
+        key, _, path = item.partition("=")
+        options[key.strip()] = path.strip()
+    return enable(trace_path=options.get("trace") or None, cprofile_path=options.get("cprofile") or None)
+
+
+class _Span:
+    __slots__ = ("profiler", "category", "name", "start")
+
+    def __init__(self, profiler, category, name):
+        self.profiler = profiler
+        self.category = category
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.profiler.record(self.category, self.name, self.start, time.perf_counter())
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+def span(category: str, name: str):
+    """with span("git", "log"): ... —— 没有打开记录时什么也不做"""
+    profiler = _profiler
+    if profiler is None:
+        return _NULL_SPAN
+    return _Span(profiler, category, name)
+
+
+def timed(category: str, name: str | None = None):
+    """把函数的每次调用记录为 category 中的一个区间"""
+    def decorate(func):
+        label = name or func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            profiler = _profiler
+            if profiler is None:
+                return func(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                profiler.record(category, label, start, time.perf_counter())
+
+        return wrapper
+    return decorate
+
+
+def watch_process(proc, name: str):
+    """记录流式读取的 git 进程从启动到退出的时间（在等待线程中）"""
+    profiler = _profiler
+    if profiler is None:
+        return
+    start = time.perf_counter()
+
+    def wait():
+        proc.wait()
+        profiler.record("git", name, start, time.perf_counter())
+
+    threading.Thread(target=wait, name=f"profile-{name}", daemon=True).start()
@@ -0,0 +1,335 @@
+"""分支和标签的浏览索引：一次读入全部引用，排序和分类预先算成下标数组
+
+    index = RefIndex.load(repo_path)         # 读 packed-refs 和松散引用，不启动 git
+    view = index.view("tag", "version")      # 只含标签、按版本号排序的序列（Ref）
+    details = RefDetailsLoader(repo_path, on_result=refresh)
+    details.show([ref.sha for ref in visible_refs])    # 只为可见的一页计算
+    details.get(sha)                         # RefDetails 或 None（还没算好）
+
+几万个引用（大多是 CI 打的标签）时：
+- 引用只读一次，按列保存（名称和 SHA 各一个列表），Ref 只在显示或搜索时创建；
+- 每种分类和排序（名称、版本号）第一次使用时算出整个下标数组（array），之后
+  切换只是换一个数组，不再比较字符串；版本号排序可以用 prepare() 在后台先算好；
+- 按日期排序需要每个引用的提交时间，第一次使用时由一个 `git for-each-ref`
+  在后台读出，读完之前按名称排序；
+- 最后一次提交的作者、时间、标题和相对 HEAD 的领先/落后提交数由
+  RefDetailsLoader 的工作线程只为界面上可见的行计算，滚走的行不再计算。
+"""
+
+import array
+import re
+import subprocess
+import threading
+import time
+from typing import NamedTuple, Optional
+
+from .git_backend import GitBackend, GitError
+from .refs import read_refs
+
+KINDS = ("all", "branch", "remote", "tag")
+SORTS = ("name", "version", "date")
+
+_PREFIXES = (("refs/heads/", "branch"), ("refs/remotes/", "remote"), ("refs/tags/", "tag"))
+_NUMBER = re.compile(r"(\d+)")
+
+
+class Ref(NamedTuple):
+    name: str           # 完整引用名 refs/...
+    short: str          # 显示用的短名称
+    kind: str           # branch / remote / tag / other
+    sha: str            # 引用指向的对象（附注标签是标签对象）
+    peeled: Optional[str]   # 附注标签指向的提交（已知时）
+
+    @property
+    def target(self) -> str:
+        return self.peeled or self.sha
+
+
+def _classify(name: str):
+    for prefix, kind in _PREFIXES:
+        if name.startswith(prefix):
+            return name[len(prefix):], kind
+    return name[len("refs/"):] if name.startswith("refs/") else name, "other"
+
+
+def _pad_number(match) -> str:
+    return match.group().zfill(20)
+
+
+def version_key(name: str) -> str:
+    """v1.10.0 排在 v1.9.0 之后：数字部分补齐成等长后按字符串比较"""
+    return _NUMBER.sub(_pad_number, name)
+
+
+class RefView:
+    """按下标数组排列的引用序列（VirtualList 数据源），Ref 在访问时才创建"""
+
+    def __init__(self, index: "RefIndex", order: array.array):
+        self.index = index
+        self.order = order
+
+    def __len__(self):
+        return len(self.order)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            ref = self.index.ref
+            return [ref(j) for j in self.order[i]]
+        return self.index.ref(self.order[i])
+
+
+class RefIndex:
+    """按列保存的引用（名称和 SHA 各一个列表），按名称排序"""
+
+    def __init__(self, repo_path: str, names: list, shas: list, peeled: dict, head: Optional[str]):
+        self.repo_path = repo_path
+        self.names = names
+        self.shas = shas
+        self.peeled = peeled
+        self.head = head            # HEAD 指向的引用名（分离时为 None）
+        self.dates = None           # 引用下标 -> 提交时间，按日期排序时才读取
+        self._orders = {}           # (分类, 排序) -> array
+        self._lock = threading.RLock()      # 分类的数组由全部引用的数组筛选得到，会嵌套获取
+        self._dates_thread = None
+
+    @classmethod
+    def load(cls, repo_path: str) -> "RefIndex":
+        refs, peeled, head = read_refs(repo_path)
+        # 名称顺序是其他所有排序的基础（排序稳定，同键时按名称）
+        names = sorted(refs)
+        return cls(repo_path, names, [refs[name] for name in names], peeled, head)
+
+    def __len__(self):
+        return len(self.names)
+
+    def ref(self, i: int) -> Ref:
+        name = self.names[i]
+        short, kind = _classify(name)
+        return Ref(name, short, kind, self.shas[i], self.peeled.get(name))
+
+    def count(self, kind: str) -> int:
+        return len(self._order(kind, "name"))
+
+    # ---- 排序和分类 ----
+
+    def view(self, kind: str = "all", sort: str = "name") -> RefView:
+        """分类为 kind、按 sort 排序的引用；日期还没读到时按名称排序"""
+        if sort == "date" and self.dates is None:
+            sort = "name"
+        return RefView(self, self._order(kind, sort))
+
+    def _order(self, kind: str, sort: str) -> array.array:
+        key = (kind, sort)
+        order = self._orders.get(key)
+        if order is not None:
+            return order
+        with self._lock:
+            order = self._orders.get(key)
+            if order is None:
+                order = self._orders[key] = self._build_order(kind, sort)
+        return order
+
+    def _build_order(self, kind: str, sort: str) -> array.array:
+        names = self.names
+        if kind != "all":
+            # 在全部引用的同一排序上筛选，不再单独排序
+            prefix = next((p for p, k in _PREFIXES if k == kind), None)
+            return array.array("I", (i for i in self._order("all", sort) if names[i].startswith(prefix)))
+        if sort == "name":
+            return array.array("I", range(len(names)))
+        if sort == "version":
+            # 用完整名称作键：同一分类的前缀相同，结果和按短名称排序一致，分类之间按前缀分组
+            keys = [version_key(name) for name in names]
+            return array.array("I", sorted(range(len(names)), key=keys.__getitem__))
+        dates = self.dates
+        return array.array("I", sorted(range(len(names)), key=lambda i: -dates[i]))
+
+    def prepare(self):
+        """在后台线程中预先算好按版本号排序的数组，第一次切换排序时不必等待"""
+        threading.Thread(target=self._order, args=("all", "version"), name="ref-sort", daemon=True).start()
+
+    def load_dates(self, on_done=None):
+        """在后台用一个 `git for-each-ref` 读出所有引用的提交时间，完成后调用 on_done()"""
+        if self.dates is not None or self._dates_thread is not None:
+            return
+        self._dates_thread = threading.Thread(target=self._read_dates, args=(on_done,),
+                                              name="ref-dates", daemon=True)
+        self._dates_thread.start()
+
+    def _read_dates(self, on_done):
+        # 附注标签的 committerdate 为空，用剥离后的提交时间（%(*committerdate)）
+        fmt = "%(committerdate:unix) %(*committerdate:unix) %(refname)"
+        try:
+            output = GitBackend.for_repo(self.repo_path).run(["for-each-ref", f"--format={fmt}"])
+        except (GitError, OSError):
+            output = ""
+        by_name = {}
+        for line in output.splitlines():
+            date, peeled_date, name = line.split(" ", 2)
+            by_name[name] = int(date or peeled_date or 0)
+        dates = array.array("q", (by_name.get(name, 0) for name in self.names))
+        with self._lock:
+            self.dates = dates
+        if on_done is not None:
+            on_done()
+
+
+# ---- 可见行的详情 ----
+
+class RefDetails(NamedTuple):
+    commit: str
+    author: str
+    time: int
+    subject: str
+    ahead: Optional[int]        # 相对 HEAD：引用有而 HEAD 没有的提交数（HEAD 不存在时为 None）
+    behind: Optional[int]
+
+
+def parse_commit(data: bytes):
+    """提交对象 -> (作者, 作者时间, 标题)"""
+    header, _, message = data.partition(b"\n\n")
+    author, when = "", 0
+    for line in header.split(b"\n"):
+        if line.startswith(b"author "):
+            # author Name <mail> 1700000000 +0800
+            name, _, rest = line[len(b"author "):].rpartition(b" <")
+            author = name.decode("utf-8", "replace")
+            try:
+                when = int(rest.rsplit(b" ", 2)[-2])
+            except (ValueError, IndexError):
+                when = 0
+            break
+    subject = message.split(b"\n", 1)[0].decode("utf-8", "replace")
+    return author, when, subject
+
+
+class RefDetailsLoader:
+    """工作线程池：为界面上可见的引用计算 RefDetails
+
+    show() 给出当前可见的对象（按显示顺序）；不在其中的排队任务被丢弃，正在运行的
+    `git rev-list` 被结束。结果按对象 SHA 保存（同一个提交被多个标签指向时只算一次），
+    每算完一个调用 on_result(sha)（在工作线程中）。
+    """
+
+    def __init__(self, repo_path: str, on_result=None, workers: int = 4, head: str = "HEAD"):
+        self.backend = GitBackend.for_repo(repo_path)
+        self.on_result = on_result
+        self.workers = workers
+        self.results = {}
+        self._head = head
+        self._head_sha = None
+        self._cond = threading.Condition()
+        self._queue = []            # 可见的、还没有开始的 sha（显示顺序）
+        self._wanted = set()
+        self._running = {}          # sha -> git 进程（启动前为 None）
+        self._threads = []
+        self._closed = False
+
+    def get(self, sha: str) -> Optional[RefDetails]:
+        return self.results.get(sha)
+
+    def show(self, shas):
+        with self._cond:
+            self._wanted = set(shas)
+            self._queue = [sha for sha in dict.fromkeys(shas)
+                           if sha not in self.results and sha not in self._running]
+            for sha, proc in self._running.items():
+                if sha not in self._wanted and proc is not None:
+                    proc.kill()
+            while self._queue and len(self._threads) < self.workers:
+                thread = threading.Thread(target=self._work, name=f"ref-details-{len(self._threads)}", daemon=True)
+                self._threads.append(thread)
+                thread.start()
+            self._cond.notify_all()
+
+    def _work(self):
+        while True:
+            with self._cond:
+                while not self._queue and not self._closed:
+                    self._cond.wait()
+                if self._closed:
+                    return
+                sha = self._queue.pop(0)
+                self._running[sha] = None
+            try:
+                details = self._compute(sha)
+            except (GitError, OSError, ValueError):
+                details = None
+            finally:
+                with self._cond:
+                    self._running.pop(sha, None)
+            if details is not None:
+                self.results[sha] = details
+                if self.on_result is not None:
+                    self.on_result(sha)
+
+    def _resolve(self, sha: str):
+        """标签一直剥离到提交，返回 (提交 SHA, 提交对象)；不指向提交时返回 (None, None)"""
+        for _ in range(8):
+            obj = self.backend.read(sha)
+            if obj is None:
+                return None, None
+            if obj.type == "commit":
+                return sha, obj
+            if obj.type != "tag":
+                return None, None
+            sha = obj.data.split(b"\n", 1)[0].split(b" ", 1)[1].decode("ascii")
+        return None, None
+
+    def _head_commit(self) -> Optional[str]:
+        if self._head_sha is None:
+            try:
+                self._head_sha = self.backend.run(["rev-parse", "--verify", "--quiet", self._head]).strip() or ""
+            except GitError:
+                self._head_sha = ""
+        return self._head_sha or None
+
+    def _compute(self, sha: str) -> Optional[RefDetails]:
+        commit, obj = self._resolve(sha)
+        if commit is None:
+            return None
+        author, when, subject = parse_commit(obj.data)
+        head = self._head_commit()
+        ahead = behind = None
+        if head == commit:
+            ahead = behind = 0
+        elif head is not None:
+            proc = self.backend.popen(["rev-list", "--left-right", "--count", f"{head}...{commit}"],
+                                      stdin=subprocess.DEVNULL, stdout=subprocess.PIPE,
+                                      stderr=subprocess.DEVNULL)
+            with self._cond:
+                self._running[sha] = proc
+                if sha not in self._wanted or self._closed:
+                    proc.kill()
+            output = proc.communicate()[0]
+            if proc.returncode != 0:
+                # 滚走后被结束：不保存结果，下次可见时重新计算
+                return None
+            behind, ahead = (int(n) for n in output.split())
+        return RefDetails(commit, author, when, subject, ahead, behind)
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._queue.clear()
+            for proc in self._running.values():
+                if proc is not None:
+                    proc.kill()
+            self._cond.notify_all()
+        for thread in self._threads:
+            thread.join(timeout=2)
+        self._threads = []
+
+
+# 测试入口
+if __name__ == "__main__":
+    import sys
+
+    start = time.perf_counter()
+    index = RefIndex.load(sys.argv[1] if len(sys.argv) > 1 else ".")
+    loaded = time.perf_counter()
+    view = index.view("tag", "version")
+    print(f"{len(index)} refs in {(loaded - start) * 1000:.1f} ms, "
+          f"{len(view)} tags sorted by version in {(time.perf_counter() - loaded) * 1000:.1f} ms")
+    for ref in view[:10]:
+        print(f"  {ref.kind:<7} {ref.short}")
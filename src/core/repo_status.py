@@ -0,0 +1,150 @@
+"""仓库状态：解析 `git status --porcelain=v2 --branch -z`，并行刷新多个仓库
+
+    # branch.oid 70f3980...
+    # branch.head main
+    # branch.upstream origin/main
+    # branch.ab +1 -0
+    1 .M N... 100644 100644 100644 <hH> <hI> README.md
+    2 R. N... 100644 100644 100644 <hH> <hI> R100 new.txt\\0old.txt
+    u UU N... ...  conflicted.txt
+    ? untracked.txt
+
+`refresh_statuses` 用 asyncio 信号量限制同时运行的 git 进程数，每个仓库单独
+超时（超时后结束该仓库的 git 进程），结果按完成顺序逐个交给回调，
+界面不必等最慢的仓库。
+"""
+
+import asyncio
+import os
+import time
+from typing import NamedTuple, Optional
+
+from .git_backend import GitBackend, GitError
+
+STATUS_ARGS = ["--no-optional-locks", "status", "--porcelain=v2", "--branch", "-z"]
+
+
+class StatusEntry(NamedTuple):
+    kind: str                       # "1" 普通修改，"2" 重命名/复制，"u" 冲突，"?" 未跟踪，"!" 忽略
+    xy: str                         # 暂存区/工作区状态，如 ".M"、"A."；未跟踪为 "??"
+    path: str
+    orig_path: Optional[str] = None  # 重命名/复制前的路径
+
+    @property
+    def staged(self) -> bool:
+        return self.kind in "12" and self.xy[0] != "."
+
+    @property
+    def unstaged(self) -> bool:
+        return self.kind in "12" and self.xy[1] != "."
+
+
+class RepoStatus(NamedTuple):
+    path: str
+    branch: Optional[str] = None     # 分离 HEAD 时为 "(detached)"
+    oid: Optional[str] = None
+    upstream: Optional[str] = None
+    ahead: int = 0
+    behind: int = 0
+    staged: int = 0
+    unstaged: int = 0
+    untracked: int = 0
+    conflicted: int = 0
+    error: Optional[str] = None      # 出错或超时时的说明
+    elapsed: float = 0.0             # 本次 git status 耗时（秒）
+
+    @property
+    def dirty(self) -> bool:
+        return bool(self.staged or self.unstaged or self.untracked or self.conflicted)
+
+
+def parse_porcelain_v2(data: str):
+    """解析 -z 输出，返回 (分支信息 dict, [StatusEntry])"""
+    header = {}
+    entries = []
+    records = data.split("\0")
+    i = 0
+    while i < len(records):
+        record = records[i]
+        i += 1
+        if not record:
+            continue
+        kind = record[0]
+        if kind == "#":
+            key, _, value = record[2:].partition(" ")
+            header[key] = value
+        elif kind == "1":
+            fields = record.split(" ", 8)
+            entries.append(StatusEntry("1", fields[1], fields[8]))
+        elif kind == "2":
+            fields = record.split(" ", 9)
+            # 重命名记录之后紧跟原路径
+            entries.append(StatusEntry("2", fields[1], fields[9], records[i]))
+            i += 1
+        elif kind == "u":
+            fields = record.split(" ", 10)
+            entries.append(StatusEntry("u", fields[1], fields[10]))
+        elif kind in "?!":
+            entries.append(StatusEntry(kind, kind * 2, record[2:]))
+    return header, entries
+
+
+def summarize(path: str, header: dict, entries, elapsed: float = 0.0) -> RepoStatus:
+    ahead = behind = 0
+    if "branch.ab" in header:
+        a, b = header["branch.ab"].split()
+        ahead, behind = int(a), -int(b)
+    oid = header.get("branch.oid")
+    return RepoStatus(
+        path=path,
+        branch=header.get("branch.head"),
+        oid=None if oid == "(initial)" else oid,
+        upstream=header.get("branch.upstream"),
+        ahead=ahead,
+        behind=behind,
+        staged=sum(1 for e in entries if e.staged),
+        unstaged=sum(1 for e in entries if e.unstaged),
+        untracked=sum(1 for e in entries if e.kind == "?"),
+        conflicted=sum(1 for e in entries if e.kind == "u"),
+        elapsed=elapsed,
+    )
+
+
+async def read_status_async(path: str) -> RepoStatus:
+    start = time.perf_counter()
+    output = await GitBackend(path).run_async(STATUS_ARGS)
+    header, entries = parse_porcelain_v2(output)
+    return summarize(path, header, entries, time.perf_counter() - start)
+
+
+async def refresh_statuses(paths, on_result=None, concurrency: int = 8, timeout: float = 10.0) -> list:
+    """并行读取多个仓库的状态
+
+    同时最多运行 concurrency 个 git 进程；单个仓库超过 timeout 秒即放弃。
+    每个仓库完成（或失败、超时）时调用 on_result(RepoStatus)，顺序为完成顺序。
+    返回与 paths 顺序一致的结果列表。
+    """
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async def one(path):
+        async with semaphore:
+            start = time.perf_counter()
+            if not os.path.isdir(path):
+                status = RepoStatus(path, error="目录不存在")
+            else:
+                try:
+                    status = await asyncio.wait_for(read_status_async(path), timeout)
+                except asyncio.TimeoutError:
+                    status = RepoStatus(path, error=f"超时（>{timeout:g}s）")
+                except GitError as e:
+                    lines = (e.stderr or "").strip().splitlines()
+                    status = RepoStatus(path, error=lines[-1] if lines else str(e))
+                except OSError as e:
+                    status = RepoStatus(path, error=str(e))
+                if status.error is not None:
+                    status = status._replace(elapsed=time.perf_counter() - start)
+        if on_result is not None:
+            on_result(status)
+        return status
+
+    return list(await asyncio.gather(*(one(path) for path in paths)))
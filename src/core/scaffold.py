@@ -0,0 +1,365 @@
+"""新建仓库：在临时目录中一次性生成初始提交，成功后整体移动到目标位置
+
+    request = RepoRequest("/home/user/demo", "demo", "A demo", readme=True, gitignore="Python", license="MIT")
+    sha = create(request)                        # 初始提交的 SHA（没有任何文件时为 None）
+    python -m core.scaffold repos.json           # 按清单批量创建
+
+流程：
+1. 在目标目录旁边建一个临时目录，git init；
+2. README、.gitignore、LICENSE 在内存中生成（模板见 templates/ 目录），
+   用一个 `git fast-import` 进程写入全部对象和初始提交，再用 `git read-tree -u`
+   检出到工作区（索引和工作区一次写好，不逐个 git add）；
+3. 所有文件最后统一 fsync 一次，然后把临时目录改名为目标目录；
+任何一步失败（或被取消）都删除临时目录，目标位置保持原样。
+
+目标目录可以已经有文件（例如把现有项目变成仓库）：这时生成的文件逐个写入目标目录
+（同名文件已存在时保留原文件、不放进初始提交），最后只把 .git 移进去；失败时删除
+已经写入的文件。目标目录中已经有 .git 时拒绝创建。
+登记到工作区由调用方完成（见 Workspace.add / add_many）。
+
+清单文件是 JSON：仓库列表，或 {"repositories": [...]}，每项的键与 RepoRequest 相同，
+相对路径相对于清单文件所在目录。
+"""
+
+import json
+import os
+import secrets
+import shutil
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import NamedTuple, Optional
+
+from .git_backend import GitBackend, GitError, init_repository
+from .template_archive import TemplateArchiveError, gitignore_templates
+
+TEMPLATE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "templates")
+COMMIT_MESSAGE = "Initial commit"
+
+# 界面中可选的许可证：除 PROPRIETARY 外都是 SPDX 标识
+PROPRIETARY = "Proprietary"
+LICENSES = [
+    "0BSD", "AGPL-3.0-only", "Apache-2.0", "Artistic-2.0",
+    "BSD-2-Clause", "BSD-3-Clause", "BSL-1.0",
+    "CC0-1.0", "CDDL-1.0", "EPL-2.0",
+    "GPL-2.0-only", "GPL-3.0-only", "ISC",
+    "LGPL-2.1-only", "LGPL-3.0-only",
+    "MIT", "MPL-2.0", "OFL-1.1", "OpenSSL", "OSL-3.0",
+    "PostgreSQL", PROPRIETARY, "PSF-2.0", "Python-2.0", "Ruby",
+    "Unlicense", "WTFPL", "Zlib",
+]
+# 旧版界面（以及旧的清单文件）中使用的名称
+LICENSE_ALIASES = {
+    "AGPL-3.0": "AGPL-3.0-only", "GPL-2.0": "GPL-2.0-only", "GPL-3.0": "GPL-3.0-only",
+    "LGPL-2.1": "LGPL-2.1-only", "LGPL-3.0": "LGPL-3.0-only",
+    "OFPL": "OFL-1.1", "PSF": "PSF-2.0", "openssl": "OpenSSL",
+}
+
+
+class ScaffoldError(Exception):
+    pass
+
+
+class RepoRequest(NamedTuple):
+    path: str
+    name: str
+    description: str = ""
+    readme: bool = False
+    gitignore: Optional[str] = None     # 模板名（templates/gitignore.pack 中的名称）
+    license: Optional[str] = None       # SPDX 标识（templates/licenses/<标识>.txt）或 "Proprietary"
+
+
+# ---- 模板 ----
+
+def _read_template(kind: str, name: str, suffix: str) -> Optional[str]:
+    path = os.path.join(TEMPLATE_DIR, kind, name + suffix)
+    try:
+        with open(path, encoding="utf-8") as f:
+            return f.read()
+    except (OSError, ValueError):
+        return None
+
+
+def gitignore_template(name: str) -> Optional[str]:
+    """内置的 .gitignore 模板（见 core.template_archive），没有或归档无法读取时返回 None"""
+    try:
+        return gitignore_templates().get(name)
+    except TemplateArchiveError:
+        return None
+
+
+def license_text(spdx: str, year: int, holder: str) -> str:
+    """许可证全文；没有内置全文的许可证只写 SPDX 标识和官方文本的链接
+
+    PROPRIETARY 写保留所有权利的声明；不在 LICENSES 中的名称只写版权行和名称。
+    """
+    spdx = LICENSE_ALIASES.get(spdx, spdx)
+    if spdx == PROPRIETARY:
+        return f"Copyright (c) {year} {holder}. All rights reserved.\n"
+    text = _read_template("licenses", spdx, ".txt")
+    if text is not None:
+        return text.replace("[year]", str(year)).replace("[fullname]", holder)
+    if spdx not in LICENSES:
+        return f"Copyright (c) {year} {holder}\n\nLicensed under {spdx}.\n"
+    return (f"SPDX-License-Identifier: {spdx}\n\n"
+            f"Copyright (c) {year} {holder}\n\n"
+            f"The full license text is available at https://spdx.org/licenses/{spdx}.html\n")
+
+
+def _chosen(value: Optional[str]) -> Optional[str]:
+    """界面中的 "None" 表示不选"""
+    return value if value and value != "None" else None
+
+
+def build_files(request: RepoRequest, holder: str, year: int, report=print) -> dict:
+    """初始提交的内容：{路径: bytes}"""
+    files = {}
+    if request.readme:
+        readme = f"# {request.name}\n"
+        if request.description:
+            readme += f"\n{request.description}\n"
+        files["README.md"] = readme
+    gitignore = _chosen(request.gitignore)
+    if gitignore:
+        text = gitignore_template(gitignore)
+        if text is None:
+            report(f"⚠️  没有内置 {gitignore} 的 .gitignore 模板，已跳过")
+        else:
+            files[".gitignore"] = text
+    license = _chosen(request.license)
+    if license:
+        files["LICENSE"] = license_text(license, year, holder)
+    return {path: text.encode("utf-8") for path, text in files.items()}
+
+
+# ---- 创建 ----
+
+def _fast_import_stream(ref: str, ident: str, files: dict) -> bytes:
+    message = COMMIT_MESSAGE.encode()
+    parts = [
+        b"commit %s\n" % ref.encode(),
+        b"author %s\ncommitter %s\n" % (ident.encode(), ident.encode()),
+        b"data %d\n%s\n" % (len(message), message),
+    ]
+    for path, data in sorted(files.items()):
+        parts.append(b"M 100644 inline %s\ndata %d\n%s\n" % (path.encode(), len(data), data))
+    parts.append(b"done\n")
+    return b"".join(parts)
+
+
+def _fsync_tree(root: str):
+    """fsync root 下的所有文件和目录（目录只在 POSIX 上可以 fsync）"""
+    for directory, _dirs, names in os.walk(root, topdown=False):
+        for name in names:
+            fd = os.open(os.path.join(directory, name), os.O_RDONLY)
+            try:
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+        _fsync_dir(directory)
+
+
+def _fsync_dir(path: str):
+    if os.name != "posix":
+        return
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _move_into(tmp: str, target: str, files: dict):
+    """已有文件的目标目录：生成的文件逐个写入（不覆盖），最后把 .git 移进去"""
+    written = []
+    try:
+        for path, data in sorted(files.items()):
+            dest = os.path.join(target, path)
+            with open(dest, "xb") as f:
+                written.append(dest)
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+        os.rename(os.path.join(tmp, ".git"), os.path.join(target, ".git"))
+    except BaseException:
+        for dest in written:
+            try:
+                os.remove(dest)
+            except OSError:
+                pass
+        raise
+    _fsync_dir(target)
+
+
+def _check(cancelled: Optional[threading.Event]):
+    if cancelled is not None and cancelled.is_set():
+        raise ScaffoldError("已取消")
+
+
+def create(request: RepoRequest, report=print, cancelled: Optional[threading.Event] = None) -> Optional[str]:
+    """创建仓库，返回初始提交的 SHA（没有选择任何文件时不创建提交，返回 None）
+
+    失败或 cancelled 被设置时删除所有中间结果并抛出 ScaffoldError。
+    """
+    target = os.path.abspath(request.path)
+    if os.path.lexists(target) and not os.path.isdir(target):
+        raise ScaffoldError(f"目标已存在且不是目录: {target}")
+    if os.path.lexists(os.path.join(target, ".git")):
+        raise ScaffoldError(f"目标已经是 git 仓库: {target}")
+    populated = os.path.isdir(target) and bool(os.listdir(target))
+    target_was_empty_dir = os.path.isdir(target) and not populated
+    parent = os.path.dirname(target)
+    created_parents = []
+    ancestor = parent
+    while not os.path.exists(ancestor):
+        created_parents.append(ancestor)
+        ancestor = os.path.dirname(ancestor)
+
+    tmp = None
+    try:
+        os.makedirs(parent, exist_ok=True)
+        # 不用 tempfile.mkdtemp：它的目录权限是 0700，改名后会成为仓库目录的权限
+        tmp = os.path.join(parent, f".{os.path.basename(target)}.{secrets.token_hex(4)}.tmp")
+        os.mkdir(tmp)
+        init_repository(tmp)
+        report("✅ git init")
+        _check(cancelled)
+
+        sha = None
+        backend = GitBackend(tmp)
+        ident = backend.run(["var", "GIT_COMMITTER_IDENT"]).strip()
+        holder = ident.split(" <", 1)[0]
+        files = build_files(request, holder, time.localtime().tm_year, report)
+        if populated:
+            for path in sorted(files):
+                if os.path.lexists(os.path.join(target, path)):
+                    report(f"⚠️  {path} 已存在，保留原文件，不放进初始提交")
+                    del files[path]
+        if files:
+            with open(os.path.join(tmp, ".git", "HEAD"), encoding="utf-8") as f:
+                ref = f.read().strip().removeprefix("ref: ")
+            # 流中的长度是字节数，以 bytes 写入（文本模式在 Windows 上会改写换行）
+            backend.run(["fast-import", "--quiet", "--done"], input=_fast_import_stream(ref, ident, files))
+            backend.run(["read-tree", "--reset", "-u", "HEAD"])
+            # 新仓库中 fast-import 写的是松散引用，直接读文件，不再启动 rev-parse
+            with open(os.path.join(tmp, ".git", *ref.split("/")), encoding="utf-8") as f:
+                sha = f.read().strip()
+            report(f"✅ 初始提交 {sha[:12]}: {', '.join(sorted(files))}")
+        _check(cancelled)
+
+        _fsync_tree(tmp)
+        if populated:
+            _move_into(tmp, target, files)
+            shutil.rmtree(tmp, ignore_errors=True)
+            tmp = None
+            try:
+                # 索引中记录的是临时目录里文件的时间戳，刷新后 git status 不必重新比较内容
+                GitBackend(target).run(["update-index", "-q", "--refresh"])
+            except GitError:
+                pass
+        else:
+            if os.path.isdir(target):
+                os.rmdir(target)        # 空的目标目录（Windows 上不能直接改名覆盖）
+            os.rename(tmp, target)
+            tmp = None
+            _fsync_dir(parent)
+        report(f"✅ 仓库已创建: {target}")
+        return sha
+    except GitError as e:
+        if e.cmd[1:3] == ["var", "GIT_COMMITTER_IDENT"]:
+            raise ScaffoldError("没有配置提交者身份，请先设置 git config --global user.name / user.email") from e
+        raise ScaffoldError(str(e)) from e
+    except FileNotFoundError as e:
+        if e.filename == "git":
+            raise ScaffoldError("未找到 git 命令，请确保 Git 已安装并添加到系统 PATH") from e
+        raise ScaffoldError(str(e)) from e
+    except OSError as e:
+        raise ScaffoldError(str(e)) from e
+    finally:
+        if tmp is not None:
+            shutil.rmtree(tmp, ignore_errors=True)
+            if target_was_empty_dir and not os.path.exists(target):
+                os.mkdir(target)
+            for path in created_parents:
+                try:
+                    os.rmdir(path)
+                except OSError:
+                    break
+
+
+# ---- 批量创建 ----
+
+class BatchResult(NamedTuple):
+    request: RepoRequest
+    sha: Optional[str]
+    error: Optional[str]
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def load_manifest(path: str) -> list:
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    if isinstance(data, dict):
+        data = data.get("repositories", [])
+    base = os.path.dirname(os.path.abspath(path))
+    requests = []
+    for item in data:
+        repo_path = os.path.join(base, os.path.expanduser(item["path"]))
+        fields = {key: item[key] for key in RepoRequest._fields if key in item and key != "path"}
+        fields.setdefault("name", os.path.basename(os.path.normpath(repo_path)))
+        requests.append(RepoRequest(path=repo_path, **fields))
+    return requests
+
+
+def create_many(requests: list, report=print, workers: int = 4) -> list:
+    """并行创建多个仓库，每个仓库各自原子地成功或失败，返回 BatchResult 列表（与输入顺序相同）"""
+    lock = threading.Lock()
+
+    def locked_report(line):
+        with lock:
+            report(line)
+
+    def one(request):
+        try:
+            sha = create(request, report=lambda line: locked_report(f"[{request.name}] {line}"))
+            return BatchResult(request, sha, None)
+        except ScaffoldError as e:
+            locked_report(f"[{request.name}] ❌ {e}")
+            return BatchResult(request, None, str(e))
+
+    with ThreadPoolExecutor(max_workers=max(workers, 1)) as pool:
+        return list(pool.map(one, requests))
+
+
+def main(argv=None):
+    import argparse
+
+    from .workspace import Workspace
+
+    parser = argparse.ArgumentParser(prog="python -m core.scaffold", description="按清单批量创建仓库")
+    parser.add_argument("manifest")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--no-register", action="store_true", help="不登记到工作区")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    results = create_many(load_manifest(args.manifest), workers=args.workers)
+    created = [result for result in results if result.ok]
+    if created and not args.no_register:
+        Workspace().add_many([
+            (r.request.path, r.request.name, {
+                "description": r.request.description, "initialize_with_readme": r.request.readme,
+                "git_ignore": r.request.gitignore, "license": r.request.license,
+            }) for r in created
+        ])
+    print(f"{len(created)}/{len(results)} 个仓库已创建，用时 {time.perf_counter() - start:.2f} s")
+    return 0 if len(created) == len(results) else 1
+
+
+# 测试入口
+if __name__ == "__main__":
+    sys.exit(main())
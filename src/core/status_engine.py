@@ -0,0 +1,173 @@
+"""增量工作区状态
+
+对大仓库每次刷新都运行一遍完整的 `git status` 要几秒钟。StatusEngine 只在启动时
+（以及 .git/index、HEAD 被外部改动或监视事件丢失时）做一次全量扫描，之后监视
+工作区（core.fs_watch），只对变化的路径运行
+
+    git --literal-pathspecs status --porcelain=v2 -z -uall --no-renames -- <变化的路径>
+
+git 只需检查与这些路径匹配的索引项和目录，开销与变化量而不是仓库大小相关。
+与旧状态比较后把差异（新增/变化/消失的条目）推送给 on_diff。
+
+说明：
+- 增量查询只看到一部分路径，无法可靠地配对重命名，因此统一使用 --no-renames，
+  重命名显示为删除 + 新增。
+- 未跟踪文件逐个列出（-uall），目录级的变化才能映射到具体条目。
+- 使用 --no-optional-locks，状态查询不会改写 .git/index，避免触发自己的监视。
+"""
+
+import threading
+import time
+from typing import NamedTuple
+
+from .fs_watch import GIT_STATE, open_watcher
+from .git_backend import GitBackend
+from .refs import git_dir
+from .repo_status import parse_porcelain_v2
+
+STATUS_ARGS = ["--no-optional-locks", "--literal-pathspecs", "status",
+               "--porcelain=v2", "-z", "--untracked-files=all", "--no-renames"]
+
+# 一次查询最多带多少个路径；变化超过 MAX_PATHS 时直接全量扫描
+PATHS_PER_QUERY = 512
+MAX_PATHS = 4096
+
+
+class StatusDiff(NamedTuple):
+    added: list       # 新出现的 StatusEntry
+    changed: list     # 状态变化的 StatusEntry
+    removed: list     # 不再有变化的路径
+    full: bool        # 是否来自全量扫描
+    elapsed: float    # git status 耗时（秒）
+
+    def __bool__(self):
+        return bool(self.added or self.changed or self.removed)
+
+
+def _affected(path: str, prefixes: set) -> bool:
+    """path 本身或它的某一级父目录是否在 prefixes 中"""
+    while True:
+        if path in prefixes:
+            return True
+        slash = path.rfind("/")
+        if slash < 0:
+            return False
+        path = path[:slash]
+
+
+class StatusEngine:
+    def __init__(self, repo_path: str, on_diff=None, debounce: float = 0.03, watcher=None):
+        self.repo_path = repo_path
+        self.on_diff = on_diff
+        self.debounce = debounce
+        self.entries = {}           # path -> StatusEntry
+        self.backend = GitBackend.for_repo(repo_path)
+        self.watcher = watcher
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    # ---- 查询 ----
+
+    def _query(self, paths=()) -> dict:
+        args = [*STATUS_ARGS, "--", *paths] if paths else STATUS_ARGS
+        _header, entries = parse_porcelain_v2(self.backend.run(args))
+        return {entry.path: entry for entry in entries}
+
+    def _apply(self, fresh: dict, scope, full: bool, elapsed: float) -> StatusDiff:
+        """用 fresh 替换 scope 范围内的旧条目（scope 为 None 表示全部）"""
+        added, changed, removed = [], [], []
+        with self._lock:
+            if scope is None:
+                stale = [path for path in self.entries if path not in fresh]
+            else:
+                stale = [path for path in self.entries if path not in fresh and _affected(path, scope)]
+            for path in stale:
+                del self.entries[path]
+                removed.append(path)
+            for path, entry in fresh.items():
+                old = self.entries.get(path)
+                if old is None:
+                    added.append(entry)
+                elif old != entry:
+                    changed.append(entry)
+                self.entries[path] = entry
+        diff = StatusDiff(added, changed, removed, full, elapsed)
+        if diff and self.on_diff is not None:
+            self.on_diff(diff)
+        return diff
+
+    def rescan(self) -> StatusDiff:
+        """全量 git status"""
+        start = time.perf_counter()
+        fresh = self._query()
+        return self._apply(fresh, None, True, time.perf_counter() - start)
+
+    def refresh_paths(self, paths) -> StatusDiff:
+        """只重新计算 paths（文件或目录）的状态"""
+        paths = sorted(set(paths))
+        if not paths:
+            return StatusDiff([], [], [], False, 0.0)
+        if len(paths) > MAX_PATHS:
+            return self.rescan()
+        start = time.perf_counter()
+        fresh = {}
+        for i in range(0, len(paths), PATHS_PER_QUERY):
+            fresh.update(self._query(paths[i:i + PATHS_PER_QUERY]))
+        scope = set(paths)
+        fresh = {path: entry for path, entry in fresh.items() if _affected(path, scope)}
+        return self._apply(fresh, scope, False, time.perf_counter() - start)
+
+    def snapshot(self) -> list:
+        with self._lock:
+            return sorted(self.entries.values(), key=lambda entry: entry.path)
+
+    # ---- 监视 ----
+
+    def start(self) -> StatusDiff:
+        """全量扫描一次，然后在后台线程中监视变化；返回首次扫描的结果"""
+        if self.watcher is None:
+            self.watcher = open_watcher(self.repo_path, git_dir(self.repo_path))
+        diff = self.rescan()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="status-engine", daemon=True)
+        self._thread.start()
+        return diff
+
+    def _run(self):
+        while not self._stop.is_set():
+            changes = self.watcher.read(0.5)
+            if changes is not None and not changes:
+                continue
+            # 合并短时间内连续到达的事件（编辑器保存一次文件往往产生好几个事件）
+            while changes is not None and self.debounce > 0 and not self._stop.is_set():
+                more = self.watcher.read(self.debounce)
+                if more is None:
+                    changes = None
+                elif not more:
+                    break
+                else:
+                    changes |= more
+            if self._stop.is_set():
+                break
+            try:
+                if changes is None or GIT_STATE in changes:
+                    self.rescan()
+                else:
+                    self.refresh_paths(changes)
+            except Exception:
+                # 查询失败（例如仓库被删除）时不中断监视，下次变化再试
+                continue
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+            self._thread = None
+        if self.watcher is not None:
+            self.watcher.close()
+            self.watcher = None
+
+    @property
+    def watching(self) -> str:
+        return type(self.watcher).__name__ if self.watcher is not None else "stopped"
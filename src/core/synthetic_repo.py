@@ -0,0 +1,239 @@
+"""合成仓库生成器：用一个 git fast-import 进程生成大规模测试仓库
+
+历史图、工作区状态和仪表盘要在 10^5–10^6 个提交的仓库上测试。逐个运行
+`git commit` 太慢，这里直接用 Python 写出 fast-import 命令流，整个仓库由
+一个 git 进程一次导入：
+
+    python -m core.synthetic_repo /tmp/big --commits 1000000 --branches 32 --files 20000
+    make_synthetic_repo("/tmp/big", commits=100000, octopus_every=1000)   # 参数相同时直接复用
+
+仓库的形状由 RepoSpec 决定：
+- 第一个提交在 main 上写入 files 个文件，分布在 prefix 下的 dirs 个目录中（宽树）；
+- 之后每个提交属于 main 或某个特性分支，修改 files_per_commit 个文件；
+- 每 merge_every 个提交把一个特性分支合并回 main，该分支随后从 main 重新分叉；
+- 每 octopus_every 个提交做一次章鱼合并（一次合并 octopus_width 个分支）；
+- big_file_lines 不为 0 时另有一个大文件 BIG_FILE，之后每个提交改写其中相邻的 1–5 行
+  （blame 测试）；
+- 最后加上 tags 个轻量标签和 branch_refs 个只是指针的分支，均匀指向历史中的提交
+  （引用很多的仓库）。
+同样的参数总是生成同样的历史（文件选择用固定种子的随机数）。
+write_stream 也可以从已有提交开始，把历史追加到已有仓库的另一个分支上。
+
+仓库目录由 git_backend.init_repository 初始化（和新建仓库走同一条 git init 路径），
+生成参数记录在 .git/synthetic-repo 中。
+"""
+
+import os
+import random
+import shutil
+import subprocess
+import sys
+from typing import NamedTuple
+
+from .git_backend import init_repository
+
+MARKER = "synthetic-repo"
+# 旧版基准工具的标记文件，同样视为生成器创建的仓库
+LEGACY_MARKER = "synthetic-commits"
+START_TIME = 1_600_000_000
+BIG_FILE = "src/big.py"
+TAG_PREFIX = "refs/tags/ci/build-"
+BRANCH_REF_PREFIX = "refs/heads/feature/"
+
+
+class RepoSpec(NamedTuple):
+    commits: int = 10_000
+    branches: int = 8               # 分支数（含 main）
+    merge_every: int = 50           # 0 表示不合并
+    octopus_every: int = 0          # 0 表示不做章鱼合并
+    octopus_width: int = 4          # 章鱼合并的父提交数（含 main）
+    files: int = 100                # 第一个提交写入的文件数
+    dirs: int = 10                  # 文件分布的目录数
+    files_per_commit: int = 1
+    authors: int = 20
+    seed: int = 1
+    prefix: str = "src"             # 文件所在的顶层目录
+    message: str = "commit {n} on {branch}"     # 非合并提交的说明（format 模板）
+    start_time: int = START_TIME    # 第一个提交的时间（之后每个提交加一秒）
+    big_file_lines: int = 0         # BIG_FILE 的行数，0 表示没有
+    tags: int = 0                   # 轻量标签数（TAG_PREFIX<i>）
+    branch_refs: int = 0            # 不产生提交的分支数（BRANCH_REF_PREFIX<i>）
+
+
+def _branch_name(index: int, main: str = "main") -> str:
+    return main if index == 0 else f"b{index}"
+
+
+def file_path(spec: RepoSpec, index: int) -> str:
+    """第 index 个文件的路径"""
+    return f"{spec.prefix}/d{index % max(spec.dirs, 1):03d}/f{index}.txt"
+
+
+def write_stream(spec: RepoSpec, write, report=None, main: str = "main", parent: str | None = None):
+    """把 spec 描述的历史写成 fast-import 命令流；write 接收 bytes
+
+    main 是主线分支名；parent 是已有提交的 SHA 时，第一个提交接在它后面
+    （向已有仓库追加历史）。
+    """
+    rng = random.Random(spec.seed)
+    branches = max(spec.branches, 1)
+    octopus_width = max(min(spec.octopus_width, branches), 2)
+    authors = [b"Dev %d <dev%d@example.com>" % (i, i) for i in range(max(spec.authors, 1))]
+    paths = [file_path(spec, i).encode() for i in range(max(spec.files, 0))]
+    big = [b"line %d = %d\n" % (i, i) for i in range(spec.big_file_lines)]
+    tips = {}
+    when = spec.start_time
+    step = max(spec.commits // 100, 1)
+
+    for n in range(1, spec.commits + 1):
+        when += 1
+        octopus = spec.octopus_every and n % spec.octopus_every == 0 and branches > 2
+        merge = spec.merge_every and n % spec.merge_every == 0 and branches > 1
+        if n == 1 or octopus or merge or n % 3 == 0 or branches == 1:
+            branch = main
+        else:
+            branch = _branch_name(1 + n % (branches - 1), main)
+        parent_mark = tips.get(branch) or tips.get(main)
+        merged = []
+        if octopus:
+            first = (n // spec.octopus_every) % (branches - 1)
+            names = [_branch_name(1 + (first + k) % (branches - 1), main) for k in range(octopus_width - 1)]
+            merged = [name for name in names if tips.get(name) and tips[name] != parent_mark]
+        elif merge:
+            name = _branch_name(1 + (n // spec.merge_every) % (branches - 1), main)
+            if tips.get(name) and tips[name] != parent_mark:
+                merged = [name]
+
+        if merged:
+            message = b"Merge %s into %s (%d)" % (b", ".join(name.encode() for name in merged), main.encode(), n)
+        else:
+            message = spec.message.format(n=n, branch=branch).encode()
+        author = authors[n % len(authors)]
+        parts = [
+            b"commit refs/heads/%s\nmark :%d\n" % (branch.encode(), n),
+            b"author %s %d +0000\ncommitter %s %d +0000\n" % (author, when, author, when),
+            b"data %d\n%s\n" % (len(message), message),
+        ]
+        if parent_mark:
+            parts.append(b"from :%d\n" % parent_mark)
+        elif parent:
+            parts.append(b"from %s\n" % parent.encode())
+        for name in merged:
+            parts.append(b"merge :%d\n" % tips[name])
+        if n == 1:
+            changed = range(len(paths))
+        elif paths:
+            changed = [rng.randrange(len(paths)) for _ in range(spec.files_per_commit)]
+        else:
+            changed = ()
+        for index in changed:
+            body = b"%d %d\n" % (index, n)
+            parts.append(b"M 644 inline %s\ndata %d\n%s\n" % (paths[index], len(body), body))
+        if big:
+            if n > 1:
+                start = rng.randrange(max(len(big) - 5, 1))
+                for i in range(start, min(start + rng.randint(1, 5), len(big))):
+                    big[i] = b"line %d = %d (commit %d)\n" % (i, i, n)
+            data = b"".join(big)
+            parts.append(b"M 644 inline %s\ndata %d\n%s\n" % (BIG_FILE.encode(), len(data), data))
+        write(b"".join(parts))
+
+        tips[branch] = n
+        for name in merged:
+            # 合并后的特性分支从新的主线重新分叉
+            tips[name] = n
+        if report is not None and n % step == 0:
+            report(n)
+
+    for prefix, count in ((TAG_PREFIX, spec.tags), (BRANCH_REF_PREFIX, spec.branch_refs)):
+        for i in range(count if spec.commits else 0):
+            write(b"reset %s%d\nfrom :%d\n\n" % (prefix.encode(), i, 1 + i % spec.commits))
+    write(b"done\n")
+
+
+def generate(path: str, spec: RepoSpec = RepoSpec(), report=None, compress: bool = False) -> str:
+    """在 path 生成仓库（path 必须不存在或为空）；report(n) 报告进度
+
+    默认不做 zlib 压缩（仍然做增量压缩，宽树的每个版本只存差异），导入快约 25%，
+    pack 稍大；compress=True 时使用 git 的默认设置。
+    """
+    os.makedirs(path, exist_ok=True)
+    init_repository(path)
+    options = [] if compress else ["-c", "core.compression=0"]
+    args = ["fast-import", "--quiet", "--done", f"--active-branches={max(spec.branches, 1) + 1}"]
+    proc = subprocess.Popen(["git", *options, *args], cwd=path, stdin=subprocess.PIPE, bufsize=1 << 20)
+    try:
+        write_stream(spec, proc.stdin.write, report)
+    finally:
+        proc.stdin.close()
+    if proc.wait() != 0:
+        raise RuntimeError("git fast-import failed")
+    subprocess.run(["git", "symbolic-ref", "HEAD", "refs/heads/main"], cwd=path, check=True)
+    with open(os.path.join(path, ".git", MARKER), "w", encoding="utf-8") as f:
+        f.write(repr(tuple(spec)))
+    return path
+
+
+def _generated(path: str) -> bool:
+    git_dir = os.path.join(path, ".git")
+    return any(os.path.exists(os.path.join(git_dir, name)) for name in (MARKER, LEGACY_MARKER))
+
+
+def make_synthetic_repo(path: str, commits: int = RepoSpec.commits, report=None, compress: bool = False,
+                        **params) -> str:
+    """生成仓库；path 已有同样参数生成的仓库时直接复用
+
+    path 是之前用其他参数生成的仓库时删除重建；是其他非空目录时抛出 FileExistsError。
+    """
+    spec = RepoSpec(commits=commits, **params)
+    marker = os.path.join(path, ".git", MARKER)
+    if os.path.exists(marker):
+        with open(marker, encoding="utf-8") as f:
+            if f.read().strip() == repr(tuple(spec)):
+                return path
+    if os.path.isdir(path) and os.listdir(path):
+        if not _generated(path):
+            raise FileExistsError(f"{path} 不是生成器创建的仓库，不会覆盖")
+        shutil.rmtree(path)
+    return generate(path, spec, report, compress)
+
+
+def main(argv=None):
+    import argparse
+    import time
+
+    defaults = RepoSpec()
+    parser = argparse.ArgumentParser(prog="python -m core.synthetic_repo",
+                                     description="用 git fast-import 生成合成测试仓库")
+    parser.add_argument("path")
+    for field in RepoSpec._fields:
+        default = getattr(defaults, field)
+        parser.add_argument(f"--{field.replace('_', '-')}", type=type(default), default=default)
+    parser.add_argument("--force", action="store_true", help="参数相同也重新生成")
+    parser.add_argument("--compress", action="store_true", help="用 zlib 压缩对象（慢约 25%%，pack 稍小）")
+    args = parser.parse_args(argv)
+
+    spec = RepoSpec(*(getattr(args, field) for field in RepoSpec._fields))
+    if args.force and _generated(args.path):
+        shutil.rmtree(args.path)
+    start = time.perf_counter()
+
+    def report(n):
+        if sys.stderr.isatty():
+            elapsed = time.perf_counter() - start
+            sys.stderr.write(f"\r{n}/{spec.commits} commits  {n / elapsed:,.0f}/s")
+            sys.stderr.flush()
+
+    try:
+        make_synthetic_repo(args.path, report=report, compress=args.compress, **spec._asdict())
+    except FileExistsError as e:
+        parser.error(str(e))
+    if sys.stderr.isatty():
+        sys.stderr.write("\n")
+    print(f"{args.path}: {spec.commits} commits, {spec.branches} branches, {spec.files} files "
+          f"in {time.perf_counter() - start:.1f} s")
+
+
+# 测试入口
+if __name__ == "__main__":
+    main()
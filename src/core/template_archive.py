@@ -0,0 +1,174 @@
+"""内置 .gitignore 模板的归档：一个文件加偏移索引，按需用 mmap 读取
+
+    archive = gitignore_templates()         # 第一次访问时才打开
+    archive.names()                         # 归档中的模板名（按名称排序）
+    archive.get("Python")                   # 模板全文，没有时返回 None
+
+归档是纯文本，git 中可以直接看差异：
+
+    GITTUI-TEMPLATES 1
+    <名称>\t<偏移>\t<长度>              每个模板一行，偏移相对于数据区开头
+    ...
+    <空行>
+    <数据区：各模板原文依次拼接>
+
+打开时只解析开头的索引（几十行），取模板就是从映射中切一段，不读其余部分，
+选择界面里逐项预览不会有文件读取的延迟。
+
+编辑模板时先解开成目录，改完再打包：
+
+    python -m core.template_archive unpack /tmp/gitignore
+    python -m core.template_archive pack /tmp/gitignore
+"""
+
+import mmap
+import os
+import sys
+import threading
+from typing import Optional
+
+MAGIC = b"GITTUI-TEMPLATES 1\n"
+SUFFIX = ".gitignore"
+GITIGNORE_ARCHIVE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "templates", "gitignore.pack")
+
+
+class TemplateArchiveError(Exception):
+    pass
+
+
+class TemplateArchive:
+    """只读的模板归档；文件在第一次 names()/get() 时才映射"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._map = None
+        self._index = None          # 名称 -> (偏移, 长度)
+        self._data = 0              # 数据区在文件中的起点
+
+    def _open(self):
+        if self._index is not None:
+            return
+        with self._lock:
+            if self._index is not None:
+                return
+            index, data, mapped = {}, 0, None
+            try:
+                with open(self.path, "rb") as f:
+                    if os.fstat(f.fileno()).st_size:
+                        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except OSError:
+                mapped = None
+            if mapped is not None:
+                try:
+                    index, data = self._parse_index(mapped)
+                except TemplateArchiveError:
+                    # 不保留映射；下次调用重新检查文件（可能已被修复）
+                    mapped.close()
+                    raise
+            self._map, self._data = mapped, data
+            self._index = index
+
+    def _parse_index(self, mapped) -> tuple:
+        if mapped[:len(MAGIC)] != MAGIC:
+            raise TemplateArchiveError(f"{self.path}: 不是模板归档")
+        end = mapped.find(b"\n\n", len(MAGIC) - 1)
+        if end < 0:
+            raise TemplateArchiveError(f"{self.path}: 索引不完整")
+        index = {}
+        for line in mapped[len(MAGIC):end].decode("utf-8").splitlines():
+            name, offset, length = line.split("\t")
+            index[name] = (int(offset), int(length))
+        return index, end + 2
+
+    def names(self) -> list:
+        self._open()
+        return sorted(self._index, key=str.lower)
+
+    def __contains__(self, name: str) -> bool:
+        self._open()
+        return name in self._index
+
+    def get(self, name: str) -> Optional[str]:
+        self._open()
+        entry = self._index.get(name)
+        if entry is None:
+            return None
+        start = self._data + entry[0]
+        return self._map[start:start + entry[1]].decode("utf-8")
+
+    def close(self):
+        with self._lock:
+            if self._map is not None:
+                self._map.close()
+            self._map, self._index = None, None
+
+
+def write_archive(path: str, templates: dict):
+    """把 {名称: 全文} 写成归档（先写临时文件再替换，打开中的映射不受影响）"""
+    header, chunks, offset = [MAGIC], [], 0
+    for name in sorted(templates, key=str.lower):
+        data = templates[name].encode("utf-8")
+        if "\t" in name or "\n" in name:
+            raise TemplateArchiveError(f"模板名不能包含制表符或换行: {name!r}")
+        header.append(f"{name}\t{offset}\t{len(data)}\n".encode("utf-8"))
+        chunks.append(data)
+        offset += len(data)
+    tmp = f"{path}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(b"".join(header) + b"\n" + b"".join(chunks))
+    os.replace(tmp, path)
+
+
+def pack(directory: str, path: str = GITIGNORE_ARCHIVE) -> int:
+    """目录中的 <名称>.gitignore 打包成归档，返回模板数"""
+    templates = {}
+    for entry in os.scandir(directory):
+        if entry.is_file() and entry.name.endswith(SUFFIX):
+            with open(entry.path, encoding="utf-8") as f:
+                templates[entry.name[:-len(SUFFIX)]] = f.read()
+    write_archive(path, templates)
+    return len(templates)
+
+
+def unpack(directory: str, path: str = GITIGNORE_ARCHIVE) -> int:
+    """归档解开成目录中的 <名称>.gitignore，返回模板数"""
+    archive = TemplateArchive(path)
+    os.makedirs(directory, exist_ok=True)
+    names = archive.names()
+    for name in names:
+        with open(os.path.join(directory, name + SUFFIX), "w", encoding="utf-8") as f:
+            f.write(archive.get(name))
+    archive.close()
+    return len(names)
+
+
+_gitignore = None
+
+
+def gitignore_templates() -> TemplateArchive:
+    """内置 .gitignore 模板的归档（进程内共享）"""
+    global _gitignore
+    if _gitignore is None:
+        _gitignore = TemplateArchive(GITIGNORE_ARCHIVE)
+    return _gitignore
+
+
+def main(argv=None) -> int:
+    argv = sys.argv[1:] if argv is None else argv
+    if len(argv) == 2 and argv[0] in ("pack", "unpack"):
+        count = (pack if argv[0] == "pack" else unpack)(argv[1])
+        print(f"{argv[0]}: {count} 个模板 ({GITIGNORE_ARCHIVE})")
+        return 0
+    if not argv or argv[0] == "list":
+        archive = gitignore_templates()
+        for name in archive.names():
+            print(name)
+        return 0
+    print("用法: python -m core.template_archive [list | pack <目录> | unpack <目录>]", file=sys.stderr)
+    return 2
+
+
+# 测试入口
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,125 @@
+"""工作区登记表：所有登记过的本地仓库，保存在一个索引文件中
+
+以前每创建一个仓库就在当前目录写一个 NewRepository.json，散落各处无法汇总。
+现在所有仓库都登记在用户数据目录的 workspace.json 里：
+
+    {"version": 1, "repositories": [{"path": ..., "name": ..., "added": ..., ...}, ...]}
+
+写入时先写临时文件再原子替换。每次修改都持有锁文件 workspace.json.lock
+（O_EXCL 创建），在锁内重新读取、修改、写回，同时运行的多个实例不会互相覆盖
+对方刚登记的仓库。
+"""
+
+import contextlib
+import json
+import os
+import time
+from typing import Optional
+
+from .paths import data_dir
+
+INDEX_FILE = "workspace.json"
+FORMAT_VERSION = 1
+# 等待其他实例释放锁的最长时间；超过 STALE_LOCK 秒的锁文件视为崩溃遗留
+LOCK_TIMEOUT = 5.0
+STALE_LOCK = 30.0
+
+
+def _key(path: str) -> str:
+    return os.path.normcase(os.path.abspath(path))
+
+
+class Workspace:
+    def __init__(self, index_path: Optional[str] = None):
+        self.index_path = index_path or os.path.join(data_dir(), INDEX_FILE)
+        self._entries = {}
+        self.reload()
+
+    # ---- 读写 ----
+
+    def reload(self):
+        try:
+            with open(self.index_path, encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            data = {}
+        if data.get("version") != FORMAT_VERSION:
+            data = {}
+        self._entries = {_key(entry["path"]): entry for entry in data.get("repositories", [])}
+
+    @contextlib.contextmanager
+    def _locked(self):
+        lock = f"{self.index_path}.lock"
+        deadline = time.monotonic() + LOCK_TIMEOUT
+        while True:
+            try:
+                os.close(os.open(lock, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+                break
+            except FileExistsError:
+                try:
+                    if time.time() - os.path.getmtime(lock) > STALE_LOCK:
+                        os.remove(lock)
+                        continue
+                except OSError:
+                    continue        # 锁刚被释放
+                if time.monotonic() > deadline:
+                    raise TimeoutError(f"{lock} 被其他实例占用")
+                time.sleep(0.01)
+        try:
+            yield
+        finally:
+            try:
+                os.remove(lock)
+            except OSError:
+                pass
+
+    def _save(self):
+        data = {"version": FORMAT_VERSION, "repositories": list(self._entries.values())}
+        tmp = f"{self.index_path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=1)
+        os.replace(tmp, self.index_path)
+
+    # ---- 登记 ----
+
+    def add(self, path: str, name: Optional[str] = None, **info) -> dict:
+        """登记仓库（已登记时更新信息），返回登记项"""
+        return self.add_many([(path, name, info)])[0]
+
+    def add_many(self, items) -> list:
+        """批量登记 [(path, name, info), ...]，只读写一次索引文件"""
+        with self._locked():
+            self.reload()
+            entries = []
+            for path, name, info in items:
+                path = os.path.abspath(path)
+                entry = self._entries.get(_key(path)) or {"path": path, "added": int(time.time())}
+                entry["name"] = name or entry.get("name") or os.path.basename(path.rstrip(os.sep)) or path
+                entry.update(info)
+                self._entries[_key(path)] = entry
+                entries.append(entry)
+            self._save()
+        return entries
+
+    def remove(self, path: str) -> bool:
+        with self._locked():
+            self.reload()
+            if self._entries.pop(_key(path), None) is None:
+                return False
+            self._save()
+        return True
+
+    def get(self, path: str) -> Optional[dict]:
+        return self._entries.get(_key(path))
+
+    def __contains__(self, path: str) -> bool:
+        return _key(path) in self._entries
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __iter__(self):
+        return iter(sorted(self._entries.values(), key=lambda entry: entry["name"].lower()))
+
+    def paths(self) -> list:
+        return [entry["path"] for entry in self]
@@ -0,0 +1,29 @@
+"""测试公共设置：导入路径与 git 提交者身份"""
+
+import os
+import sys
+
+import pytest
+
+SRC = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+if SRC not in sys.path:
+    sys.path.insert(0, SRC)
+
+
+@pytest.fixture(autouse=True)
+def git_identity(monkeypatch):
+    """不依赖本机的 git 全局配置"""
+    for kind in ("AUTHOR", "COMMITTER"):
+        monkeypatch.setenv(f"GIT_{kind}_NAME", "Test User")
+        monkeypatch.setenv(f"GIT_{kind}_EMAIL", "test@example.com")
+
+
+@pytest.fixture
+def project(tmp_path) -> str:
+    """已有文件的项目目录（还不是仓库）"""
+    root = tmp_path / "proj"
+    for path, text in [("main.py", "x\n"), ("pkg/__init__.py", "x\n"), ("pkg/__pycache__/mod.cpython-312.pyc", "x\n"),
+                       ("build/lib/out.txt", "x\n"), ("README.md", "existing readme\n")]:
+        (root / path).parent.mkdir(parents=True, exist_ok=True)
+        (root / path).write_text(text)
+    return str(root)
@@ -0,0 +1,141 @@
+import asyncio
+import os
+import re
+import subprocess
+
+import pytest
+
+from core.clone import CloneOptions, clone_repository, parse_progress
+from core.git_backend import GitError, error_line
+
+# `git clone --progress file://...` 的 stderr 原样截取：同一阶段的更新以 \r 分隔
+CLONE_STDERR = (
+    "Cloning into 'out'...\n"
+    "remote: Enumerating objects: 302, done.        \n"
+    "remote: Counting objects:   0% (1/302)        \r"
+    "remote: Counting objects:  29% (88/302)        \r"
+    "remote: Counting objects: 100% (302/302)        \r"
+    "remote: Counting objects: 100% (302/302), done.        \n"
+    "remote: Compressing objects: 100% (302/302), done.        \n"
+    "Receiving objects:  45% (136/302)\r"
+    "Receiving objects: 100% (302/302)\r"
+    "Receiving objects: 100% (302/302), 5.89 MiB | 12.28 MiB/s, done.\n"
+    "Resolving deltas: 100% (2/2), done.\n"
+)
+
+COMMITS = 5
+
+
+def git(cwd, *args) -> str:
+    return subprocess.run(["git", *args], cwd=cwd, check=True, capture_output=True, text=True).stdout
+
+
+@pytest.fixture(scope="module")
+def remote(tmp_path_factory) -> str:
+    """本地裸仓库的 file:// URL：main 上 COMMITS 个提交，另有一个 dev 分支"""
+    root = tmp_path_factory.mktemp("remote")
+    work = str(root / "work")
+    env = dict(os.environ, GIT_AUTHOR_NAME="Test", GIT_AUTHOR_EMAIL="t@example.com",
+               GIT_COMMITTER_NAME="Test", GIT_COMMITTER_EMAIL="t@example.com")
+    subprocess.run(["git", "init", "-q", "-b", "main", work], check=True)
+    for i in range(COMMITS):
+        # data.bin 每次都改写，更早的版本只在历史中
+        for name in (f"file{i}.txt", "data.bin"):
+            with open(os.path.join(work, name), "wb") as f:
+                f.write(os.urandom(64 * 1024))
+        subprocess.run(["git", "add", "-A"], cwd=work, check=True, env=env)
+        subprocess.run(["git", "commit", "-q", "-m", f"commit {i}"], cwd=work, check=True, env=env)
+    git(work, "branch", "dev", "HEAD~1")
+    bare = str(root / "remote.git")
+    git(str(root), "clone", "-q", "--bare", work, bare)
+    # file:// 克隆时 --filter 需要服务端允许
+    git(bare, "config", "uploadpack.allowFilter", "true")
+    return f"file://{bare}"
+
+
+def clone(url, path, options=CloneOptions(), **kwargs) -> str:
+    return asyncio.run(clone_repository(url, path, options, **kwargs))
+
+
+def remote_branches(path) -> list:
+    refs = git(path, "for-each-ref", "--format=%(refname:short)", "refs/remotes/origin").split()
+    return [ref for ref in refs if ref != "origin/HEAD"]
+
+
+def test_plain_clone(remote, tmp_path):
+    progress = []
+    path = clone(remote, str(tmp_path / "plain"), on_progress=progress.append)
+    assert git(path, "rev-list", "--count", "HEAD").strip() == str(COMMITS)
+    assert set(remote_branches(path)) >= {"origin/main", "origin/dev"}
+    assert any(p.phase == "Receiving objects" and p.done for p in progress)
+
+
+def test_shallow_clone(remote, tmp_path):
+    path = clone(remote, str(tmp_path / "shallow"), CloneOptions(depth=1))
+    assert git(path, "rev-list", "--count", "HEAD").strip() == "1"
+    assert git(path, "rev-parse", "--is-shallow-repository").strip() == "true"
+
+
+def test_blobless_clone(remote, tmp_path):
+    path = clone(remote, str(tmp_path / "blobless"), CloneOptions(blob_filter=True))
+    assert git(path, "config", "remote.origin.partialclonefilter").strip() == "blob:none"
+    # 只下载了检出 HEAD 所需的文件内容，data.bin 的旧版本不在本地
+    missing = git(path, "rev-list", "--objects", "--all", "--missing=print").splitlines()
+    assert any(line.startswith("?") for line in missing)
+
+
+def test_single_branch_clone(remote, tmp_path):
+    path = clone(remote, str(tmp_path / "single"), CloneOptions(single_branch=True))
+    assert remote_branches(path) == ["origin/main"]
+    path = clone(remote, str(tmp_path / "dev"), CloneOptions(single_branch=True, branch="dev"))
+    assert remote_branches(path) == ["origin/dev"]
+    assert git(path, "rev-list", "--count", "HEAD").strip() == str(COMMITS - 1)
+
+
+@pytest.mark.parametrize("existing", [False, True])
+def test_cancel_removes_partial_clone(remote, tmp_path, existing):
+    target = tmp_path / "cancelled"
+    if existing:
+        target.mkdir()
+
+    async def run():
+        task = asyncio.ensure_future(clone_repository(remote, str(target), on_line=lambda _line: task.cancel()))
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(run())
+    # 新建的目录整个删除；原来就有的空目录保留并清空
+    assert target.exists() == existing
+    if existing:
+        assert os.listdir(target) == []
+
+
+def test_failed_clone_removes_target(tmp_path):
+    target = tmp_path / "missing"
+    with pytest.raises(GitError) as info:
+        clone(f"file://{tmp_path / 'no-such.git'}", str(target))
+    assert not target.exists()
+    assert error_line(info.value.stderr).startswith("fatal:")
+
+
+def test_parse_progress_on_clone_stderr():
+    lines = re.split(r"[\r\n]", CLONE_STDERR)
+    parsed = [parse_progress(line) for line in lines if line]
+    assert parsed[0] is None                       # Cloning into 'out'...
+
+    enumerate_ = parsed[1]
+    assert (enumerate_.phase, enumerate_.current, enumerate_.total, enumerate_.done) == (
+        "Enumerating objects", 302, None, True)
+    assert enumerate_.remote
+
+    counting = [p for p in parsed[1:] if p.phase == "Counting objects"]
+    assert [(p.percent, p.current, p.done) for p in counting] == [
+        (0, 1, False), (29, 88, False), (100, 302, False), (100, 302, True)]
+
+    receiving = [p for p in parsed[1:] if p.phase == "Receiving objects"]
+    assert [p.percent for p in receiving] == [45, 100, 100]
+    last = receiving[-1]
+    assert not last.remote and last.done
+    assert last.transferred == int(5.89 * (1 << 20))
+    assert last.rate == int(12.28 * (1 << 20))
+    assert parsed[-1].phase == "Resolving deltas" and parsed[-1].done
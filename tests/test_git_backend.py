@@ -0,0 +1,63 @@
+import os
+import subprocess
+import threading
+
+from core.git_backend import CatFileProcess, GitBackend
+
+
+def test_cat_file_missing_path_with_spaces(tmp_path):
+    repo = str(tmp_path)
+    subprocess.run(["git", "init", "-q", repo], check=True)
+    (tmp_path / "a file.txt").write_text("hello\n")
+    subprocess.run(["git", "add", "-A"], cwd=repo, check=True)
+    subprocess.run(["git", "commit", "-q", "-m", "init"], cwd=repo, check=True)
+
+    backend = GitBackend(repo)
+    try:
+        # "HEAD:no such file.txt missing" 不能被当成 "<sha> <类型> <大小>" 解析
+        assert backend.read("HEAD:no such file.txt") is None
+        assert backend.info("HEAD:no such file.txt") is None
+        # 同一个常驻进程上后续请求不受影响
+        assert backend.read_text("HEAD:a file.txt") == "hello\n"
+    finally:
+        backend.close()
+
+
+def _repo_with_blob(tmp_path, size: int) -> str:
+    repo = str(tmp_path)
+    subprocess.run(["git", "init", "-q", repo], check=True)
+    (tmp_path / "big.bin").write_bytes(os.urandom(size))
+    subprocess.run(["git", "add", "-A"], cwd=repo, check=True)
+    subprocess.run(["git", "commit", "-q", "-m", "init"], cwd=repo, check=True)
+    return repo, subprocess.run(["git", "rev-parse", "HEAD:big.bin"], cwd=repo, check=True,
+                                capture_output=True, text=True).stdout.strip()
+
+
+def _finishes(func, timeout: float = 60):
+    """在线程中运行 func，超时（死锁）时返回 None 而不是卡住整个测试"""
+    result = []
+    thread = threading.Thread(target=lambda: result.append(func()), daemon=True)
+    thread.start()
+    thread.join(timeout)
+    return result[0] if result else None
+
+
+def test_pipelined_reads_of_many_large_objects(tmp_path):
+    # git 的 stdout 管道写满后不再读 stdin：写请求阻塞时读线程必须仍能取出 Future
+    # 请求用完整 SHA：3000 个请求超过 stdin 管道的缓冲区
+    repo, sha = _repo_with_blob(tmp_path, 70 * 1024)
+    count = 3000
+    process = CatFileProcess(repo, with_data=True)
+
+    def submit_all():
+        futures = [process.submit(sha) for _ in range(count)]
+        return [future.result().size for future in futures]
+
+    # 死锁时 close 也会卡在锁上，只在成功后关闭
+    assert _finishes(submit_all) == [70 * 1024] * count
+    process.close()
+
+    backend = GitBackend(repo)
+    objects = _finishes(lambda: backend.read_many([sha] * count))
+    assert objects is not None and [obj.size for obj in objects] == [70 * 1024] * count
+    backend.close()
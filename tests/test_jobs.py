@@ -0,0 +1,166 @@
+import asyncio
+import os
+import stat
+import subprocess
+import time
+
+import pytest
+
+from core.jobs import (CANCELLED, CPU, DONE, FAILED, NETWORK, RETRYING, RUNNING, SKIPPED, JobScheduler,
+                       is_transient)
+
+# uploadpack 脚本（模拟慢速或不稳定的远程）需要 sh
+pytestmark = pytest.mark.skipif(os.name != "posix", reason="uploadpack 脚本需要 POSIX shell")
+
+
+def git(cwd, *args) -> str:
+    return subprocess.run(["git", *args], cwd=cwd, check=True, capture_output=True, text=True).stdout
+
+
+def script(path, body: str) -> str:
+    with open(path, "w") as f:
+        f.write(f"#!/bin/sh\n{body}\n")
+    os.chmod(path, os.stat(path).st_mode | stat.S_IEXEC)
+    return str(path)
+
+
+@pytest.fixture
+def remote(tmp_path) -> str:
+    """file:// 上的本地裸仓库"""
+    work = str(tmp_path / "seed")
+    git(str(tmp_path), "init", "-q", "-b", "main", work)
+    git(work, "commit", "-q", "--allow-empty", "-m", "seed")
+    bare = str(tmp_path / "remote.git")
+    git(str(tmp_path), "clone", "-q", "--bare", work, bare)
+    return f"file://{bare}"
+
+
+def clones(tmp_path, remote, count: int, uploadpack=None) -> list:
+    paths = []
+    for i in range(count):
+        path = str(tmp_path / f"repo{i}")
+        git(str(tmp_path), "clone", "-q", remote, path)
+        if uploadpack is not None:
+            git(path, "config", "remote.origin.uploadpack", uploadpack)
+        paths.append(path)
+    return paths
+
+
+class RecordingScheduler(JobScheduler):
+    """记录每次重试前等待的秒数"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.delays = []
+
+    def backoff_delay(self, attempt: int) -> float:
+        delay = super().backoff_delay(attempt)
+        self.delays.append(delay)
+        return delay
+
+
+def test_backoff_delay():
+    scheduler = JobScheduler(backoff=1.0, max_backoff=5.0, jitter=0.0)
+    assert [scheduler.backoff_delay(n) for n in range(1, 6)] == [1.0, 2.0, 4.0, 5.0, 5.0]
+    scheduler = JobScheduler(backoff=1.0, jitter=0.2)
+    assert all(0.8 <= scheduler.backoff_delay(1) <= 1.2 for _ in range(100))
+
+
+def test_is_transient():
+    assert is_transient(NETWORK, "fatal: unable to access '...': Connection reset by peer")
+    assert not is_transient(NETWORK, "fatal: Authentication failed for '...'")
+    assert not is_transient(CPU, "fatal: bad object")
+    assert is_transient(CPU, "fatal: Unable to create '/r/.git/index.lock': File exists.")
+
+
+def test_transient_failure_is_retried_with_backoff(tmp_path, remote):
+    # 前两次连接失败，第三次成功
+    counter = tmp_path / "attempts"
+    uploadpack = script(tmp_path / "flaky-upload-pack",
+                        f"n=$(cat '{counter}' 2>/dev/null || echo 0); echo $((n + 1)) > '{counter}'\n"
+                        f"if [ $n -lt 2 ]; then echo 'simulated connection reset' >&2; exit 1; fi\n"
+                        f"exec git-upload-pack \"$@\"")
+    paths = clones(tmp_path, remote, 1, uploadpack)
+    states = []
+    scheduler = RecordingScheduler(retries=3, backoff=0.05, jitter=0.0, on_update=lambda job: states.append(job.state))
+
+    start = time.perf_counter()
+    report = asyncio.run(scheduler.run(scheduler.plan(paths, ["fetch"])))
+
+    job = report.jobs[0]
+    assert (job.state, job.attempts, report.retries) == (DONE, 3, 2)
+    assert scheduler.delays == [0.05, 0.1]
+    assert time.perf_counter() - start >= 0.15
+    assert states.count(RETRYING) == 2
+
+
+def test_transient_failure_gives_up_after_retries(tmp_path, remote):
+    uploadpack = script(tmp_path / "down-upload-pack", "echo 'simulated connection reset' >&2; exit 1")
+    paths = clones(tmp_path, remote, 1, uploadpack)
+    scheduler = RecordingScheduler(retries=2, backoff=0.01, jitter=0.0)
+    report = asyncio.run(scheduler.run(scheduler.plan(paths, ["fetch", "gc"])))
+    fetch, gc = report.jobs
+    assert (fetch.state, fetch.attempts) == (FAILED, 3)
+    assert len(scheduler.delays) == 2
+    assert gc.state == SKIPPED
+
+
+def test_permanent_failure_is_not_retried(tmp_path, remote):
+    paths = clones(tmp_path, remote, 2)
+    git(paths[0], "remote", "set-url", "origin", f"file://{tmp_path / 'missing.git'}")
+    scheduler = RecordingScheduler(retries=3, backoff=0.01)
+    report = asyncio.run(scheduler.run(scheduler.plan(paths, ["fetch", "gc"])))
+
+    broken_fetch, broken_gc, fetch, gc = report.jobs
+    assert (broken_fetch.state, broken_fetch.attempts) == (FAILED, 1)
+    assert "does not appear to be a git repository" in broken_fetch.error
+    assert broken_gc.state == SKIPPED
+    assert scheduler.delays == []
+    # 一个仓库失败不影响其他仓库
+    assert (fetch.state, gc.state) == (DONE, DONE)
+
+
+def test_per_kind_limits_are_never_exceeded(tmp_path, remote):
+    # 慢速远程让 fetch 互相重叠
+    uploadpack = script(tmp_path / "slow-upload-pack", "sleep 0.2\nexec git-upload-pack \"$@\"")
+    paths = clones(tmp_path, remote, 6, uploadpack)
+    limits = {NETWORK: 2, CPU: 1}
+    observed = {NETWORK: 0, CPU: 0}
+    jobs = JobScheduler.plan(paths, ["fetch", "gc"])
+
+    def on_update(_job):
+        for kind in observed:
+            running = sum(1 for job in jobs if job.state == RUNNING and job.operation.kind == kind)
+            observed[kind] = max(observed[kind], running)
+
+    scheduler = JobScheduler(limits, on_update=on_update)
+    report = asyncio.run(scheduler.run(jobs))
+
+    assert report.ok
+    assert observed == report.peak == limits
+
+
+def test_cancel_stops_running_git_and_marks_jobs(tmp_path, remote):
+    hang = 1.0
+    uploadpack = script(tmp_path / "hanging-upload-pack", f"sleep {hang}\nexec git-upload-pack \"$@\"")
+    paths = clones(tmp_path, remote, 3, uploadpack)
+    scheduler = JobScheduler({NETWORK: 2})
+    jobs = scheduler.plan(paths, ["fetch", "gc"])
+
+    async def run() -> float:
+        task = asyncio.ensure_future(scheduler.run(jobs))
+        while sum(job.state == RUNNING for job in jobs) < 2:
+            await asyncio.sleep(0.01)
+        start = time.perf_counter()
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        elapsed = time.perf_counter() - start
+        # git 已被结束，但它启动的 upload-pack 脚本仍持有 stderr 管道；
+        # 等脚本退出、管道关闭后再关闭事件循环
+        await asyncio.sleep(hang + 0.5)
+        return elapsed
+
+    assert asyncio.run(run()) < hang / 2
+    assert all(job.state == CANCELLED for job in jobs)
+    assert scheduler.running == {NETWORK: 0, CPU: 0}
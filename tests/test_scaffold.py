@@ -0,0 +1,100 @@
+import json
+import os
+import subprocess
+import threading
+
+import pytest
+
+from core.scaffold import (RepoRequest, ScaffoldError, create, create_many, license_text,
+                           load_manifest)
+
+
+def git(cwd, *args) -> str:
+    return subprocess.run(["git", *args], cwd=cwd, check=True, capture_output=True, text=True).stdout
+
+
+def quiet(_line):
+    pass
+
+
+def test_create_in_existing_directory(project):
+    messages = []
+    sha = create(RepoRequest(project, "proj", readme=True, license="MIT"), report=messages.append)
+
+    assert sha == git(project, "rev-parse", "HEAD").strip()
+    # 已有的 README.md 保留原样，不放进初始提交
+    assert git(project, "ls-tree", "--name-only", "HEAD").split() == ["LICENSE"]
+    with open(os.path.join(project, "README.md")) as f:
+        assert f.read() == "existing readme\n"
+    assert any("README.md 已存在" in message for message in messages)
+    assert "?? main.py" in git(project, "status", "--porcelain").splitlines()
+    # 临时目录已删除
+    assert os.listdir(os.path.dirname(project)) == ["proj"]
+
+
+def test_create_refuses_existing_repository(project):
+    git(project, "init", "-q")
+    with pytest.raises(ScaffoldError):
+        create(RepoRequest(project, "proj", readme=True), report=quiet)
+
+
+def test_cancelled_create_leaves_existing_directory_untouched(project):
+    before = sorted(os.listdir(project))
+    cancelled = threading.Event()
+    cancelled.set()
+    with pytest.raises(ScaffoldError):
+        create(RepoRequest(project, "proj", license="MIT"), report=quiet, cancelled=cancelled)
+    assert sorted(os.listdir(project)) == before
+    assert os.listdir(os.path.dirname(project)) == ["proj"]
+
+
+def test_create_in_new_directory(tmp_path):
+    target = str(tmp_path / "a" / "b" / "new")
+    create(RepoRequest(target, "new", readme=True, license="Proprietary"), report=quiet)
+    assert git(target, "ls-tree", "--name-only", "HEAD").split() == ["LICENSE", "README.md"]
+    with open(os.path.join(target, "LICENSE")) as f:
+        assert "All rights reserved" in f.read()
+
+
+def test_license_text_for_non_spdx_names():
+    assert "SPDX" not in license_text("Proprietary", 2026, "A")
+    assert "spdx.org" not in license_text("Something-Else", 2026, "A")
+    assert "SPDX-License-Identifier: GPL-3.0-only" in license_text("GPL-3.0", 2026, "A")
+
+
+def test_load_manifest(tmp_path):
+    manifest = tmp_path / "sub" / "repos.json"
+    manifest.parent.mkdir()
+    manifest.write_text(json.dumps({"repositories": [
+        {"path": "one", "readme": True, "license": "MIT", "unknown": 1},
+        {"path": "nested/two/", "name": "Two", "gitignore": "Python"},
+    ]}))
+    one, two = load_manifest(str(manifest))
+    # 相对路径相对于清单文件所在目录；没有 name 时取目录名；未知的键被忽略
+    assert one == RepoRequest(str(manifest.parent / "one"), "one", readme=True, license="MIT")
+    assert two.path == os.path.join(str(manifest.parent), "nested/two/")
+    assert (two.name, two.gitignore, two.readme) == ("Two", "Python", False)
+
+    # 顶层也可以直接是列表
+    manifest.write_text(json.dumps([{"path": "three"}]))
+    assert [r.name for r in load_manifest(str(manifest))] == ["three"]
+
+
+def test_create_many_reports_each_repository(tmp_path):
+    (tmp_path / "taken" / ".git").mkdir(parents=True)
+    requests = [RepoRequest(str(tmp_path / f"repo{i}"), f"repo{i}", readme=True) for i in range(6)]
+    requests.insert(2, RepoRequest(str(tmp_path / "taken"), "taken", readme=True))
+    lines = []
+
+    results = create_many(requests, report=lines.append, workers=3)
+
+    # 结果与输入顺序相同；失败的仓库不影响其他仓库
+    assert [r.request for r in results] == requests
+    assert [r.ok for r in results] == [True, True, False, True, True, True, True]
+    assert "已经是 git 仓库" in results[2].error
+    for result in results:
+        if result.ok:
+            assert result.sha == git(result.request.path, "rev-parse", "HEAD").strip()
+    # 每行输出带仓库名前缀
+    assert all(line.startswith("[") for line in lines)
+    assert any(line.startswith("[taken] ❌") for line in lines)
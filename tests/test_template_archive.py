@@ -0,0 +1,59 @@
+import subprocess
+
+import pytest
+
+from core import scaffold, template_archive
+from core.ignore_match import IgnoreMatcher, list_files
+from core.scaffold import RepoRequest, create, gitignore_template
+from core.template_archive import TemplateArchive, TemplateArchiveError
+
+
+def git(cwd, *args) -> str:
+    return subprocess.run(["git", *args], cwd=cwd, check=True, capture_output=True, text=True).stdout
+
+
+def test_preview_then_create_in_populated_directory(project):
+    # 与 NewRepository 的预览相同：扫描目标目录，用选中的模板计数
+    text = gitignore_template("Python")
+    assert text is not None
+    files = list_files(project)
+    assert len(files) == 5
+    assert IgnoreMatcher.parse(text).count(files) == 2      # __pycache__ 和 build/
+
+    create(RepoRequest(project, "proj", gitignore="Python"), report=lambda _line: None)
+
+    assert git(project, "ls-tree", "--name-only", "HEAD").split() == [".gitignore"]
+    status = git(project, "status", "--porcelain", "--untracked-files=all").splitlines()
+    assert sorted(status) == ["?? README.md", "?? main.py", "?? pkg/__init__.py"]
+
+
+def test_corrupted_archive_degrades_to_no_template(tmp_path, monkeypatch):
+    # 换行被改写后的归档：偏移失效，读取时报错，创建仓库时跳过 .gitignore
+    with open(template_archive.GITIGNORE_ARCHIVE, "rb") as f:
+        data = f.read()
+    path = tmp_path / "gitignore.pack"
+    path.write_bytes(data.replace(b"\n", b"\r\n"))
+    archive = TemplateArchive(str(path))
+    with pytest.raises(TemplateArchiveError):
+        archive.names()
+    monkeypatch.setattr(scaffold, "gitignore_templates", lambda: archive)
+    assert gitignore_template("Python") is None
+
+
+def test_damaged_archive_does_not_keep_the_mapping(tmp_path, monkeypatch):
+    path = tmp_path / "gitignore.pack"
+    path.write_bytes(b"not an archive\n")
+    maps = []
+    real_mmap = template_archive.mmap.mmap
+
+    def tracking_mmap(*args, **kwargs):
+        mapped = real_mmap(*args, **kwargs)
+        maps.append(mapped)
+        return mapped
+
+    monkeypatch.setattr(template_archive.mmap, "mmap", tracking_mmap)
+    archive = TemplateArchive(str(path))
+    for _ in range(2):
+        with pytest.raises(TemplateArchiveError):
+            archive.names()
+    assert len(maps) == 2 and all(mapped.closed for mapped in maps)
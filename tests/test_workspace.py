@@ -0,0 +1,36 @@
+import os
+import threading
+import time
+
+from core import workspace
+from core.workspace import Workspace
+
+
+def test_concurrent_instances_keep_each_others_entries(tmp_path):
+    index = str(tmp_path / "workspace.json")
+
+    def register(worker):
+        registry = Workspace(index)
+        for i in range(20):
+            registry.add(str(tmp_path / f"repo-{worker}-{i}"))
+
+    threads = [threading.Thread(target=register, args=(worker,)) for worker in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(Workspace(index)) == 80
+    assert not os.path.exists(f"{index}.lock")
+
+
+def test_stale_lock_is_removed(tmp_path):
+    index = str(tmp_path / "workspace.json")
+    lock = f"{index}.lock"
+    open(lock, "w").close()
+    old = time.time() - workspace.STALE_LOCK - 1
+    os.utime(lock, (old, old))
+
+    Workspace(index).add(str(tmp_path / "repo"))
+    assert str(tmp_path / "repo") in Workspace(index)
+    assert not os.path.exists(lock)